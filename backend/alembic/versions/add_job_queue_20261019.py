@@ -0,0 +1,64 @@
+"""add background job queue table
+
+Revision ID: add_job_queue_20261019
+Revises: add_slow_query_log_20261019
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_job_queue_20261019"
+down_revision: Union[str, None] = "add_slow_query_log_20261019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create app_audit.jobs, claimed by workers with FOR UPDATE SKIP LOCKED."""
+    op.execute("CREATE SCHEMA IF NOT EXISTS app_audit")
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("kind", sa.String(length=100), nullable=False),
+        sa.Column("payload", postgresql.JSONB, server_default=sa.text("'{}'::jsonb"), nullable=False),
+        sa.Column("status", sa.String(length=20), server_default="queued", nullable=False),
+        sa.Column("priority", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("max_attempts", sa.Integer(), server_default="3", nullable=False),
+        sa.Column("run_after", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("progress", sa.Float(), server_default="0", nullable=False),
+        sa.Column("progress_message", sa.String(length=300), nullable=True),
+        sa.Column("result", postgresql.JSONB, nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("locked_by", sa.String(length=100), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_by", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        schema="app_audit",
+    )
+
+    op.create_index(
+        "idx_app_audit_jobs_claim",
+        "jobs",
+        [sa.text("priority DESC"), "run_after", "created_at"],
+        schema="app_audit",
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+    op.create_index("idx_app_audit_jobs_created_by", "jobs", ["created_by", "created_at"], schema="app_audit")
+
+
+def downgrade() -> None:
+    """Drop app_audit.jobs."""
+    op.drop_index("idx_app_audit_jobs_created_by", table_name="jobs", schema="app_audit")
+    op.drop_index("idx_app_audit_jobs_claim", table_name="jobs", schema="app_audit")
+    op.drop_table("jobs", schema="app_audit")
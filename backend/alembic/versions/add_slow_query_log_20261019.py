@@ -0,0 +1,49 @@
+"""add slow query log table
+
+Revision ID: add_slow_query_log_20261019
+Revises: migrate_tree_codes_to_yyyy_0000_20260210
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_slow_query_log_20261019"
+down_revision: Union[str, None] = "migrate_tree_codes_to_yyyy_0000_20260210"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create app_audit.slow_queries (filled when SLOW_QUERY_LOG_PERSIST is on)."""
+    op.execute("CREATE SCHEMA IF NOT EXISTS app_audit")
+
+    op.create_table(
+        "slow_queries",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("engine", sa.String(length=32), nullable=False),
+        sa.Column("duration_ms", postgresql.DOUBLE_PRECISION(), nullable=False),
+        sa.Column("statement", sa.Text(), nullable=False),
+        sa.Column("parameters", postgresql.JSONB, nullable=True),
+        sa.Column("http_method", sa.String(length=16), nullable=True),
+        sa.Column("route_path", sa.String(length=300), nullable=True),
+        sa.Column("user_email", sa.String(length=255), nullable=True),
+        sa.Column("plan", sa.Text(), nullable=True),
+        sa.Column("explain_error", sa.String(length=300), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        schema="app_audit",
+    )
+
+    op.create_index("idx_app_audit_slow_queries_occurred_at", "slow_queries", ["occurred_at"], schema="app_audit")
+
+
+def downgrade() -> None:
+    """Drop app_audit.slow_queries."""
+    op.drop_index("idx_app_audit_slow_queries_occurred_at", table_name="slow_queries", schema="app_audit")
+    op.drop_table("slow_queries", schema="app_audit")
@@ -1,6 +1,6 @@
 # app/apis/deps.py
-from typing import Optional, Generator, List, Callable
-from fastapi import Depends, HTTPException, status
+from typing import Optional, Generator, List, Callable, Sequence, Tuple
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, sessionmaker
@@ -15,6 +15,8 @@ from app.models.auth_models import User, Role # SQLAlchemy model
 from app.schemas.token_schemas import TokenPayload # Pydantic schema for token payload
 from app.crud.crud_user import user as crud_user # CRUD operations for user
 from app.crud.crud_session import session_crud
+from app.services.profiler_service import start_request_profile
+from app.db.query_stats import set_request_user
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl="/api/v1/auth/login" # Or your actual login path
@@ -69,6 +71,10 @@ def get_current_user(
             detail="Account suspended by administrator. Contact support for assistance."
         )
     
+    # Honour X-Profile: 1 now that we know whether this is a super admin
+    start_request_profile(user_obj)
+    set_request_user(user_obj.email)
+    
     return user_obj
 
 # Async version of get_current_user for use with async database sessions
@@ -125,6 +131,10 @@ async def get_current_user_async(
             detail="Account suspended by administrator. Contact support for assistance."
         )
     
+    # Honour X-Profile: 1 now that we know whether this is a super admin
+    start_request_profile(user_obj)
+    set_request_user(user_obj.email)
+    
     return user_obj
 
 def get_current_active_superuser(
@@ -323,3 +333,34 @@ def require_super_admin() -> Callable:
         return current_user
     
     return super_admin_checker
+
+
+def sparse_fields(allowed: Sequence[str]) -> Callable:
+    """
+    Dependency parsing the ``fields`` query parameter (a sparse fieldset) against
+    a resource's allow-list, normally ``Projection.names``. Returns None when the
+    parameter is absent, so endpoints return every field by default.
+    """
+    allowed = tuple(allowed)
+    description = (
+        "Comma-separated fields to return instead of the full object. Columns that back no requested "
+        "field are not read, except the key and, on list pages, the sort columns behind the cursors; "
+        "derived fields (counts, latest test) still cost their own lookup. "
+        f"Allowed: {', '.join(allowed)}"
+    )
+
+    def fields_parser(
+        fields: Optional[str] = Query(None, description=description, examples=[",".join(allowed[:4])])
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+        requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in allowed]
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field(s): {', '.join(unknown)}" if unknown else "fields must name at least one field",
+            )
+        return requested
+
+    return fields_parser
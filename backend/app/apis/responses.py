@@ -0,0 +1,37 @@
+"""JSON response rendered with orjson, for endpoints that return plain dicts.
+
+Returning a ``Response`` makes FastAPI skip the ``response_model`` validation
+and ``jsonable_encoder`` walk, so the content must already match the schema
+(see ``app.crud.projection``). Values are encoded the way pydantic's JSON mode
+encodes them: ISO datetimes with ``Z`` for UTC, UUIDs and Decimals as strings.
+orjson is optional; without it the stdlib encoder is used.
+"""
+
+import json
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_jsonable_python
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    return to_jsonable_python(value)
+
+
+def render_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
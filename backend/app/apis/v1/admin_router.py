@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc, delete
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
+import asyncio
 
 from app.apis.deps import get_current_user_async, get_db_session, require_roles, require_super_admin, require_permissions
 from app.models.auth_models import User, UserRoleMapping, Profile, Role
@@ -26,9 +28,23 @@ from app.schemas.permission_schemas import (
 )
 from app.services.auth_service import auth_service
 from app.services.system_health_service import SystemHealthService
+from app.services.loop_watchdog_service import loop_watchdog
+from app.services.profiler_service import request_profiler
+from app.services.memory_diagnostics_service import memory_diagnostics
+from app.db.slow_query_log import slow_query_log
+from app.db.database import sync_engine
+from app.services.index_advisor_service import index_advisor
+from app.models.audit_models import SlowQuery
 from app.services.permission_service import permission_service
+from app.services.cache_service import cache
+from app.services.cache_bus_service import cache_bus
+from app.services.analytics_service import analytics_snapshot, request_refresh
+from app.db.database import SessionLocal
+from app.apis.v1.job_router import job_status_url
+from app.schemas.job_schemas import JobAccepted
 from app.crud.crud_role import role_crud
 from app.crud.crud_user import user as crud_user
+from app.crud.pagination import set_cursor_headers
 from app.crud.crud_session import session_crud
 from app.core import supabase_client
 import secrets
@@ -87,22 +103,299 @@ async def get_user_activity_data(
 @router.get("/dashboard/system-health")
 async def get_system_health_data(
     db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(require_permissions(ADMIN_DASHBOARD_PERMISSIONS))
+    current_user: User = Depends(require_permissions(ADMIN_DASHBOARD_PERMISSIONS)),
+    history_limit: int = Query(60, ge=0, le=1000, description="Number of recent samples to include"),
+):
+    """Get system health metrics (latest values plus recent history)"""
+    
+    # Served from the background sampler's ring buffer; never blocks on psutil
+    return SystemHealthService.get_system_health(history_limit=history_limit)
+
+@router.get("/dashboard/event-loop")
+async def get_event_loop_stalls(
+    current_user: User = Depends(require_permissions(ADMIN_DASHBOARD_PERMISSIONS)),
+    limit: int = Query(20, ge=1, le=200, description="Number of top offending call sites to include"),
+):
+    """Get event-loop stall statistics and the call sites that blocked the loop the most"""
+    
+    return loop_watchdog.stats(limit=limit)
+
+@router.get("/dashboard/slow-queries")
+async def get_slow_queries(
+    current_user: User = Depends(require_permissions(ADMIN_DASHBOARD_PERMISSIONS)),
+    db: AsyncSession = Depends(get_db_session),
+    limit: int = Query(20, ge=1, le=200, description="Number of top offending statements to include"),
+    recent: int = Query(20, ge=0, le=200, description="Number of most recent slow statements to include"),
+    source: str = Query("memory", regex="^(memory|table)$", description="This worker's ring buffer or the persisted table"),
+    days: int = Query(7, ge=1, le=90, description="Window for source=table"),
+):
+    """Slow statements ranked by total time, with recent entries and their EXPLAIN plans"""
+    
+    if source == "memory":
+        return {**slow_query_log.stats(limit=limit), "recent": slow_query_log.recent(recent)}
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    total_ms = func.sum(SlowQuery.duration_ms)
+    rows = await db.execute(
+        select(
+            SlowQuery.statement,
+            func.count().label("count"),
+            total_ms.label("total_ms"),
+            func.avg(SlowQuery.duration_ms).label("mean_ms"),
+            func.max(SlowQuery.duration_ms).label("max_ms"),
+            func.max(SlowQuery.occurred_at).label("last_seen"),
+        )
+        .where(SlowQuery.occurred_at >= since)
+        .group_by(SlowQuery.statement)
+        .order_by(desc(total_ms))
+        .limit(limit)
+    )
+    recent_rows = await db.execute(
+        select(SlowQuery).where(SlowQuery.occurred_at >= since).order_by(SlowQuery.occurred_at.desc()).limit(recent)
+    )
+    return {
+        "source": "table",
+        "days": days,
+        "top_offenders": [
+            {
+                "statement": row.statement,
+                "count": row.count,
+                "total_ms": round(row.total_ms, 2),
+                "mean_ms": round(row.mean_ms, 2),
+                "max_ms": round(row.max_ms, 2),
+                "last_seen": row.last_seen,
+            }
+            for row in rows
+        ],
+        "recent": [
+            {
+                "id": str(entry.id),
+                "occurred_at": entry.occurred_at,
+                "engine": entry.engine,
+                "duration_ms": entry.duration_ms,
+                "shape": entry.statement,
+                "parameters": entry.parameters,
+                "method": entry.http_method,
+                "route": entry.route_path,
+                "user_email": entry.user_email,
+                "plan": entry.plan,
+                "explain_error": entry.explain_error,
+            }
+            for entry in recent_rows.scalars()
+        ],
+    }
+
+@router.get("/dashboard/slow-queries/{entry_id}")
+async def get_slow_query(
+    entry_id: str,
+    current_user: User = Depends(require_permissions(ADMIN_DASHBOARD_PERMISSIONS)),
+):
+    """One slow statement from this worker's ring buffer, including its EXPLAIN plan"""
+    
+    entry = slow_query_log.get(entry_id)
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slow query entry not found on this worker")
+    return entry
+
+@router.delete("/dashboard/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries(
+    current_user: User = Depends(require_super_admin()),
+):
+    """Clear this worker's slow-query ring buffer and totals"""
+    
+    slow_query_log.reset()
+
+@router.get("/profiles")
+async def list_request_profiles(
+    current_user: User = Depends(require_super_admin()),
+):
+    """List request profiles captured on this worker (send `X-Profile: 1` to capture one)"""
+    
+    return request_profiler.artifacts()
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    current_user: User = Depends(require_super_admin()),
+    format: str = Query("collapsed", regex="^(collapsed|speedscope)$"),
+):
+    """Download a request profile as collapsed stacks (flamegraph.pl) or speedscope JSON"""
+    
+    artifact = request_profiler.get(profile_id)
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found on this worker"
+        )
+    
+    if format == "speedscope":
+        return artifact.speedscope()
+    return PlainTextResponse(artifact.collapsed())
+
+# Cache
+
+@router.get("/cache")
+async def get_cache_status(
+    current_user: User = Depends(require_super_admin()),
+):
+    """Cache backend size and the state of this worker's invalidation listener"""
+    
+    return {"cache": cache.stats(), "bus": cache_bus.stats()}
+
+# Analytics snapshot
+
+@router.get("/analytics")
+async def get_analytics_status(
+    current_user: User = Depends(require_super_admin()),
 ):
-    """Get system health metrics"""
+    """Analytics snapshot tables (rows, size, fingerprint, age) and this worker's last refresh"""
     
-    # Get real system health metrics from the service
-    return SystemHealthService.get_system_metrics()
+    return await asyncio.to_thread(analytics_snapshot.stats)
+
+def _queue_analytics_refresh(force: bool, created_by: str):
+    with SessionLocal() as db:
+        return request_refresh(db, force=force, created_by=created_by)
+
+@router.post("/analytics/refresh", response_model=JobAccepted, status_code=202)
+async def refresh_analytics_snapshot(
+    current_user: User = Depends(require_super_admin()),
+    force: bool = Query(False, description="Recopy every table, changed or not"),
+):
+    """Queue a snapshot refresh; returns the already pending one if there is one"""
+    
+    job = await asyncio.to_thread(_queue_analytics_refresh, force, current_user.email)
+    return JobAccepted(job_id=job.id, status=job.status, status_url=job_status_url(job.id))
+
+# Memory diagnostics (per worker process)
+
+@router.get("/memory")
+async def get_memory_summary(
+    current_user: User = Depends(require_super_admin()),
+):
+    """RSS, tracemalloc status, GC generation counts and live ORM instances per mapped class"""
+    
+    # Walks the whole heap; keep it off the event loop
+    return await asyncio.to_thread(memory_diagnostics.summary)
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(
+    current_user: User = Depends(require_super_admin()),
+    frames: int = Query(1, ge=1, le=50, description="Traceback depth to record per allocation"),
+):
+    """Start tracing allocations (adds memory and CPU overhead until stopped)"""
+    
+    return memory_diagnostics.start(frames)
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc(
+    current_user: User = Depends(require_super_admin()),
+):
+    """Stop tracing allocations; existing snapshots are kept"""
+    
+    return memory_diagnostics.stop()
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot(
+    current_user: User = Depends(require_super_admin()),
+    name: Optional[str] = Query(None, max_length=100),
+):
+    """Take a named tracemalloc snapshot"""
+    
+    try:
+        return await asyncio.to_thread(memory_diagnostics.take_snapshot, name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/memory/snapshots")
+async def list_memory_snapshots(
+    current_user: User = Depends(require_super_admin()),
+):
+    """List stored tracemalloc snapshots"""
+    
+    return memory_diagnostics.list_snapshots()
+
+@router.delete("/memory/snapshots/{name}")
+async def delete_memory_snapshot(
+    name: str,
+    current_user: User = Depends(require_super_admin()),
+):
+    """Delete a stored snapshot"""
+    
+    if not memory_diagnostics.delete_snapshot(name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    return {"message": "Snapshot deleted"}
+
+@router.get("/memory/diff")
+async def diff_memory_snapshots(
+    base: str = Query(..., description="Snapshot to compare from"),
+    target: Optional[str] = Query(None, description="Snapshot to compare to; defaults to a fresh snapshot"),
+    group_by: str = Query("lineno", regex="^(lineno|filename|traceback)$"),
+    limit: int = Query(25, ge=1, le=500),
+    current_user: User = Depends(require_super_admin()),
+):
+    """Top allocation growth sites between two snapshots"""
+    
+    try:
+        return await asyncio.to_thread(
+            memory_diagnostics.diff, base, target, group_by=group_by, limit=limit
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+# Index advisor
+
+@router.get("/index-advisor")
+async def run_index_advisor(
+    current_user: User = Depends(require_super_admin()),
+    limit: int = Query(100, ge=1, le=500, description="Workload statements to consider"),
+    min_calls: int = Query(5, ge=1, description="Ignore pg_stat_statements entries with fewer calls"),
+    max_candidates: int = Query(25, ge=1, le=100),
+    estimate: bool = Query(True, description="Estimate plan cost with and without each candidate"),
+    cached: bool = Query(False, description="Return the last run on this worker instead of analysing again"),
+):
+    """Rank missing indexes for the heaviest statements in pg_stat_statements and the slow-query log"""
+
+    if cached:
+        last = index_advisor.last_run()
+        if last is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The index advisor has not run on this worker")
+        return last
+    # Plans every candidate on a blocking connection; keep it off the event loop
+    return await asyncio.to_thread(
+        index_advisor.analyze, sync_engine,
+        limit=limit, min_calls=min_calls, max_candidates=max_candidates, estimate=estimate,
+    )
+
+@router.post("/index-advisor/migration")
+async def render_index_migration(
+    candidate_ids: List[str],
+    current_user: User = Depends(require_super_admin()),
+    down_revision: Optional[str] = Query(None, description="Current Alembic head"),
+    message: Optional[str] = Query(None, max_length=100),
+):
+    """Alembic migration stub creating the chosen candidates from the last advisor run"""
+
+    if not candidate_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No candidate ids given")
+    try:
+        return PlainTextResponse(index_advisor.migration(candidate_ids, down_revision=down_revision, message=message))
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
 
 
 # User Management Endpoints
 
 @router.get("/users", response_model=List[UserFullPublic])
 async def get_all_users(
+    response: Response,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(require_permissions(["user_account.view"])),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
     search: Optional[str] = Query(None),
     status: Optional[str] = Query("active", regex="^(active|archived|all)$")
 ):
@@ -110,6 +403,8 @@ async def get_all_users(
     
     Args:
         status: Filter by user status - 'active' (default), 'archived', or 'all'
+
+    Newest first; page cursors are returned in the `X-Next-Cursor` / `X-Prev-Cursor` headers.
     """
     
     # Build base query based on status filter
@@ -128,13 +423,14 @@ async def get_all_users(
             Profile.last_name.ilike(f"%{search}%")
         )
     
-    query = query.offset(skip).limit(limit).order_by(desc(User.created_at))
-    
-    result = await db.execute(query)
-    users = result.scalars().all()
+    try:
+        page = await crud_user.paginator.paginate(db, query, skip=skip, limit=limit, after=after, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_cursor_headers(response, page)
     
     # Fetch users with their profiles and roles in batch queries (optimized)
-    user_ids = [user.id for user in users]
+    user_ids = [user.id for user in page.items]
     users_with_details = await auth_service.get_users_with_details(db=db, user_ids=user_ids)
     
     return users_with_details
@@ -729,6 +1025,7 @@ async def remove_role_from_user(
     return {"message": "Role removed successfully"}
 
 @router.get("/roles", response_model=List[RolePublic])
+@cache.cached("admin.roles", tags=("roles", "role_permissions", "permissions"), model=List[RolePublic])
 async def get_available_roles(
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(require_roles(["admin"]))
@@ -6,6 +6,9 @@ from .upload_router import router as upload_router
 from . import auth_router, profile_router, emission_router, fee_router, test_schedules, tree_management_router, planting_router, admin_router, session_router, audit_router
 from .dashboard_router import router as dashboard_router
 from .gemini_router import router as gemini_router
+from .job_router import router as job_router
+from .export_router import router as export_router
+from .report_router import router as report_router
 
 api_v1_router = APIRouter()
 api_v1_router.include_router(auth_router.router, prefix="/auth", tags=["Authentication"])
@@ -24,3 +27,6 @@ api_v1_router.include_router(dashboard_router)
 api_v1_router.include_router(gemini_router, prefix="/gemini", tags=["Gemini AI"])
 api_v1_router.include_router(upload_router)  # File Upload
 api_v1_router.include_router(audit_router.router, prefix="/admin", tags=["Audit"])
+api_v1_router.include_router(job_router, prefix="/jobs", tags=["Jobs"])
+api_v1_router.include_router(export_router, prefix="/export", tags=["Export"])
+api_v1_router.include_router(report_router, prefix="/reports", tags=["Reports"])
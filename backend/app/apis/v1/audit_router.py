@@ -28,6 +28,8 @@ async def list_audit_logs(
     search: Optional[str] = Query(None, description="Free-text search across event name, route, and user"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = Query(None, description="Cursor pointing to the last item of the previous page"),
+    before: Optional[str] = Query(None, description="Cursor pointing to the first item of the next page"),
 ):
     filters = AuditLogFilter(
         module_name=module_name,
@@ -39,10 +41,17 @@ async def list_audit_logs(
         search=search,
         skip=skip,
         limit=limit,
+        after=after,
+        before=before,
     )
 
-    logs, total = await audit_log_crud.get_logs(db, filters=filters)
-    return AuditLogListResponse(items=logs, total=total)
+    try:
+        page, total = await audit_log_crud.get_logs(db, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return AuditLogListResponse(
+        items=page.items, total=total, next_cursor=page.next_cursor, prev_cursor=page.prev_cursor
+    )
 
 
 @router.get("/logs/{log_id}", response_model=AuditLogResponse)
@@ -1,12 +1,20 @@
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func, case
+from sqlalchemy import desc, func
 from uuid import UUID
 import traceback
 
-from app.apis.deps import get_db, require_permissions_sync
+from app.apis.deps import get_db, require_permissions_sync, sparse_fields
+from app.apis.responses import FastJSONResponse
 from app.crud import crud_emission
+from app.crud.crud_emission import TEST_RESPONSE, VEHICLE_LIST, test_period_tag
+from app.services.analytics_service import analytics_snapshot
+from app.services.cache_service import bulk_tag, cache
+from app.services import job_handlers  # noqa: F401  (registers the job kinds enqueued below)
+from app.services.job_service import enqueue_sync
+from app.apis.v1.job_router import job_status_url
+from app.schemas.job_schemas import JobAccepted
 from app.models.auth_models import User
 from app.models.emission_models import Office as OfficeModel, Vehicle as VehicleModel, VehicleDriverHistory, Test as TestModel
 from app.schemas.emission_schemas import (
@@ -24,6 +32,13 @@ from app.schemas.emission_schemas import (
 router = APIRouter()
 
 
+def _test_period_tag(year: Optional[int], quarter: Optional[int]) -> list:
+    # A single quarter only goes stale when that quarter's tests change (or on a bulk write)
+    if year is not None and quarter is not None:
+        return [test_period_tag(year, quarter), bulk_tag("tests")]
+    return ["tests"]
+
+
 # Offices endpoints
 @router.get("/offices", response_model=OfficeListResponse)
 def get_offices(
@@ -106,6 +121,26 @@ def get_office_compliance(
         )
 
 
+@router.post("/offices/compliance/jobs", response_model=JobAccepted, status_code=202)
+def start_office_compliance_job(
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    search_term: Optional[str] = None,
+    year: Optional[int] = None,
+    quarter: Optional[int] = None,
+    current_user: User = Depends(require_permissions_sync(['office.view']))
+):
+    """Aggregate office compliance in the background; the job result has the /offices/compliance shape"""
+    job = enqueue_sync(
+        db,
+        "emission.office_compliance",
+        {"skip": skip, "limit": limit, "search_term": search_term, "year": year, "quarter": quarter},
+        created_by=current_user.email,
+    )
+    return JobAccepted(job_id=job.id, status=job.status, status_url=job_status_url(job.id))
+
+
 @router.get("/offices/vehicle-counts", response_model=OfficeVehicleCountsResponse)
 def get_office_vehicle_counts(
     db: Session = Depends(get_db),
@@ -165,6 +200,11 @@ def get_office_vehicle_counts(
 
 # Dashboard summary endpoint
 @router.get("/dashboard/summary", response_model=EmissionDashboardSummary)
+@cache.cached(
+    "emission.dashboard_summary",
+    tags=("vehicles", "offices", _test_period_tag),
+    model=EmissionDashboardSummary,
+)
 def get_emission_dashboard_summary(
     db: Session = Depends(get_db),
     year: Optional[int] = None,
@@ -173,109 +213,16 @@ def get_emission_dashboard_summary(
 ):
     """
     Get aggregated dashboard metrics for emission overview.
-    Uses latest test per vehicle for the selected period.
+    Uses latest test per vehicle for the selected period, read from the
+    analytics snapshot while it is fresh (see ``freshness``).
     """
     try:
-        filters = []
-        if year is not None:
-            filters.append(TestModel.year == year)
-        if quarter is not None:
-            filters.append(TestModel.quarter == quarter)
-
-        latest_tests_subquery = (
-            db.query(
-                TestModel.vehicle_id.label("vehicle_id"),
-                TestModel.result.label("result"),
-                TestModel.test_date.label("test_date"),
-                func.row_number()
-                .over(
-                    partition_by=TestModel.vehicle_id,
-                    order_by=TestModel.test_date.desc()
-                )
-                .label("rn"),
-            )
-            .filter(*filters)
-        ).subquery()
-
-        latest_tests = (
-            db.query(
-                latest_tests_subquery.c.vehicle_id,
-                latest_tests_subquery.c.result,
-                latest_tests_subquery.c.test_date,
-            )
-            .filter(latest_tests_subquery.c.rn == 1)
-        ).subquery()
-
-        total_vehicles = db.query(func.count(VehicleModel.id)).scalar() or 0
-        total_offices = db.query(func.count(OfficeModel.id)).scalar() or 0
-        tested_vehicles = db.query(func.count(latest_tests.c.vehicle_id)).scalar() or 0
-        passed_tests = (
-            db.query(func.count())
-            .select_from(latest_tests)
-            .filter(latest_tests.c.result.is_(True))
-            .scalar()
-            or 0
-        )
-        failed_tests = (
-            db.query(func.count())
-            .select_from(latest_tests)
-            .filter(latest_tests.c.result.is_(False))
-            .scalar()
-            or 0
-        )
-        pending_tests = max(total_vehicles - tested_vehicles, 0)
-        compliance_rate = round((passed_tests / total_vehicles * 100) if total_vehicles > 0 else 0, 2)
-
-        tested_count_expr = func.count(latest_tests.c.vehicle_id)
-        passed_count_expr = func.sum(
-            case(
-                (latest_tests.c.result.is_(True), 1),
-                else_=0
-            )
+        summary, freshness = analytics_snapshot.compute(
+            db,
+            crud_emission.EMISSION_DASHBOARD_TABLES,
+            lambda run: crud_emission.office_compliance.dashboard_summary(run, year=year, quarter=quarter),
         )
-        compliance_expr = case(
-            (tested_count_expr > 0, passed_count_expr * 100.0 / tested_count_expr),
-            else_=0.0
-        )
-
-        top_office_row = (
-            db.query(
-                OfficeModel.name.label("office_name"),
-                func.count(func.distinct(VehicleModel.id)).label("vehicle_count"),
-                tested_count_expr.label("tested_count"),
-                passed_count_expr.label("passed_count"),
-                compliance_expr.label("compliance_rate"),
-            )
-            .join(VehicleModel, VehicleModel.office_id == OfficeModel.id)
-            .outerjoin(latest_tests, latest_tests.c.vehicle_id == VehicleModel.id)
-            .group_by(OfficeModel.name)
-            .order_by(
-                compliance_expr.desc(),
-                tested_count_expr.desc(),
-                func.count(func.distinct(VehicleModel.id)).desc(),
-            )
-            .first()
-        )
-
-        top_office = None
-        if top_office_row:
-            top_office = {
-                "office_name": top_office_row.office_name,
-                "compliance_rate": round(float(top_office_row.compliance_rate or 0), 2),
-                "passed_count": int(top_office_row.passed_count or 0),
-                "vehicle_count": int(top_office_row.vehicle_count or 0),
-            }
-
-        return {
-            "total_vehicles": int(total_vehicles),
-            "total_offices": int(total_offices),
-            "tested_vehicles": int(tested_vehicles),
-            "passed_tests": int(passed_tests),
-            "failed_tests": int(failed_tests),
-            "pending_tests": int(pending_tests),
-            "compliance_rate": float(compliance_rate),
-            "top_office": top_office,
-        }
+        return {**summary, "freshness": freshness}
     except Exception as e:
         print(f"Error in get_emission_dashboard_summary: {str(e)}")
         traceback.print_exc()
@@ -381,12 +328,14 @@ def get_vehicles(
     search: Optional[str] = None,
     include_test_data: bool = False,  # New parameter to optionally include test data
     include_total: bool = Query(True, description="Include total count (can be slow on large datasets)"),
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(VEHICLE_LIST.names)),
     current_user: User = Depends(require_permissions_sync(['vehicle.view']))
 ):
     """
     Get all vehicles with optional filtering.
     By default, excludes test data for better performance.
     Set include_test_data=true to include latest test results.
+    `fields` limits each vehicle to the listed fields.
     """
     try:
         if after and before:
@@ -402,7 +351,7 @@ def get_vehicles(
             resolved_include_total = False
 
         if search:
-            return crud_emission.vehicle.search(
+            return FastJSONResponse(crud_emission.vehicle.search(
                 db,
                 search_term=search,
                 limit=limit,
@@ -410,7 +359,8 @@ def get_vehicles(
                 before=before,
                 skip=skip,
                 include_total=resolved_include_total,
-            )
+                fields=fields,
+            ))
         
         filters = {}
         if plate_number:
@@ -434,7 +384,7 @@ def get_vehicles(
         
         # Choose which method to use based on include_test_data parameter
         if include_test_data:
-            return crud_emission.vehicle.get_multi_with_test_info(
+            return FastJSONResponse(crud_emission.vehicle.get_multi_with_test_info(
                 db,
                 limit=limit,
                 filters=filters,
@@ -442,9 +392,10 @@ def get_vehicles(
                 before=before,
                 skip=skip,
                 include_total=resolved_include_total,
-            )
+                fields=fields,
+            ))
         else:
-            return crud_emission.vehicle.get_multi_optimized(
+            return FastJSONResponse(crud_emission.vehicle.get_multi_optimized(
                 db,
                 limit=limit,
                 filters=filters,
@@ -452,7 +403,8 @@ def get_vehicles(
                 before=before,
                 skip=skip,
                 include_total=resolved_include_total,
-            )
+                fields=fields,
+            ))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -558,19 +510,23 @@ def create_vehicle(
 @router.get("/vehicles/{vehicle_id}", response_model=Vehicle)
 def get_vehicle(
     vehicle_id: UUID,
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(VEHICLE_LIST.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['vehicle.view']))
 ):
     """
     Get a specific vehicle by ID.
     """
-    vehicle = crud_emission.vehicle.get_with_test_info(db, id=vehicle_id)
+    if fields is not None:
+        vehicle = crud_emission.vehicle.get_fields_with_test_info(db, id=vehicle_id, fields=fields)
+    else:
+        vehicle = crud_emission.vehicle.get_with_test_info(db, id=vehicle_id)
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vehicle not found"
         )
-    return vehicle
+    return FastJSONResponse(vehicle) if fields is not None else vehicle
 
 
 @router.put("/vehicles/{vehicle_id}", response_model=Vehicle)
@@ -684,6 +640,7 @@ def delete_vehicle(
 
 
 @router.get("/vehicles/filters/options")
+@cache.cached("emission.filter_options", tags=("vehicles", "offices"))
 def get_filter_options(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['vehicle.view']))
@@ -708,30 +665,29 @@ def get_tests(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor pointing to the last item of the previous page"),
+    before: Optional[str] = Query(None, description="Cursor pointing to the first item of the next page"),
     vehicle_id: Optional[UUID] = None,
     quarter: Optional[int] = None,
     year: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(TEST_RESPONSE.names)),
     current_user: User = Depends(require_permissions_sync(['test.view']))
 ):
     """
     Get all tests or tests for a specific vehicle, optionally filtered by quarter and year.
+    `fields` limits each test to the listed fields.
     """
     try:
         if vehicle_id:
-            return crud_emission.test.get_by_vehicle(db, vehicle_id=vehicle_id, skip=skip, limit=limit)
-        
-        # Query directly to avoid nested dictionary issues
-        query = db.query(TestModel)
-        
-        # Apply quarter and year filters if provided
-        if quarter is not None:
-            query = query.filter(TestModel.quarter == quarter)
-        if year is not None:
-            query = query.filter(TestModel.year == year)
+            return FastJSONResponse(crud_emission.test.get_by_vehicle(
+                db, vehicle_id=vehicle_id, skip=skip, limit=limit, after=after, before=before, fields=fields
+            ))
         
-        total = query.count()
-        tests = query.order_by(desc(TestModel.test_date)).offset(skip).limit(limit).all()
-        return {"tests": tests, "total": total}
+        return FastJSONResponse(crud_emission.test.get_multi_sync(
+            db, skip=skip, limit=limit, after=after, before=before, quarter=quarter, year=year, fields=fields
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"Error in get_tests: {str(e)}")
         traceback.print_exc()
@@ -766,19 +722,23 @@ def create_test(
 @router.get("/tests/{test_id}", response_model=Test)
 def get_test(
     test_id: UUID,
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(TEST_RESPONSE.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['test.view']))
 ):
     """
     Get a specific test by ID.
     """
-    test = crud_emission.test.get_sync(db, id=test_id)
+    if fields is not None:
+        test = crud_emission.test.get_projected_sync(db, TEST_RESPONSE.only(fields), id=test_id)
+    else:
+        test = crud_emission.test.get_sync(db, id=test_id)
     if not test:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Test not found"
         )
-    return test
+    return FastJSONResponse(test) if fields is not None else test
 
 
 @router.put("/tests/{test_id}", response_model=Test)
@@ -922,18 +882,24 @@ def get_driver_history(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor pointing to the last item of the previous page"),
+    before: Optional[str] = Query(None, description="Cursor pointing to the first item of the next page"),
     vehicle_id: Optional[UUID] = None,
     current_user: User = Depends(require_permissions_sync(['vehicle.view']))
 ):
     """
     Get driver history for all vehicles or a specific vehicle.
     """
-    if vehicle_id:
-        return crud_emission.vehicle_driver_history.get_by_vehicle(db, vehicle_id=vehicle_id, skip=skip, limit=limit)
-    
-    history = crud_emission.vehicle_driver_history.get_multi_sync(db, skip=skip, limit=limit)
-    total = crud_emission.vehicle_driver_history.count_sync(db)
-    return {"history": history, "total": total}
+    try:
+        if vehicle_id:
+            return crud_emission.vehicle_driver_history.get_by_vehicle(
+                db, vehicle_id=vehicle_id, skip=skip, limit=limit, after=after, before=before
+            )
+        return crud_emission.vehicle_driver_history.get_multi_sync(
+            db, skip=skip, limit=limit, after=after, before=before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 # Vehicle Remarks endpoints
 @router.get("/vehicles/{vehicle_id}/remarks/{year}", response_model=VehicleRemarks)
@@ -0,0 +1,130 @@
+# app/apis/v1/export_router.py
+"""Whole filtered listings as downloadable CSV, NDJSON or Parquet streams."""
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.apis.deps import require_permissions, require_permissions_sync
+from app.db.database import sync_engine
+from app.models.auth_models import User
+from app.schemas.audit_schemas import AuditLogFilter
+from app.services import export_service
+
+router = APIRouter()
+
+FORMAT_QUERY = Query(
+    "csv", alias="format", pattern="^(csv|ndjson|parquet)$", description="csv, ndjson or parquet"
+)
+
+
+def _stream(entity: str, stmt: Select, export_format: str) -> StreamingResponse:
+    if export_format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs the pyarrow package on the server")
+    # The generator opens its own connection: request dependencies are closed
+    # before a streaming body starts.
+    return StreamingResponse(
+        export_service.export_chunks(sync_engine.connect, stmt, export_format),
+        media_type=export_service.FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_service.export_filename(entity, export_format)}"'
+        },
+    )
+
+
+@router.get("/vehicles")
+def export_vehicles(
+    export_format: str = FORMAT_QUERY,
+    plate_number: Optional[str] = None,
+    chassis_number: Optional[str] = None,
+    registration_number: Optional[str] = None,
+    driver_name: Optional[str] = None,
+    office_name: Optional[str] = None,
+    office_id: Optional[UUID] = None,
+    vehicle_type: Optional[str] = None,
+    engine_type: Optional[str] = None,
+    wheels: Optional[int] = None,
+    current_user: User = Depends(require_permissions_sync(['vehicle.view'])),
+):
+    """All vehicles matching the `/emission/vehicles` filters, with their office name."""
+    filters = {
+        "plate_number": plate_number,
+        "chassis_number": chassis_number,
+        "registration_number": registration_number,
+        "driver_name": driver_name,
+        "office_name": office_name,
+        "office_id": office_id,
+        "vehicle_type": vehicle_type,
+        "engine_type": engine_type,
+        "wheels": wheels,
+    }
+    return _stream("vehicles", export_service.vehicles_select(filters), export_format)
+
+
+@router.get("/tests")
+def export_tests(
+    export_format: str = FORMAT_QUERY,
+    vehicle_id: Optional[UUID] = None,
+    quarter: Optional[int] = Query(None, ge=1, le=4),
+    year: Optional[int] = None,
+    current_user: User = Depends(require_permissions_sync(['test.view'])),
+):
+    """All emission tests matching the `/emission/tests` filters."""
+    return _stream("tests", export_service.tests_select(vehicle_id, quarter, year), export_format)
+
+
+@router.get("/trees")
+def export_trees(
+    export_format: str = FORMAT_QUERY,
+    status: Optional[str] = Query(None, description="Filter by status: alive, cut, dead, replaced"),
+    health: Optional[str] = Query(None, description="Filter by health: healthy, needs_attention, diseased, dead"),
+    species: Optional[str] = Query(None, description="Filter by species (partial match)"),
+    barangay: Optional[str] = Query(None, description="Filter by barangay (partial match)"),
+    search: Optional[str] = Query(None, description="Search by code, species, name, or address"),
+    is_archived: Optional[bool] = Query(False, description="Filter by archived status. Set to null to include all."),
+    current_user: User = Depends(require_permissions_sync(['tree.view'])),
+):
+    """All inventory trees matching the `/tree-inventory/trees` filters."""
+    stmt = export_service.trees_select(
+        status=status, health=health, species=species, barangay=barangay, search=search, is_archived=is_archived
+    )
+    return _stream("trees", stmt, export_format)
+
+
+@router.get("/fees")
+def export_fees(
+    export_format: str = FORMAT_QUERY,
+    year: Optional[int] = Query(None, description="Filter by year (e.g., 2025)"),
+    current_user: User = Depends(require_permissions_sync(['fee.view'])),
+):
+    """All urban greening fee records, optionally for one year."""
+    return _stream("fees", export_service.fees_select(year), export_format)
+
+
+@router.get("/audit-logs")
+def export_audit_logs(
+    export_format: str = FORMAT_QUERY,
+    module_name: Optional[str] = Query(None, description="Filter by module name"),
+    user_email: Optional[str] = Query(None, description="Filter by acting user email"),
+    event_id: Optional[str] = Query(None, description="Filter by event identifier"),
+    status_code: Optional[int] = Query(None, ge=100, le=599),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    search: Optional[str] = Query(None, description="Free-text search across event name, route, and user"),
+    current_user: User = Depends(require_permissions(["audit_log.view"])),
+):
+    """All audit log entries matching the `/admin/audit/logs` filters."""
+    filters = AuditLogFilter(
+        module_name=module_name,
+        user_email=user_email,
+        event_id=event_id,
+        status_code=status_code,
+        date_from=date_from,
+        date_to=date_to,
+        search=search,
+    )
+    return _stream("audit-logs", export_service.audit_logs_select(filters), export_format)
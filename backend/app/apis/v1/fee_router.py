@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.apis.deps import get_db, require_permissions_sync
+from app.apis.deps import get_db, require_permissions_sync, sparse_fields
 from app.models.auth_models import User
-from app.crud.crud_fee import urban_greening_fee_record
+from app.apis.responses import FastJSONResponse
+from app.crud.crud_fee import FEE_LIST, urban_greening_fee_record
 from app.schemas.fee_schemas import (
     UrbanGreeningFeeRecord, UrbanGreeningFeeRecordCreate, UrbanGreeningFeeRecordUpdate
 )
@@ -16,15 +17,26 @@ def read_urban_greening_fee_records(
     db: Session = Depends(get_db), 
     skip: int = 0, 
     limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
     year: int = Query(None, description="Filter by year (e.g., 2025)"),
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(FEE_LIST.names)),
     current_user: User = Depends(require_permissions_sync(['fee.view']))
 ):
     """
-    Retrieve urban greening fee records. Optionally filter by year.
+    Retrieve urban greening fee records, newest first. Optionally filter by year.
+    Page cursors are returned in the `X-Next-Cursor` / `X-Prev-Cursor` headers;
+    `fields` limits each record to the listed fields.
     """
     if year:
-        return urban_greening_fee_record.get_by_year(db, year=year)
-    return urban_greening_fee_record.get_multi_sync(db, skip=skip, limit=limit)
+        return FastJSONResponse(urban_greening_fee_record.get_by_year(db, year=year, fields=fields))
+    try:
+        page = urban_greening_fee_record.get_projected_page_sync(
+            db, FEE_LIST.only(fields), skip=skip, limit=limit, after=after, before=before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page.items, headers=page.cursor_headers())
 
 @router.get("/urban-greening/search", response_model=List[UrbanGreeningFeeRecord])
 def search_urban_greening_fee_records(
@@ -59,16 +71,20 @@ def create_urban_greening_fee_record(
 @router.get("/urban-greening/{record_id}", response_model=UrbanGreeningFeeRecord)
 def read_urban_greening_fee_record(
     record_id: str,
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(FEE_LIST.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['fee.view']))
 ):
     """
     Get urban greening fee record by ID.
     """
-    record = urban_greening_fee_record.get_sync(db, id=record_id)
+    if fields is not None:
+        record = urban_greening_fee_record.get_projected_sync(db, FEE_LIST.only(fields), id=record_id)
+    else:
+        record = urban_greening_fee_record.get_sync(db, id=record_id)
     if not record:
         raise HTTPException(status_code=404, detail="Fee record not found")
-    return record
+    return FastJSONResponse(record) if fields is not None else record
 
 @router.put("/urban-greening/{record_id}", response_model=UrbanGreeningFeeRecord)
 def update_urban_greening_fee_record(
@@ -2,12 +2,11 @@ from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form
 from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from sqlalchemy.orm import Session
+import asyncio
 import base64
 import json
 import logging
-import httpx
 
-from app.core.config import settings
 from app.schemas.gemini_schemas import (
     GeminiTextRequest,
     GeminiImageRequest,
@@ -21,6 +20,7 @@ from app.schemas.gemini_schemas import (
     PlateRecognitionResponse
 )
 from app.services.gemini_service import gemini_service
+from app.services.ocr_service import ocr_service
 from app.apis.deps import get_current_user, get_db
 from app.models.auth_models import User
 
@@ -235,10 +235,10 @@ async def upload_multimodal(
                     detail=f"File {img.filename} must be an image"
                 )
             
+            # Pass raw bytes through; the service only re-encodes oversized images
             image_data = await img.read()
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
             processed_images.append({
-                'data': image_base64,
+                'data': memoryview(image_data),
                 'mime_type': img.content_type
             })
         
@@ -327,10 +327,10 @@ async def analyze_environmental_data_upload(
                         detail=f"File {img.filename} must be an image"
                     )
                 
+                # Pass raw bytes through; the service only re-encodes oversized images
                 image_data = await img.read()
-                image_base64 = base64.b64encode(image_data).decode('utf-8')
                 processed_images.append({
-                    'data': image_base64,
+                    'data': memoryview(image_data),
                     'mime_type': img.content_type
                 })
         
@@ -376,43 +376,6 @@ async def count_tokens(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def recognize_with_ocr_space(image_data: str, mime_type: str) -> str:
-    if not settings.OCR_SPACE_API_KEY:
-        raise Exception("OCR_SPACE_API_KEY is not set")
-    
-    async with httpx.AsyncClient() as client:
-        # OCR.Space expects data URI scheme
-        base64_image = f"data:{mime_type};base64,{image_data}"
-        
-        response = await client.post(
-            "https://api.ocr.space/parse/image",
-            data={
-                "apikey": settings.OCR_SPACE_API_KEY,
-                "base64Image": base64_image,
-                "language": "eng",
-                "isOverlayRequired": "false",
-                "detectOrientation": "true",
-                "scale": "true",
-                "OCREngine": "2"  # Engine 2 is better for number plates/digits
-            },
-            timeout=30.0
-        )
-        
-        if response.status_code != 200:
-             raise Exception(f"OCR.Space API error: {response.status_code} {response.text}")
-             
-        result = response.json()
-        
-        if result.get("IsErroredOnProcessing"):
-            raise Exception(f"OCR.Space processing error: {result.get('ErrorMessage')}")
-            
-        if not result.get("ParsedResults"):
-            return "NOT_FOUND"
-            
-        parsed_text = result["ParsedResults"][0]["ParsedText"]
-        return parsed_text if parsed_text else "NOT_FOUND"
-
-
 @router.post("/recognize-plate", response_model=PlateRecognitionResponse)
 async def recognize_license_plate(
     request: PlateRecognitionRequest,
@@ -434,48 +397,16 @@ async def recognize_license_plate(
                 status_code=400,
                 detail="image_data is required"
             )
-        # Create a specialized prompt for license plate recognition
-        recognized_text = ""
-        ai_response_content = ""
-
-        if settings.OCR_PROVIDER == "ocr_space":
-            logger.info("Using OCR.Space for license plate recognition")
-            recognized_text = await recognize_with_ocr_space(image_data, mime_type)
-            ai_response_content = recognized_text
-            # Normalize text
-            recognized_text = recognized_text.strip().upper()
-        else:
-            # Create a specialized prompt for license plate recognition
-            plate_recognition_prompt = """
-            Extract license plate number from this image.
-
-            TASK: Find visible license plate and return ONLY the alphanumeric characters.
-
-            INSTRUCTIONS:
-            - Look for rectangular plates on vehicles
-            - Extract letters and numbers only
-            - If no plate visible, return "NOT_FOUND"
-            - Return ONLY the plate characters, no explanation
+        # Race the configured OCR providers; the first valid plate wins
+        ocr_result = await ocr_service.recognize(image_data, mime_type)
+        ai_response_content = ocr_result.text or ""
+        recognized_text = ai_response_content.strip().upper()
+        logger.info(
+            f"OCR provider '{ocr_result.provider}' answered in {ocr_result.latency_ms} ms"
+            f"{' (hedged)' if ocr_result.hedged else ''}"
+        )
 
-            EXAMPLES: ABC123, 123ABC, AB123CD
-            """
-            
-            # Create request for Gemini with optimized settings
-            request = GeminiImageRequest(
-                prompt=plate_recognition_prompt,
-                image_data=image_data,
-                mime_type=mime_type,
-                model="gemini-2.0-flash-lite",
-                temperature=0.0,  # Zero temperature for fastest processing
-                max_tokens=20  # Reduced tokens for faster response
-            )
-            
-            # Get plate recognition result
-            result = await gemini_service.analyze_image(request)
-            recognized_text = result.content.strip().upper()
-            ai_response_content = result.content
-        
-        # Debug logging to see what Gemini actually returned
+        # Debug logging to see what the OCR provider actually returned
         logger.info(f"OCR raw response: '{ai_response_content}'")
         logger.info(f"Processed text: '{recognized_text}'")
         
@@ -487,7 +418,8 @@ async def recognize_license_plate(
                 "confidence": 0.0,
                 "vehicle_exists": False,
                 "message": "No license plate found in the image",
-                "ai_response": ai_response_content[:100]
+                "ai_response": ai_response_content[:100],
+                "ocr_provider": ocr_result.provider,
             }
         
         # Clean up the recognized plate number
@@ -503,7 +435,8 @@ async def recognize_license_plate(
                 "confidence": 0.0,
                 "vehicle_exists": False,
                 "message": f"Could not extract a valid plate number from the image. Detected text: '{recognized_text}'",
-                "ai_response": recognized_text
+                "ai_response": recognized_text,
+                "ocr_provider": ocr_result.provider,
             }
         
         # Check if vehicle exists in database
@@ -536,22 +469,42 @@ async def recognize_license_plate(
                 "confidence": 0.85,  # Could be enhanced with actual confidence scoring
                 "vehicle_exists": True,
                 "vehicle_id": str(vehicle.id),
-                "vehicle_details": vehicle_details
+                "vehicle_details": vehicle_details,
+                "ocr_provider": ocr_result.provider,
             }
         else:
-            # Vehicle not found - suggest creation
+            # Vehicle not found - offer near matches (OCR misreads) and suggest creation.
+            # The lookup can build the index on a cold worker, so keep it off the loop.
+            matches = await asyncio.to_thread(vehicle_crud.get_plate_candidates, db, plate_number=plate_number)
+            candidates = [
+                {
+                    "vehicle_id": str(candidate.vehicle_id),
+                    "plate_number": candidate.plate_number,
+                    "matched_field": candidate.matched_field,
+                    "matched_value": candidate.matched_value,
+                    "distance": candidate.distance,
+                    "score": candidate.score,
+                }
+                for candidate in matches
+            ]
+            message = f"License plate '{plate_number}' detected but not found in database"
+            if candidates:
+                message += f"; {len(candidates)} similar vehicle(s) found"
+
             return {
                 "plate_number": plate_number,
                 "confidence": 0.85,
                 "vehicle_exists": False,
                 "vehicle_id": None,
                 "vehicle_details": None,
-                "message": f"License plate '{plate_number}' detected but not found in database",
-                "suggest_creation": True,
+                "message": message,
+                "suggest_creation": not candidates,
                 "creation_data": {
                     "plate_number": plate_number,
                     "detected_confidence": 0.85
-                }
+                },
+                "candidates": candidates,
+                "ocr_provider": ocr_result.provider,
             }
         
     except HTTPException:
@@ -570,7 +523,8 @@ async def health_check():
         if gemini_service.client is None:
             return {
                 "status": "unavailable",
-                "message": "Gemini client not initialized. Check GOOGLE_API_KEY."
+                "message": "Gemini client not initialized. Check GOOGLE_API_KEY.",
+                "ocr": ocr_service.stats(),
             }
         
         # Try a simple token count to verify connection
@@ -578,7 +532,8 @@ async def health_check():
         
         return {
             "status": "healthy",
-            "message": "Gemini service is available"
+            "message": "Gemini service is available",
+            "ocr": ocr_service.stats(),
         }
         
     except Exception as e:
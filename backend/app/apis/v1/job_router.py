@@ -0,0 +1,89 @@
+# app/apis/v1/job_router.py
+"""Status of background jobs started by endpoints that answer 202."""
+
+from typing import List, Optional
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.apis.deps import get_current_user_async, get_db_session
+from app.crud.pagination import paginator_for, set_cursor_headers
+from app.models.auth_models import User
+from app.models.job_models import Job
+from app.schemas.job_schemas import JobStatus
+from app.services.job_service import get_handler
+
+router = APIRouter()
+
+job_pages = paginator_for(Job)
+
+
+def job_status_url(job_id: uuid.UUID) -> str:
+    return f"/api/v1/jobs/{job_id}"
+
+
+async def _get_visible_job(db: AsyncSession, job_id: uuid.UUID, current_user: User) -> Job:
+    job = await db.get(Job, job_id)
+    # Other users' jobs are reported as missing rather than forbidden
+    if job is None or (job.created_by != current_user.email and not current_user.is_super_admin):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("", response_model=List[JobStatus])
+async def list_my_jobs(
+    response: Response,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user_async),
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
+):
+    """Jobs started by the current user, newest first"""
+    stmt = select(Job).where(Job.created_by == current_user.email)
+    try:
+        page = await job_pages.paginate(db, stmt, limit=limit, after=after, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_cursor_headers(response, page)
+    return page.items
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Status, progress and (once finished) result or error of a job"""
+    return await _get_visible_job(db, job_id, current_user)
+
+
+@router.post("/{job_id}/cancel", response_model=JobStatus)
+async def cancel_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Cancel a queued job, or a running one whose handler allows it (it finishes but its result is discarded)"""
+    job = await _get_visible_job(db, job_id, current_user)
+    handler = get_handler(job.kind)
+    cancellable = ("queued", "running") if handler is None or handler.cancel_running else ("queued",)
+    if job.status == "running" and "running" not in cancellable:
+        raise HTTPException(status_code=409, detail="Job is already running and cannot be cancelled")
+    if job.status not in cancellable:
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+    result = await db.execute(
+        update(Job.__table__)
+        .where(Job.__table__.c.id == job_id, Job.__table__.c.status.in_(cancellable))
+        .values(status="cancelled", locked_by=None, finished_at=func.now())
+    )
+    await db.commit()
+    if not result.rowcount:
+        # Claimed or finished since we read it
+        await db.refresh(job)
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+    await db.refresh(job)
+    return job
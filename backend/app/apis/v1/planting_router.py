@@ -1,12 +1,14 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 
-from app.apis.deps import get_db, require_permissions_sync
+from app.apis.deps import get_db, require_permissions_sync, sparse_fields
 from app.models.auth_models import User
 import json
-from app.crud.crud_planting import urban_greening_planting_crud, sapling_collection_crud
+from app.apis.responses import FastJSONResponse
+from app.crud.crud_planting import PLANTING_LIST, urban_greening_planting_crud, sapling_collection_crud
+from app.crud.pagination import set_cursor_headers
 from app.schemas.planting_schemas import (
     UrbanGreeningPlantingCreate, UrbanGreeningPlantingUpdate, UrbanGreeningPlantingInDB,
     SaplingCollectionCreate, SaplingCollectionUpdate, SaplingCollectionInDB,
@@ -30,30 +32,37 @@ def _serialize_plants(entity):
 def get_urban_greening_plantings(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
     planting_type: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     year: Optional[int] = Query(None, description="Filter by year"),
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(PLANTING_LIST.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['planting.view']))
 ):
-    """Get all urban greening planting records with optional filters"""
-    if year is not None:
-        items = urban_greening_planting_crud.get_by_year(db, year=year, skip=skip, limit=limit)
-        return [_serialize_plants(it) for it in items]
-    
-    if search or planting_type or status:
-        items = urban_greening_planting_crud.search(
-            db, 
-            search_term=search or "",
-            planting_type=planting_type,
-            status=status,
-            skip=skip, 
-            limit=limit
-        )
-        return [_serialize_plants(it) for it in items]
-    items = urban_greening_planting_crud.get_multi(db, skip=skip, limit=limit)
-    return [_serialize_plants(it) for it in items]
+    """Get all urban greening planting records with optional filters, newest planting first.
+    Page cursors are returned in the `X-Next-Cursor` / `X-Prev-Cursor` headers;
+    `fields` limits each record to the listed fields."""
+    page_args = {"skip": skip, "limit": limit, "after": after, "before": before}
+    try:
+        if year is not None:
+            page = urban_greening_planting_crud.get_by_year(db, year=year, fields=fields, **page_args)
+        elif search or planting_type or status:
+            page = urban_greening_planting_crud.search(
+                db, 
+                search_term=search or "",
+                planting_type=planting_type,
+                status=status,
+                fields=fields,
+                **page_args
+            )
+        else:
+            page = urban_greening_planting_crud.get_projected_page_sync(db, PLANTING_LIST.only(fields), **page_args)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page.items, headers=page.cursor_headers())
 
 @router.post("/urban-greening/", response_model=UrbanGreeningPlantingInDB)
 def create_urban_greening_planting(
@@ -98,10 +107,17 @@ def create_urban_greening_planting(
 @router.get("/urban-greening/{planting_id}", response_model=UrbanGreeningPlantingInDB)
 def get_urban_greening_planting(
     planting_id: UUID,
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(PLANTING_LIST.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['planting.view']))
 ):
     """Get a specific urban greening planting record"""
+    if fields is not None:
+        planting = urban_greening_planting_crud.get_projected_sync(db, PLANTING_LIST.only(fields), id=planting_id)
+        if not planting:
+            raise HTTPException(status_code=404, detail="Urban greening planting record not found")
+        return FastJSONResponse(planting)
+
     planting = urban_greening_planting_crud.get(db, id=planting_id)
     if not planting:
         raise HTTPException(status_code=404, detail="Urban greening planting record not found")
@@ -190,25 +206,35 @@ def get_urban_greening_statistics(
 # Sapling Collection Endpoints
 @router.get("/saplings/", response_model=List[SaplingCollectionInDB])
 def get_sapling_collections(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
     purpose: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['sapling_collection.view']))
 ):
-    """Get all sapling collection records with optional filters"""
-    if search or purpose or status:
-        return sapling_collection_crud.search(
-            db,
-            search_term=search or "",
-            purpose=purpose,
-            status=status,
-            skip=skip,
-            limit=limit
-        )
-    return sapling_collection_crud.get_multi(db, skip=skip, limit=limit)
+    """Get all sapling collection records with optional filters, newest collection first.
+    Page cursors are returned in the `X-Next-Cursor` / `X-Prev-Cursor` headers."""
+    page_args = {"skip": skip, "limit": limit, "after": after, "before": before}
+    try:
+        if search or purpose or status:
+            page = sapling_collection_crud.search(
+                db,
+                search_term=search or "",
+                purpose=purpose,
+                status=status,
+                **page_args
+            )
+        else:
+            page = sapling_collection_crud.get_page_sync(db, **page_args)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_cursor_headers(response, page)
+    return page.items
 
 @router.post("/saplings/", response_model=SaplingCollectionInDB)
 def create_sapling_collection(
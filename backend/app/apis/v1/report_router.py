@@ -0,0 +1,96 @@
+# app/apis/v1/report_router.py
+"""XLSX/PDF reports rendered by background jobs and cached by data version."""
+
+import re
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.apis.deps import get_current_user, require_permissions_sync
+from app.apis.v1.job_router import job_status_url
+from app.db.database import get_db
+from app.models.auth_models import User
+from app.schemas.report_schemas import ReportInfo, ReportRequest, ReportResponse
+from app.services import job_handlers  # noqa: F401  (registers the job kinds enqueued below)
+from app.services import report_service
+from app.services.report_rendering import CONTENT_TYPES, renderer_available
+
+router = APIRouter()
+
+ARTIFACT_NAME = re.compile(r"^(?P<key>[0-9a-f]{32})\.(?P<format>xlsx|pdf)$")
+
+
+def _authorized_report(name: str, current_user: User, db: Session) -> report_service.ReportDefinition:
+    definition = report_service.get_report(name)
+    if definition is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    # Each report carries the view permission of the data it summarises
+    require_permissions_sync([definition.permission])(current_user=current_user, db=db)
+    return definition
+
+
+@router.get("", response_model=List[ReportInfo])
+def list_reports(current_user: User = Depends(get_current_user)):
+    """Available reports and the parameters each accepts."""
+    return [
+        ReportInfo(
+            name=definition.name,
+            title=definition.template.title,
+            formats=list(CONTENT_TYPES),
+            parameters=definition.params.model_json_schema(),
+        )
+        for definition in report_service.REPORTS.values()
+    ]
+
+
+@router.post(
+    "/{name}",
+    response_model=ReportResponse,
+    status_code=202,
+    responses={200: {"model": ReportResponse, "description": "A current artifact already exists"}},
+)
+def request_report(
+    name: str,
+    request: ReportRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return the download link of a current artifact, or queue its rendering and return the job."""
+    definition = _authorized_report(name, current_user, db)
+    try:
+        params = definition.params.model_validate(request.parameters)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    if not renderer_available(request.format):
+        raise HTTPException(status_code=501, detail=f"{request.format.upper()} rendering is not installed on the server")
+
+    result = report_service.request_report(db, definition, params, request.format, current_user.email)
+    if result["status"] == "ready":
+        response.status_code = 200
+    else:
+        result["status_url"] = job_status_url(result["job_id"])
+    return ReportResponse(**result)
+
+
+@router.get("/{name}/artifacts/{filename}", response_class=FileResponse)
+def download_report(
+    name: str,
+    filename: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Download a rendered report (links come from POST /reports/{name} or the job result)."""
+    definition = _authorized_report(name, current_user, db)
+    match = ARTIFACT_NAME.match(filename)
+    path = match and report_service.find_artifact(definition.name, match["key"], match["format"])
+    if not path:
+        raise HTTPException(status_code=404, detail="Report artifact not found or expired")
+    return FileResponse(
+        path,
+        media_type=CONTENT_TYPES[match["format"]],
+        filename=f"{definition.name}-{match['key'][:8]}.{match['format']}",
+    )
@@ -1,11 +1,12 @@
 # app/apis/v1/session_router.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import uuid
 
 from app.apis.deps import get_db_session, require_roles, require_permissions
 from app.crud.crud_session import session_crud
+from app.crud.pagination import set_cursor_headers
 from app.crud.crud_user import user as crud_user
 from app.core import supabase_client
 from app.schemas.session_schemas import (
@@ -24,25 +25,35 @@ router = APIRouter()
 
 @router.get("/sessions", response_model=List[SessionWithUser])
 async def get_all_sessions(
+    response: Response,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(require_permissions(["session.view"])),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
     device_type: Optional[DeviceTypeEnum] = Query(None),
     is_active: Optional[bool] = Query(True, description="Filter by active status. True=active only, False=inactive only, null=all sessions")
 ):
-    """Get all user sessions (admin only). By default, shows only active sessions."""
-    sessions = await session_crud.get_all_sessions_with_users(
-        db,
-        skip=skip,
-        limit=limit,
-        device_type=device_type,
-        is_active=is_active
-    )
+    """Get all user sessions (admin only). By default, shows only active sessions.
+    Page cursors are returned in the `X-Next-Cursor` / `X-Prev-Cursor` headers."""
+    try:
+        page = await session_crud.get_all_sessions_with_users(
+            db,
+            skip=skip,
+            limit=limit,
+            after=after,
+            before=before,
+            device_type=device_type,
+            is_active=is_active
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    set_cursor_headers(response, page)
     
     # Transform to SessionWithUser format
     result = []
-    for session in sessions:
+    for session in page.items:
         session_data = {
             "id": session.id,
             "user_id": session.user_id,
@@ -1,14 +1,15 @@
 # app/apis/v1/tree_inventory_router.py
 """API endpoints for Tree Inventory System"""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
 
 from app.db.database import get_db
-from app.apis.deps import require_permissions_sync
+from app.apis.deps import require_permissions_sync, sparse_fields
+from app.apis.responses import FastJSONResponse
 from app.models.auth_models import User
 from app.schemas.tree_inventory_schemas import (
     TreeInventoryCreate, TreeInventoryUpdate, TreeInventoryResponse,
@@ -18,6 +19,12 @@ from app.schemas.tree_inventory_schemas import (
     TreeSpeciesCreate, TreeSpeciesUpdate, TreeSpeciesResponse
 )
 from app.crud import crud_tree_inventory as crud
+from app.services.analytics_service import analytics_snapshot
+from app.services.cache_service import cache
+from app.services import job_handlers  # noqa: F401  (registers the job kinds enqueued below)
+from app.services.job_service import enqueue_sync
+from app.apis.v1.job_router import job_status_url
+from app.schemas.job_schemas import JobAccepted
 
 router = APIRouter(prefix="/tree-inventory", tags=["Tree Inventory"])
 
@@ -25,6 +32,7 @@ router = APIRouter(prefix="/tree-inventory", tags=["Tree Inventory"])
 # ==================== Tree Species Endpoints ====================
 
 @router.get("/species", response_model=List[TreeSpeciesResponse])
+@cache.cached("tree_inventory.species", tags=("tree_species",), model=List[TreeSpeciesResponse])
 def get_all_species(
     search: Optional[str] = Query(None, description="Search by scientific, common, or local name"),
     species_type: Optional[str] = Query(None, description="Filter by species type (Tree, Ornamental, Seed, Other)"),
@@ -116,34 +124,37 @@ def get_all_trees(
     barangay: Optional[str] = Query(None, description="Filter by barangay (partial match)"),
     search: Optional[str] = Query(None, description="Search by code, species, name, or address"),
     is_archived: Optional[bool] = Query(False, description="Filter by archived status. Set to null to include all."),
-    cursor: Optional[str] = Query(None, description="Keyset pagination cursor"),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
+    cursor: Optional[str] = Query(None, description="Deprecated alias of `after`"),
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(crud.TREE_RESPONSE.names)),
     db: Session = Depends(get_db),
-    response: Response = None,
     current_user: User = Depends(require_permissions_sync(['tree.view']))
 ):
-    """Get all trees in inventory with optional filters.
+    """Get all trees in inventory with optional filters, newest first.
 
-    If `cursor` is provided, keyset pagination is used and the next cursor
-    is returned via the `X-Next-Cursor` response header.
+    Page cursors are returned via the `X-Next-Cursor` / `X-Prev-Cursor`
+    response headers; pass them back as `after` / `before`. `fields`
+    limits each tree to the listed fields.
     """
-    if cursor:
-        items, next_cursor = crud.get_all_trees_keyset(
+    try:
+        page = crud.get_trees_page(
             db,
             limit=limit,
-            cursor=cursor,
+            after=after or cursor,
+            before=before,
+            skip=skip,
             status=status,
             health=health,
             species=species,
             barangay=barangay,
             search=search,
             is_archived=is_archived,
+            fields=fields,
         )
-        if response is not None and next_cursor:
-            response.headers["X-Next-Cursor"] = next_cursor
-        return [TreeInventoryResponse.from_db_model(t) for t in items]
-
-    trees = crud.get_all_trees(db, skip, limit, status, health, species, barangay, search, is_archived)
-    return [TreeInventoryResponse.from_db_model(t) for t in trees]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page.items, headers=page.cursor_headers())
 
 
 @router.get("/trees/next-code")
@@ -159,12 +170,12 @@ def preview_tree_code(
 
 @router.get("/trees/map", response_model=List[TreeInventoryResponse])
 def get_trees_for_map(
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(crud.TREE_RESPONSE.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree.view']))
 ):
     """Get all trees with location data for map visualization"""
-    trees = crud.get_trees_for_map(db)
-    return [TreeInventoryResponse.from_db_model(t) for t in trees]
+    return FastJSONResponse(crud.get_trees_for_map(db, fields))
 
 
 @router.get("/trees/bounds")
@@ -209,6 +220,7 @@ def get_tree_clusters(
 
 
 @router.get("/trees/stats", response_model=TreeInventoryStats)
+@cache.cached("tree_inventory.stats", tags=("tree_inventory", "tree_species"), model=TreeInventoryStats)
 def get_tree_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree.view']))
@@ -218,6 +230,7 @@ def get_tree_stats(
 
 
 @router.get("/trees/carbon-statistics", response_model=TreeCarbonStatistics)
+@cache.cached("tree_inventory.carbon", tags=("tree_inventory", "tree_species"), model=TreeCarbonStatistics)
 def get_carbon_statistics(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree.view']))
@@ -228,17 +241,39 @@ def get_carbon_statistics(
     - Carbon Stock (total CO₂ stored, per species, top 5 contribution)
     - Annual Carbon Sequestration (total absorbed, from new plantings)
     - Carbon Loss (from removals, projected decay)
+
+    Read from the analytics snapshot while it is fresh (see ``freshness``).
     """
-    return crud.get_tree_carbon_statistics(db)
+    statistics, freshness = analytics_snapshot.compute(
+        db, crud.CARBON_STATISTICS_TABLES, lambda run: crud.get_tree_carbon_statistics(run=run)
+    )
+    return statistics.model_copy(update={"freshness": freshness})
+
+
+@router.post("/trees/carbon-statistics/jobs", response_model=JobAccepted, status_code=202)
+def start_carbon_statistics_job(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permissions_sync(['tree.view']))
+):
+    """Compute carbon statistics in the background; poll the returned status URL for the result"""
+    job = enqueue_sync(db, "tree_inventory.carbon_statistics", created_by=current_user.email)
+    return JobAccepted(job_id=job.id, status=job.status, status_url=job_status_url(job.id))
 
 
 @router.get("/trees/{tree_id}", response_model=TreeInventoryResponse)
 def get_tree(
     tree_id: UUID,
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(crud.TREE_RESPONSE.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree.view']))
 ):
     """Get a specific tree by ID"""
+    if fields is not None:
+        tree = crud.get_tree_fields(db, fields, tree_id=tree_id)
+        if not tree:
+            raise HTTPException(status_code=404, detail="Tree not found")
+        return FastJSONResponse(tree)
+
     tree = crud.get_tree_by_id(db, tree_id)
     if not tree:
         raise HTTPException(status_code=404, detail="Tree not found")
@@ -254,10 +289,17 @@ def get_tree(
 @router.get("/trees/code/{tree_code}", response_model=TreeInventoryResponse)
 def get_tree_by_code(
     tree_code: str,
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(crud.TREE_RESPONSE.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree.view']))
 ):
     """Get a specific tree by tree code (for QR scanning)"""
+    if fields is not None:
+        tree = crud.get_tree_fields(db, fields, tree_code=tree_code)
+        if not tree:
+            raise HTTPException(status_code=404, detail="Tree not found")
+        return FastJSONResponse(tree)
+
     tree = crud.get_tree_by_code(db, tree_code)
     if not tree:
         raise HTTPException(status_code=404, detail="Tree not found")
@@ -356,15 +398,24 @@ def get_all_projects(
     project_type: Optional[str] = Query(None, description="Filter by type: replacement, urban_greening, reforestation"),
     status: Optional[str] = Query(None, description="Filter by status: planned, ongoing, completed, cancelled"),
     search: Optional[str] = Query(None, description="Search by code, name, or organization"),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(crud.PROJECT_RESPONSE.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree_project.view']))
 ):
-    """Get all planting projects with optional filters"""
-    projects = crud.get_all_projects(db, skip, limit, project_type, status, search)
-    return [PlantingProjectResponse.from_db_model(p) for p in projects]
+    """Get all planting projects with optional filters, newest first"""
+    try:
+        page = crud.get_all_projects(
+            db, skip, limit, project_type, status, search, after=after, before=before, fields=fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page.items, headers=page.cursor_headers())
 
 
 @router.get("/projects/stats", response_model=PlantingProjectStats)
+@cache.cached("tree_inventory.project_stats", tags=("planting_projects",), model=PlantingProjectStats)
 def get_project_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree_project.view']))
@@ -376,10 +427,17 @@ def get_project_stats(
 @router.get("/projects/{project_id}", response_model=PlantingProjectResponse)
 def get_project(
     project_id: UUID,
+    fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(crud.PROJECT_RESPONSE.names)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree_project.view']))
 ):
     """Get a specific planting project by ID"""
+    if fields is not None:
+        project = crud.get_project_fields(db, project_id, fields)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return FastJSONResponse(project)
+
     project = crud.get_project_by_id(db, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -431,11 +489,24 @@ def create_trees_batch(
     current_user: User = Depends(require_permissions_sync(['tree.create']))
 ):
     """Create multiple trees in a single request (for bulk import)"""
-    created_trees = []
-    for tree_data in trees_data:
-        tree = crud.create_tree(db, tree_data, current_user)
-        created_trees.append(TreeInventoryResponse.from_db_model(tree))
-    return created_trees
+    try:
+        trees = crud.create_trees(db, trees_data, current_user)
+    except crud.DuplicateTreeCodeError:
+        raise HTTPException(status_code=409, detail="Tree code already exists")
+    return [TreeInventoryResponse.from_db_model(tree) for tree in trees]
+
+
+@router.post("/trees/batch/jobs", response_model=JobAccepted, status_code=202)
+def start_trees_import_job(
+    trees_data: List[TreeInventoryCreate],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permissions_sync(['tree.create']))
+):
+    """Import trees in the background (same payload as /trees/batch); the job result lists the new tree ids"""
+    job = enqueue_sync(
+        db, "tree_inventory.import_trees", {"trees": trees_data}, created_by=current_user.email
+    )
+    return JobAccepted(job_id=job.id, status=job.status, status_url=job_status_url(job.id))
 
 
 @router.post("/projects/{project_id}/add-trees", response_model=List[TreeInventoryResponse], status_code=201)
@@ -451,7 +522,6 @@ def add_trees_to_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    created_trees = []
     for tree_data in trees_data:
         # Link tree to project
         tree_data.planting_project_id = project_id
@@ -463,12 +533,14 @@ def add_trees_to_project(
             tree_data.address = project.address
         if not tree_data.barangay and project.barangay:
             tree_data.barangay = project.barangay
-        
-        tree = crud.create_tree(db, tree_data, current_user)
-        created_trees.append(TreeInventoryResponse.from_db_model(tree))
+    
+    try:
+        trees = crud.create_trees(db, trees_data, current_user)
+    except crud.DuplicateTreeCodeError:
+        raise HTTPException(status_code=409, detail="Tree code already exists")
     
     # Update project trees_planted count
-    project.trees_planted = (project.trees_planted or 0) + len(created_trees)
+    project.trees_planted = (project.trees_planted or 0) + len(trees)
     db.commit()
     
-    return created_trees
+    return [TreeInventoryResponse.from_db_model(tree) for tree in trees]
@@ -1,10 +1,12 @@
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from datetime import date
 from sqlalchemy.orm import Session
 from app.apis.deps import get_db, require_permissions_sync
 from app.models.auth_models import User
 from app.crud.crud_tree_management import tree_management_request, tree_request, processing_standards, dropdown_options
+from app.crud.pagination import set_cursor_headers
+from app.services.cache_service import cache
 from app.schemas.tree_management_schemas import (
     TreeManagementRequest, TreeManagementRequestCreate, TreeManagementRequestUpdate,
     TreeRequestCreate, TreeRequestUpdate, TreeRequestInDB,
@@ -16,6 +18,7 @@ from app.schemas.tree_management_schemas import (
 router = APIRouter()
 
 @router.get("/stats")
+@cache.cached("tree_management.stats", tags=("tree_management_requests", "fee_records"))
 def get_tree_management_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['tree_request.view']))
@@ -317,16 +320,20 @@ def create_tree_request(
 
 @router.get("/v2/requests", response_model=List[Dict[str, Any]])
 def read_tree_requests(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
     status: Optional[str] = Query(None, description="Filter by overall status"),
     request_type: Optional[str] = Query(None, description="Filter by request type"),
     year: Optional[int] = Query(None, description="Filter by year"),
     is_archived: bool = Query(False, description="Filter by archived status"),
     current_user: User = Depends(require_permissions_sync(['tree_request.view']))
 ):
-    """Get all tree requests with analytics"""
+    """Get all tree requests with analytics, newest first.
+    Page cursors are returned in the `X-Next-Cursor` / `X-Prev-Cursor` headers."""
     from sqlalchemy import extract
     from app.models.urban_greening_models import TreeRequest
     
@@ -342,9 +349,13 @@ def read_tree_requests(
     if request_type:
         query = query.filter(TreeRequest.request_type == request_type)
     
-    requests = query.offset(skip).limit(limit).all()
+    try:
+        page = tree_request.get_page_sync(db, query, skip=skip, limit=limit, after=after, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_cursor_headers(response, page)
     
-    return [tree_request.get_with_analytics(db, str(req.id)) for req in requests]
+    return tree_request.with_analytics(db, page.items)
 
 @router.get("/v2/requests/{request_id}", response_model=Dict[str, Any])
 def read_tree_request(
@@ -482,6 +493,11 @@ def get_analytics_summary(
 
 # Processing standards endpoints
 @router.get("/v2/processing-standards", response_model=List[ProcessingStandardsInDB])
+@cache.cached(
+    "tree_management.processing_standards",
+    tags=("tree_request_processing_standards",),
+    model=List[ProcessingStandardsInDB],
+)
 def get_all_processing_standards(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['processing_standard.view']))
@@ -544,6 +560,9 @@ def delete_processing_standards(
 # ===== DROPDOWN OPTIONS ENDPOINTS =====
 
 @router.get("/v2/dropdown-options", response_model=List[DropdownOptionInDB])
+@cache.cached(
+    "tree_management.dropdown_options", tags=("tree_request_dropdown_options",), model=List[DropdownOptionInDB]
+)
 def get_all_dropdown_options(
     field_name: Optional[str] = None,
     active_only: bool = True,
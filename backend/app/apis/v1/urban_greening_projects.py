@@ -1,11 +1,13 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 import json
 
 from app.apis.deps import get_db, require_permissions_sync
 from app.models.auth_models import User
 from app.crud.crud_urban_greening_project import urban_greening_project_crud
+from app.crud.pagination import set_cursor_headers
+from app.services.cache_service import cache
 from app.schemas.urban_greening_project_schemas import (
     UrbanGreeningProjectCreate,
     UrbanGreeningProjectUpdate,
@@ -49,8 +51,11 @@ def _serialize_project(project) -> dict:
 
 @router.get("", response_model=List[dict])
 def list_urban_greening_projects(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor"),
     status: Optional[str] = Query(None),
     project_type: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
@@ -59,21 +64,29 @@ def list_urban_greening_projects(
     current_user: User = Depends(require_permissions_sync(['urban_project.view']))
 ) -> Any:
     """
-    Get list of urban greening projects with optional filters
+    Get list of urban greening projects with optional filters.
+    Page cursors are returned in the `X-Next-Cursor` / `X-Prev-Cursor` headers.
     """
-    projects = urban_greening_project_crud.get_multi(
-        db,
-        skip=skip,
-        limit=limit,
-        status=status,
-        project_type=project_type,
-        search=search,
-        year=year
-    )
-    return [_serialize_project(p) for p in projects]
+    try:
+        page = urban_greening_project_crud.get_filtered_page(
+            db,
+            skip=skip,
+            limit=limit,
+            after=after,
+            before=before,
+            status=status,
+            project_type=project_type,
+            search=search,
+            year=year
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_cursor_headers(response, page)
+    return [_serialize_project(p) for p in page.items]
 
 
 @router.get("/stats")
+@cache.cached("urban_greening_projects.stats", tags=("urban_greening_projects",))
 def get_project_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permissions_sync(['urban_project.view']))
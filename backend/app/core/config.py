@@ -20,8 +20,21 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-2.0-flash-lite"
     
     # OCR Configuration
-    OCR_PROVIDER: str = "gemini"  # "gemini" or "ocr_space"
+    OCR_PROVIDER: str = "gemini"  # "gemini", "ocr_space" or "stub" (offline)
     OCR_SPACE_API_KEY: Optional[str] = None
+    # Hedged OCR (see ocr_service). The secondary defaults to the other provider
+    # when its API key is configured; set to "none" to disable hedging.
+    OCR_SECONDARY_PROVIDER: Optional[str] = None
+    OCR_HEDGE_ENABLED: bool = True
+    OCR_HEDGE_DEFAULT_DELAY_MS: float = 1500
+    OCR_HEDGE_MIN_DELAY_MS: float = 200
+    OCR_HEDGE_MAX_DELAY_MS: float = 10000
+    OCR_TIMEOUT_SECONDS: float = 30.0
+    OCR_STUB_TEXT: str = "NOT_FOUND"
+    OCR_STUB_DELAY_MS: float = 0
+    # Fuzzy plate index (see plate_index_service). Rebuilt from the DB after this
+    # many seconds so writes made by other workers are eventually picked up.
+    PLATE_INDEX_MAX_AGE_SECONDS: int = 300
     
     # Super Admin Configuration
     # Comma-separated list of emails that should have super admin privileges
@@ -50,6 +63,96 @@ class Settings(BaseSettings):
     # This adds 2+ extra DB round-trips per request; keep false for performance.
     AUDIT_RESOLVE_USER_DETAILS: bool = False
 
+    # Per-request query accounting (see DBTimingMiddleware). Adds a Server-Timing
+    # header and flags statements repeated this many times in one request.
+    DB_INSTRUMENTATION_ENABLED: bool = True
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Runtime health sampling (see SystemMetricsSampler)
+    SYSTEM_METRICS_INTERVAL_SECONDS: float = 5.0
+    SYSTEM_METRICS_HISTORY_SIZE: int = 120
+
+    # Event-loop watchdog (see LoopWatchdog); logs the call site of any stall
+    # longer than the threshold. Costs one lightweight thread per worker.
+    LOOP_WATCHDOG_ENABLED: bool = True
+    LOOP_WATCHDOG_INTERVAL_MS: float = 50
+    LOOP_WATCHDOG_THRESHOLD_MS: float = 100
+
+    # On-demand request profiling via the X-Profile: 1 header (super admins only)
+    PROFILING_ENABLED: bool = True
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5
+    PROFILE_MAX_SECONDS: float = 60
+    PROFILE_MAX_ARTIFACTS: int = 20
+
+    # Slow-query log (see app.db.slow_query_log): statements slower than the
+    # threshold are kept with redacted binds, route, user and an EXPLAIN plan.
+    # PERSIST also writes them to app_audit.slow_queries.
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 500
+    SLOW_QUERY_LOG_SIZE: int = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_EXPLAIN_INTERVAL_S: float = 300
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 2000
+    SLOW_QUERY_LOG_PERSIST: bool = False
+
+    # Deep-page jumps (see app.db.page_jump_index): skips of at least one stride
+    # seek from a cached boundary key instead of an OFFSET. A jump may land up
+    # to MAX_WRITES rows off before the boundaries are rebuilt.
+    PAGE_JUMP_ENABLED: bool = True
+    PAGE_JUMP_STRIDE: int = 1000
+    PAGE_JUMP_MAX_WRITES: int = 100
+    PAGE_JUMP_TTL_SECONDS: float = 600
+    PAGE_JUMP_INDEX_SIZE: int = 256
+
+    # Tagged cache for reference data and aggregates (see cache_service).
+    # "memory" is per worker; "redis" is shared and needs the redis package.
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_DEFAULT_TTL_SECONDS: float = 300
+    CACHE_MAX_ENTRIES: int = 2000
+    # Cross-worker invalidation for the memory backend (see cache_bus_service).
+    # While the LISTEN connection is down, entries live at most FALLBACK_TTL.
+    # LISTEN needs a direct or session-mode URL (Supabase port 5432, not the
+    # 6543 transaction pooler); defaults to DATABASE_URL.
+    CACHE_BUS_ENABLED: bool = True
+    CACHE_BUS_DATABASE_URL: Optional[str] = None
+    CACHE_BUS_CHANNEL: str = "app_cache"
+    CACHE_BUS_KEEPALIVE_SECONDS: float = 30
+    CACHE_BUS_PROBE_TIMEOUT_SECONDS: float = 5
+    CACHE_BUS_FALLBACK_TTL_SECONDS: float = 30
+    CACHE_BUS_RECONNECT_MAX_SECONDS: float = 30
+
+    # Background jobs (see job_service). JOB_RUN_IN_APP starts workers in each
+    # API process; set it to false when running `python -m app.worker` instead.
+    JOB_RUN_IN_APP: bool = True
+    JOB_WORKERS: int = 2
+    JOB_PROCESS_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 2
+    JOB_HEARTBEAT_SECONDS: float = 5
+    JOB_STALE_AFTER_SECONDS: float = 120
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_SECONDS: float = 10
+    JOB_RETRY_MAX_SECONDS: float = 600
+
+    # Streaming exports (see export_service): rows fetched per server-side
+    # cursor round trip, which is also one response chunk / Parquet row group.
+    EXPORT_BATCH_SIZE: int = 5000
+
+    # Rendered XLSX/PDF reports (see report_service). The directory must be
+    # shared by API and worker processes; artifacts older than the TTL are pruned.
+    REPORTS_DIR: str = "storage/reports"
+    REPORT_ARTIFACT_TTL_HOURS: float = 24
+
+    # Parquet snapshot of the fact tables queried with DuckDB by the dashboards
+    # (see analytics_service). The app enqueues a refresh job every
+    # ANALYTICS_REFRESH_SECONDS; dashboards read Postgres instead once the
+    # oldest table they use is older than ANALYTICS_MAX_STALENESS_SECONDS.
+    ANALYTICS_ENABLED: bool = True
+    ANALYTICS_DIR: str = "storage/analytics"
+    ANALYTICS_REFRESH_SECONDS: int = 300
+    ANALYTICS_MAX_STALENESS_SECONDS: int = 900
+
     @field_validator("BACKEND_CORS_ORIGINS", mode="before")
     @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
@@ -5,6 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, func
 from app.db.database import Base
+from app.crud.pagination import KeysetPaginator, Page, paginator_for
+from app.crud.projection import Projection, fetch_one, paginate
 
 ModelType = TypeVar("ModelType", bound=Base) # type: ignore
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -13,6 +15,7 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        self.paginator: KeysetPaginator = paginator_for(model)
 
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         result = await db.execute(select(self.model).filter(self.model.id == id))
@@ -21,8 +24,59 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     async def get_multi(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
-        result = await db.execute(select(self.model).offset(skip).limit(limit))
-        return result.scalars().all()
+        page = await self.get_page(db, skip=skip, limit=limit)
+        return page.items
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> Page:
+        """Newest-first keyset page; ``skip`` only applies when no cursor is given"""
+        return await self.paginator.paginate(
+            db, select(self.model), limit=limit, after=after, before=before, skip=skip
+        )
+
+    def get_page_sync(
+        self,
+        db,
+        stmt=None,
+        *,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> Page:
+        """Sync-session variant of ``get_page``; ``stmt`` narrows the listing (defaults to every row)"""
+        return self.paginator.paginate_sync(
+            db, select(self.model) if stmt is None else stmt,
+            limit=limit, after=after, before=before, skip=skip,
+        )
+
+    def get_projected_page_sync(
+        self,
+        db,
+        projection: Projection,
+        query=None,
+        *,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> Page:
+        """``get_page_sync`` with ``projection`` dicts as items; ``query`` is a ``db.query(model)`` to narrow it"""
+        return paginate(
+            self.paginator, db, db.query(self.model) if query is None else query, projection,
+            limit=limit, after=after, before=before, skip=skip,
+        )
+
+    def get_projected_sync(self, db, projection: Projection, *, id: Any) -> Optional[Dict[str, Any]]:
+        """One row by id as a ``projection`` dict (for ``?fields=`` on detail endpoints)"""
+        return fetch_one(db.query(self.model).filter(self.model.id == id), projection)
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = obj_in.model_dump()
@@ -1,31 +1,29 @@
 """CRUD helpers for audit logs."""
 
-from typing import List, Optional, Tuple
+from typing import Any, List, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func, and_, or_
 
 from app.crud.base_crud import CRUDBase
+from app.crud.pagination import KeysetPaginator, Page
 from app.models.audit_models import AuditLog
 from app.schemas.audit_schemas import AuditLogCreate, AuditLogFilter
 
 
 class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, AuditLogCreate]):
+    def __init__(self, model):
+        super().__init__(model)
+        self.paginator = KeysetPaginator("app_audit.audit_logs", AuditLog.occurred_at.desc(), AuditLog.id.desc())
+
     async def create_log(self, db: AsyncSession, *, obj_in: AuditLogCreate) -> AuditLog:
         """Persist a new audit log entry."""
         return await self.create(db, obj_in=obj_in)
 
-    async def get_logs(
-        self,
-        db: AsyncSession,
-        *,
-        filters: AuditLogFilter
-    ) -> Tuple[List[AuditLog], int]:
-        """Retrieve audit logs with optional filtering and pagination."""
-        query = select(AuditLog)
-        total_query = select(func.count(AuditLog.id))
-        conditions = []
+    def filter_conditions(self, filters: AuditLogFilter) -> List[Any]:
+        """WHERE clauses for the listing filters (shared with the audit log export)."""
+        conditions: List[Any] = []
 
         if filters.module_name:
             conditions.append(AuditLog.module_name == filters.module_name)
@@ -49,6 +47,18 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, AuditLogCreate]):
                     AuditLog.module_name.ilike(search_term),
                 )
             )
+        return conditions
+
+    async def get_logs(
+        self,
+        db: AsyncSession,
+        *,
+        filters: AuditLogFilter
+    ) -> Tuple[Page, int]:
+        """Retrieve audit logs with optional filtering and keyset pagination, newest first."""
+        query = select(AuditLog)
+        total_query = select(func.count(AuditLog.id))
+        conditions = self.filter_conditions(filters)
 
         if conditions:
             combined = and_(*conditions)
@@ -58,10 +68,10 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, AuditLogCreate]):
         total_result = await db.execute(total_query)
         total = total_result.scalar() or 0
 
-        query = query.order_by(AuditLog.occurred_at.desc()).offset(filters.skip).limit(filters.limit)
-
-        result = await db.execute(query)
-        return result.scalars().all(), total
+        page = await self.paginator.paginate(
+            db, query, limit=filters.limit, after=filters.after, before=filters.before, skip=filters.skip
+        )
+        return page, total
 
 
 audit_log_crud = CRUDAuditLog(AuditLog)
@@ -0,0 +1,249 @@
+"""Aggregations behind the urban greening dashboard.
+
+Every query goes through ``run(stmt) -> rows`` so the same statements serve
+Postgres and the analytics snapshot (see ``analytics_service``).
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import Date, cast, extract, func, select
+
+from app.models.urban_greening_models import FeeRecord, TreeRequest, UrbanGreeningPlanting, UrbanGreeningProject
+from app.schemas.dashboard_schemas import LabelValue, MonthValue, StatCardData, UrbanGreeningDashboardOverview
+
+Run = Callable[[Any], Sequence[Any]]
+
+QUARTER_MONTHS = {
+    "Q1": [1, 2, 3],
+    "Q2": [4, 5, 6],
+    "Q3": [7, 8, 9],
+    "Q4": [10, 11, 12],
+}
+
+# analytics snapshot tables read by urban_greening_overview
+URBAN_GREENING_TABLES = (
+    "urban_greening.fee_records",
+    "urban_greening.urban_greening_plantings",
+    "urban_greening.urban_greening_projects",
+    "urban_greening.tree_requests",
+)
+
+
+def month_labels():
+    return [
+        "January", "February", "March", "April", "May", "June",
+        "July", "August", "September", "October", "November", "December"
+    ]
+
+
+def _scalar(run: Run, stmt: Any) -> Any:
+    rows = run(stmt)
+    return rows[0][0] if rows else None
+
+
+def urban_greening_overview(
+    run: Run, *, year: int, quarter: Optional[str] = None, current_month: Optional[int] = None
+) -> UrbanGreeningDashboardOverview:
+    """Stat cards and charts for ``year`` (optionally one quarter, "Q1".."Q4" or "all")."""
+    quarter_months = QUARTER_MONTHS.get(quarter.upper()) if quarter and quarter != "all" else None
+    if current_month is None:
+        current_month = datetime.now().month
+
+    project_date_expr = func.coalesce(
+        UrbanGreeningProject.actual_end_date,
+        UrbanGreeningProject.actual_start_date,
+        UrbanGreeningProject.planting_date,
+        UrbanGreeningProject.date_received_of_request,
+        cast(UrbanGreeningProject.created_at, Date),
+    )
+
+    def in_period(date_expr: Any, month: Optional[int] = None) -> List[Any]:
+        conditions = [extract('year', date_expr) == year]
+        if month is not None:
+            conditions.append(extract('month', date_expr) == month)
+        elif quarter_months:
+            conditions.append(extract('month', date_expr).in_(quarter_months))
+        return conditions
+
+    paid_fees = [FeeRecord.payment_date.isnot(None), FeeRecord.status == 'paid']
+    fee_sum = func.coalesce(func.sum(FeeRecord.amount), 0)
+    planted_sum = func.coalesce(func.sum(UrbanGreeningPlanting.quantity_planted), 0)
+    project_sum = func.coalesce(func.sum(UrbanGreeningProject.total_plants), 0)
+
+    # ===== STAT CARD DATA =====
+
+    # Fees - paid in the selected year/quarter, and in the current month
+    fees_yearly_total = _scalar(run, select(fee_sum).where(*paid_fees, *in_period(FeeRecord.payment_date))) or 0.0
+    fees_monthly_total = _scalar(
+        run, select(fee_sum).where(*paid_fees, *in_period(FeeRecord.payment_date, current_month))
+    ) or 0.0
+
+    # Urban Greening - quantity planted (plantings plus project plants)
+    planting_yearly_total = _scalar(
+        run, select(planted_sum).where(*in_period(UrbanGreeningPlanting.planting_date))
+    ) or 0
+    project_yearly_total = _scalar(run, select(project_sum).where(*in_period(project_date_expr))) or 0
+    planting_monthly_total = _scalar(
+        run, select(planted_sum).where(*in_period(UrbanGreeningPlanting.planting_date, current_month))
+    ) or 0
+    project_monthly_total = _scalar(
+        run, select(project_sum).where(*in_period(project_date_expr, current_month))
+    ) or 0
+
+    stat_cards = StatCardData(
+        fees_yearly_total=float(fees_yearly_total),
+        fees_monthly_total=float(fees_monthly_total),
+        urban_greening_yearly_total=int(planting_yearly_total + project_yearly_total),
+        urban_greening_monthly_total=int(planting_monthly_total + project_monthly_total),
+    )
+
+    # ===== CHART DATA =====
+
+    months_to_show = quarter_months if quarter_months else range(1, 13)
+
+    # Monthly fees (paid amount by payment_date)
+    fee_month = extract('month', FeeRecord.payment_date)
+    fee_rows = run(
+        select(fee_month.label('m'), fee_sum)
+        .where(*paid_fees, *in_period(FeeRecord.payment_date))
+        .group_by(fee_month)
+    )
+    fee_by_month = {int(m): float(total) for m, total in fee_rows}
+    fee_monthly: List[MonthValue] = [
+        MonthValue(month=i, label=month_labels()[i - 1], total=fee_by_month.get(i, 0.0)) for i in months_to_show
+    ]
+
+    # Planting type breakdown - sum quantities instead of count
+    type_rows = run(
+        select(UrbanGreeningPlanting.planting_type, planted_sum)
+        .where(*in_period(UrbanGreeningPlanting.planting_date))
+        .group_by(UrbanGreeningPlanting.planting_type)
+    )
+    planting_type_totals: Dict[str, float] = {}
+    for planting_type, quantity in type_rows:
+        if not planting_type:
+            continue
+        planting_type_totals[planting_type] = planting_type_totals.get(planting_type, 0.0) + float(quantity or 0)
+
+    # Species bar: top 12 by total quantity (excluding trees - Flora only)
+    species_rows = run(
+        select(UrbanGreeningPlanting.species_name, planted_sum)
+        .where(*in_period(UrbanGreeningPlanting.planting_date), UrbanGreeningPlanting.planting_type != 'trees')
+        .group_by(UrbanGreeningPlanting.species_name)
+        .order_by(planted_sum.desc())
+    )
+    species_totals: Dict[str, float] = {}
+    for species_name, quantity in species_rows:
+        if not species_name:
+            continue
+        species_totals[species_name] = species_totals.get(species_name, 0.0) + float(quantity or 0)
+
+    # Include Urban Greening Project flora (plants stored as JSON)
+    project_plants_rows = run(select(UrbanGreeningProject.plants).where(*in_period(project_date_expr)))
+    for (plants_json,) in project_plants_rows:
+        if not plants_json:
+            continue
+        try:
+            plants_payload = json.loads(plants_json) if isinstance(plants_json, str) else plants_json
+        except Exception:
+            continue
+        if not isinstance(plants_payload, list):
+            continue
+        for item in plants_payload:
+            if not isinstance(item, dict):
+                continue
+            plant_type = (item.get('plant_type') or item.get('type') or 'unknown').strip()
+            quantity = item.get('quantity') or item.get('qty') or 0
+            try:
+                quantity_value = float(quantity)
+            except (TypeError, ValueError):
+                quantity_value = 0.0
+            if quantity_value <= 0:
+                continue
+            if plant_type:
+                planting_type_totals[plant_type] = planting_type_totals.get(plant_type, 0.0) + quantity_value
+            species_label = item.get('common_name') or item.get('species') or item.get('name')
+            if species_label:
+                key = species_label.strip()
+                if key:
+                    species_totals[key] = species_totals.get(key, 0.0) + quantity_value
+
+    planting_type_data = [
+        LabelValue(
+            id=plant_type,
+            label=plant_type.replace('_', ' ').title() if plant_type else 'Unknown',
+            value=float(total)
+        )
+        for plant_type, total in planting_type_totals.items()
+        if total > 0
+    ]
+    planting_type_data.sort(key=lambda item: (-item.value, item.label))
+
+    species_data = [
+        LabelValue(id=species, label=species, value=float(total))
+        for species, total in species_totals.items()
+        if total > 0
+    ]
+    species_data.sort(key=lambda item: (-item.value, item.label))
+    species_data = species_data[:12]
+
+    # Tree request counts by type and status
+    type_counts = run(
+        select(TreeRequest.request_type, func.count(TreeRequest.id))
+        .where(*in_period(TreeRequest.created_at))
+        .group_by(TreeRequest.request_type)
+        .order_by(TreeRequest.request_type)
+    )
+    tree_request_type_counts = [
+        LabelValue(id=t, label=t.replace('_', ' ').title(), value=float(c)) for t, c in type_counts
+    ]
+    status_counts = run(
+        select(TreeRequest.overall_status, func.count(TreeRequest.id))
+        .where(*in_period(TreeRequest.created_at))
+        .group_by(TreeRequest.overall_status)
+        .order_by(TreeRequest.overall_status)
+    )
+    tree_request_status_counts = [
+        LabelValue(id=s, label=s.replace('_', ' ').title(), value=float(c)) for s, c in status_counts
+    ]
+
+    # Recent Activity monthly totals (UG plantings and projects)
+    planting_month = extract('month', UrbanGreeningPlanting.planting_date)
+    ug_rows = run(
+        select(planting_month.label('m'), planted_sum)
+        .where(*in_period(UrbanGreeningPlanting.planting_date))
+        .group_by(planting_month)
+    )
+    ug_by_month = {int(m): float(total) for m, total in ug_rows if m is not None}
+
+    project_month = extract('month', project_date_expr)
+    project_ug_rows = run(
+        select(project_month.label('m'), project_sum)
+        .where(*in_period(project_date_expr))
+        .group_by(project_month)
+    )
+    for m, total in project_ug_rows:
+        if m is None:
+            continue
+        month_index = int(m)
+        ug_by_month[month_index] = ug_by_month.get(month_index, 0.0) + float(total or 0)
+
+    ug_monthly: List[MonthValue] = [
+        MonthValue(month=i, label=month_labels()[i - 1], total=ug_by_month.get(i, 0.0)) for i in months_to_show
+    ]
+
+    return UrbanGreeningDashboardOverview(
+        stat_cards=stat_cards,
+        planting_type_data=planting_type_data,
+        species_data=species_data,
+        # No sapling species data (feature removed)
+        sapling_species_data=[],
+        fee_monthly=fee_monthly,
+        tree_request_type_counts=tree_request_type_counts,
+        tree_request_status_counts=tree_request_status_counts,
+        # Trees to be cut/prune bar: Not available in new schema yet
+        tree_types_bar=[],
+        ug_monthly=ug_monthly,
+    )
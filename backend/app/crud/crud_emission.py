@@ -1,14 +1,17 @@
-import base64
-from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List, Callable
-from sqlalchemy.orm import Session, selectinload
+from typing import Optional, Dict, Any, List, Callable, Sequence
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import desc, or_, func, and_
+from sqlalchemy import case, inspect as sa_inspect, or_, func, select
 from uuid import UUID
 import traceback
 import re
 from app.crud.base_crud import CRUDBase
+from app.crud.pagination import KeysetPaginator, paginator_for
+from app.crud.projection import Projection, fetch_one, paginate
 from app.models.emission_models import Office, Vehicle, Test, TestSchedule, VehicleDriverHistory, VehicleRemarks
+from app.services.plate_index_service import plate_index
+from app.services.cache_service import cache
+from app.schemas import emission_schemas
 from app.schemas.emission_schemas import OfficeCreate, OfficeUpdate, VehicleCreate, VehicleUpdate, TestCreate, TestUpdate, TestScheduleCreate, TestScheduleUpdate, VehicleDriverHistoryCreate, VehicleRemarksCreate, VehicleRemarksUpdate, OfficeComplianceData, OfficeComplianceSummary
 
 
@@ -18,6 +21,26 @@ def _normalize_identifier(value: Optional[str]) -> Optional[str]:
     normalized = re.sub(r"[^a-z0-9]", "", value.lower())
     return normalized or None
 
+
+# vehicle list pages are built from these columns rather than ORM objects (see app.crud.projection)
+VEHICLE_LIST = Projection.for_schema(
+    emission_schemas.Vehicle,
+    Vehicle,
+    related={"office": Projection.for_schema(emission_schemas.Office, Office)},
+)
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+TEST_RESPONSE = Projection.for_schema(
+    emission_schemas.Test,
+    Test,
+    convert={name: _optional_float for name in ("co_level", "hc_level", "opacimeter_result")},
+)
+
+
 class CRUDOffice(CRUDBase[Office, OfficeCreate, OfficeUpdate]):
     def get_sync(self, db: Session, *, id: UUID) -> Optional[Office]:
         """Synchronous version of get for use with sync sessions"""
@@ -81,120 +104,9 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
         """Synchronous version of get for use with sync sessions"""
         return db.query(self.model).filter(self.model.id == id).first()
 
-    def _sanitize_limit(self, limit: Optional[int]) -> int:
-        if limit is None:
-            return self._DEFAULT_LIMIT
-        try:
-            limit_value = int(limit)
-        except (TypeError, ValueError):
-            limit_value = self._DEFAULT_LIMIT
-        return max(1, min(limit_value, self._MAX_LIMIT))
-
-    def _encode_vehicle_cursor(self, vehicle: Vehicle) -> str:
-        created_at = vehicle.created_at or datetime.now(timezone.utc)
-        payload = f"{created_at.isoformat()}|{vehicle.id}"
-        encoded = base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
-        return encoded
-
-    def _decode_vehicle_cursor(self, cursor: str) -> tuple[datetime, UUID]:
-        try:
-            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii")
-            created_str, vehicle_id_str = raw.split("|", 1)
-            created_at = datetime.fromisoformat(created_str)
-            vehicle_id = UUID(vehicle_id_str)
-            return created_at, vehicle_id
-        except Exception as exc:
-            raise ValueError("Invalid pagination cursor") from exc
-
-    def _cursor_from_skip(self, base_query_factory: Callable[[], Any], skip: int) -> Optional[str]:
-        if skip <= 0:
-            return None
-
-        seed_query = (
-            base_query_factory()
-            .order_by(Vehicle.created_at.desc(), Vehicle.id.desc())
-            .offset(skip - 1)
-            .limit(1)
-        )
-        seed = seed_query.first()
-        if not seed:
-            return None
-        return self._encode_vehicle_cursor(seed)
-
-    def _has_more_older(self, base_query_factory: Callable[[], Any], vehicle: Optional[Vehicle]) -> bool:
-        if not vehicle:
-            return False
-
-        older_query = base_query_factory().filter(
-            or_(
-                Vehicle.created_at < vehicle.created_at,
-                and_(Vehicle.created_at == vehicle.created_at, Vehicle.id < vehicle.id),
-            )
-        )
-        return older_query.order_by(Vehicle.created_at.desc(), Vehicle.id.desc()).limit(1).first() is not None
-
-    def _paginate_vehicle_query(
-        self,
-        base_query_factory: Callable[[], Any],
-        *,
-        limit: int,
-        after: Optional[str],
-        before: Optional[str],
-    ) -> Dict[str, Any]:
-        if after and before:
-            raise ValueError("Cannot specify both 'after' and 'before' cursors")
-
-        limit_value = self._sanitize_limit(limit)
-
-        if before:
-            created_at_val, vehicle_id_val = self._decode_vehicle_cursor(before)
-            asc_query = (
-                base_query_factory()
-                .filter(
-                    or_(
-                        Vehicle.created_at > created_at_val,
-                        and_(Vehicle.created_at == created_at_val, Vehicle.id > vehicle_id_val),
-                    )
-                )
-                .order_by(Vehicle.created_at.asc(), Vehicle.id.asc())
-            )
-
-            rows_raw = asc_query.limit(limit_value + 1).all()
-            has_more_newer = len(rows_raw) > limit_value
-            if has_more_newer:
-                rows_raw = rows_raw[:-1]
-            vehicles = list(reversed(rows_raw))
-
-            more_older = self._has_more_older(base_query_factory, vehicles[-1] if vehicles else None)
-            more_newer = has_more_newer
-        else:
-            desc_query = base_query_factory().order_by(Vehicle.created_at.desc(), Vehicle.id.desc())
-
-            if after:
-                created_at_val, vehicle_id_val = self._decode_vehicle_cursor(after)
-                desc_query = desc_query.filter(
-                    or_(
-                        Vehicle.created_at < created_at_val,
-                        and_(Vehicle.created_at == created_at_val, Vehicle.id < vehicle_id_val),
-                    )
-                )
-
-            rows_raw = desc_query.limit(limit_value + 1).all()
-            has_more_older = len(rows_raw) > limit_value
-            vehicles = rows_raw[:limit_value] if has_more_older else rows_raw
-
-            more_older = has_more_older
-            more_newer = after is not None
-
-        next_cursor = self._encode_vehicle_cursor(vehicles[-1]) if vehicles and more_older else None
-        prev_cursor = self._encode_vehicle_cursor(vehicles[0]) if vehicles and more_newer else None
-
-        return {
-            "vehicles": vehicles,
-            "next_cursor": next_cursor,
-            "prev_cursor": prev_cursor,
-            "limit": limit_value,
-        }
+    def __init__(self, model):
+        super().__init__(model)
+        self.paginator = paginator_for(model, default_limit=self._DEFAULT_LIMIT, max_limit=self._MAX_LIMIT)
 
     def create_sync(self, db: Session, *, obj_in: VehicleCreate) -> Vehicle:
         """Synchronous version of create for use with sync sessions"""
@@ -204,6 +116,7 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            plate_index.upsert(db_obj)
             return db_obj
         except Exception as e:
             db.rollback()
@@ -217,6 +130,7 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        plate_index.upsert(db_obj)
         return db_obj
     
     def remove_sync(self, db: Session, *, id: UUID) -> Vehicle:
@@ -224,10 +138,12 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
+        plate_index.remove(id)
         return obj
 
     def _base_query(self, db: Session):
-        return db.query(Vehicle).options(selectinload(Vehicle.office))
+        # Many-to-one, so joining keeps one row per vehicle and saves a round trip
+        return db.query(Vehicle).options(joinedload(Vehicle.office))
 
     def _apply_filters(self, query, filters: Optional[Dict[str, Any]]):
         if not filters:
@@ -271,11 +187,11 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
 
         return query
 
-    def _populate_latest_tests(self, db: Session, vehicles: List[Vehicle]) -> None:
-        if not vehicles:
-            return
+    def _latest_tests(self, db: Session, vehicle_ids: List[Any]) -> Dict[Any, tuple]:
+        """``vehicle_id -> (result, test_date)`` of each vehicle's most recent test."""
+        if not vehicle_ids:
+            return {}
 
-        vehicle_ids = [vehicle.id for vehicle in vehicles]
         latest_tests_subquery = (
             db.query(
                 Test.vehicle_id.label("vehicle_id"),
@@ -298,15 +214,64 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
             .all()
         )
 
-        latest_by_vehicle = {
-            row.vehicle_id: (row.result, row.test_date) for row in latest_tests
-        }
+        return {row.vehicle_id: (row.result, row.test_date) for row in latest_tests}
 
+    def _populate_latest_tests(self, db: Session, vehicles: List[Vehicle]) -> None:
+        latest_by_vehicle = self._latest_tests(db, [vehicle.id for vehicle in vehicles])
         for vehicle in vehicles:
             result, test_date = latest_by_vehicle.get(vehicle.id, (None, None))
             setattr(vehicle, "latest_test_result", result)
             setattr(vehicle, "latest_test_date", test_date)
 
+    def _list_query(self, db: Session):
+        # List pages select VEHICLE_LIST columns, so the office comes from a plain join
+        return db.query(Vehicle).outerjoin(Vehicle.office)
+
+    def _list_page(
+        self,
+        db: Session,
+        base_query_factory: Callable[[], Any],
+        *,
+        limit: int,
+        after: Optional[str],
+        before: Optional[str],
+        skip: int,
+        include_total: bool,
+        with_tests: bool,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        limit_value = self.paginator.sanitize_limit(limit)
+        total = base_query_factory().count() if include_total else None
+
+        # the keys are selected even when ``fields`` leaves them out; row.id finds the latest tests
+        projection = VEHICLE_LIST.only(fields).keeping([key.name for key in self.paginator.keys])
+        page = self.paginator.paginate_sync(
+            db, base_query_factory().with_entities(*projection.columns()),
+            limit=limit_value, after=after, before=before, skip=skip,
+        )
+        ids = [row.id for row in page.items]
+        vehicles = projection.to_dicts(page.items)
+
+        if with_tests and {"latest_test_result", "latest_test_date"} & set(projection.names):
+            self._merge_latest_tests(db, ids, vehicles)
+
+        return {
+            "vehicles": vehicles,
+            "total": total,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+            "limit": page.limit,
+        }
+
+    def _merge_latest_tests(self, db: Session, ids: List[Any], items: List[Dict[str, Any]]) -> None:
+        latest_by_vehicle = self._latest_tests(db, ids)
+        for vehicle_id, item in zip(ids, items):
+            result, test_date = latest_by_vehicle.get(vehicle_id, (None, None))
+            if "latest_test_result" in item:
+                item["latest_test_result"] = result
+            if "latest_test_date" in item:
+                item["latest_test_date"] = test_date
+
     def get_multi_with_test_info(
         self,
         db: Session,
@@ -317,34 +282,16 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
         before: Optional[str] = None,
         skip: int = 0,
         include_total: bool = True,
+        fields: Optional[Sequence[str]] = None,
     ):
-        """Get vehicles with their latest test information using keyset pagination"""
+        """Get vehicles (as response dicts) with their latest test information using keyset pagination"""
         filters = filters or {}
-        limit_value = self._sanitize_limit(limit)
-        base_query_factory: Callable[[], Any] = lambda: self._apply_filters(self._base_query(db), filters)
-
-        total = base_query_factory().count() if include_total else None
-
-        if skip and skip > 0 and not after and not before:
-            after = self._cursor_from_skip(base_query_factory, skip)
-
-        page = self._paginate_vehicle_query(
-            base_query_factory=base_query_factory,
-            limit=limit_value,
-            after=after,
-            before=before,
+        return self._list_page(
+            db,
+            lambda: self._apply_filters(self._list_query(db), filters),
+            limit=limit, after=after, before=before, skip=skip,
+            include_total=include_total, with_tests=True, fields=fields,
         )
-        vehicles = page["vehicles"]
-
-        self._populate_latest_tests(db, vehicles)
-
-        return {
-            "vehicles": vehicles,
-            "total": total,
-            "next_cursor": page["next_cursor"],
-            "prev_cursor": page["prev_cursor"],
-            "limit": page["limit"],
-        }
 
     def get_multi_optimized(
         self,
@@ -356,36 +303,16 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
         before: Optional[str] = None,
         skip: int = 0,
         include_total: bool = True,
+        fields: Optional[Sequence[str]] = None,
     ):
-        """Get vehicles without test information for faster loading using keyset pagination"""
+        """Get vehicles (as response dicts) without test information for faster loading using keyset pagination"""
         filters = filters or {}
-        limit_value = self._sanitize_limit(limit)
-        base_query_factory: Callable[[], Any] = lambda: self._apply_filters(self._base_query(db), filters)
-
-        total = base_query_factory().count() if include_total else None
-
-        if skip and skip > 0 and not after and not before:
-            after = self._cursor_from_skip(base_query_factory, skip)
-
-        page = self._paginate_vehicle_query(
-            base_query_factory=base_query_factory,
-            limit=limit_value,
-            after=after,
-            before=before,
+        return self._list_page(
+            db,
+            lambda: self._apply_filters(self._list_query(db), filters),
+            limit=limit, after=after, before=before, skip=skip,
+            include_total=include_total, with_tests=False, fields=fields,
         )
-        vehicles = page["vehicles"]
-
-        for vehicle in vehicles:
-            setattr(vehicle, "latest_test_result", None)
-            setattr(vehicle, "latest_test_date", None)
-
-        return {
-            "vehicles": vehicles,
-            "total": total,
-            "next_cursor": page["next_cursor"],
-            "prev_cursor": page["prev_cursor"],
-            "limit": page["limit"],
-        }
 
     def get_with_test_info(self, db: Session, *, id: UUID):
         """Get a specific vehicle with its latest test information"""
@@ -398,6 +325,13 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
 
         return vehicle
 
+    def get_fields_with_test_info(self, db: Session, *, id: UUID, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """A vehicle as a response dict narrowed to ``fields``, with its latest test when asked for"""
+        vehicle = fetch_one(self._list_query(db).filter(Vehicle.id == id), VEHICLE_LIST.only(fields))
+        if vehicle is not None and {"latest_test_result", "latest_test_date"} & vehicle.keys():
+            self._merge_latest_tests(db, [id], [vehicle])
+        return vehicle
+
     def get_unique_values(self, db: Session):
         """Get unique values for filter dropdowns"""
         offices = db.query(Office.name).distinct().all()
@@ -422,6 +356,7 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
         before: Optional[str] = None,
         skip: int = 0,
         include_total: bool = True,
+        fields: Optional[Sequence[str]] = None,
     ):
         """Search vehicles by plate number, chassis number, registration number, driver name, or office using keyset pagination"""
         normalized_term = _normalize_identifier(search_term)
@@ -443,36 +378,14 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
             conditions.append(Vehicle.office.has(Office.name.ilike(like_term)))
 
         if not conditions:
-            return {"vehicles": [], "total": 0}
-
-        def base_query_factory() -> Any:
-            return self._base_query(db).filter(or_(*conditions))
-
-        limit_value = self._sanitize_limit(limit)
-        total = base_query_factory().count() if include_total else None
-
-        if skip and skip > 0 and not after and not before:
-            after = self._cursor_from_skip(base_query_factory, skip)
+            return {"vehicles": [], "total": 0, "limit": self.paginator.sanitize_limit(limit)}
 
-        page = self._paginate_vehicle_query(
-            base_query_factory=base_query_factory,
-            limit=limit_value,
-            after=after,
-            before=before,
+        return self._list_page(
+            db,
+            lambda: self._list_query(db).filter(or_(*conditions)),
+            limit=limit, after=after, before=before, skip=skip,
+            include_total=include_total, with_tests=False, fields=fields,
         )
-        vehicles = page["vehicles"]
-
-        for vehicle in vehicles:
-            setattr(vehicle, "latest_test_result", None)
-            setattr(vehicle, "latest_test_date", None)
-
-        return {
-            "vehicles": vehicles,
-            "total": total,
-            "next_cursor": page["next_cursor"],
-            "prev_cursor": page["prev_cursor"],
-            "limit": page["limit"],
-        }
 
     def get_by_plate_number(self, db: Session, *, plate_number: str) -> Optional[Vehicle]:
         """Get vehicle by plate number"""
@@ -494,6 +407,32 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
 
         return vehicle
 
+    def get_plate_candidates(self, db: Session, *, plate_number: str, limit: int = 5):
+        """Rank vehicles whose identifiers are within a small OCR-aware edit distance"""
+        plate_index.ensure_built(db)
+        return plate_index.lookup(plate_number, limit=limit)
+
+def test_period_tag(year: int, quarter: int) -> str:
+    """Cache tag for aggregates over one quarter's tests, e.g. ``tests:2026Q1``."""
+    return f"tests:{year}Q{quarter}"
+
+
+def _test_period_tags(test: Test) -> List[str]:
+    """The quarter a written test is in and, when an update moved it, the one it left."""
+    state = sa_inspect(test)
+    year, quarter = state.attrs.year.history, state.attrs.quarter.history
+    periods = {(test.year, test.quarter)}
+    if year.deleted or quarter.deleted:
+        periods.add((
+            year.deleted[0] if year.deleted else test.year,
+            quarter.deleted[0] if quarter.deleted else test.quarter,
+        ))
+    return [test_period_tag(*period) for period in periods if None not in period]
+
+
+cache.tag_writes(Test, _test_period_tags)
+
+
 class CRUDTest(CRUDBase[Test, TestCreate, TestUpdate]):
     def get_sync(self, db: Session, *, id: UUID) -> Optional[Test]:
         """Synchronous version of get for use with sync sessions"""
@@ -507,12 +446,40 @@ class CRUDTest(CRUDBase[Test, TestCreate, TestUpdate]):
         db.refresh(db_obj)
         return db_obj
         
-    def get_multi_sync(self, db: Session, *, skip: int = 0, limit: int = 100):
-        """Synchronous version of get_multi for use with sync sessions"""
-        query = db.query(self.model)
+    def __init__(self, model):
+        super().__init__(model)
+        self.paginator = KeysetPaginator("emission.tests", Test.test_date.desc(), Test.id.desc())
+
+    def _list_page(self, db: Session, query, fields: Optional[Sequence[str]] = None, **page_args):
         total = query.count()
-        tests = query.order_by(desc(Test.test_date)).offset(skip).limit(limit).all()
-        return {"tests": tests, "total": total}
+        page = paginate(self.paginator, db, query, TEST_RESPONSE.only(fields), **page_args)
+        return {
+            "tests": page.items,
+            "total": total,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
+
+    def get_multi_sync(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        quarter: Optional[int] = None,
+        year: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ):
+        """Synchronous version of get_multi for use with sync sessions (keyset pagination, newest first);
+        tests are response dicts narrowed to ``fields``"""
+        query = db.query(self.model)
+        if quarter is not None:
+            query = query.filter(Test.quarter == quarter)
+        if year is not None:
+            query = query.filter(Test.year == year)
+        return self._list_page(db, query, fields, skip=skip, limit=limit, after=after, before=before)
     
     def count_sync(self, db: Session) -> int:
         """Synchronous version of count for use with sync sessions"""
@@ -535,12 +502,20 @@ class CRUDTest(CRUDBase[Test, TestCreate, TestUpdate]):
         db.commit()
         return obj
     
-    def get_by_vehicle(self, db: Session, *, vehicle_id: UUID, skip: int = 0, limit: int = 100):
+    def get_by_vehicle(
+        self,
+        db: Session,
+        *,
+        vehicle_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ):
         """Get tests for a specific vehicle"""
         query = db.query(self.model).filter(Test.vehicle_id == vehicle_id)
-        total = query.count()
-        tests = query.order_by(desc(Test.test_date)).offset(skip).limit(limit).all()
-        return {"tests": tests, "total": total}
+        return self._list_page(db, query, fields, skip=skip, limit=limit, after=after, before=before)
         
     def count(self, db: Session) -> int:
         """Synchronous count method for Test model"""
@@ -610,12 +585,47 @@ class CRUDVehicleDriverHistory(CRUDBase[VehicleDriverHistory, VehicleDriverHisto
         db.refresh(db_obj)
         return db_obj
         
-    def get_by_vehicle(self, db: Session, *, vehicle_id: UUID, skip: int = 0, limit: int = 100):
+    def __init__(self, model):
+        super().__init__(model)
+        self.paginator = KeysetPaginator(
+            "emission.vehicle_driver_history", VehicleDriverHistory.changed_at.desc(), VehicleDriverHistory.id.desc()
+        )
+
+    def _list_page(self, db: Session, query, **page_args):
+        total = query.count()
+        page = self.paginator.paginate_sync(db, query, **page_args)
+        return {
+            "history": page.items,
+            "total": total,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
+
+    def get_multi_sync(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ):
+        """Driver history for all vehicles, most recent change first"""
+        return self._list_page(db, db.query(self.model), skip=skip, limit=limit, after=after, before=before)
+
+    def get_by_vehicle(
+        self,
+        db: Session,
+        *,
+        vehicle_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ):
         """Get driver history for a specific vehicle"""
         query = db.query(self.model).filter(VehicleDriverHistory.vehicle_id == vehicle_id)
-        total = query.count()
-        history = query.order_by(desc(VehicleDriverHistory.changed_at)).offset(skip).limit(limit).all()
-        return {"history": history, "total": total}
+        return self._list_page(db, query, skip=skip, limit=limit, after=after, before=before)
 
 
 class CRUDVehicleRemarks(CRUDBase[VehicleRemarks, VehicleRemarksCreate, VehicleRemarksUpdate]):
@@ -653,7 +663,122 @@ class CRUDVehicleRemarks(CRUDBase[VehicleRemarks, VehicleRemarksCreate, VehicleR
             db.refresh(new_remarks)
             return new_remarks
 
+# analytics snapshot tables read by CRUDOfficeCompliance.dashboard_summary
+EMISSION_DASHBOARD_TABLES = ("emission.offices", "emission.vehicles", "emission.tests")
+
+
 class CRUDOfficeCompliance:
+    def dashboard_summary(
+        self, run: Callable[[Any], Sequence[Any]], *, year: Optional[int] = None, quarter: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Fleet counts and the best office for the emission dashboard, from each vehicle's latest test.
+
+        ``run(stmt)`` executes a Core statement and returns its rows, so the same
+        queries serve Postgres and the analytics snapshot.
+        """
+        period = []
+        if year is not None:
+            period.append(Test.year == year)
+        if quarter is not None:
+            period.append(Test.quarter == quarter)
+        ranked = (
+            select(
+                Test.vehicle_id.label("vehicle_id"),
+                Test.result.label("result"),
+                func.row_number()
+                .over(partition_by=Test.vehicle_id, order_by=Test.test_date.desc())
+                .label("rn"),
+            )
+            .where(*period)
+            .subquery()
+        )
+        latest = select(ranked.c.vehicle_id, ranked.c.result).where(ranked.c.rn == 1).subquery()
+
+        totals = run(
+            select(
+                select(func.count()).select_from(Vehicle).scalar_subquery().label("total_vehicles"),
+                select(func.count()).select_from(Office).scalar_subquery().label("total_offices"),
+                func.count(latest.c.vehicle_id).label("tested_vehicles"),
+                func.count().filter(latest.c.result.is_(True)).label("passed_tests"),
+                func.count().filter(latest.c.result.is_(False)).label("failed_tests"),
+            ).select_from(latest)
+        )[0]
+        total_vehicles = int(totals.total_vehicles or 0)
+        passed_tests = int(totals.passed_tests or 0)
+
+        tested_count = func.count(latest.c.vehicle_id)
+        passed_count = func.sum(case((latest.c.result.is_(True), 1), else_=0))
+        compliance = case((tested_count > 0, passed_count * 100.0 / tested_count), else_=0.0)
+        vehicle_count = func.count(func.distinct(Vehicle.id))
+        top_rows = run(
+            select(
+                Office.name.label("office_name"),
+                vehicle_count.label("vehicle_count"),
+                passed_count.label("passed_count"),
+                compliance.label("compliance_rate"),
+            )
+            .join(Vehicle, Vehicle.office_id == Office.id)
+            .outerjoin(latest, latest.c.vehicle_id == Vehicle.id)
+            .group_by(Office.name)
+            .order_by(compliance.desc(), tested_count.desc(), vehicle_count.desc(), Office.name)
+            .limit(1)
+        )
+        top_office = None
+        if top_rows:
+            top = top_rows[0]
+            top_office = {
+                "office_name": top.office_name,
+                "compliance_rate": round(float(top.compliance_rate or 0), 2),
+                "passed_count": int(top.passed_count or 0),
+                "vehicle_count": int(top.vehicle_count or 0),
+            }
+
+        return {
+            "total_vehicles": total_vehicles,
+            "total_offices": int(totals.total_offices or 0),
+            "tested_vehicles": int(totals.tested_vehicles or 0),
+            "passed_tests": passed_tests,
+            "failed_tests": int(totals.failed_tests or 0),
+            "pending_tests": max(total_vehicles - int(totals.tested_vehicles or 0), 0),
+            "compliance_rate": round(passed_tests / total_vehicles * 100, 2) if total_vehicles > 0 else 0.0,
+            "top_office": top_office,
+        }
+
+    def compliance_by_office(
+        self, db: Session, *, year: int, quarter: Optional[int] = None, search_term: Optional[str] = None
+    ) -> List[Any]:
+        """One row per office with its whole fleet and each vehicle's latest test in the period.
+
+        A single grouped query (DISTINCT ON for the latest test), for reports
+        that cover every office at once.
+        """
+        period = [Test.year == year]
+        if quarter:
+            period.append(Test.quarter == quarter)
+        latest = (
+            db.query(Test.vehicle_id, Test.result, Test.test_date)
+            .filter(*period)
+            .distinct(Test.vehicle_id)
+            .order_by(Test.vehicle_id, Test.test_date.desc())
+            .subquery()
+        )
+        query = (
+            db.query(
+                Office.name.label("office_name"),
+                func.count(Vehicle.id).label("total_vehicles"),
+                func.count(latest.c.vehicle_id).label("tested_vehicles"),
+                func.count(latest.c.vehicle_id).filter(latest.c.result.is_(True)).label("compliant_vehicles"),
+                func.max(latest.c.test_date).label("last_test_date"),
+            )
+            .join(Vehicle, Vehicle.office_id == Office.id)
+            .outerjoin(latest, latest.c.vehicle_id == Vehicle.id)
+            .group_by(Office.id, Office.name)
+            .order_by(Office.name)
+        )
+        if search_term:
+            query = query.filter(Office.name.ilike(f"%{search_term}%"))
+        return query.all()
+
     def get_office_compliance_data(
         self, 
         db: Session, 
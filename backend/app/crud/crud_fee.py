@@ -1,11 +1,15 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from sqlalchemy.orm import Session
 from app.crud.base_crud import CRUDBase
+from app.crud.projection import Projection
 from app.models.urban_greening_models import FeeRecord
 from app.schemas.fee_schemas import (
-    UrbanGreeningFeeRecordCreate, UrbanGreeningFeeRecordUpdate
+    UrbanGreeningFeeRecord, UrbanGreeningFeeRecordCreate, UrbanGreeningFeeRecordUpdate
 )
 
+# list responses are built from these columns rather than ORM objects (see app.crud.projection)
+FEE_LIST = Projection.for_schema(UrbanGreeningFeeRecord, FeeRecord)
+
 
 
 
@@ -34,12 +38,29 @@ class CRUDUrbanGreeningFeeRecord(CRUDBase[FeeRecord, UrbanGreeningFeeRecordCreat
             FeeRecord.status.in_(["pending", "overdue"])
         ).all()
 
-    def get_by_year(self, db: Session, *, year: int) -> List[FeeRecord]:
-        """Get fee records for a specific year based on the date field"""
+    def get_by_year(self, db: Session, *, year: int, fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Get fee records for a specific year based on the date field, as FEE_LIST dicts narrowed to ``fields``"""
         from sqlalchemy import extract
-        return db.query(FeeRecord).filter(
+        projection = FEE_LIST.only(fields)
+        rows = db.query(*projection.columns()).filter(
             extract('year', FeeRecord.date) == year
         ).all()
+        return projection.to_dicts(rows)
+
+    def collection_summary(self, db: Session, *, year: int, group_by: str = "month") -> List:
+        """Count, billed and collected amounts for ``year`` per month or per fee type."""
+        from datetime import date
+        from sqlalchemy import extract, func
+        key = extract('month', FeeRecord.date) if group_by == "month" else FeeRecord.type
+        return db.query(
+            key.label(group_by),
+            func.count(FeeRecord.id).label('records'),
+            func.sum(FeeRecord.amount).label('billed'),
+            func.coalesce(func.sum(FeeRecord.amount).filter(FeeRecord.status == 'paid'), 0).label('collected'),
+            func.count(FeeRecord.id).filter(FeeRecord.status == 'pending').label('pending'),
+        ).filter(
+            FeeRecord.date >= date(year, 1, 1), FeeRecord.date < date(year + 1, 1, 1)
+        ).group_by(key).order_by(key).all()
 
     def get_sync(self, db: Session, *, id: str) -> Optional[FeeRecord]:
         """Synchronous version of get for use with sync sessions"""
@@ -47,7 +68,7 @@ class CRUDUrbanGreeningFeeRecord(CRUDBase[FeeRecord, UrbanGreeningFeeRecordCreat
 
     def get_multi_sync(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[FeeRecord]:
         """Synchronous version of get_multi for use with sync sessions"""
-        return db.query(FeeRecord).offset(skip).limit(limit).all()
+        return self.get_page_sync(db, skip=skip, limit=limit).items
 
     def create_sync(self, db: Session, *, obj_in: UrbanGreeningFeeRecordCreate) -> FeeRecord:
         """Synchronous version of create for use with sync sessions"""
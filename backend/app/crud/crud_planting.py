@@ -1,13 +1,16 @@
-from typing import List, Optional
+import json
+from typing import Any, List, Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func, extract
+from sqlalchemy import and_, or_, func, extract
 from datetime import date, datetime
 import re
 
 from app.crud.base_crud import CRUDBase
+from app.crud.pagination import KeysetPaginator, Page
+from app.crud.projection import Projection
 from app.models.urban_greening_models import UrbanGreeningPlanting, SaplingCollection
 from app.schemas.planting_schemas import (
-    UrbanGreeningPlantingCreate, UrbanGreeningPlantingUpdate,
+    UrbanGreeningPlantingCreate, UrbanGreeningPlantingUpdate, UrbanGreeningPlantingInDB,
     SaplingCollectionCreate, SaplingCollectionUpdate,
     PlantingStatistics, SaplingStatistics
 )
@@ -20,15 +23,38 @@ def _normalize_text(value: Optional[str]) -> Optional[str]:
     return normalized or None
 
 
+def plant_list(value: Any) -> Optional[list]:
+    """Stored plants JSON as a list, or None when missing or malformed."""
+    if not value:
+        return None
+    try:
+        plants = json.loads(value)
+    except (TypeError, ValueError):
+        return None
+    return plants if isinstance(plants, list) else None
+
+
+# list pages are built from these columns rather than ORM objects (see app.crud.projection)
+PLANTING_LIST = Projection.for_schema(UrbanGreeningPlantingInDB, UrbanGreeningPlanting, convert={"plants": plant_list})
+
+
 class CRUDUrbanGreeningPlanting(CRUDBase[UrbanGreeningPlanting, UrbanGreeningPlantingCreate, UrbanGreeningPlantingUpdate]):
     
+    def __init__(self, model):
+        super().__init__(model)
+        self.paginator = KeysetPaginator(
+            "urban_greening.urban_greening_plantings",
+            UrbanGreeningPlanting.planting_date.desc(),
+            UrbanGreeningPlanting.id.desc(),
+        )
+
     def get(self, db: Session, id: any) -> Optional[UrbanGreeningPlanting]:
         """Get urban greening planting by ID (sync override)"""
         return db.query(UrbanGreeningPlanting).filter(UrbanGreeningPlanting.id == id).first()
     
     def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[UrbanGreeningPlanting]:
         """Get multiple urban greening plantings (sync override)"""
-        return db.query(UrbanGreeningPlanting).offset(skip).limit(limit).all()
+        return self.get_page_sync(db, db.query(UrbanGreeningPlanting), skip=skip, limit=limit).items
     
     def create(self, db: Session, *, obj_in) -> UrbanGreeningPlanting:
         """Create urban greening planting (sync override)"""
@@ -121,22 +147,26 @@ class CRUDUrbanGreeningPlanting(CRUDBase[UrbanGreeningPlanting, UrbanGreeningPla
             UrbanGreeningPlanting.monitoring_request_id == monitoring_request_id
         ).all()
     
-    def get_by_year(self, db: Session, *, year: int, skip: int = 0, limit: int = 100) -> List[UrbanGreeningPlanting]:
-        """Get urban greening plantings filtered by year"""
+    def get_by_year(
+        self,
+        db: Session,
+        *,
+        year: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        """Get urban greening plantings filtered by year, as PLANTING_LIST dicts narrowed to ``fields``"""
         start = date(year, 1, 1)
         end = date(year + 1, 1, 1)
 
-        return (
-            db.query(UrbanGreeningPlanting)
-            .filter(
-                UrbanGreeningPlanting.planting_date >= start,
-                UrbanGreeningPlanting.planting_date < end,
-            )
-            .order_by(UrbanGreeningPlanting.planting_date.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        query = db.query(UrbanGreeningPlanting).filter(
+            UrbanGreeningPlanting.planting_date >= start,
+            UrbanGreeningPlanting.planting_date < end,
         )
+        return self.get_projected_page_sync(db, PLANTING_LIST.only(fields), query, skip=skip, limit=limit, after=after, before=before)
     
     def search(
         self, 
@@ -146,9 +176,12 @@ class CRUDUrbanGreeningPlanting(CRUDBase[UrbanGreeningPlanting, UrbanGreeningPla
         planting_type: Optional[str] = None,
         status: Optional[str] = None,
         skip: int = 0, 
-        limit: int = 100
-    ) -> List[UrbanGreeningPlanting]:
-        """Search plantings with filters"""
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        """Search plantings with filters, as PLANTING_LIST dicts narrowed to ``fields``"""
         query = db.query(UrbanGreeningPlanting)
         
         # Search term filter
@@ -189,7 +222,7 @@ class CRUDUrbanGreeningPlanting(CRUDBase[UrbanGreeningPlanting, UrbanGreeningPla
         if status and status != "all":
             query = query.filter(UrbanGreeningPlanting.status == status)
         
-        return query.order_by(desc(UrbanGreeningPlanting.planting_date)).offset(skip).limit(limit).all()
+        return self.get_projected_page_sync(db, PLANTING_LIST.only(fields), query, skip=skip, limit=limit, after=after, before=before)
     
     def get_statistics(self, db: Session) -> PlantingStatistics:
         """Get planting statistics"""
@@ -237,13 +270,19 @@ class CRUDUrbanGreeningPlanting(CRUDBase[UrbanGreeningPlanting, UrbanGreeningPla
 
 class CRUDSaplingCollection(CRUDBase[SaplingCollection, SaplingCollectionCreate, SaplingCollectionUpdate]):
     
+    def __init__(self, model):
+        super().__init__(model)
+        self.paginator = KeysetPaginator(
+            "urban_greening.sapling_collections", SaplingCollection.collection_date.desc(), SaplingCollection.id.desc()
+        )
+
     def get(self, db: Session, id: any) -> Optional[SaplingCollection]:
         """Get sapling collection by ID (sync override)"""
         return db.query(SaplingCollection).filter(SaplingCollection.id == id).first()
     
     def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[SaplingCollection]:
         """Get multiple sapling collections (sync override)"""
-        return db.query(SaplingCollection).offset(skip).limit(limit).all()
+        return self.get_page_sync(db, db.query(SaplingCollection), skip=skip, limit=limit).items
     
     def create(self, db: Session, *, obj_in) -> SaplingCollection:
         """Create sapling collection (sync override)"""
@@ -328,8 +367,10 @@ class CRUDSaplingCollection(CRUDBase[SaplingCollection, SaplingCollectionCreate,
         purpose: Optional[str] = None,
         status: Optional[str] = None,
         skip: int = 0, 
-        limit: int = 100
-    ) -> List[SaplingCollection]:
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ) -> Page:
         """Search collections with filters"""
         query = db.query(SaplingCollection)
         
@@ -352,7 +393,7 @@ class CRUDSaplingCollection(CRUDBase[SaplingCollection, SaplingCollectionCreate,
         if status and status != "all":
             query = query.filter(SaplingCollection.status == status)
         
-        return query.order_by(desc(SaplingCollection.collection_date)).offset(skip).limit(limit).all()
+        return self.get_page_sync(db, query, skip=skip, limit=limit, after=after, before=before)
     
     def get_statistics(self, db: Session) -> SaplingStatistics:
         """Get sapling collection statistics"""
@@ -4,16 +4,23 @@ import uuid
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, func
 from sqlalchemy.orm import selectinload
 
 from app.crud.base_crud import CRUDBase
+from app.crud.pagination import KeysetPaginator, Page
 from app.models.auth_models import UserSession, User, Profile, DeviceTypeEnum
 from app.schemas.session_schemas import SessionCreate, SessionUpdate
 from app.core.config import settings
 
 
 class CRUDSession(CRUDBase[UserSession, SessionCreate, SessionUpdate]):
+    def __init__(self, model):
+        super().__init__(model)
+        self.paginator = KeysetPaginator(
+            "app_auth.user_sessions", UserSession.is_active.desc(), UserSession.created_at.desc(), UserSession.id.desc()
+        )
+
     async def create_session(
         self,
         db: AsyncSession,
@@ -102,10 +109,12 @@ class CRUDSession(CRUDBase[UserSession, SessionCreate, SessionUpdate]):
         *,
         skip: int = 0,
         limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
         device_type: Optional[DeviceTypeEnum] = None,
         is_active: Optional[bool] = None
-    ) -> List[UserSession]:
-        """Get all sessions with user information"""
+    ) -> Page:
+        """Get all sessions with user information, active first then newest first"""
         query = select(UserSession).options(
             selectinload(UserSession.user).selectinload(User.profile)
         )
@@ -118,23 +127,20 @@ class CRUDSession(CRUDBase[UserSession, SessionCreate, SessionUpdate]):
                 query = query.where(
                     and_(
                         UserSession.is_active == True,
-                        UserSession.expires_at > datetime.utcnow()
+                        UserSession.expires_at > func.now()
                     )
                 )
             else:
                 query = query.where(
                     or_(
                         UserSession.is_active == False,
-                        UserSession.expires_at <= datetime.utcnow()
+                        UserSession.expires_at <= func.now()
                     )
                 )
         
-        query = query.order_by(desc(UserSession.is_active), desc(UserSession.created_at)).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        sessions = result.scalars().all()
-        
-        return sessions
+        return await self.paginator.paginate(
+            db, query, skip=skip, limit=limit, after=after, before=before
+        )
     
     async def terminate_session(
         self,
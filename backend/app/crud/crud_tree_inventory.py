@@ -2,20 +2,22 @@
 """CRUD operations for Tree Inventory System"""
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, desc, or_, and_
+from sqlalchemy import func, extract, desc, literal, or_, select
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence
 from uuid import UUID
 from datetime import date, datetime, timezone
-import base64
 import json
 import re
 
+from app.crud.pagination import KeysetPaginator, Page
+from app.crud.projection import Projection, fetch_one, paginate
 from app.models.tree_inventory_models import TreeInventory, TreeMonitoringLog, PlantingProject, TreeSpecies
 from app.schemas.tree_inventory_schemas import (
-    TreeInventoryCreate, TreeInventoryUpdate,
+    TreeInventoryCreate, TreeInventoryUpdate, TreeInventoryResponse, TreePhotoMetadata,
     TreeMonitoringLogCreate,
-    PlantingProjectCreate, PlantingProjectUpdate,
+    PlantingProjectCreate, PlantingProjectUpdate, PlantingProjectResponse,
     TreeInventoryStats, PlantingProjectStats,
     TreeSpeciesCreate, TreeSpeciesUpdate,
     TreeCarbonStatistics, TreeCountCompositionStats, CarbonStockStats,
@@ -125,15 +127,17 @@ def count_trees_using_species(db: Session, common_name: str) -> int:
 
 # ==================== Tree Code Generation ====================
 
-def generate_tree_code(db: Session, year: Optional[int] = None) -> str:
-    """Generate unique tree code: YYYY-NNNN (detects and fills gaps in sequence)"""
+def _tree_code_year(year: Optional[int] = None) -> int:
     try:
         target_year = int(year) if year is not None else datetime.now().year
     except (TypeError, ValueError):
         target_year = datetime.now().year
+    return max(1900, min(target_year, 9999))
+
 
-    target_year = max(1900, min(target_year, 9999))
-    prefix = f"{target_year}-"
+def generate_tree_codes(db: Session, year: Optional[int] = None, count: int = 1) -> List[str]:
+    """Generate ``count`` unique tree codes YYYY-NNNN with one query (fills gaps first)"""
+    prefix = f"{_tree_code_year(year)}-"
 
     # Get all existing tree codes for this year
     existing_codes = (
@@ -142,9 +146,6 @@ def generate_tree_code(db: Session, year: Optional[int] = None) -> str:
         .all()
     )
 
-    if not existing_codes:
-        return f"{prefix}0001"
-
     # Extract sequence numbers
     sequence_numbers = set()
     for (code,) in existing_codes:
@@ -154,14 +155,19 @@ def generate_tree_code(db: Session, year: Optional[int] = None) -> str:
         except Exception:
             continue
 
-    # Find first gap in sequence
-    max_seq = max(sequence_numbers) if sequence_numbers else 0
-    for i in range(1, max_seq + 1):
-        if i not in sequence_numbers:
-            return f"{prefix}{str(i).zfill(4)}"
+    # Fill gaps in the sequence first, then continue after the highest number
+    codes = []
+    seq = 0
+    while len(codes) < count:
+        seq += 1
+        if seq not in sequence_numbers:
+            codes.append(f"{prefix}{str(seq).zfill(4)}")
+    return codes
+
 
-    # No gaps found, use next number
-    return f"{prefix}{str(max_seq + 1).zfill(4)}"
+def generate_tree_code(db: Session, year: Optional[int] = None) -> str:
+    """Generate unique tree code: YYYY-NNNN (detects and fills gaps in sequence)"""
+    return generate_tree_codes(db, year, 1)[0]
 
 
 def generate_project_code(db: Session) -> str:
@@ -187,20 +193,44 @@ def generate_project_code(db: Session) -> str:
 
 # ==================== Tree Inventory CRUD ====================
 
-def get_all_trees(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
+tree_pages = KeysetPaginator(
+    "urban_greening.tree_inventory", TreeInventory.created_at.desc(), TreeInventory.id.desc()
+)
+
+_PHOTO_FIELDS = tuple(TreePhotoMetadata.model_fields)
+
+
+def photo_list(value) -> list:
+    """Stored photos JSON as ``TreeInventoryResponse.photos`` dumps it (URLs or full metadata)."""
+    if not value:
+        return []
+    try:
+        photos = json.loads(value) if isinstance(value, str) else value
+    except ValueError:
+        return []
+    if not isinstance(photos, list):
+        return []
+    return [
+        photo if isinstance(photo, str) else {name: photo.get(name) for name in _PHOTO_FIELDS}
+        for photo in photos
+        if isinstance(photo, str) or (isinstance(photo, dict) and isinstance(photo.get("url"), str))
+    ]
+
+
+# list responses are built from these columns rather than ORM objects (see app.crud.projection)
+TREE_RESPONSE = Projection.for_schema(TreeInventoryResponse, TreeInventory, convert={"photos": photo_list})
+
+
+def filter_trees(
+    query,
     status: Optional[str] = None,
     health: Optional[str] = None,
     species: Optional[str] = None,
     barangay: Optional[str] = None,
     search: Optional[str] = None,
-    is_archived: Optional[bool] = False
-) -> List[TreeInventory]:
-    """Get all trees with optional filters"""
-    query = db.query(TreeInventory)
-    
+    is_archived: Optional[bool] = False,
+):
+    """Apply the tree listing filters to an ORM query or a Core select."""
     if is_archived is not None:
         query = query.filter(TreeInventory.is_archived == is_archived)
     if status:
@@ -218,80 +248,43 @@ def get_all_trees(
             (TreeInventory.common_name.ilike(f"%{search}%")) |
             (TreeInventory.address.ilike(f"%{search}%"))
         )
-    
-    return query.order_by(desc(TreeInventory.created_at)).offset(skip).limit(limit).all()
-
-
-def _encode_tree_cursor(tree: TreeInventory) -> str:
-    created_at = tree.created_at or datetime.now(timezone.utc)
-    payload = f"{created_at.isoformat()}|{tree.id}"
-    return base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+    return query
 
 
-def _decode_tree_cursor(cursor: str) -> tuple[datetime, UUID]:
-    try:
-        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii")
-        created_str, tree_id_str = raw.split("|", 1)
-        created_at = datetime.fromisoformat(created_str)
-        tree_id = UUID(tree_id_str)
-        return created_at, tree_id
-    except Exception as exc:
-        raise ValueError("Invalid pagination cursor") from exc
+def _tree_query(
+    db: Session,
+    status: Optional[str] = None,
+    health: Optional[str] = None,
+    species: Optional[str] = None,
+    barangay: Optional[str] = None,
+    search: Optional[str] = None,
+    is_archived: Optional[bool] = False,
+):
+    return filter_trees(db.query(TreeInventory), status, health, species, barangay, search, is_archived)
 
 
-def get_all_trees_keyset(
+def get_trees_page(
     db: Session,
     *,
     limit: int = 100,
-    cursor: Optional[str] = None,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    skip: int = 0,
     status: Optional[str] = None,
     health: Optional[str] = None,
     species: Optional[str] = None,
     barangay: Optional[str] = None,
     search: Optional[str] = None,
     is_archived: Optional[bool] = False,
-) -> tuple[List[TreeInventory], Optional[str]]:
-    """Keyset-pagination for tree inventory (ordered by created_at desc, id desc)."""
-    query = db.query(TreeInventory)
-
-    if is_archived is not None:
-        query = query.filter(TreeInventory.is_archived == is_archived)
-    if status:
-        query = query.filter(TreeInventory.status == status)
-    if health:
-        query = query.filter(TreeInventory.health == health)
-    if species:
-        query = query.filter(TreeInventory.species.ilike(f"%{species}%"))
-    if barangay:
-        query = query.filter(TreeInventory.barangay.ilike(f"%{barangay}%"))
-    if search:
-        query = query.filter(
-            (TreeInventory.tree_code.ilike(f"%{search}%")) |
-            (TreeInventory.species.ilike(f"%{search}%")) |
-            (TreeInventory.common_name.ilike(f"%{search}%")) |
-            (TreeInventory.address.ilike(f"%{search}%"))
-        )
-
-    if cursor:
-        created_at_val, tree_id_val = _decode_tree_cursor(cursor)
-        query = query.filter(
-            or_(
-                TreeInventory.created_at < created_at_val,
-                and_(TreeInventory.created_at == created_at_val, TreeInventory.id < tree_id_val),
-            )
-        )
-
-    rows = (
-        query.order_by(desc(TreeInventory.created_at), desc(TreeInventory.id))
-        .limit(limit + 1)
-        .all()
+    fields: Optional[Sequence[str]] = None,
+) -> Page:
+    """Keyset page of the tree inventory (ordered by created_at desc, id desc) as response dicts,
+    narrowed to ``fields`` when given."""
+    query = _tree_query(db, status, health, species, barangay, search, is_archived)
+    return paginate(
+        tree_pages, db, query, TREE_RESPONSE.only(fields), limit=limit, after=after, before=before, skip=skip
     )
 
-    has_more = len(rows) > limit
-    items = rows[:limit] if has_more else rows
-    next_cursor = _encode_tree_cursor(items[-1]) if items and has_more else None
-    return items, next_cursor
-
 
 def get_tree_by_id(db: Session, tree_id: UUID) -> Optional[TreeInventory]:
     """Get tree by ID"""
@@ -303,22 +296,53 @@ def get_tree_by_code(db: Session, tree_code: str) -> Optional[TreeInventory]:
     return db.query(TreeInventory).filter(TreeInventory.tree_code == tree_code).first()
 
 
-def create_tree(db: Session, tree_data: TreeInventoryCreate, current_user=None) -> TreeInventory:
-    """Create new tree in inventory with automatic initial monitoring log"""
-    # Generate tree code if not provided
-    planted_date = tree_data.planted_date
-    target_year = planted_date.year if planted_date else datetime.now().year
-    tree_code = tree_data.tree_code or generate_tree_code(db, target_year)
-    
-    # Convert photos list to JSON string
-    photos_json = None
-    if tree_data.photos:
-        photos_list = [
-            p.model_dump() if hasattr(p, "model_dump") else p 
-            for p in tree_data.photos
-        ]
-        photos_json = json.dumps(photos_list)
-    
+def get_tree_fields(
+    db: Session, fields: Sequence[str], *, tree_id: Optional[UUID] = None, tree_code: Optional[str] = None
+) -> Optional[Dict]:
+    """One tree (by ID or code) as a response dict narrowed to ``fields``.
+
+    Looked up by ID, the monitoring fields are filled in as on the full detail response.
+    """
+    query = db.query(TreeInventory)
+    if tree_id is not None:
+        query = query.filter(TreeInventory.id == tree_id)
+    else:
+        query = query.filter(TreeInventory.tree_code == tree_code)
+    tree = fetch_one(query, TREE_RESPONSE.only(fields))
+    if tree is not None and tree_id is not None and {"monitoring_logs_count", "last_inspection_date"} & tree.keys():
+        logs_count, last_inspection = db.query(
+            func.count(TreeMonitoringLog.id), func.max(TreeMonitoringLog.inspection_date)
+        ).filter(TreeMonitoringLog.tree_id == tree_id).one()
+        if "monitoring_logs_count" in tree:
+            tree["monitoring_logs_count"] = logs_count
+        if "last_inspection_date" in tree:
+            tree["last_inspection_date"] = last_inspection
+    return tree
+
+
+def _photos_json(tree_data: TreeInventoryCreate) -> Optional[str]:
+    """Convert photos list to JSON string"""
+    if not tree_data.photos:
+        return None
+    photos_list = [
+        p.model_dump() if hasattr(p, "model_dump") else p
+        for p in tree_data.photos
+    ]
+    return json.dumps(photos_list)
+
+
+def _inspector_name(current_user) -> str:
+    if not current_user:
+        return "System"
+    profile = getattr(current_user, 'profile', None)
+    if profile and (profile.first_name or profile.last_name):
+        return f"{profile.first_name or ''} {profile.last_name or ''}".strip()
+    return current_user.email
+
+
+def _build_tree(tree_data: TreeInventoryCreate, tree_code: str, inspector_name: str) -> TreeInventory:
+    """New tree plus its initial monitoring log (attached through the relationship)"""
+    photos_json = _photos_json(tree_data)
     db_tree = TreeInventory(
         tree_code=tree_code,
         species=tree_data.species,
@@ -340,38 +364,13 @@ def create_tree(db: Session, tree_data: TreeInventoryCreate, current_user=None)
         photos=photos_json,
         notes=tree_data.notes
     )
-    
-    db.add(db_tree)
-
-    try:
-        db.commit()
-    except IntegrityError as exc:
-        db.rollback()
-        if _is_duplicate_tree_code_error(exc):
-            raise DuplicateTreeCodeError from exc
-        raise
 
-    db.refresh(db_tree)
-    
-    # Automatically create initial monitoring log
-    inspector_name = "System"
-    if current_user:
-        if hasattr(current_user, 'profile') and current_user.profile:
-            if current_user.profile.first_name or current_user.profile.last_name:
-                inspector_name = f"{current_user.profile.first_name or ''} {current_user.profile.last_name or ''}".strip()
-            else:
-                inspector_name = current_user.email
-        else:
-            inspector_name = current_user.email
-    
     # Build monitoring log notes
     log_notes = f"Initial tree registration. Status: {tree_data.status}, Health: {tree_data.health}"
     if tree_data.notes:
         log_notes += f"\n\nNotes: {tree_data.notes}"
-    
-    # Create monitoring log
-    monitoring_log = TreeMonitoringLog(
-        tree_id=db_tree.id,
+
+    db_tree.monitoring_logs.append(TreeMonitoringLog(
         inspection_date=date.today(),
         health_status=tree_data.health,
         height_meters=tree_data.height_meters,
@@ -379,15 +378,68 @@ def create_tree(db: Session, tree_data: TreeInventoryCreate, current_user=None)
         notes=log_notes,
         inspector_name=inspector_name,
         photos=photos_json
-    )
-    
-    db.add(monitoring_log)
-    db.commit()
-    db.refresh(db_tree)
-    
+    ))
     return db_tree
 
 
+def create_tree(db: Session, tree_data: TreeInventoryCreate, current_user=None) -> TreeInventory:
+    """Create new tree in inventory with automatic initial monitoring log"""
+    return create_trees(db, [tree_data], current_user)[0]
+
+
+def create_trees(db: Session, trees_data: List[TreeInventoryCreate], current_user=None) -> List[TreeInventory]:
+    """Create trees (each with its initial monitoring log) in a single transaction.
+
+    Missing tree codes are generated with one query per planting year, the
+    inserts are batched by the flush, and the rows are reloaded with one query.
+    """
+    if not trees_data:
+        return []
+
+    # Generate tree codes if not provided
+    target_years = [
+        tree_data.planted_date.year if tree_data.planted_date else datetime.now().year
+        for tree_data in trees_data
+    ]
+    missing = Counter(
+        _tree_code_year(year)
+        for tree_data, year in zip(trees_data, target_years)
+        if not tree_data.tree_code
+    )
+    generated = {year: iter(generate_tree_codes(db, year, count)) for year, count in missing.items()}
+
+    inspector_name = _inspector_name(current_user)
+    db_trees = [
+        _build_tree(
+            tree_data,
+            tree_data.tree_code or next(generated[_tree_code_year(year)]),
+            inspector_name,
+        )
+        for tree_data, year in zip(trees_data, target_years)
+    ]
+    db.add_all(db_trees)
+
+    try:
+        db.flush()
+        tree_ids = [db_tree.id for db_tree in db_trees]
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if _is_duplicate_tree_code_error(exc):
+            raise DuplicateTreeCodeError from exc
+        raise
+
+    # Pick up server-side defaults (timestamps) for every new row at once
+    reloaded = {
+        tree.id: tree
+        for tree in db.query(TreeInventory)
+        .filter(TreeInventory.id.in_(tree_ids))
+        .populate_existing()
+        .all()
+    }
+    return [reloaded[tree_id] for tree_id in tree_ids]
+
+
 def update_tree(db: Session, tree_id: UUID, tree_data: TreeInventoryUpdate) -> Optional[TreeInventory]:
     """Update tree in inventory"""
     db_tree = get_tree_by_id(db, tree_id)
@@ -467,13 +519,15 @@ def restore_tree(db: Session, tree_id: UUID) -> bool:
     return True
 
 
-def get_trees_for_map(db: Session) -> List[TreeInventory]:
-    """Get all trees with location for map display"""
-    return db.query(TreeInventory)\
+def get_trees_for_map(db: Session, fields: Optional[Sequence[str]] = None) -> List[dict]:
+    """Get all trees with location for map display, as response dicts narrowed to ``fields``"""
+    projection = TREE_RESPONSE.only(fields).keeping(["id"])
+    rows = db.query(*projection.columns())\
         .filter(TreeInventory.is_archived == False)\
         .filter(TreeInventory.latitude.isnot(None))\
         .filter(TreeInventory.longitude.isnot(None))\
         .all()
+    return projection.to_dicts(rows)
 
 
 def get_trees_in_bounds(
@@ -589,15 +643,39 @@ def create_monitoring_log(db: Session, log_data: TreeMonitoringLogCreate) -> Tre
 
 # ==================== Planting Project CRUD ====================
 
+project_pages = KeysetPaginator(
+    "urban_greening.planting_projects", PlantingProject.created_at.desc(), PlantingProject.id.desc()
+)
+
+
+def project_photo_list(value) -> list:
+    """Stored project photos JSON as a list of URLs ([] when missing or malformed)."""
+    if not value:
+        return []
+    try:
+        photos = json.loads(value) if isinstance(value, str) else value
+    except ValueError:
+        return []
+    return [photo for photo in photos if isinstance(photo, str)] if isinstance(photos, list) else []
+
+
+PROJECT_RESPONSE = Projection.for_schema(
+    PlantingProjectResponse, PlantingProject, convert={"photos": project_photo_list}
+)
+
+
 def get_all_projects(
     db: Session,
     skip: int = 0,
     limit: int = 100,
     project_type: Optional[str] = None,
     status: Optional[str] = None,
-    search: Optional[str] = None
-) -> List[PlantingProject]:
-    """Get all planting projects with optional filters"""
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Page:
+    """Get a page of planting projects (as response dicts narrowed to ``fields``) with optional filters, newest first"""
     query = db.query(PlantingProject)
     
     if project_type:
@@ -611,7 +689,9 @@ def get_all_projects(
             (PlantingProject.organization.ilike(f"%{search}%"))
         )
     
-    return query.order_by(desc(PlantingProject.created_at)).offset(skip).limit(limit).all()
+    return paginate(
+        project_pages, db, query, PROJECT_RESPONSE.only(fields), limit=limit, after=after, before=before, skip=skip
+    )
 
 
 def get_project_by_id(db: Session, project_id: UUID) -> Optional[PlantingProject]:
@@ -619,6 +699,11 @@ def get_project_by_id(db: Session, project_id: UUID) -> Optional[PlantingProject
     return db.query(PlantingProject).filter(PlantingProject.id == project_id).first()
 
 
+def get_project_fields(db: Session, project_id: UUID, fields: Sequence[str]) -> Optional[Dict]:
+    """One planting project as a response dict narrowed to ``fields``"""
+    return fetch_one(db.query(PlantingProject).filter(PlantingProject.id == project_id), PROJECT_RESPONSE.only(fields))
+
+
 def create_project(db: Session, project_data: PlantingProjectCreate) -> PlantingProject:
     """Create new planting project"""
     project_code = project_data.project_code or generate_project_code(db)
@@ -681,66 +766,115 @@ def delete_project(db: Session, project_id: UUID) -> bool:
 # ==================== Statistics ====================
 
 def get_tree_inventory_stats(db: Session) -> TreeInventoryStats:
-    """Get comprehensive tree inventory statistics"""
+    """Get comprehensive tree inventory statistics (two queries)"""
     current_year = datetime.now().year
     active_clause = (TreeInventory.is_archived == False)
-    
-    # Total counts by status
-    total = db.query(func.count(TreeInventory.id)).filter(active_clause).scalar() or 0
-    alive = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.status == 'alive').scalar() or 0
-    cut = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.status == 'cut').scalar() or 0
-    dead = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.status == 'dead').scalar() or 0
-    
-    # Health counts
-    healthy = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.health == 'healthy').scalar() or 0
-    needs_attention = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.health == 'needs_attention').scalar() or 0
-    diseased = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.health == 'diseased').scalar() or 0
-    
-    # This year's activity
-    planted_this_year = db.query(func.count(TreeInventory.id))\
-        .filter(active_clause, extract('year', TreeInventory.planted_date) == current_year).scalar() or 0
-    cut_this_year = db.query(func.count(TreeInventory.id))\
-        .filter(active_clause, extract('year', TreeInventory.cutting_date) == current_year).scalar() or 0
-    
+
+    def count_where(*conditions):
+        return func.count(TreeInventory.id).filter(*conditions)
+
+    # All counters in a single pass using aggregate FILTER clauses
+    counts = db.query(
+        func.count(TreeInventory.id).label('total'),
+        count_where(TreeInventory.status == 'alive').label('alive'),
+        count_where(TreeInventory.status == 'cut').label('cut'),
+        count_where(TreeInventory.status == 'dead').label('dead'),
+        count_where(TreeInventory.health == 'healthy').label('healthy'),
+        count_where(TreeInventory.health == 'needs_attention').label('needs_attention'),
+        count_where(TreeInventory.health == 'diseased').label('diseased'),
+        count_where(extract('year', TreeInventory.planted_date) == current_year).label('planted_this_year'),
+        count_where(extract('year', TreeInventory.cutting_date) == current_year).label('cut_this_year'),
+    ).filter(active_clause).one()
+
+    planted_this_year = counts.planted_this_year or 0
+    cut_this_year = counts.cut_this_year or 0
+
     # Replacement ratio
     replacement_ratio = None
     if cut_this_year > 0:
         replacement_ratio = round(planted_this_year / cut_this_year, 2)
-    
-    # Top species
+
+    # Top species and top barangays as one UNION ALL, tagged by kind
     top_species = db.query(
-        TreeInventory.species,
+        literal('species').label('kind'),
+        TreeInventory.species.label('label'),
         func.count(TreeInventory.id).label('count')
     ).filter(active_clause, TreeInventory.status == 'alive')\
      .group_by(TreeInventory.species)\
      .order_by(desc('count'))\
-     .limit(10).all()
-    
-    # By barangay
+     .limit(10)
+
     by_barangay = db.query(
-        TreeInventory.barangay,
+        literal('barangay').label('kind'),
+        TreeInventory.barangay.label('label'),
         func.count(TreeInventory.id).label('count')
     ).filter(active_clause, TreeInventory.barangay.isnot(None))\
      .group_by(TreeInventory.barangay)\
      .order_by(desc('count'))\
-     .limit(10).all()
-    
+     .limit(10)
+
+    ranked = {'species': [], 'barangay': []}
+    for kind, label, count in top_species.union_all(by_barangay).all():
+        ranked[kind].append((label, count))
+    for rows in ranked.values():
+        rows.sort(key=lambda row: row[1], reverse=True)
+
     return TreeInventoryStats(
-        total_trees=total,
-        alive_trees=alive,
-        cut_trees=cut,
-        dead_trees=dead,
-        healthy_trees=healthy,
-        needs_attention_trees=needs_attention,
-        diseased_trees=diseased,
+        total_trees=counts.total or 0,
+        alive_trees=counts.alive or 0,
+        cut_trees=counts.cut or 0,
+        dead_trees=counts.dead or 0,
+        healthy_trees=counts.healthy or 0,
+        needs_attention_trees=counts.needs_attention or 0,
+        diseased_trees=counts.diseased or 0,
         trees_planted_this_year=planted_this_year,
         trees_cut_this_year=cut_this_year,
         replacement_ratio=replacement_ratio,
-        top_species=[{"species": s, "count": c} for s, c in top_species],
-        by_barangay=[{"barangay": b or "Unknown", "count": c} for b, c in by_barangay]
+        top_species=[{"species": s, "count": c} for s, c in ranked['species']],
+        by_barangay=[{"barangay": b or "Unknown", "count": c} for b, c in ranked['barangay']]
     )
 
 
+def get_barangay_summary(db: Session, barangay: Optional[str] = None, include_archived: bool = False) -> List:
+    """Per-barangay status and health counts in one grouped query."""
+    def count_where(*conditions):
+        return func.count(TreeInventory.id).filter(*conditions)
+
+    query = db.query(
+        TreeInventory.barangay.label('barangay'),
+        func.count(TreeInventory.id).label('total'),
+        count_where(TreeInventory.status == 'alive').label('alive'),
+        count_where(TreeInventory.status == 'cut').label('cut'),
+        count_where(TreeInventory.status == 'dead').label('dead'),
+        count_where(TreeInventory.health == 'healthy').label('healthy'),
+        count_where(TreeInventory.health == 'needs_attention').label('needs_attention'),
+        count_where(TreeInventory.health == 'diseased').label('diseased'),
+        func.count(func.distinct(TreeInventory.species)).label('species'),
+    )
+    if not include_archived:
+        query = query.filter(TreeInventory.is_archived == False)
+    if barangay:
+        query = query.filter(TreeInventory.barangay.ilike(f"%{barangay}%"))
+    return query.group_by(TreeInventory.barangay).order_by(TreeInventory.barangay.nulls_last()).all()
+
+
+def get_species_summary(
+    db: Session, barangay: Optional[str] = None, include_archived: bool = False, limit: int = 50
+) -> List:
+    """Most common species (alive / total) in one grouped query."""
+    query = db.query(
+        TreeInventory.species.label('species'),
+        func.max(TreeInventory.common_name).label('common_name'),
+        func.count(TreeInventory.id).label('total'),
+        func.count(TreeInventory.id).filter(TreeInventory.status == 'alive').label('alive'),
+    )
+    if not include_archived:
+        query = query.filter(TreeInventory.is_archived == False)
+    if barangay:
+        query = query.filter(TreeInventory.barangay.ilike(f"%{barangay}%"))
+    return query.group_by(TreeInventory.species).order_by(desc('total'), TreeInventory.species).limit(limit).all()
+
+
 def get_planting_project_stats(db: Session) -> PlantingProjectStats:
     """Get planting project statistics"""
     total = db.query(func.count(PlantingProject.id)).scalar() or 0
@@ -766,56 +900,72 @@ def get_planting_project_stats(db: Session) -> PlantingProjectStats:
     )
 
 
-def get_tree_carbon_statistics(db: Session) -> TreeCarbonStatistics:
+# analytics snapshot tables read by get_tree_carbon_statistics
+CARBON_STATISTICS_TABLES = ("urban_greening.tree_inventory", "urban_greening.tree_species")
+
+
+def get_tree_carbon_statistics(db: Optional[Session] = None, run: Optional[Callable] = None) -> TreeCarbonStatistics:
     """
     Get comprehensive tree carbon statistics including:
     - Tree Count & Composition
     - Carbon Stock
     - Annual Carbon Sequestration
     - Carbon Loss
+
+    Queries go through ``run(stmt) -> rows`` when given (the analytics
+    snapshot), otherwise through ``db``.
     """
     from datetime import datetime
-    
+
+    if run is None:
+        run = lambda stmt: db.execute(stmt).all()
+
     current_year = datetime.now().year
     active_clause = (TreeInventory.is_archived == False)
-    
+    alive_clause = TreeInventory.status == 'alive'
+    with_species = TreeInventory.__table__.outerjoin(
+        TreeSpecies.__table__, TreeInventory.common_name == TreeSpecies.common_name
+    )
+
     # ==================== Tree Count & Composition ====================
-    
-    # Basic counts
-    total_trees = db.query(func.count(TreeInventory.id)).filter(active_clause).scalar() or 0
-    alive_trees = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.status == 'alive').scalar() or 0
-    cut_trees = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.status == 'cut').scalar() or 0
-    dead_trees = db.query(func.count(TreeInventory.id)).filter(active_clause, TreeInventory.status == 'dead').scalar() or 0
-    
-    # Native vs endangered - join with species table
-    native_subquery = db.query(func.count(TreeInventory.id))\
-        .join(TreeSpecies, TreeInventory.common_name == TreeSpecies.common_name)\
-        .filter(TreeSpecies.is_native == True)\
-        .filter(active_clause, TreeInventory.status == 'alive')\
-        .scalar() or 0
-    
-    endangered_subquery = db.query(func.count(TreeInventory.id))\
-        .join(TreeSpecies, TreeInventory.common_name == TreeSpecies.common_name)\
-        .filter(TreeSpecies.is_endangered == True)\
-        .filter(active_clause, TreeInventory.status == 'alive')\
-        .scalar() or 0
-    
-    native_count = native_subquery
-    endangered_count = endangered_subquery
+
+    # Status counts in one pass; native / endangered go through the species join
+    tree_id = TreeInventory.id
+    counts = run(
+        select(
+            func.count(tree_id).label('total'),
+            func.count(tree_id).filter(alive_clause).label('alive'),
+            func.count(tree_id).filter(TreeInventory.status == 'cut').label('cut'),
+            func.count(tree_id).filter(TreeInventory.status == 'dead').label('dead'),
+        ).where(active_clause)
+    )[0]
+    species_flags = run(
+        select(
+            func.count(tree_id).filter(TreeSpecies.is_native == True).label('native'),
+            func.count(tree_id).filter(TreeSpecies.is_endangered == True).label('endangered'),
+        ).select_from(with_species).where(active_clause, alive_clause)
+    )[0]
+    total_trees = counts.total or 0
+    alive_trees = counts.alive or 0
+    cut_trees = counts.cut or 0
+    dead_trees = counts.dead or 0
+    native_count = species_flags.native or 0
+    endangered_count = species_flags.endangered or 0
     native_ratio = round(native_count / alive_trees * 100, 1) if alive_trees > 0 else 0.0
-    
+
     # Trees per species with native flag
-    species_counts = db.query(
-        TreeInventory.common_name,
-        TreeSpecies.scientific_name,
-        TreeSpecies.is_native,
-        func.count(TreeInventory.id).label('count')
-    ).outerjoin(TreeSpecies, TreeInventory.common_name == TreeSpecies.common_name)\
-     .filter(active_clause, TreeInventory.status == 'alive')\
-     .group_by(TreeInventory.common_name, TreeSpecies.scientific_name, TreeSpecies.is_native)\
-     .order_by(desc('count'))\
-     .all()
-    
+    species_counts = run(
+        select(
+            TreeInventory.common_name,
+            TreeSpecies.scientific_name,
+            TreeSpecies.is_native,
+            func.count(TreeInventory.id).label('count')
+        ).select_from(with_species)
+        .where(active_clause, alive_clause)
+        .group_by(TreeInventory.common_name, TreeSpecies.scientific_name, TreeSpecies.is_native)
+        .order_by(desc('count'), TreeInventory.common_name, TreeSpecies.scientific_name, TreeSpecies.is_native)
+    )
+
     trees_per_species = []
     for common_name, scientific_name, is_native, count in species_counts:
         trees_per_species.append(SpeciesComposition(
@@ -825,7 +975,7 @@ def get_tree_carbon_statistics(db: Session) -> TreeCarbonStatistics:
             percentage=round(count / alive_trees * 100, 2) if alive_trees > 0 else 0,
             is_native=is_native or False
         ))
-    
+
     composition = TreeCountCompositionStats(
         total_trees=total_trees,
         alive_trees=alive_trees,
@@ -841,20 +991,28 @@ def get_tree_carbon_statistics(db: Session) -> TreeCarbonStatistics:
     
     # Calculate CO2 stored based on species data
     # Join trees with species to get CO2 stored per tree
-    carbon_by_species = db.query(
-        TreeInventory.common_name,
-        TreeSpecies.scientific_name,
-        func.count(TreeInventory.id).label('tree_count'),
-        TreeSpecies.co2_stored_mature_avg_kg,
-        TreeSpecies.co2_absorbed_kg_per_year
-    ).outerjoin(TreeSpecies, TreeInventory.common_name == TreeSpecies.common_name)\
-     .filter(active_clause, TreeInventory.status == 'alive')\
-     .group_by(
-         TreeInventory.common_name,
-         TreeSpecies.scientific_name,
-         TreeSpecies.co2_stored_mature_avg_kg,
-         TreeSpecies.co2_absorbed_kg_per_year
-     ).all()
+    carbon_by_species = run(
+        select(
+            TreeInventory.common_name,
+            TreeSpecies.scientific_name,
+            func.count(TreeInventory.id).label('tree_count'),
+            TreeSpecies.co2_stored_mature_avg_kg,
+            TreeSpecies.co2_absorbed_kg_per_year
+        ).select_from(with_species)
+        .where(active_clause, alive_clause)
+        .group_by(
+            TreeInventory.common_name,
+            TreeSpecies.scientific_name,
+            TreeSpecies.co2_stored_mature_avg_kg,
+            TreeSpecies.co2_absorbed_kg_per_year
+        )
+        .order_by(
+            TreeInventory.common_name,
+            TreeSpecies.scientific_name,
+            TreeSpecies.co2_stored_mature_avg_kg,
+            TreeSpecies.co2_absorbed_kg_per_year
+        )
+    )
     
     total_co2_stored = 0.0
     co2_stored_per_species = []
@@ -912,18 +1070,20 @@ def get_tree_carbon_statistics(db: Session) -> TreeCarbonStatistics:
     total_co2_absorbed = sum(s.co2_absorbed_per_year_kg for s in co2_species_list)
     
     # Trees planted this year
-    trees_planted_this_year = db.query(func.count(TreeInventory.id))\
-        .filter(active_clause, extract('year', TreeInventory.planted_date) == current_year)\
-        .scalar() or 0
+    planted_this_year = extract('year', TreeInventory.planted_date) == current_year
+    trees_planted_this_year = run(
+        select(func.count(TreeInventory.id)).where(active_clause, planted_this_year)
+    )[0][0] or 0
     
     # CO2 from new plantings (newly planted trees absorb less initially)
     # Estimate 30% of mature absorption rate for new trees
-    new_planting_co2 = db.query(
-        func.count(TreeInventory.id),
-        func.avg(TreeSpecies.co2_absorbed_kg_per_year)
-    ).outerjoin(TreeSpecies, TreeInventory.common_name == TreeSpecies.common_name)\
-     .filter(active_clause, extract('year', TreeInventory.planted_date) == current_year)\
-     .first()
+    new_planting_co2 = run(
+        select(
+            func.count(TreeInventory.id),
+            func.avg(TreeSpecies.co2_absorbed_kg_per_year)
+        ).select_from(with_species)
+        .where(active_clause, planted_this_year)
+    )[0]
     
     new_tree_count = new_planting_co2[0] or 0
     avg_absorption = float(new_planting_co2[1]) if new_planting_co2[1] else 22.0
@@ -940,31 +1100,33 @@ def get_tree_carbon_statistics(db: Session) -> TreeCarbonStatistics:
     # ==================== Carbon Loss ====================
     
     # Trees removed this year
-    trees_removed_this_year = db.query(func.count(TreeInventory.id))\
-        .filter(
-            active_clause,
-            extract('year', TreeInventory.cutting_date) == current_year
-        ).scalar() or 0
+    cut_this_year = extract('year', TreeInventory.cutting_date) == current_year
+    trees_removed_this_year = run(
+        select(func.count(TreeInventory.id)).where(active_clause, cut_this_year)
+    )[0][0] or 0
     
     # CO2 released from removals
-    removed_trees_carbon = db.query(
-        TreeInventory.cutting_reason,
-        func.count(TreeInventory.id).label('count'),
-        TreeSpecies.co2_stored_mature_avg_kg,
-        TreeSpecies.burned_carbon_release_pct,
-        TreeSpecies.lumber_carbon_retention_pct,
-        TreeSpecies.decay_years_min,
-        TreeSpecies.decay_years_max
-    ).outerjoin(TreeSpecies, TreeInventory.common_name == TreeSpecies.common_name)\
-     .filter(active_clause, extract('year', TreeInventory.cutting_date) == current_year)\
-     .group_by(
-         TreeInventory.cutting_reason,
-         TreeSpecies.co2_stored_mature_avg_kg,
-         TreeSpecies.burned_carbon_release_pct,
-         TreeSpecies.lumber_carbon_retention_pct,
-         TreeSpecies.decay_years_min,
-         TreeSpecies.decay_years_max
-     ).all()
+    removed_trees_carbon = run(
+        select(
+            TreeInventory.cutting_reason,
+            func.count(TreeInventory.id).label('count'),
+            TreeSpecies.co2_stored_mature_avg_kg,
+            TreeSpecies.burned_carbon_release_pct,
+            TreeSpecies.lumber_carbon_retention_pct,
+            TreeSpecies.decay_years_min,
+            TreeSpecies.decay_years_max
+        ).select_from(with_species)
+        .where(active_clause, cut_this_year)
+        .group_by(
+            TreeInventory.cutting_reason,
+            TreeSpecies.co2_stored_mature_avg_kg,
+            TreeSpecies.burned_carbon_release_pct,
+            TreeSpecies.lumber_carbon_retention_pct,
+            TreeSpecies.decay_years_min,
+            TreeSpecies.decay_years_max
+        )
+        .order_by(TreeInventory.cutting_reason)
+    )
     
     total_co2_released = 0.0
     projected_decay_release = 0.0
@@ -327,17 +327,27 @@ class CRUDTreeRequest(CRUDBase[TreeRequest, TreeRequestCreate, TreeRequestUpdate
     
     def get_with_analytics(self, db: Session, request_id: str) -> Optional[Dict[str, Any]]:
         """Get request with delay analytics computed"""
-        from datetime import date as dt_date
-        import json
-        
         obj = db.query(TreeRequest).filter(TreeRequest.id == request_id).first()
         if not obj:
             return None
-        
-        # Get processing standards
-        standards = db.query(TreeRequestProcessingStandards).filter(
-            TreeRequestProcessingStandards.request_type == obj.request_type
-        ).first()
+        return self.with_analytics(db, [obj])[0]
+    
+    def with_analytics(self, db: Session, requests: List[TreeRequest]) -> List[Dict[str, Any]]:
+        """Compute delay analytics for already-loaded requests (one standards query in total)"""
+        request_types = {obj.request_type for obj in requests}
+        standards_by_type: Dict[str, TreeRequestProcessingStandards] = {}
+        if request_types:
+            rows = db.query(TreeRequestProcessingStandards).filter(
+                TreeRequestProcessingStandards.request_type.in_(request_types)
+            ).all()
+            for row in rows:
+                standards_by_type.setdefault(row.request_type, row)
+        return [self._analytics(obj, standards_by_type.get(obj.request_type)) for obj in requests]
+    
+    @staticmethod
+    def _analytics(obj: TreeRequest, standards: Optional[TreeRequestProcessingStandards]) -> Dict[str, Any]:
+        from datetime import date as dt_date
+        import json
         
         # Calculate days in each phase
         today = dt_date.today()
@@ -440,13 +450,7 @@ class CRUDTreeRequest(CRUDBase[TreeRequest, TreeRequestCreate, TreeRequestUpdate
             TreeRequest.overall_status.in_(['receiving', 'inspection', 'requirements', 'clearance'])
         ).offset(skip).limit(limit).all()
         
-        delayed = []
-        for req in requests:
-            analytics = self.get_with_analytics(db, str(req.id))
-            if analytics and analytics['is_delayed']:
-                delayed.append(analytics)
-        
-        return delayed
+        return [analytics for analytics in self.with_analytics(db, requests) if analytics['is_delayed']]
     
     def get_analytics_summary(self, db: Session) -> Dict[str, Any]:
         """Get summary analytics for dashboard"""
@@ -1,11 +1,12 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc, func, case
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import json
 import re
 
 from app.crud.base_crud import CRUDBase
+from app.crud.pagination import Key, KeysetPaginator, Page
 from app.models.urban_greening_models import UrbanGreeningProject
 from app.schemas.urban_greening_project_schemas import (
     UrbanGreeningProjectCreate,
@@ -23,6 +24,16 @@ def _normalize_text(value: Optional[str]) -> Optional[str]:
 
 class CRUDUrbanGreeningProject(CRUDBase[UrbanGreeningProject, UrbanGreeningProjectCreate, UrbanGreeningProjectUpdate]):
     
+    def __init__(self, model):
+        super().__init__(model)
+        self.paginator = KeysetPaginator(
+            "urban_greening.urban_greening_projects",
+            # Undated requests sort last, as with NULLS LAST
+            Key(UrbanGreeningProject.date_received_of_request, descending=True, nulls=date.min),
+            UrbanGreeningProject.created_at.desc(),
+            UrbanGreeningProject.id.desc(),
+        )
+
     def get(self, db: Session, id: any) -> Optional[UrbanGreeningProject]:
         return db.query(UrbanGreeningProject).filter(UrbanGreeningProject.id == id).first()
 
@@ -101,6 +112,24 @@ class CRUDUrbanGreeningProject(CRUDBase[UrbanGreeningProject, UrbanGreeningProje
         search: Optional[str] = None,
         year: Optional[int] = None
     ) -> List[UrbanGreeningProject]:
+        return self.get_filtered_page(
+            db, skip=skip, limit=limit, status=status, project_type=project_type, search=search, year=year
+        ).items
+
+    def get_filtered_page(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        status: Optional[str] = None,
+        project_type: Optional[str] = None,
+        search: Optional[str] = None,
+        year: Optional[int] = None
+    ) -> Page:
+        """Projects by date received (undated last), then newest first"""
         query = self._apply_filters(
             self._base_query(db),
             status=status,
@@ -108,13 +137,7 @@ class CRUDUrbanGreeningProject(CRUDBase[UrbanGreeningProject, UrbanGreeningProje
             search=search,
             year=year,
         )
-
-        return (
-            query.order_by(UrbanGreeningProject.date_received_of_request.desc().nullslast(), UrbanGreeningProject.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return self.get_page_sync(db, query, skip=skip, limit=limit, after=after, before=before)
     
     def create(self, db: Session, *, obj_in) -> UrbanGreeningProject:
         data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump()
@@ -0,0 +1,425 @@
+"""Keyset pagination for any ``select()`` (or legacy ``Query``).
+
+A paginator is declared once per listing with its ordering keys, e.g.::
+
+    vehicle_pages = KeysetPaginator("vehicles", Vehicle.created_at.desc(), Vehicle.id.desc())
+    page = vehicle_pages.paginate_sync(db, stmt, limit=50, after=cursor)
+
+The last key must be unique (normally the primary key). NULLs in a nullable
+key sort last ascending and first descending (Postgres' default) and seeks
+match them with ``IS [NOT] NULL``, so the common next-page seek stays a plain
+row comparison on the index. ``Key(column, nulls=...)`` sorts NULLs as a
+stand-in value instead.
+Cursors hold the ordering values of the first/last row of a page. They are
+signed with ``SECRET_KEY`` and bound to the paginator name, so a client can't
+forge a position or replay a cursor against another listing. ``after`` returns
+the rows following a cursor, ``before`` the rows preceding it (in the same
+display order). Only the row comparison changes between pages, so deep pages
+cost the same as the first one. Positional ``skip`` jumps of a stride or more
+seek from a shared page-boundary index instead of an OFFSET.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, FrozenSet, Generic, List, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy import and_, false, func, literal, or_, select, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+from sqlalchemy.sql.util import find_tables
+
+from app.core.config import settings
+from app.db.page_jump_index import Boundaries, page_jump_index
+
+T = TypeVar("T")
+
+CURSOR_HEADERS = ("X-Next-Cursor", "X-Prev-Cursor")
+_SIGNATURE_BYTES = 12
+
+
+class InvalidCursorError(ValueError):
+    """Raised for malformed, tampered or foreign cursors (routers map it to 400)."""
+
+    def __init__(self, message: str = "Invalid pagination cursor") -> None:
+        super().__init__(message)
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+    limit: int
+
+    def cursor_headers(self) -> dict:
+        headers = {}
+        if self.next_cursor:
+            headers["X-Next-Cursor"] = self.next_cursor
+        if self.prev_cursor:
+            headers["X-Prev-Cursor"] = self.prev_cursor
+        return headers
+
+
+def set_cursor_headers(response: Any, page: Page) -> None:
+    """Expose a page's cursors on endpoints that return a bare list."""
+    if response is not None:
+        response.headers.update(page.cursor_headers())
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"u": str(value)}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    ((tag, raw),) = value.items()
+    if tag == "dt":
+        return datetime.fromisoformat(raw)
+    if tag == "d":
+        return date.fromisoformat(raw)
+    if tag == "u":
+        return UUID(raw)
+    if tag == "n":
+        return Decimal(raw)
+    raise ValueError(tag)
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+@dataclass(frozen=True)
+class Key:
+    """One ordering key; ``nulls`` is a stand-in value that lets a nullable column take part."""
+
+    column: Any
+    descending: bool = False
+    nulls: Any = None
+
+    @property
+    def expression(self) -> Any:
+        if self.nulls is None:
+            return self.column
+        return func.coalesce(self.column, literal(self.nulls, self.column.type))
+
+    @property
+    def nullable(self) -> bool:
+        """Whether the ordering expression can be NULL (no stand-in, nullable column)."""
+        if self.nulls is not None:
+            return False
+        return bool(getattr(getattr(self.column, "expression", self.column), "nullable", False))
+
+    def ordering(self, descending: bool) -> Any:
+        clause = self.expression.desc() if descending else self.expression.asc()
+        if self.nullable:
+            # Spelled out so every dialect agrees with _seek
+            clause = clause.nulls_first() if descending else clause.nulls_last()
+        return clause
+
+    def after(self, value: Any) -> Any:
+        """Rows sorting after ``value`` ascending, NULLs last."""
+        if value is None:
+            return false()
+        comparison = self.expression > literal(value, self.column.type)
+        return or_(comparison, self.column.is_(None)) if self.nullable else comparison
+
+    def before(self, value: Any) -> Any:
+        """Rows sorting before ``value`` ascending, NULLs last."""
+        if value is None:
+            return self.column.is_not(None)
+        return self.expression < literal(value, self.column.type)
+
+    def equals(self, value: Any) -> Any:
+        if value is None:
+            return self.column.is_(None)
+        return self.expression == literal(value, self.column.type)
+
+    def value(self, item: Any) -> Any:
+        value = getattr(item, self.name)
+        return self.nulls if value is None else value
+
+    @property
+    def name(self) -> str:
+        # ORM attribute name, which can differ from the column name
+        annotations = getattr(self.column, "_annotations", {})
+        return annotations.get("proxy_key") or self.column.key
+
+    @classmethod
+    def from_clause(cls, clause: Any) -> "Key":
+        if isinstance(clause, Key):
+            return clause
+        if isinstance(clause, UnaryExpression) and clause.modifier in (operators.desc_op, operators.asc_op):
+            return cls(clause.element, clause.modifier is operators.desc_op)
+        return cls(clause)
+
+
+class KeysetPaginator:
+    def __init__(self, name: str, *keys: Any, default_limit: int = 100, max_limit: Optional[int] = None) -> None:
+        if not keys:
+            raise ValueError("A keyset paginator needs at least one ordering key")
+        self.name = name
+        self.keys: Tuple[Key, ...] = tuple(Key.from_clause(key) for key in keys)
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    # cursors
+
+    def _signature(self, payload: bytes) -> bytes:
+        key = hashlib.sha256(f"keyset:{settings.SECRET_KEY}".encode()).digest()
+        return hmac.new(key, payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+    def encode_cursor(self, values: Sequence[Any]) -> str:
+        payload = json.dumps(
+            {"p": self.name, "k": [_encode_value(value) for value in values]}, separators=(",", ":")
+        ).encode()
+        return f"{_b64encode(payload)}.{_b64encode(self._signature(payload))}"
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            encoded_payload, encoded_signature = cursor.split(".", 1)
+            payload = _b64decode(encoded_payload)
+            signature = _b64decode(encoded_signature)
+        except (ValueError, binascii.Error) as exc:
+            raise InvalidCursorError() from exc
+        if not hmac.compare_digest(signature, self._signature(payload)):
+            raise InvalidCursorError()
+        try:
+            data = json.loads(payload)
+            values = [_decode_value(value) for value in data["k"]]
+        except (ValueError, KeyError, TypeError) as exc:
+            raise InvalidCursorError() from exc
+        if data.get("p") != self.name or len(values) != len(self.keys):
+            raise InvalidCursorError("Pagination cursor belongs to a different listing")
+        return values
+
+    def cursor_for(self, item: Any) -> str:
+        return self.encode_cursor([key.value(item) for key in self.keys])
+
+    # statements
+
+    def sanitize_limit(self, limit: Optional[int]) -> int:
+        if limit is None:
+            return self.default_limit
+        limit = max(1, int(limit))
+        return min(limit, self.max_limit) if self.max_limit else limit
+
+    def _order_by(self, reverse: bool = False) -> List[Any]:
+        return [key.ordering(descending=key.descending != reverse) for key in self.keys]
+
+    def _seek(self, values: Sequence[Any], forward: bool) -> Any:
+        """Rows strictly past ``values`` in display order (``forward``) or strictly before them."""
+        directions = {key.descending for key in self.keys}
+        if len(directions) == 1:
+            greater = directions == {False} if forward else directions == {True}
+            # NULLs sort last ascending, so only a "greater" seek or a NULL position has to reach them
+            if not any(value is None for value in values) and not (
+                greater and any(key.nullable for key in self.keys)
+            ):
+                # One row comparison, which Postgres can answer straight from a matching composite index
+                columns = tuple_(*(key.expression for key in self.keys))
+                bound = tuple_(*(literal(value, key.column.type) for key, value in zip(self.keys, values)))
+                return columns > bound if greater else columns < bound
+
+        clauses = []
+        for index, key in enumerate(self.keys):
+            greater = not key.descending if forward else key.descending
+            comparison = key.after(values[index]) if greater else key.before(values[index])
+            equal_prefix = [self.keys[i].equals(values[i]) for i in range(index)]
+            clauses.append(and_(*equal_prefix, comparison))
+        return or_(*clauses)
+
+    def page_statement(
+        self,
+        stmt: Any,
+        *,
+        limit: int,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> Any:
+        """``stmt`` ordered, filtered to the requested window and limited to ``limit + 1`` rows."""
+        if after and before:
+            raise InvalidCursorError("Specify only one of 'after' or 'before' cursors")
+        if before:
+            return self._window(stmt, limit, self.decode_cursor(before), forward=False)
+        if after:
+            return self._window(stmt, limit, self.decode_cursor(after))
+        return self._window(stmt, limit, None, offset=skip)
+
+    def _window(self, stmt: Any, limit: int, values: Optional[Sequence[Any]], *, forward: bool = True, offset: int = 0) -> Any:
+        if values is not None:
+            stmt = stmt.filter(self._seek(values, forward=forward))
+        # ordered first: a legacy Query refuses order_by() after offset()
+        stmt = stmt.order_by(*self._order_by(reverse=not forward))
+        if offset > 0:
+            stmt = stmt.offset(offset)
+        return stmt.limit(limit + 1)
+
+    # deep-page jumps (see app.db.page_jump_index)
+
+    def _jumps(self, skip: int, after: Optional[str], before: Optional[str]) -> bool:
+        return settings.PAGE_JUMP_ENABLED and not (after or before) and skip >= settings.PAGE_JUMP_STRIDE
+
+    def _keys_only(self, stmt: Any) -> Any:
+        """``stmt`` selecting just the ordering keys, unordered and unlimited.
+
+        Jumps depend only on the filters and keys, so every select list over
+        the same rows (each ``?fields=`` combination) shares one boundary index.
+        """
+        statement = stmt.statement if isinstance(stmt, Query) else stmt
+        return (
+            statement.with_only_columns(*(key.expression.label(f"k{index}") for index, key in enumerate(self.keys)))
+            .order_by(None)
+            .limit(None)
+            .offset(None)
+        )
+
+    def jump_signature(self, stmt: Any) -> Tuple[str, FrozenSet[str]]:
+        """Cache key for ``stmt``'s filters (SQL and binds) and the tables it reads."""
+        statement = self._keys_only(stmt)
+        compiled = statement.compile(dialect=postgresql.dialect())
+        params = sorted(compiled.params.items())
+        digest = hashlib.sha1(f"{self.name}|{compiled}|{params!r}".encode()).hexdigest()
+        return digest, frozenset(table.fullname for table in find_tables(statement, include_joins=True))
+
+    def boundary_statement(self, stmt: Any, stride: int) -> Any:
+        """Ordering keys of every ``stride``-th row of ``stmt``, in display order."""
+        keyed = self._keys_only(stmt)
+        position = func.row_number().over(order_by=self._order_by()).label("position")
+        numbered = keyed.add_columns(position).subquery()
+        return (
+            select(*(numbered.c[f"k{index}"] for index in range(len(self.keys))))
+            .where(numbered.c.position % stride == 0)
+            .order_by(numbered.c.position)
+        )
+
+    def _jump_window(self, stmt: Any, limit: int, skip: int, boundaries: Boundaries) -> Any:
+        # Boundary n is the last row of block n, so seeking past it starts at row (n + 1) * stride
+        block = min(skip // boundaries.stride, len(boundaries.keys))
+        if block == 0:
+            return self._window(stmt, limit, None, offset=skip)
+        return self._window(stmt, limit, boundaries.keys[block - 1], offset=skip - block * boundaries.stride)
+
+    def _jump_boundaries_sync(self, db: Any, stmt: Any) -> Boundaries:
+        stride = settings.PAGE_JUMP_STRIDE
+        signature, tables = self.jump_signature(stmt)
+        boundaries = page_jump_index.get(signature, stride)
+        if boundaries is None:
+            mark = page_jump_index.write_mark(tables)
+            keys = [tuple(row) for row in db.execute(self.boundary_statement(stmt, stride)).all()]
+            boundaries = page_jump_index.put(signature, stride, keys, tables, mark)
+        return boundaries
+
+    async def _jump_boundaries(self, db: Any, stmt: Any) -> Boundaries:
+        stride = settings.PAGE_JUMP_STRIDE
+        signature, tables = self.jump_signature(stmt)
+        boundaries = page_jump_index.get(signature, stride)
+        if boundaries is None:
+            mark = page_jump_index.write_mark(tables)
+            keys = [tuple(row) for row in (await db.execute(self.boundary_statement(stmt, stride))).all()]
+            boundaries = page_jump_index.put(signature, stride, keys, tables, mark)
+        return boundaries
+
+    def build_page(
+        self,
+        rows: Sequence[Any],
+        *,
+        limit: int,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> Page:
+        rows = list(rows)
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        if before:
+            items.reverse()
+            # The cursor row itself follows this page
+            more_after, more_before = bool(items), has_more
+        else:
+            more_after, more_before = has_more, bool(after) or skip > 0
+        return Page(
+            items=items,
+            next_cursor=self.cursor_for(items[-1]) if items and more_after else None,
+            prev_cursor=self.cursor_for(items[0]) if items and more_before else None,
+            limit=limit,
+        )
+
+    # execution
+
+    def paginate_sync(
+        self,
+        db: Any,
+        stmt: Any,
+        *,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> Page:
+        limit_value = self.sanitize_limit(limit)
+        if self._jumps(skip, after, before):
+            paged = self._jump_window(stmt, limit_value, skip, self._jump_boundaries_sync(db, stmt))
+        else:
+            paged = self.page_statement(stmt, limit=limit_value, after=after, before=before, skip=skip)
+        rows = paged.all() if isinstance(paged, Query) else db.execute(paged).scalars().unique().all()
+        return self.build_page(rows, limit=limit_value, after=after, before=before, skip=skip)
+
+    async def paginate(
+        self,
+        db: Any,
+        stmt: Any,
+        *,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> Page:
+        limit_value = self.sanitize_limit(limit)
+        if self._jumps(skip, after, before):
+            paged = self._jump_window(stmt, limit_value, skip, await self._jump_boundaries(db, stmt))
+        else:
+            paged = self.page_statement(stmt, limit=limit_value, after=after, before=before, skip=skip)
+        rows = (await db.execute(paged)).scalars().unique().all()
+        return self.build_page(rows, limit=limit_value, after=after, before=before, skip=skip)
+
+
+def paginator_for(model: Any, *, default_limit: int = 100, max_limit: Optional[int] = None) -> KeysetPaginator:
+    """Newest-first paginator on ``(created_at, id)``, or ``id`` for models without ``created_at``."""
+    table = model.__table__
+    keys = [model.id.desc()]
+    if "created_at" in table.columns:
+        keys.insert(0, model.created_at.desc())
+    return KeysetPaginator(
+        f"{table.schema}.{table.name}" if table.schema else table.name,
+        *keys,
+        default_limit=default_limit,
+        max_limit=max_limit,
+    )
@@ -0,0 +1,138 @@
+"""Column projections: list responses built from selected columns instead of ORM objects.
+
+A ``Projection`` is derived from a response schema: the schema fields backed
+by a column of the model are selected, fields with no column take the schema
+default, and the few fields stored in another shape (JSON text) get a
+converter. ``query.with_entities(*projection.columns())`` then fetches plain
+rows -- no identity map, no instrumented attributes -- and ``to_dicts`` turns
+them into the dicts the schema would dump, ready for ``FastJSONResponse``
+without a second validation pass.
+
+Related rows (a vehicle's office) are selected through a join the caller adds
+and nested under the relationship name.
+
+``only(names)`` narrows a projection to a sparse fieldset (``?fields=``): just
+those columns are selected and emitted. ``paginate`` still selects the
+paginator's key columns, since cursors are built from them, but leaves them
+out of the items when they were not asked for.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from app.crud.pagination import KeysetPaginator, Page
+
+
+@dataclass(frozen=True)
+class Projection:
+    model: Any
+    fields: Tuple[str, ...]
+    convert: Mapping[str, Callable[[Any], Any]] = field(default_factory=dict)
+    constants: Mapping[str, Any] = field(default_factory=dict)
+    related: Mapping[str, "Projection"] = field(default_factory=dict)
+    # selected only for pagination, dropped from the items
+    hidden: Tuple[str, ...] = ()
+
+    @classmethod
+    def for_schema(
+        cls,
+        schema: type[BaseModel],
+        model: Any,
+        *,
+        convert: Optional[Mapping[str, Callable[[Any], Any]]] = None,
+        related: Optional[Mapping[str, "Projection"]] = None,
+    ) -> "Projection":
+        related = dict(related or {})
+        columns = {attribute.key for attribute in model.__mapper__.column_attrs}
+        fields = tuple(name for name in schema.model_fields if name in columns)
+        constants = {
+            name: info.get_default(call_default_factory=True)
+            for name, info in schema.model_fields.items()
+            if name not in columns and name not in related
+        }
+        return cls(model, fields, dict(convert or {}), constants, related)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Every field the projection can emit (the allow-list for ``only``)."""
+        return (*[name for name in self.fields if name not in self.hidden], *self.related, *self.constants)
+
+    def only(self, names: Optional[Sequence[str]]) -> "Projection":
+        """The projection narrowed to ``names``; ``None`` keeps every field."""
+        if names is None:
+            return self
+        unknown = [name for name in names if name not in self.names]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        wanted = set(names)
+        return replace(
+            self,
+            fields=tuple(name for name in self.fields if name in wanted),
+            convert={name: function for name, function in self.convert.items() if name in wanted},
+            constants={name: value for name, value in self.constants.items() if name in wanted},
+            related={name: projection for name, projection in self.related.items() if name in wanted},
+            hidden=(),
+        )
+
+    def keeping(self, names: Sequence[str]) -> "Projection":
+        """Also select the columns ``names`` without emitting them."""
+        missing = tuple(name for name in names if name not in self.fields)
+        if not missing:
+            return self
+        return replace(self, fields=self.fields + missing, hidden=self.hidden + missing)
+
+    def columns(self) -> List[Any]:
+        selected = [getattr(self.model, name) for name in self.fields]
+        for prefix, projection in self.related.items():
+            selected.extend(
+                getattr(projection.model, name).label(f"{prefix}__{name}") for name in projection.fields
+            )
+        return selected
+
+    def to_dicts(self, rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+        width = len(self.fields)
+        names = self.fields
+        convert = list(self.convert.items())
+        constants = self.constants
+        hidden = self.hidden
+        related = []
+        offset = width
+        for prefix, projection in self.related.items():
+            related.append((prefix, projection, offset, offset + len(projection.fields)))
+            offset += len(projection.fields)
+
+        items = []
+        for row in rows:
+            item = dict(zip(names, row[:width]))
+            for name, function in convert:
+                item[name] = function(item[name])
+            for prefix, projection, start, end in related:
+                nested = projection.to_dicts((row[start:end],))[0]
+                item[prefix] = nested if nested.get("id") is not None else None
+            item.update(constants)
+            for name in hidden:
+                del item[name]
+            items.append(item)
+        return items
+
+
+def paginate(
+    paginator: KeysetPaginator, db: Any, query: Any, projection: Projection, **page_args: Any
+) -> Page:
+    """Keyset page of ``query`` (a legacy ``Query``) as projected dicts."""
+    projection = projection.keeping([key.name for key in paginator.keys])
+    page = paginator.paginate_sync(db, query.with_entities(*projection.columns()), **page_args)
+    page.items = projection.to_dicts(page.items)
+    return page
+
+
+def fetch_one(query: Any, projection: Projection) -> Optional[Dict[str, Any]]:
+    """First row of ``query`` (a legacy ``Query``) as a projected dict, or None."""
+    # the key keeps the SELECT non-empty when only constant fields were asked for
+    projection = projection.keeping(["id"])
+    row = query.with_entities(*projection.columns()).first()
+    return projection.to_dicts([row])[0] if row is not None else None
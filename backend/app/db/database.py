@@ -1,6 +1,12 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from app.core.config import settings
+from app.db.query_stats import install_query_hooks
+from app.db.slow_query_log import slow_query_log
+from app.db.page_jump_index import page_jump_index
+from app.services.cache_service import cache
+from app.services.cache_bus_service import bus_enabled, cache_bus
+from app.db.instrumented_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, register_pool_gauges
 
 from sqlalchemy import create_engine
 from typing import AsyncGenerator
@@ -25,6 +31,8 @@ def _to_sync_psycopg(url: str) -> str:
 sync_engine = create_engine(
     _to_sync_psycopg(settings.DATABASE_URL),
     future=True,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="sync",
     pool_size=10,
     max_overflow=10,
     pool_pre_ping=True,
@@ -48,6 +56,8 @@ def _to_async_asyncpg(url: str) -> str:
 engine = create_async_engine(
     _to_async_asyncpg(settings.DATABASE_URL),
     future=True,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_logging_name="async",
     pool_pre_ping=True,
     pool_recycle=1800,
     pool_size=5,
@@ -57,6 +67,19 @@ engine = create_async_engine(
     },
 )
 
+# Per-request query accounting; a no-op outside of an instrumented request
+install_query_hooks(sync_engine, engine.sync_engine)
+# Slow statements on either engine; EXPLAINs run on a sync side connection
+slow_query_log.install(sync_engine, sync_engine, engine.sync_engine)
+# Write volume per table, which expires deep-page jump boundaries
+page_jump_index.install(sync_engine, engine.sync_engine)
+# Evict cached reference data and aggregates when their tables are written
+cache.install(Session)
+if bus_enabled():
+    # ...and in the other workers, via NOTIFY from the writing transaction
+    cache_bus.install(Session)
+register_pool_gauges({"sync": sync_engine, "async": engine.sync_engine})
+
 
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False, future=True
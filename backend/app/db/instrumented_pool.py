@@ -0,0 +1,53 @@
+"""Connection pools that export checkout counts and wait times as metrics.
+
+The engine label comes from ``pool_logging_name`` passed to ``create_engine``,
+which SQLAlchemy carries over when the pool is recreated on ``dispose()``.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.services.metrics_service import DB_POOL_CHECKOUTS, DB_POOL_WAIT, registry
+
+
+class _CheckoutTimingMixin:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            engine_name = self.logging_name or "default"
+            DB_POOL_CHECKOUTS.labels(engine_name).inc()
+            DB_POOL_WAIT.labels(engine_name).observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def register_pool_gauges(engines: Dict[str, Engine]) -> None:
+    """Export size/checked-out/overflow of each engine's current pool at scrape time."""
+
+    def collect(attribute: str) -> Iterable[Tuple[Tuple[str], float]]:
+        for name, target in engines.items():
+            pool = target.pool
+            if isinstance(pool, QueuePool):
+                yield (name,), getattr(pool, attribute)()
+
+    registry.gauge_callback("db_pool_size", "Configured pool size", ("engine",), lambda: collect("size"))
+    registry.gauge_callback(
+        "db_pool_checked_out", "Connections currently checked out", ("engine",), lambda: collect("checkedout")
+    )
+    registry.gauge_callback(
+        "db_pool_overflow", "Overflow connections in use (negative when below pool_size)", ("engine",),
+        lambda: collect("overflow"),
+    )
@@ -0,0 +1,124 @@
+"""Page-boundary index for deep ``skip`` jumps on keyset listings.
+
+``OFFSET n`` reads and discards ``n`` rows, so "page 900" of a large grid
+costs as much as reading all 900 pages. For each filter signature (paginator
+name plus the compiled filter SQL and its binds) the paginator materialises the
+ordering keys of every ``PAGE_JUMP_STRIDE``-th row once. A jump then seeks past
+the nearest boundary and walks at most ``stride - 1`` rows from there. Entries
+are shared by every user issuing the same filters.
+
+An ``after_cursor_execute`` listener counts rows written per table. Each
+insert/delete moves later rows by at most one position, so an entry is
+dropped once its tables have seen ``PAGE_JUMP_MAX_WRITES`` writes (the most a
+jump may drift), or after ``PAGE_JUMP_TTL_SECONDS`` as a backstop for writes
+made by other workers.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+_WRITE = re.compile(r'^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+([\w."]+)', re.IGNORECASE)
+
+
+def written_table(statement: str) -> Optional[str]:
+    """Schema-qualified table a DML statement writes to, if any."""
+    match = _WRITE.match(statement)
+    return match.group(1).replace('"', "") if match else None
+
+
+@dataclass
+class Boundaries:
+    stride: int
+    keys: List[Sequence[Any]]
+    tables: FrozenSet[str]
+    write_mark: int
+    built_at: float
+
+
+class PageJumpIndex:
+    def __init__(self, *, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Boundaries]" = OrderedDict()
+        self._writes: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def install(self, *engines: Engine) -> None:
+        """Count writes on sync engines (use ``AsyncEngine.sync_engine``)."""
+        for target in engines:
+            if not event.contains(target, "after_cursor_execute", self._after_cursor_execute):
+                event.listen(target, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        table = written_table(statement)
+        if table is None:
+            return
+        rowcount = getattr(cursor, "rowcount", -1)
+        if rowcount is None or rowcount < 0:
+            rowcount = len(parameters) if executemany else 1
+        if rowcount:
+            self.note_writes(table, rowcount)
+
+    def note_writes(self, table: str, count: int = 1) -> None:
+        with self._lock:
+            self._writes[table] += count
+
+    def _write_mark(self, tables: FrozenSet[str]) -> int:
+        return sum(self._writes[table] for table in tables)
+
+    def get(self, signature: str, stride: int) -> Optional[Boundaries]:
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                return None
+            stale = (
+                entry.stride != stride
+                or self._write_mark(entry.tables) - entry.write_mark >= settings.PAGE_JUMP_MAX_WRITES
+                or time.monotonic() - entry.built_at > settings.PAGE_JUMP_TTL_SECONDS
+            )
+            if stale:
+                del self._entries[signature]
+                return None
+            self._entries.move_to_end(signature)
+            self.hits += 1
+            return entry
+
+    def write_mark(self, tables: FrozenSet[str]) -> int:
+        """Taken before a build so writes racing with it still count against the entry."""
+        with self._lock:
+            return self._write_mark(tables)
+
+    def put(self, signature: str, stride: int, keys: List[Sequence[Any]], tables: FrozenSet[str], write_mark: int) -> Boundaries:
+        entry = Boundaries(stride, keys, tables, write_mark, time.monotonic())
+        with self._lock:
+            self._entries[signature] = entry
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.builds += 1
+        return entry
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Drop entries reading ``table`` (or every entry)."""
+        with self._lock:
+            for signature in [s for s, e in self._entries.items() if table is None or table in e.tables]:
+                del self._entries[signature]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "builds": self.builds}
+
+
+page_jump_index = PageJumpIndex(max_entries=settings.PAGE_JUMP_INDEX_SIZE)
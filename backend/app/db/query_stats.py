@@ -0,0 +1,151 @@
+"""Per-request database query accounting.
+
+``install_query_hooks`` registers ``before/after_cursor_execute`` listeners on
+an engine. While a request is being served, ``DBTimingMiddleware`` places a
+``RequestQueryStats`` in a contextvar; the listeners add every statement's
+count and duration to it. Contextvars follow the request into the threadpool
+used by sync endpoints and into the greenlet used by the async engine, so both
+engines report into the same object.
+
+Statements are grouped by shape (whitespace and bind-parameter lists
+collapsed). A shape executed ``DB_N_PLUS_ONE_THRESHOLD`` or more times within
+one request is reported as a likely N+1 query.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+MAX_SHAPE_CHARS = 500
+
+_WHITESPACE = re.compile(r"\s+")
+# psycopg (%(name)s / %s), asyncpg ($1) and qmark (?) placeholders
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalise a statement so repeated executions with different binds compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("?, ...", shape)
+    return shape[:MAX_SHAPE_CHARS]
+
+
+class RequestQueryStats:
+    """Query count and timing collected for one request."""
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None) -> None:
+        self.scope = scope
+        self.user_email: Optional[str] = None
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter[str] = Counter()
+        self.closed = False
+
+    @property
+    def method(self) -> Optional[str]:
+        return self.scope.get("method") if self.scope else None
+
+    @property
+    def route(self) -> Optional[str]:
+        """Matched route template once routing has happened, otherwise the raw path."""
+        if not self.scope:
+            return None
+        return getattr(self.scope.get("route"), "path", None) or self.scope.get("path")
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        if self.closed:
+            return
+        shape = statement_shape(statement)
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[shape] += 1
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = shape
+
+    def repeated_shapes(self, threshold: Optional[int] = None) -> List[Dict[str, Any]]:
+        threshold = threshold or settings.DB_N_PLUS_ONE_THRESHOLD
+        return [
+            {"statement": shape, "count": count}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def close(self) -> None:
+        """Stop accepting statements (e.g. from background tasks spawned by the request)."""
+        self.closed = True
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "query_count": self.count,
+            "query_time_ms": round(self.total_ms, 2),
+            "slowest_ms": round(self.slowest_ms, 2),
+            "slowest_statement": self.slowest_statement,
+            "n_plus_one": self.repeated_shapes(),
+        }
+
+    def server_timing(self) -> str:
+        parts = [f'db;dur={self.total_ms:.1f};desc="{self.count} queries"']
+        if self.count:
+            parts.append(f"db-slowest;dur={self.slowest_ms:.1f}")
+        return ", ".join(parts)
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+def begin_request_stats(scope: Optional[Dict[str, Any]] = None) -> RequestQueryStats:
+    stats = RequestQueryStats(scope)
+    _current_stats.set(stats)
+    return stats
+
+
+def set_request_user(email: Optional[str]) -> None:
+    """Attribute the current request's statements to the authenticated user."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.user_email = email
+
+
+def statement_started_at(context) -> Optional[float]:
+    """``perf_counter`` value stamped on an execution context before the cursor ran."""
+    return getattr(context, "_query_started_at", None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Always stamped (it is cheap) so statements outside requests can be timed too
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    started = statement_started_at(context)
+    if stats is None or started is None:
+        return
+    stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def install_query_hooks(*engines: Engine) -> None:
+    """Attach the accounting listeners to sync engines (use ``AsyncEngine.sync_engine``)."""
+    for target in engines:
+        if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+            event.listen(target, "before_cursor_execute", _before_cursor_execute)
+            event.listen(target, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,313 @@
+"""Slow-query log with automatic EXPLAIN capture.
+
+An ``after_cursor_execute`` listener on both engines reports every statement
+slower than ``SLOW_QUERY_THRESHOLD_MS``. Bound parameters are redacted down to
+their types before anything is stored. The entry records the route and user of
+the request it ran in (via ``RequestQueryStats``) and is kept in a ring buffer,
+with per-shape totals for a "top offenders" view.
+
+A single background thread then runs a plain ``EXPLAIN`` of the statement, with
+the original parameters, on a side connection from the sync engine (at most
+once per shape every ``SLOW_QUERY_EXPLAIN_INTERVAL_S``). When
+``SLOW_QUERY_LOG_PERSIST`` is on, the entry is also written to
+``app_audit.slow_queries`` from that thread. The request thread never waits on
+either.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.query_stats import current_query_stats, statement_shape, statement_started_at
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+_DOLLAR_PARAM = re.compile(r"\$(\d+)")
+
+_side_channel = threading.local()
+
+
+def redact_value(value: Any) -> Any:
+    """Type-only stand-in for a bound parameter value."""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes:{len(value)}>"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    if isinstance(value, dict):
+        return f"<dict:{len(value)}>"
+    # Numbers, dates, UUIDs, ...
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    if executemany and isinstance(parameters, (list, tuple)):
+        return {"executemany": len(parameters), "first": redact_parameters(parameters[0]) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_value(value) for value in parameters]
+    return redact_value(parameters)
+
+
+def to_pyformat(statement: str, parameters: Any) -> Tuple[str, Any]:
+    """Rewrite an asyncpg (``$1``) statement so it can run on the psycopg side connection."""
+    if not isinstance(parameters, (list, tuple)) or not _DOLLAR_PARAM.search(statement):
+        return statement, parameters
+    named = {f"p{index}": value for index, value in enumerate(parameters, start=1)}
+    rewritten = _DOLLAR_PARAM.sub(lambda match: f"%(p{match.group(1)})s", statement.replace("%", "%%"))
+    return rewritten, named
+
+
+@dataclass
+class SlowQueryEntry:
+    engine: str
+    duration_ms: float
+    shape: str
+    parameters: Any
+    method: Optional[str] = None
+    route: Optional[str] = None
+    user_email: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    occurred_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    plan: Optional[str] = None
+    explain_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ShapeTotals:
+    shape: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: Optional[str] = None
+    last_entry_id: Optional[str] = None
+    last_explained: Optional[float] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "statement": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "last_seen": self.last_seen,
+            "last_entry_id": self.last_entry_id,
+        }
+
+
+class SlowQueryLog:
+    def __init__(self, *, max_entries: int = 200, max_shapes: int = 500, queue_size: int = 100) -> None:
+        self._entries: Deque[SlowQueryEntry] = deque(maxlen=max_entries)
+        self._shapes: Dict[str, ShapeTotals] = {}
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[SlowQueryEntry, Optional[str], Any]]" = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._side_engine: Optional[Engine] = None
+        self.dropped = 0
+
+    # capture (request thread)
+
+    def install(self, side_engine: Engine, *engines: Engine) -> None:
+        """Listen on ``engines``; EXPLAINs and persistence use ``side_engine``."""
+        self._side_engine = side_engine
+        for target in engines:
+            if not event.contains(target, "after_cursor_execute", self._after_cursor_execute):
+                event.listen(target, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if not settings.SLOW_QUERY_LOG_ENABLED or getattr(_side_channel, "active", False):
+            return
+        started = statement_started_at(context)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+        engine_name = getattr(conn.engine.pool, "logging_name", None) or conn.dialect.driver
+        self.observe(
+            engine_name, statement, parameters, elapsed_ms,
+            executemany=executemany, paramstyle=conn.dialect.paramstyle,
+        )
+
+    def observe(
+        self,
+        engine_name: str,
+        statement: str,
+        parameters: Any,
+        elapsed_ms: float,
+        *,
+        executemany: bool = False,
+        paramstyle: str = "pyformat",
+    ) -> SlowQueryEntry:
+        stats = current_query_stats()
+        entry = SlowQueryEntry(
+            engine=engine_name,
+            duration_ms=round(elapsed_ms, 2),
+            shape=statement_shape(statement),
+            parameters=redact_parameters(parameters, executemany),
+            method=stats.method if stats else None,
+            route=stats.route if stats else None,
+            user_email=stats.user_email if stats else None,
+        )
+        explain = False
+        with self._lock:
+            self._entries.append(entry)
+            totals = self._shapes.get(entry.shape)
+            if totals is None:
+                if len(self._shapes) >= self.max_shapes:
+                    # Forget the least expensive shape to bound memory
+                    cheapest = min(self._shapes.values(), key=lambda item: item.total_ms)
+                    del self._shapes[cheapest.shape]
+                totals = self._shapes[entry.shape] = ShapeTotals(entry.shape)
+            totals.count += 1
+            totals.total_ms += elapsed_ms
+            totals.max_ms = max(totals.max_ms, elapsed_ms)
+            totals.last_seen = entry.occurred_at
+            totals.last_entry_id = entry.id
+            now = time.monotonic()
+            due = totals.last_explained is None or now - totals.last_explained >= settings.SLOW_QUERY_EXPLAIN_INTERVAL_S
+            if settings.SLOW_QUERY_EXPLAIN and due:
+                totals.last_explained = now
+                explain = True
+
+        logger.warning(
+            "Slow query (%.1f ms, %s) %s %s user=%s: %s",
+            elapsed_ms, engine_name, entry.method or "-", entry.route or "-", entry.user_email or "-",
+            entry.shape[:200],
+        )
+        if explain or settings.SLOW_QUERY_LOG_PERSIST:
+            explain_params = None
+            explain_statement = None
+            if explain and not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+                explain_statement, explain_params = (
+                    to_pyformat(statement, parameters) if paramstyle.startswith("numeric") else (statement, parameters)
+                )
+            self._enqueue(entry, explain_statement, explain_params)
+        return entry
+
+    def _enqueue(self, entry: SlowQueryEntry, statement: Optional[str], parameters: Any) -> None:
+        if self._side_engine is None:
+            return
+        try:
+            self._queue.put_nowait((entry, statement, parameters))
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._drain, name="slow-query-explain", daemon=True)
+                    self._worker.start()
+
+    # background thread
+
+    def _drain(self) -> None:
+        _side_channel.active = True
+        while True:
+            entry, statement, parameters = self._queue.get()
+            try:
+                if statement is not None:
+                    self._explain(entry, statement, parameters)
+                if settings.SLOW_QUERY_LOG_PERSIST:
+                    self._persist(entry)
+            except Exception:
+                logger.exception("Slow query log background work failed")
+            finally:
+                self._queue.task_done()
+
+    def _explain(self, entry: SlowQueryEntry, statement: str, parameters: Any) -> None:
+        try:
+            with self._side_engine.connect() as conn:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+                rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters or None).all()
+                conn.rollback()
+            entry.plan = "\n".join(row[0] for row in rows)
+        except Exception as exc:
+            entry.explain_error = str(exc).splitlines()[0][:300]
+
+    def _persist(self, entry: SlowQueryEntry) -> None:
+        with self._side_engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO app_audit.slow_queries "
+                    "(id, occurred_at, engine, duration_ms, statement, parameters, "
+                    " http_method, route_path, user_email, plan, explain_error) "
+                    "VALUES (:id, :occurred_at, :engine, :duration_ms, :statement, CAST(:parameters AS jsonb), "
+                    " :method, :route, :user_email, :plan, :explain_error)"
+                ),
+                {
+                    "id": entry.id,
+                    "occurred_at": entry.occurred_at,
+                    "engine": entry.engine,
+                    "duration_ms": entry.duration_ms,
+                    "statement": entry.shape,
+                    "parameters": json.dumps(entry.parameters, default=str),
+                    "method": entry.method,
+                    "route": entry.route,
+                    "user_email": entry.user_email,
+                    "plan": entry.plan,
+                    "explain_error": entry.explain_error,
+                },
+            )
+
+    # reporting
+
+    def top_offenders(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            shapes = sorted(self._shapes.values(), key=lambda item: item.total_ms, reverse=True)[:limit]
+            return [totals.summary() for totals in shapes]
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries)[-limit:] if limit > 0 else []
+        return [entry.as_dict() for entry in reversed(entries)]
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for entry in self._entries:
+                if entry.id == entry_id:
+                    return entry.as_dict()
+        return None
+
+    def stats(self, limit: int = 20) -> Dict[str, Any]:
+        return {
+            "enabled": settings.SLOW_QUERY_LOG_ENABLED,
+            "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+            "persisted": settings.SLOW_QUERY_LOG_PERSIST,
+            "buffered": len(self._entries),
+            "pending_background": self._queue.qsize(),
+            "dropped": self.dropped,
+            "top_offenders": self.top_offenders(limit),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._shapes.clear()
+            self.dropped = 0
+
+
+slow_query_log = SlowQueryLog(max_entries=settings.SLOW_QUERY_LOG_SIZE)
@@ -1,14 +1,25 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.apis.v1.api import api_v1_router
 from app.db.database import engine
+from app.crud.pagination import CURSOR_HEADERS
 
 from app.middleware.cors_exception_handler import CORSExceptionMiddleware
 from app.middleware.audit_middleware import AuditLoggingMiddleware
+from app.middleware.db_timing_middleware import DBTimingMiddleware
+from app.middleware.profiling_middleware import ProfilingMiddleware
+from app.middleware.request_tracking_middleware import RequestTrackingMiddleware
+from app.services.system_health_service import system_metrics_sampler
+from app.services.loop_watchdog_service import loop_watchdog
+from app.services.cache_bus_service import bus_enabled, cache_bus
+from app.services.job_service import job_pool
+from app.services.analytics_service import refresh_scheduler
+from app.services.plate_index_service import plate_index
+from app.services.metrics_service import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
 
 # Lifespan for startup/shutdown events (FastAPI's new way)
 @asynccontextmanager
@@ -19,11 +30,27 @@ async def lifespan(app: FastAPI):
     # async with AsyncSessionLocal() as session:
     #     await create_extensions(session)
     #     print("Database extensions checked/created.")
+    system_metrics_sampler.start()
+    plate_index.start()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+    if bus_enabled():
+        cache_bus.start()
+    if settings.JOB_RUN_IN_APP:
+        job_pool.start()
+    if settings.ANALYTICS_ENABLED:
+        refresh_scheduler.start()
     
     yield # Application runs here
 
     # Shutdown
     print("Application shutdown...")
+    await system_metrics_sampler.stop()
+    await loop_watchdog.stop()
+    await cache_bus.stop()
+    await refresh_scheduler.stop()
+    await plate_index.stop()
+    await job_pool.stop()
     if engine: # Check if engine was initialized
         await engine.dispose()
     print("Database connections closed.")
@@ -61,13 +88,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Bare-list endpoints return their pagination cursors in headers
+    expose_headers=list(CURSOR_HEADERS),
 )
 
+# Marks X-Profile: 1 requests; sampling starts once a super admin is authenticated
+app.add_middleware(ProfilingMiddleware)
+
 # Global audit logging middleware - must wrap business handlers
 app.add_middleware(AuditLoggingMiddleware)
 
+# Per-request query count/time (Server-Timing header, audit extra, N+1 warnings);
+# wraps audit logging so the audit entry can read the request's query stats
+app.add_middleware(DBTimingMiddleware)
+
+# In-flight request tracking for runtime health metrics (outermost)
+app.add_middleware(RequestTrackingMiddleware)
+
 app.include_router(api_v1_router, prefix="/api/v1")
 
 @app.get("/api/healthcheck")
 def healthcheck():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/api/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (per worker process)"""
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
@@ -17,7 +17,9 @@ from fastapi import Request
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
+from app.db.query_stats import current_query_stats
 from app.services.audit_service import MAX_PAYLOAD_CHARS, audit_service
+from app.services.metrics_service import AUDIT_QUEUE_DEPTH
 
 
 class AuditLoggingMiddleware:
@@ -44,6 +46,11 @@ class AuditLoggingMiddleware:
             await self.app(scope, receive, send)
             return
 
+        # Skip metrics scrapes; they would add an audit row every scrape interval
+        if path == "/api/metrics":
+            await self.app(scope, receive, send)
+            return
+
         started = time.perf_counter()
 
         request_body_parts: list[bytes] = []
@@ -106,6 +113,9 @@ class AuditLoggingMiddleware:
                             break
                     response_summary = f"{status_code} {content_type}" if content_type else str(status_code)
 
+            query_stats = current_query_stats()
+            extra = {"db": query_stats.summary()} if query_stats is not None else None
+
             async def _safe_write() -> None:
                 try:
                     await audit_service.write_request_audit(
@@ -116,10 +126,14 @@ class AuditLoggingMiddleware:
                         response_summary=response_summary,
                         error=error,
                         latency_ms=latency_ms,
+                        extra=extra,
                     )
                 except Exception:
                     return
+                finally:
+                    AUDIT_QUEUE_DEPTH.dec()
 
+            AUDIT_QUEUE_DEPTH.inc()
             asyncio.create_task(_safe_write())
 
         async def wrapped_send(message: Message) -> None:
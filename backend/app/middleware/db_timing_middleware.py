@@ -0,0 +1,55 @@
+"""ASGI middleware that reports per-request database usage.
+
+Adds a ``Server-Timing`` header (query count, total and slowest statement time)
+and logs statement shapes that were executed repeatedly, which usually means
+an N+1 query pattern. The same numbers are attached to the audit log entry by
+``AuditLoggingMiddleware``.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.query_stats import begin_request_stats
+
+logger = logging.getLogger(__name__)
+
+
+class DBTimingMiddleware:
+    """Collects query statistics for each HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.DB_INSTRUMENTATION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = begin_request_stats(scope)
+
+        async def wrapped_send(message: Message) -> None:
+            message_type = message.get("type")
+            if message_type == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            elif message_type == "http.response.body" and not message.get("more_body") and not stats.closed:
+                stats.close()
+                for repeated in stats.repeated_shapes():
+                    logger.warning(
+                        "Possible N+1: %s %s ran the same statement %d times: %s",
+                        scope.get("method"),
+                        scope.get("path"),
+                        repeated["count"],
+                        repeated["statement"][:200],
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            stats.close()
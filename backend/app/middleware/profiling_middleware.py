@@ -0,0 +1,44 @@
+"""ASGI middleware that marks ``X-Profile: 1`` requests for the sampling profiler.
+
+Only marking happens here; sampling starts when the request authenticates as a
+super admin. The response then carries an ``X-Profile-Id`` header naming the
+artifact to fetch from ``/api/v1/admin/profiles/{profile_id}``.
+"""
+
+from __future__ import annotations
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.services.profiler_service import request_profiler
+
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        requested = any(key == PROFILE_HEADER and value == b"1" for key, value in scope.get("headers", ()))
+        if not requested:
+            await self.app(scope, receive, send)
+            return
+
+        pending = request_profiler.mark(scope.get("method", ""), scope.get("path", ""))
+
+        async def wrapped_send(message: Message) -> None:
+            if message["type"] == "http.response.start" and pending.sampler is not None:
+                headers = list(message.get("headers") or [])
+                headers.append((b"x-profile-id", pending.artifact.id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            request_profiler.finish(pending)
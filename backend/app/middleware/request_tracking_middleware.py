@@ -0,0 +1,62 @@
+"""ASGI middleware that tracks HTTP requests for runtime health metrics."""
+
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics_service import HTTP_REQUEST_DURATION, HTTP_REQUESTS, registry
+
+
+class RequestStats:
+    """Process-wide request counters (single event loop, no locking needed)."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.total = 0
+
+
+request_stats = RequestStats()
+
+registry.gauge_callback(
+    "http_requests_in_flight", "Requests currently being handled", (), lambda: [((), request_stats.in_flight)]
+)
+
+
+def _route_template(scope: Scope) -> str:
+    """Matched route path (e.g. ``/api/v1/emission/vehicles/{vehicle_id}``) to keep label cardinality low."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestTrackingMiddleware:
+    """Counts requests in flight and records per-route latency and status."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def wrapped_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = int(message.get("status") or 500)
+            await send(message)
+
+        request_stats.in_flight += 1
+        request_stats.total += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            request_stats.in_flight -= 1
+            method = scope.get("method", "")
+            route = _route_template(scope)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
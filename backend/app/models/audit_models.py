@@ -50,3 +50,25 @@ class AuditLog(Base):
     extra = Column(postgresql.JSONB, nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class SlowQuery(Base):
+    """Statement that exceeded SLOW_QUERY_THRESHOLD_MS (written when SLOW_QUERY_LOG_PERSIST is on)."""
+
+    __tablename__ = "slow_queries"
+    __table_args__ = (
+        Index("idx_app_audit_slow_queries_occurred_at", "occurred_at"),
+        {"schema": "app_audit"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    engine = Column(String(32), nullable=False)
+    duration_ms = Column(postgresql.DOUBLE_PRECISION, nullable=False)
+    statement = Column(postgresql.TEXT, nullable=False)
+    parameters = Column(postgresql.JSONB, nullable=True)
+    http_method = Column(String(16), nullable=True)
+    route_path = Column(String(300), nullable=True)
+    user_email = Column(String(255), nullable=True)
+    plan = Column(postgresql.TEXT, nullable=True)
+    explain_error = Column(String(300), nullable=True)
@@ -0,0 +1,47 @@
+"""SQLAlchemy model for the background job queue (see app.services.job_service)."""
+
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func, text
+
+from app.db.database import Base
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+
+class Job(Base):
+    """One unit of background work, claimed by workers with FOR UPDATE SKIP LOCKED."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim order for runnable jobs; finished rows never enter the index
+        Index(
+            "idx_app_audit_jobs_claim",
+            text("priority DESC"),
+            "run_after",
+            "created_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        Index("idx_app_audit_jobs_created_by", "created_by", "created_at"),
+        {"schema": "app_audit"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    kind = Column(String(100), nullable=False)
+    payload = Column(postgresql.JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    status = Column(String(20), nullable=False, server_default="queued")
+    priority = Column(Integer, nullable=False, server_default="0")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="3")
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    progress = Column(Float, nullable=False, server_default="0")
+    progress_message = Column(String(300), nullable=True)
+    result = Column(postgresql.JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    locked_by = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_by = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class DataFreshness(BaseModel):
+    """Where an aggregate was computed and how current its inputs are.
+
+    ``snapshot`` results come from the Parquet copy of the tables and reflect
+    the database as of ``as_of``; ``live`` results were read from Postgres.
+    """
+    source: Literal["snapshot", "live"]
+    as_of: datetime
@@ -72,8 +72,12 @@ class AuditLogFilter(BaseModel):
     search: Optional[str] = None
     skip: int = Field(0, ge=0)
     limit: int = Field(50, ge=1, le=500)
+    after: Optional[str] = None
+    before: Optional[str] = None
 
 
 class AuditLogListResponse(BaseModel):
     items: List[AuditLogResponse]
     total: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
@@ -1,6 +1,8 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
+from app.schemas.analytics_schemas import DataFreshness
+
 
 class LabelValue(BaseModel):
     id: str
@@ -40,3 +42,4 @@ class UrbanGreeningDashboardOverview(BaseModel):
     tree_types_bar: List[LabelValue]
 
     ug_monthly: List[MonthValue]
+    freshness: Optional[DataFreshness] = None
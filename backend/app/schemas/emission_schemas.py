@@ -2,6 +2,8 @@ from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel, UUID4
 
+from app.schemas.analytics_schemas import DataFreshness
+
 # Office schemas
 class OfficeBase(BaseModel):
     name: str
@@ -239,6 +241,7 @@ class EmissionDashboardSummary(BaseModel):
     pending_tests: int
     compliance_rate: float
     top_office: Optional[EmissionDashboardTopOffice] = None
+    freshness: Optional[DataFreshness] = None
 
 # Response models
 class OfficeListResponse(BaseModel):
@@ -255,6 +258,8 @@ class VehicleListResponse(BaseModel):
 class TestListResponse(BaseModel):
     tests: List[Test]
     total: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class TestScheduleListResponse(BaseModel):
     schedules: List[TestSchedule]
@@ -262,4 +267,6 @@ class TestScheduleListResponse(BaseModel):
     
 class VehicleDriverHistoryListResponse(BaseModel):
     history: List[VehicleDriverHistory]
-    total: int
\ No newline at end of file
+    total: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
@@ -41,7 +41,7 @@ class GeminiImageRequest(BaseModel):
 class GeminiMultimodalRequest(BaseModel):
     """Request for multimodal (text + images) Gemini generation"""
     text_prompt: str = Field(..., description="Text prompt for generation")
-    images: List[dict] = Field(default=[], description="List of images with data and mime_type")
+    images: List[dict] = Field(default=[], description="List of images with data (base64, or raw bytes internally) and mime_type")
     model: GeminiModel = Field(default=GeminiModel.GEMINI_2_0_FLASH_LITE, description="Gemini model to use")
     max_tokens: Optional[int] = Field(default=None, description="Maximum tokens to generate")
     temperature: Optional[float] = Field(default=None, ge=0.0, le=2.0, description="Temperature for generation")
@@ -84,7 +84,7 @@ class EnvironmentalAnalysisRequest(BaseModel):
     data_type: str = Field(..., description="Type of environmental data (air_quality, emissions, tree_health, etc.)")
     prompt: str = Field(..., description="Analysis prompt")
     data_context: Optional[dict] = Field(default=None, description="Contextual data for analysis")
-    images: Optional[List[dict]] = Field(default=None, description="Optional images for analysis")
+    images: Optional[List[dict]] = Field(default=None, description="Optional images with data (base64, or raw bytes internally) and mime_type")
     analysis_focus: Optional[str] = Field(default=None, description="Specific focus area for analysis")
 
 
@@ -117,6 +117,16 @@ class VehicleDetails(BaseModel):
     latest_test_date: Optional[str]
 
 
+class PlateMatchCandidate(BaseModel):
+    """Near match for a recognized plate from the fuzzy identifier index"""
+    vehicle_id: str
+    plate_number: Optional[str] = Field(default=None, description="Plate number on file for the vehicle")
+    matched_field: str = Field(..., description="Identifier that matched: plate_number, chassis_number or registration_number")
+    matched_value: str = Field(..., description="Normalized identifier value that matched")
+    distance: float = Field(..., ge=0.0, description="Weighted edit distance (OCR confusions cost less)")
+    score: float = Field(..., ge=0.0, le=1.0, description="Similarity score derived from the distance")
+
+
 class PlateRecognitionResponse(BaseModel):
     """Response for license plate recognition"""
     plate_number: Optional[str] = Field(default=None, description="Recognized plate number, null if no plate detected")
@@ -128,3 +138,5 @@ class PlateRecognitionResponse(BaseModel):
     ai_response: Optional[str] = Field(default=None, description="Raw AI response for debugging")
     suggest_creation: Optional[bool] = Field(default=False, description="Whether to suggest creating a new vehicle record")
     creation_data: Optional[dict] = Field(default=None, description="Data to pre-populate vehicle creation form")
+    candidates: List[PlateMatchCandidate] = Field(default=[], description="Ranked near matches when the exact plate is not on file")
+    ocr_provider: Optional[str] = Field(default=None, description="OCR provider whose answer was used")
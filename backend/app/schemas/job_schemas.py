@@ -0,0 +1,35 @@
+"""Pydantic schemas for background jobs."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class JobAccepted(BaseModel):
+    """Returned with 202 by endpoints that hand their work to a job."""
+
+    job_id: uuid.UUID
+    status: str
+    status_url: str = Field(..., description="Poll this URL for progress and the result")
+
+
+class JobStatus(BaseModel):
+    id: uuid.UUID
+    kind: str
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    priority: int
+    attempts: int
+    max_attempts: int
+    progress: float = Field(..., ge=0, le=1)
+    progress_message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    run_after: datetime
@@ -0,0 +1,32 @@
+"""Pydantic schemas for generated reports."""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ReportInfo(BaseModel):
+    name: str
+    title: str
+    formats: List[str]
+    parameters: Dict[str, Any] = Field(..., description="JSON schema of the report's parameters")
+
+
+class ReportRequest(BaseModel):
+    format: Literal["xlsx", "pdf"] = "xlsx"
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+
+
+class ReportResponse(BaseModel):
+    """200 with ``download_url`` when a current artifact exists, else 202 with the render job."""
+
+    report: str
+    format: str
+    artifact_key: str
+    status: str = Field(..., description="ready, or the render job's status")
+    download_url: Optional[str] = None
+    job_id: Optional[uuid.UUID] = None
+    status_url: Optional[str] = Field(None, description="Poll this URL; the job result has the download_url")
@@ -7,6 +7,8 @@ from typing import Optional, List, Union, Any
 from uuid import UUID
 import re
 
+from app.schemas.analytics_schemas import DataFreshness
+
 
 # ==================== Photo Metadata Schema ====================
 
@@ -515,6 +517,7 @@ class TreeCarbonStatistics(BaseModel):
     annual_sequestration: AnnualCarbonSequestrationStats
     carbon_loss: CarbonLossStats
     generated_at: str  # ISO timestamp
+    freshness: Optional[DataFreshness] = None
 
 
 class TreeInventoryStats(BaseModel):
@@ -0,0 +1,446 @@
+"""Columnar snapshot of the fact tables for the dashboard aggregations.
+
+``refresh`` copies each fact table (and a daily audit aggregate) to a Parquet
+file under ``ANALYTICS_DIR``: rows stream out of Postgres as CSV through
+``export_service`` and DuckDB converts them to Parquet. A table is rewritten
+only when its write counters in ``pg_stat_user_tables`` moved since the last
+copy, so a refresh over quiet tables is one catalog query.
+
+``compute`` runs a dashboard builder against that snapshot. Builders take a
+``run(stmt)`` callable instead of a session; the same SQLAlchemy statements
+are compiled for Postgres and executed by an in-process DuckDB over views named
+like the original tables. When DuckDB is not installed, a table has not been
+copied yet, the oldest table involved is older than
+``ANALYTICS_MAX_STALENESS_SECONDS`` or DuckDB rejects the query, the builder
+runs against Postgres instead. The result says which one answered.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import JSON, Date, Table, Text, cast, func, literal, select, text, union_all
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.db.database import SessionLocal, sync_engine
+from app.models.audit_models import AuditLog
+from app.models.emission_models import Office, Test, Vehicle
+from app.models.job_models import Job
+from app.models.tree_inventory_models import TreeInventory, TreeMonitoringLog, TreeSpecies
+from app.models.urban_greening_models import FeeRecord, TreeRequest, UrbanGreeningPlanting, UrbanGreeningProject
+from app.schemas.analytics_schemas import DataFreshness
+from app.services.export_service import base_select, export_chunks, export_columns
+from app.services.job_service import enqueue_sync
+
+logger = logging.getLogger(__name__)
+
+REFRESH_JOB = "analytics.refresh"
+MANIFEST = "manifest.json"
+
+Run = Callable[[Select], Sequence[Any]]
+T = TypeVar("T")
+
+DUCKDB_TYPES = {
+    "string": "VARCHAR",
+    "int": "BIGINT",
+    "float": "DOUBLE",
+    "bool": "BOOLEAN",
+    "datetime": "TIMESTAMPTZ",
+    "date": "DATE",
+    "json": "VARCHAR",
+}
+
+
+@dataclass(frozen=True)
+class FactTable:
+    name: str  # schema-qualified name of the DuckDB view, matching the Postgres table it copies
+    source: Table
+    select: Callable[[], Select]
+
+
+def snapshot_select(model: Any, keep: Sequence[str] = ()) -> Select:
+    """All columns of ``model`` except free text, JSON and generated search columns."""
+    exclude = [
+        column.key
+        for column in model.__table__.columns
+        if column.key not in keep and (isinstance(column.type, (Text, JSON)) or column.computed is not None)
+    ]
+    return base_select(model, exclude)
+
+
+def _table(model: Any, keep: Sequence[str] = ()) -> FactTable:
+    return FactTable(model.__table__.fullname, model.__table__, lambda: snapshot_select(model, keep))
+
+
+def audit_daily_select() -> Select:
+    # cast(... AS DATE) rather than date_trunc: grouping by an expression with a
+    # bound 'day' argument is rejected by Postgres
+    day = cast(AuditLog.occurred_at, Date)
+    return select(
+        day.label("day"),
+        AuditLog.module_name,
+        AuditLog.status_code,
+        func.count().label("events"),
+    ).group_by(day, AuditLog.module_name, AuditLog.status_code)
+
+
+FACT_TABLES: Tuple[FactTable, ...] = (
+    _table(Office),
+    _table(Vehicle),
+    _table(Test),
+    _table(TreeInventory),
+    _table(TreeSpecies),
+    _table(TreeMonitoringLog),
+    _table(FeeRecord),
+    _table(UrbanGreeningPlanting),
+    _table(UrbanGreeningProject, keep=("plants",)),
+    _table(TreeRequest),
+    FactTable(f"{AuditLog.__table__.schema}.audit_daily", AuditLog.__table__, audit_daily_select),
+)
+FACTS: Dict[str, FactTable] = {fact.name: fact for fact in FACT_TABLES}
+
+
+def duckdb_available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _duckdb_type(expression: Any, kind: str) -> str:
+    if kind == "datetime" and not getattr(expression.type, "timezone", False):
+        return "TIMESTAMP"
+    return DUCKDB_TYPES[kind]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+# change detection
+
+
+def table_fingerprints(conn: Connection, tables: Sequence[Table]) -> Dict[str, str]:
+    """Per-table write counters; any committed insert, update or delete changes them.
+
+    Postgres reads ``pg_stat_user_tables`` (no table scan). Elsewhere, row count
+    and the newest ``updated_at`` / ``created_at`` stand in.
+    """
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(
+            text(
+                "SELECT schemaname || '.' || relname AS name, n_tup_ins, n_tup_upd, n_tup_del, n_live_tup "
+                "FROM pg_stat_user_tables"
+            )
+        ).all()
+        counters = {row.name: f"{row.n_tup_ins}:{row.n_tup_upd}:{row.n_tup_del}:{row.n_live_tup}" for row in rows}
+        return {table.fullname: counters.get(table.fullname, "") for table in tables}
+
+    parts = []
+    for position, table in enumerate(tables):
+        version = table.c.get("updated_at", table.c.get("created_at"))
+        parts.append(
+            select(
+                literal(position).label("position"),
+                func.count().label("rows"),
+                func.max(version).label("version") if version is not None else literal(None).label("version"),
+            ).select_from(table)
+        )
+    rows = sorted(conn.execute(union_all(*parts) if len(parts) > 1 else parts[0]).all(), key=lambda row: row.position)
+    return {table.fullname: f"{row.rows}:{row.version}" for table, row in zip(tables, rows)}
+
+
+def _timezone(conn: Connection) -> Optional[str]:
+    if conn.dialect.name != "postgresql":
+        return None
+    return conn.execute(text("SHOW TimeZone")).scalar()
+
+
+class AnalyticsSnapshot:
+    """Parquet files plus a manifest of when each was copied and last confirmed current."""
+
+    def __init__(self, directory: str, facts: Sequence[FactTable] = FACT_TABLES) -> None:
+        self.directory = Path(directory)
+        self.facts = {fact.name: fact for fact in facts}
+        self._refresh_lock = threading.Lock()
+        self._manifest: Dict[str, Any] = {}
+        self._manifest_mtime: Optional[float] = None
+        self.last_refresh: Dict[str, Any] = {}
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.parquet"
+
+    # manifest
+
+    def manifest(self) -> Dict[str, Any]:
+        """The manifest as last written by any process (re-read when the file changes)."""
+        manifest_path = self.directory / MANIFEST
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {"timezone": None, "tables": {}}
+        if mtime != self._manifest_mtime:
+            try:
+                self._manifest = json.loads(manifest_path.read_text())
+            except (OSError, ValueError) as exc:
+                logger.warning("Unreadable analytics manifest: %s", exc)
+                return {"timezone": None, "tables": {}}
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        partial = self.directory / f"{MANIFEST}.{os.getpid()}.partial"
+        partial.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(partial, self.directory / MANIFEST)
+
+    # refresh
+
+    def refresh(self, connect: Callable[[], Connection] = sync_engine.connect, force: bool = False) -> Dict[str, Any]:
+        """Copy every fact table whose fingerprint changed; returns what was done per table."""
+        with self._refresh_lock:
+            started = time.perf_counter()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with connect() as conn:
+                # read before copying: a write racing the copy leaves the old
+                # fingerprint behind, so the table is copied again next time
+                checked_at = _utcnow().isoformat()
+                fingerprints = table_fingerprints(conn, list({fact.source for fact in self.facts.values()}))
+                tz = _timezone(conn)
+
+            manifest = self.manifest()
+            tables = dict(manifest.get("tables", {}))
+            summary: Dict[str, Any] = {}
+            for name, fact in self.facts.items():
+                fingerprint = fingerprints.get(fact.source.fullname, "")
+                entry = tables.get(name)
+                if (
+                    not force
+                    and entry is not None
+                    and fingerprint
+                    and entry.get("fingerprint") == fingerprint
+                    and self.path(name).exists()
+                ):
+                    tables[name] = {**entry, "checked_at": checked_at}
+                    summary[name] = "unchanged"
+                    continue
+                copy_started = time.perf_counter()
+                rows = self._copy(fact, connect)
+                tables[name] = {
+                    "fingerprint": fingerprint,
+                    "rows": rows,
+                    "refreshed_at": checked_at,
+                    "checked_at": checked_at,
+                    "seconds": round(time.perf_counter() - copy_started, 3),
+                }
+                summary[name] = rows
+
+            self._write_manifest({"timezone": tz, "tables": tables})
+            self.last_refresh = {
+                "finished_at": _utcnow().isoformat(),
+                "seconds": round(time.perf_counter() - started, 3),
+                "tables": summary,
+            }
+            return self.last_refresh
+
+    def _copy(self, fact: FactTable, connect: Callable[[], Connection]) -> int:
+        import duckdb
+
+        stmt = fact.select()
+        target = self.path(fact.name)
+        staging = target.with_name(f"{target.name}.{os.getpid()}.partial")
+        csv_path = staging.with_suffix(".csv")
+        columns = ", ".join(
+            f"{_literal(column.name)}: {_literal(_duckdb_type(expression, column.kind))}"
+            for expression, column in zip(stmt.selected_columns, export_columns(stmt))
+        )
+        try:
+            with open(csv_path, "wb") as handle:
+                for chunk in export_chunks(connect, stmt, "csv"):
+                    handle.write(chunk)
+            duck = duckdb.connect()
+            try:
+                rows = duck.execute(
+                    f"COPY (SELECT * FROM read_csv({_literal(str(csv_path))}, header = true, quote = '\"', "
+                    f"escape = '\"', columns = {{{columns}}})) "
+                    f"TO {_literal(str(staging))} (FORMAT parquet, COMPRESSION zstd)"
+                ).fetchone()[0]
+            finally:
+                duck.close()
+            os.replace(staging, target)
+        finally:
+            for leftover in (csv_path, staging):
+                if leftover.exists():
+                    leftover.unlink()
+        return int(rows)
+
+    # queries
+
+    def freshness(self, names: Sequence[str]) -> Optional[DataFreshness]:
+        """Snapshot freshness for ``names``, or None when it cannot be used."""
+        if not settings.ANALYTICS_ENABLED or not duckdb_available():
+            return None
+        tables = self.manifest().get("tables", {})
+        checked = []
+        for name in names:
+            entry = tables.get(name)
+            if entry is None or not self.path(name).exists():
+                return None
+            checked.append(datetime.fromisoformat(entry["checked_at"]))
+        as_of = min(checked)
+        if (_utcnow() - as_of).total_seconds() > settings.ANALYTICS_MAX_STALENESS_SECONDS:
+            return None
+        return DataFreshness(source="snapshot", as_of=as_of)
+
+    def runner(self, duck: Any, names: Sequence[str]) -> Run:
+        """``run(stmt)`` over DuckDB views of ``names``, returning named tuples like ``Result.all()``."""
+        tz = self.manifest().get("timezone")
+        if tz:
+            duck.execute(f"SET TimeZone = {_literal(tz)}")
+        for name in names:
+            schema, _, table = name.rpartition(".")
+            if schema:
+                duck.execute(f"CREATE SCHEMA IF NOT EXISTS {_quote(schema)}")
+            view = f"{_quote(schema)}.{_quote(table)}" if schema else _quote(table)
+            duck.execute(f"CREATE VIEW {view} AS SELECT * FROM read_parquet({_literal(str(self.path(name)))})")
+
+        dialect = postgresql.dialect(paramstyle="numeric_dollar")
+
+        def run(stmt: Select) -> List[Any]:
+            compiled = stmt.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+            params = [compiled.params[key] for key in compiled.positiontup or ()]
+            cursor = duck.execute(str(compiled), params)
+            row_type = namedtuple("Row", [column[0] for column in cursor.description], rename=True)
+            return [row_type(*row) for row in cursor.fetchall()]
+
+        return run
+
+    def compute(self, db: Session, names: Sequence[str], build: Callable[[Run], T]) -> Tuple[T, DataFreshness]:
+        """``build(run)`` on the snapshot when it is fresh enough, otherwise on Postgres."""
+        freshness = self.freshness(names)
+        if freshness is not None:
+            import duckdb
+
+            duck = duckdb.connect()
+            try:
+                return build(self.runner(duck, names)), freshness
+            except duckdb.Error as exc:
+                logger.warning("Analytics snapshot query failed, reading Postgres instead: %s", exc)
+            finally:
+                duck.close()
+        live = DataFreshness(source="live", as_of=_utcnow())
+        return build(lambda stmt: db.execute(stmt).all()), live
+
+    def stats(self) -> Dict[str, Any]:
+        now = _utcnow()
+        tables = {}
+        for name, entry in self.manifest().get("tables", {}).items():
+            path = self.path(name)
+            tables[name] = {
+                **entry,
+                "age_seconds": round((now - datetime.fromisoformat(entry["checked_at"])).total_seconds(), 1),
+                "bytes": path.stat().st_size if path.exists() else None,
+            }
+        return {
+            "enabled": settings.ANALYTICS_ENABLED,
+            "duckdb_available": duckdb_available(),
+            "directory": str(self.directory),
+            "max_staleness_seconds": settings.ANALYTICS_MAX_STALENESS_SECONDS,
+            "tables": tables,
+            "last_refresh": self.last_refresh,
+        }
+
+
+analytics_snapshot = AnalyticsSnapshot(settings.ANALYTICS_DIR)
+
+
+# scheduling
+
+
+def pending_refresh(db: Session) -> Optional[Job]:
+    return (
+        db.query(Job)
+        .filter(Job.kind == REFRESH_JOB, Job.status.in_(("queued", "running")))
+        .order_by(Job.created_at)
+        .first()
+    )
+
+
+def request_refresh(db: Session, force: bool = False, created_by: Optional[str] = None) -> Job:
+    """Queue a refresh unless one is already queued or running."""
+    return pending_refresh(db) or enqueue_sync(db, REFRESH_JOB, {"force": force}, created_by=created_by)
+
+
+class RefreshScheduler:
+    """Enqueues an ``analytics.refresh`` job every ``interval_seconds``.
+
+    Every API worker runs one; the pending-job check keeps them from piling up
+    and an unchanged table costs nothing to refresh.
+    """
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        if not duckdb_available():
+            # every refresh job would fail; dashboards read Postgres instead
+            logger.info("duckdb is not installed; analytics snapshot refreshes are not scheduled")
+            return
+        self._task = asyncio.create_task(self._run(), name="analytics-refresh-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._enqueue)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Could not schedule analytics refresh: %s", exc)
+            await asyncio.sleep(self.interval_seconds)
+
+    @staticmethod
+    def _enqueue() -> None:
+        with SessionLocal() as db:
+            request_refresh(db)
+
+
+refresh_scheduler = RefreshScheduler(settings.ANALYTICS_REFRESH_SECONDS)
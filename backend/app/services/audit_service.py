@@ -56,6 +56,7 @@ class AuditService:
         response_summary: Optional[str] = None,
         error: Optional[Dict[str, Any]] = None,
         latency_ms: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
     ) -> None:
         occurred_at = datetime.now(timezone.utc)
         occurred_at_iso = occurred_at.isoformat()
@@ -101,7 +102,7 @@ class AuditService:
                 user_agent=user_agent_header,
                 latency_ms=latency_ms,
                 error=error,
-                extra=None,
+                extra=extra,
             )
 
             try:
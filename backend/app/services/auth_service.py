@@ -536,7 +536,9 @@ class AuthService:
             .options(selectinload(User.profile))
             .where(User.id.in_(user_ids))
         )
-        users = result.scalars().all()
+        # Keep the caller's (page) order
+        position = {user_id: index for index, user_id in enumerate(user_ids)}
+        users = sorted(result.scalars().all(), key=lambda user: position[user.id])
         
         # Fetch all role mappings for these users in a single query
         roles_result = await db.execute(
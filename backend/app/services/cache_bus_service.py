@@ -0,0 +1,237 @@
+"""Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+The in-process cache backend only sees its own worker's commits. Every flush
+that writes mapped rows also runs ``pg_notify('app_cache', '<tag>,<tag>')`` on
+the session's connection. The notification is part of the writing transaction,
+so Postgres delivers it exactly when that transaction commits and drops it on
+rollback, with no extra round trip or connection after the commit.
+
+Each worker keeps one dedicated asyncpg connection that LISTENs on the channel
+and evicts matching local entries as notifications arrive. It connects to
+``CACHE_BUS_DATABASE_URL``, which must be a direct or session-mode connection:
+a transaction-mode pooler (Supabase's port 6543) accepts LISTEN but never
+delivers. The bus only counts as connected once a NOTIFY it sends itself comes
+back, and repeats that probe every ``CACHE_BUS_KEEPALIVE_SECONDS`` to catch
+half-open connections. The connection is re-opened with backoff when it drops
+or a probe goes unanswered. While it is down the worker cannot hear other
+workers' writes, so the local cache is emptied and new entries live at most
+``CACHE_BUS_FALLBACK_TTL_SECONDS``; it is emptied again on reconnect.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.cache_service import Cache, bulk_tag, cache
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7000
+
+# Payloads starting with this are the bus's own round-trip probes, not tags
+PROBE_PREFIX = "__probe__:"
+
+
+def encode_payloads(tags: Iterable[str]) -> List[str]:
+    """Comma-joined tags, split so no payload exceeds ``MAX_PAYLOAD_BYTES``."""
+    payloads: List[str] = []
+    current = ""
+    for tag in sorted(set(tags)):
+        candidate = f"{current},{tag}" if current else tag
+        if current and len(candidate.encode()) > MAX_PAYLOAD_BYTES:
+            payloads.append(current)
+            candidate = tag
+        current = candidate
+    if current:
+        payloads.append(current)
+    return payloads
+
+
+def decode_payload(payload: str) -> Set[str]:
+    return {tag for tag in payload.split(",") if tag}
+
+
+def listen_dsn(url: str) -> str:
+    """SQLAlchemy DATABASE_URL -> plain DSN for ``asyncpg.connect``."""
+    scheme, sep, rest = url.partition("://")
+    return f"postgresql://{rest}" if sep else url
+
+
+def bus_database_url() -> str:
+    return settings.CACHE_BUS_DATABASE_URL or settings.DATABASE_URL
+
+
+def bus_enabled() -> bool:
+    """Only the per-worker backend needs the bus; Redis entries are already shared."""
+    return settings.CACHE_ENABLED and settings.CACHE_BUS_ENABLED and settings.CACHE_BACKEND == "memory"
+
+
+class CacheInvalidationBus:
+    def __init__(self, target: Cache, *, channel: str = "app_cache") -> None:
+        self.cache = target
+        self.channel = channel
+        self.connected = False
+        self.received = 0
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+        self._connection: Optional[Any] = None
+        self._lost: Optional[asyncio.Event] = None
+        self._probes: Dict[str, asyncio.Future] = {}
+
+    # publishing
+
+    def install(self, session_class: type = Session) -> None:
+        if event.contains(session_class, "after_flush", self._after_flush):
+            return
+        event.listen(session_class, "after_flush", self._after_flush)
+        event.listen(session_class, "do_orm_execute", self._do_orm_execute)
+
+    def _notify(self, session: Session, tags: Set[str]) -> None:
+        if not tags or not self.cache.enabled:
+            return
+        connection = session.connection()
+        if connection.dialect.name != "postgresql":
+            return
+        for payload in encode_payloads(tags):
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+
+    def _after_flush(self, session: Session, flush_context: Any) -> None:
+        tags: Set[str] = set()
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            tags.update(self.cache.tags_for(obj))
+        self._notify(session, tags)
+
+    def _do_orm_execute(self, orm_execute_state: Any) -> None:
+        if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper:
+            tables = orm_execute_state.bind_mapper.tables
+            self._notify(
+                orm_execute_state.session,
+                {tag for table in tables for tag in (table.name, bulk_tag(table.name))},
+            )
+
+    # listening
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        if payload.startswith(PROBE_PREFIX):
+            waiter = self._probes.pop(payload, None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+            return
+        tags = decode_payload(payload)
+        if tags:
+            self.received += 1
+            self.cache.invalidate(*tags)
+
+    def _on_termination(self, connection: Any) -> None:
+        if self._lost is not None:
+            self._lost.set()
+
+    def _set_connected(self, connected: bool) -> None:
+        # Whatever we hold may have missed notifications either way
+        self.cache.backend.clear()
+        self.connected = connected
+        self.cache.ttl_cap = None if connected else settings.CACHE_BUS_FALLBACK_TTL_SECONDS
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._set_connected(False)
+        self._task = asyncio.create_task(self._run(), name="cache-invalidation-bus")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.connected = False
+        self.cache.ttl_cap = None
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                self._lost = asyncio.Event()
+                self._connection = await asyncpg.connect(listen_dsn(bus_database_url()))
+                self._connection.add_termination_listener(self._on_termination)
+                await self._connection.add_listener(self.channel, self._on_notification)
+                await self._probe()
+                self._set_connected(True)
+                delay = 1.0
+                await self._watch()
+                logger.warning("Cache invalidation listener lost its connection; reconnecting")
+            except asyncio.CancelledError:
+                await self._close()
+                raise
+            except Exception as exc:
+                logger.warning("Cache invalidation listener failed (%s); retrying in %.0fs", exc, delay)
+            await self._close()
+            if self.connected:
+                self._set_connected(False)
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.CACHE_BUS_RECONNECT_MAX_SECONDS)
+
+    async def _probe(self) -> None:
+        """NOTIFY ourselves and wait for it to arrive through our own LISTEN."""
+        token = f"{PROBE_PREFIX}{uuid.uuid4().hex}"
+        waiter = asyncio.get_running_loop().create_future()
+        self._probes[token] = waiter
+        timeout = settings.CACHE_BUS_PROBE_TIMEOUT_SECONDS
+        try:
+            await asyncio.wait_for(self._round_trip(token, waiter), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(
+                f"NOTIFY did not come back within {timeout:.0f}s; CACHE_BUS_DATABASE_URL must be a "
+                "direct or session-mode connection, not a transaction pooler"
+            ) from None
+        finally:
+            self._probes.pop(token, None)
+
+    async def _round_trip(self, token: str, waiter: asyncio.Future) -> None:
+        await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, token)
+        await waiter
+
+    async def _watch(self) -> None:
+        """Return when the connection is lost; raise when a keepalive probe goes unanswered."""
+        while True:
+            try:
+                await asyncio.wait_for(self._lost.wait(), settings.CACHE_BUS_KEEPALIVE_SECONDS)
+                return
+            except asyncio.TimeoutError:
+                await self._probe()
+
+    async def _close(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=5)
+            except Exception:
+                connection.terminate()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "connected": self.connected,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
+
+
+cache_bus = CacheInvalidationBus(cache, channel=settings.CACHE_BUS_CHANNEL)
@@ -0,0 +1,345 @@
+"""Tagged read-through cache for reference data and aggregates.
+
+Endpoints opt in with ``@cache.cached(...)``::
+
+    @router.get("/species", response_model=List[TreeSpeciesResponse])
+    @cache.cached("species", tags=("tree_species",), model=List[TreeSpeciesResponse])
+    def get_all_species(search: Optional[str] = None, db: Session = Depends(get_db), ...):
+
+The key is the namespace plus the endpoint's plain arguments (query and path
+parameters); sessions, users and requests are ignored. Dependencies still run
+on a hit, so permission checks are unaffected. Results are stored as JSON-ready
+data (validated through ``model`` when given), so any backend can hold them.
+
+Every entry carries tags. A session ``after_flush`` listener collects the tags
+of the mapped classes that were inserted, updated or deleted (their table name
+plus anything registered with ``tag_writes``), and ``after_commit`` evicts the
+entries carrying them. Bulk ``update()``/``delete()`` can't say which rows they
+touched, so they evict the table tag and ``bulk_tag(table)``; entries tagged
+more narrowly than the table must also carry the latter. Rolled-back work
+evicts nothing. Other workers on the
+in-process backend hear about the same writes through ``cache_bus_service``;
+writes made outside the ORM are covered by TTL.
+
+``CACHE_BACKEND=memory`` is a per-worker LRU with TTL; ``redis`` shares entries
+between workers (needs the optional ``redis`` package).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.metrics_service import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+_KEY_TYPES = (str, int, float, bool, type(None), UUID, date, datetime, Enum)
+
+TagSpec = Union[str, Callable[..., Iterable[str]]]
+
+
+def bulk_tag(table: str) -> str:
+    """Tag evicted by bulk writes to ``table``, e.g. ``tests:bulk``."""
+    return f"{table}:bulk"
+
+
+class MemoryCacheBackend:
+    """Per-process LRU with per-entry TTL and a tag -> keys index."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 2000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, frozenset]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        tags = frozenset(tags)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            keys = set().union(*(self._keys_by_tag.get(tag, ()) for tag in tags))
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "tags": len(self._keys_by_tag)}
+
+
+class RedisCacheBackend:
+    """Shared backend: values as JSON strings, one Redis set of keys per tag."""
+
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "envirotrace:cache:") -> None:
+        import redis  # optional dependency, only needed for CACHE_BACKEND=redis
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        raw = self._client.get(self.prefix + key)
+        return (False, None) if raw is None else (True, json.loads(raw))
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        pipe = self._client.pipeline()
+        pipe.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+        for tag in tags:
+            pipe.sadd(f"{self.prefix}tag:{tag}", key)
+            pipe.expire(f"{self.prefix}tag:{tag}", max(1, int(ttl)))
+        pipe.execute()
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        count = 0
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = self._client.smembers(tag_key)
+            if keys:
+                count += self._client.delete(*(self.prefix + key.decode() for key in keys))
+            self._client.delete(tag_key)
+        return count
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+def _plain(value: Any) -> bool:
+    return isinstance(value, _KEY_TYPES) or (
+        isinstance(value, (list, tuple)) and all(isinstance(item, _KEY_TYPES) for item in value)
+    )
+
+
+class Cache:
+    def __init__(self, backend: Any, *, default_ttl: float = 300, enabled: bool = True) -> None:
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        # Set by the invalidation bus while it cannot hear other workers' writes
+        self.ttl_cap: Optional[float] = None
+        self._write_tags: Dict[type, List[Callable[[Any], Iterable[str]]]] = {}
+        # Per instance, since several caches may watch the same session
+        self._pending_key = f"cache_tags:{id(self)}"
+
+    # tags written by the ORM
+
+    def tag_writes(self, model: type, tags: Callable[[Any], Iterable[str]]) -> None:
+        """Extra tags to evict when an instance of ``model`` is written (the table name always is)."""
+        self._write_tags.setdefault(model, []).append(tags)
+
+    def tags_for(self, obj: Any) -> Set[str]:
+        mapper = sa_inspect(type(obj), raiseerr=False)
+        if mapper is None:
+            return set()
+        tags = {table.name for table in mapper.tables}
+        for cls in mapper.class_.__mro__:
+            for tags_of in self._write_tags.get(cls, ()):
+                tags.update(tags_of(obj))
+        return tags
+
+    def install(self, session_class: type = Session) -> None:
+        if event.contains(session_class, "after_commit", self._after_commit):
+            return
+        event.listen(session_class, "after_flush", self._after_flush)
+        event.listen(session_class, "do_orm_execute", self._do_orm_execute)
+        event.listen(session_class, "after_commit", self._after_commit)
+        event.listen(session_class, "after_rollback", self._after_rollback)
+
+    def _pending(self, session: Session) -> Set[str]:
+        return session.info.setdefault(self._pending_key, set())
+
+    def _after_flush(self, session: Session, flush_context: Any) -> None:
+        pending = self._pending(session)
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            pending.update(self.tags_for(obj))
+
+    def _do_orm_execute(self, orm_execute_state: Any) -> None:
+        # Bulk query(...).update()/delete() never reach the flush
+        if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper:
+            mapper = orm_execute_state.bind_mapper
+            self._pending(orm_execute_state.session).update(
+                tag for table in mapper.tables for tag in (table.name, bulk_tag(table.name))
+            )
+
+    def _after_commit(self, session: Session) -> None:
+        tags = session.info.pop(self._pending_key, None)
+        if tags:
+            self.invalidate(*tags)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(self._pending_key, None)
+
+    def invalidate(self, *tags: str) -> None:
+        try:
+            self.backend.invalidate_tags(tags)
+        except Exception:
+            logger.exception("Cache invalidation failed for %s", tags)
+
+    # lookups
+
+    def get(self, name: str, key: str) -> Tuple[bool, Any]:
+        try:
+            hit, value = self.backend.get(key)
+        except Exception:
+            logger.exception("Cache lookup failed for %s", key)
+            hit, value = False, None
+        record_cache_lookup(name, hit)
+        return hit, value
+
+    def set(self, key: str, value: Any, *, tags: Iterable[str], ttl: Optional[float] = None) -> None:
+        ttl = ttl or self.default_ttl
+        if self.ttl_cap is not None:
+            ttl = min(ttl, self.ttl_cap)
+        try:
+            self.backend.set(key, value, ttl, tags)
+        except Exception:
+            logger.exception("Cache store failed for %s", key)
+
+    def cached(
+        self,
+        namespace: str,
+        *,
+        tags: Iterable[TagSpec],
+        ttl: Optional[float] = None,
+        model: Any = None,
+    ) -> Callable:
+        """Cache an endpoint's result under ``namespace``.
+
+        ``tags`` are plain strings, or callables taking the endpoint's keyword
+        arguments by name and returning tags (e.g. per-quarter aggregates).
+        """
+        adapter = TypeAdapter(model) if model is not None else None
+
+        def resolve(arguments: Dict[str, Any]) -> Tuple[str, List[str]]:
+            plain = {name: value for name, value in arguments.items() if _plain(value)}
+            key = f"{namespace}:{json.dumps(jsonable_encoder(plain), sort_keys=True, separators=(',', ':'))}"
+            resolved: List[str] = []
+            for spec in tags:
+                if callable(spec):
+                    names = inspect.signature(spec).parameters
+                    resolved.extend(spec(**{name: arguments.get(name) for name in names}))
+                else:
+                    resolved.append(spec)
+            return key, resolved
+
+        def to_data(result: Any) -> Any:
+            if adapter is None:
+                return jsonable_encoder(result)
+            return adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json")
+
+        def decorator(func: Callable) -> Callable:
+            signature = inspect.signature(func)
+
+            def bind(args: tuple, kwargs: dict) -> Dict[str, Any]:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                return dict(bound.arguments)
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    key, entry_tags = resolve(bind(args, kwargs))
+                    if self.backend.blocking:
+                        hit, value = await asyncio.to_thread(self.get, namespace, key)
+                    else:
+                        hit, value = self.get(namespace, key)
+                    if hit:
+                        return value
+                    value = to_data(await func(*args, **kwargs))
+                    if self.backend.blocking:
+                        await asyncio.to_thread(self.set, key, value, tags=entry_tags, ttl=ttl)
+                    else:
+                        self.set(key, value, tags=entry_tags, ttl=ttl)
+                    return value
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                key, entry_tags = resolve(bind(args, kwargs))
+                hit, value = self.get(namespace, key)
+                if hit:
+                    return value
+                value = to_data(func(*args, **kwargs))
+                self.set(key, value, tags=entry_tags, ttl=ttl)
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "default_ttl": self.default_ttl, **self.backend.stats()}
+
+
+def _build_backend() -> Any:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.CACHE_REDIS_URL)
+    return MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+cache = Cache(_build_backend(), default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS, enabled=settings.CACHE_ENABLED)
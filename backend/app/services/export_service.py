@@ -0,0 +1,285 @@
+"""Streaming exports of whole filtered listings as CSV, NDJSON or Parquet.
+
+Rows come from a server-side cursor on the sync engine (``yield_per``), as
+plain column tuples rather than ORM objects, and are encoded one partition at a
+time. Each partition becomes one chunk of the ``StreamingResponse`` (one row
+group for Parquet), so memory stays flat however many rows match.
+
+Filters reuse the listing code (``CRUDVehicle._apply_filters``, the tree
+filters, ``audit_log_crud.filter_conditions``) so an export matches what the
+grid shows.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import JSON, Boolean, Date, DateTime, Float, Integer, Numeric, String, Uuid, cast, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.crud.crud_audit_log import audit_log_crud
+from app.crud.crud_emission import vehicle as vehicle_crud
+from app.crud.crud_tree_inventory import filter_trees
+from app.models.audit_models import AuditLog
+from app.models.emission_models import Office, Test, Vehicle
+from app.models.tree_inventory_models import TreeInventory
+from app.models.urban_greening_models import FeeRecord
+from app.schemas.audit_schemas import AuditLogFilter
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    name: str
+    kind: str  # string, int, float, bool, datetime, date, json
+
+
+def _kind(column: Any) -> str:
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return "bool"
+    if isinstance(column_type, Integer):
+        return "int"
+    if isinstance(column_type, (Float, Numeric)):
+        return "float"
+    if isinstance(column_type, DateTime):
+        return "datetime"
+    if isinstance(column_type, Date):
+        return "date"
+    if isinstance(column_type, JSON):
+        return "json"
+    return "string"
+
+
+def export_columns(stmt: Select) -> List[ExportColumn]:
+    return [ExportColumn(column.key, _kind(column)) for column in stmt.selected_columns]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Unsupported export value {type(value).__name__}")
+
+
+# writers: each turns an iterable of row partitions into byte chunks
+
+
+def csv_chunks(columns: Sequence[ExportColumn], partitions: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in columns])
+    json_positions = [index for index, column in enumerate(columns) if column.kind == "json"]
+    for rows in partitions:
+        if json_positions:
+            rows = [_with_json_text(row, json_positions) for row in rows]
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    remainder = buffer.getvalue()
+    if remainder:
+        yield remainder.encode()
+
+
+def _with_json_text(row: Sequence[Any], positions: Sequence[int]) -> List[Any]:
+    row = list(row)
+    for index in positions:
+        if row[index] is not None:
+            row[index] = json.dumps(row[index], default=_json_default)
+    return row
+
+
+def ndjson_chunks(columns: Sequence[ExportColumn], partitions: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    names = [column.name for column in columns]
+    try:
+        import orjson  # optional, several times faster than the stdlib encoder
+    except ImportError:
+        encoder = json.JSONEncoder(default=_json_default, separators=(",", ":"), ensure_ascii=False)
+        for rows in partitions:
+            yield "".join(encoder.encode(dict(zip(names, row))) + "\n" for row in rows).encode()
+        return
+    option = orjson.OPT_APPEND_NEWLINE
+    for rows in partitions:
+        yield b"".join([orjson.dumps(dict(zip(names, row)), default=_json_default, option=option) for row in rows])
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose contents are handed out (and forgotten) after each row group."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def parquet_chunks(columns: Sequence[ExportColumn], partitions: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    import pyarrow as pa  # optional dependency, only needed for format=parquet
+    import pyarrow.parquet as pq
+
+    arrow_types = {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "datetime": pa.timestamp("us", tz="UTC"),
+        "date": pa.date32(),
+        "json": pa.string(),
+    }
+    schema = pa.schema([(column.name, arrow_types[column.kind]) for column in columns])
+    converters: List[Optional[Callable[[Any], Any]]] = []
+    for column in columns:
+        if column.kind == "json":
+            converters.append(lambda value: None if value is None else json.dumps(value, default=_json_default))
+        elif column.kind == "float":
+            converters.append(lambda value: None if value is None else float(value))
+        elif column.kind == "string":
+            converters.append(lambda value: None if value is None else str(getattr(value, "value", value)))
+        else:
+            converters.append(None)
+
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for rows in partitions:
+            arrays = []
+            for index, (column, convert) in enumerate(zip(columns, converters)):
+                values = [row[index] for row in rows]
+                if convert is not None:
+                    values = [convert(value) for value in values]
+                arrays.append(pa.array(values, type=arrow_types[column.kind]))
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+WRITERS = {"csv": csv_chunks, "ndjson": ndjson_chunks, "parquet": parquet_chunks}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_partitions(connect: Callable[[], Connection], stmt: Select, batch_size: int) -> Iterator[List[Any]]:
+    """Row partitions from a server-side cursor; the connection lives as long as the generator."""
+    with connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(stmt)
+        for rows in result.partitions():
+            yield rows
+
+
+def export_chunks(
+    connect: Callable[[], Connection], stmt: Select, export_format: str, batch_size: Optional[int] = None
+) -> Iterator[bytes]:
+    columns = export_columns(stmt)
+    partitions = stream_partitions(connect, stmt, batch_size or settings.EXPORT_BATCH_SIZE)
+    return WRITERS[export_format](columns, partitions)
+
+
+def export_filename(entity: str, export_format: str) -> str:
+    return f"{entity}-{datetime.now():%Y%m%d-%H%M%S}.{export_format}"
+
+
+def table_columns(model: Any, exclude: Iterable[str] = ()) -> List[Any]:
+    """Mapped columns of ``model`` (by attribute name) minus ``exclude``.
+
+    UUIDs and NUMERICs are cast in SQL so the driver hands back ``str`` and
+    ``float`` instead of building ``UUID`` and ``Decimal`` objects per value.
+    """
+    excluded = set(exclude)
+    columns = []
+    for attribute in model.__mapper__.column_attrs:
+        if attribute.key in excluded:
+            continue
+        expression = attribute.expression
+        if isinstance(expression.type, Uuid):
+            expression = cast(expression, String)
+        elif isinstance(expression.type, Numeric) and not isinstance(expression.type, Float):
+            expression = cast(expression, Float)
+        columns.append(expression.label(attribute.key))
+    return columns
+
+
+def base_select(model: Any, exclude: Iterable[str] = (), *extra: Any) -> Select:
+    return select(*table_columns(model, exclude), *extra).select_from(model)
+
+
+# per-entity statements, ordered like their listings
+
+
+def vehicles_select(filters: Optional[dict] = None) -> Select:
+    stmt = base_select(
+        Vehicle,
+        ("plate_number_search", "chassis_number_search", "registration_number_search"),
+        Office.name.label("office_name"),
+    ).outerjoin(Office, Vehicle.office_id == Office.id)
+    return vehicle_crud._apply_filters(stmt, filters).order_by(Vehicle.created_at.desc(), Vehicle.id.desc())
+
+
+def tests_select(
+    vehicle_id: Optional[UUID] = None, quarter: Optional[int] = None, year: Optional[int] = None
+) -> Select:
+    stmt = base_select(Test)
+    if vehicle_id:
+        stmt = stmt.where(Test.vehicle_id == vehicle_id)
+    if quarter:
+        stmt = stmt.where(Test.quarter == quarter)
+    if year:
+        stmt = stmt.where(Test.year == year)
+    return stmt.order_by(Test.test_date.desc(), Test.id.desc())
+
+
+def trees_select(**filters: Any) -> Select:
+    # photos is a JSON blob of upload URLs, not useful in a spreadsheet
+    stmt = filter_trees(base_select(TreeInventory, ("photos",)), **filters)
+    return stmt.order_by(TreeInventory.created_at.desc(), TreeInventory.id.desc())
+
+
+def fees_select(year: Optional[int] = None) -> Select:
+    stmt = base_select(FeeRecord)
+    if year:
+        stmt = stmt.where(FeeRecord.date >= date(year, 1, 1), FeeRecord.date < date(year + 1, 1, 1))
+    return stmt.order_by(FeeRecord.created_at.desc(), FeeRecord.id.desc())
+
+
+def audit_logs_select(filters: AuditLogFilter) -> Select:
+    stmt = base_select(AuditLog).where(*audit_log_crud.filter_conditions(filters))
+    return stmt.order_by(AuditLog.occurred_at.desc(), AuditLog.id.desc())
@@ -1,13 +1,17 @@
+import asyncio
 import base64
 import io
 import logging
-from typing import Optional, List, AsyncGenerator, Dict, Any
+import time
+from dataclasses import dataclass
+from typing import Optional, List, AsyncGenerator, Dict, Any, Tuple, Union
 from PIL import Image
 
 from google import genai
 from google.genai import types
 
 from app.core.config import settings
+from app.services.metrics_service import GEMINI_REQUEST_DURATION
 from app.schemas.gemini_schemas import (
     GeminiTextRequest,
     GeminiImageRequest,
@@ -22,6 +26,75 @@ from app.schemas.gemini_schemas import (
 
 logger = logging.getLogger(__name__)
 
+ImageData = Union[str, bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class ImageLimits:
+    """Largest image sent inline to a model; bigger images are re-encoded."""
+    max_edge: int
+    max_bytes: int
+
+
+DEFAULT_IMAGE_LIMITS = ImageLimits(max_edge=3072, max_bytes=4_000_000)
+
+# Gemini tiles images into 768px crops, so lighter models gain nothing from more pixels.
+MODEL_IMAGE_LIMITS: Dict[str, ImageLimits] = {
+    "gemini-2.0-flash-lite": ImageLimits(max_edge=1536, max_bytes=1_000_000),
+    "gemini-2.0-flash": ImageLimits(max_edge=2048, max_bytes=2_000_000),
+    "gemini-2.5-flash": ImageLimits(max_edge=2048, max_bytes=2_000_000),
+}
+
+REENCODE_QUALITY_STEPS = (85, 75, 60, 45)
+
+
+def _as_bytes(data: ImageData) -> Tuple[bytes, bool]:
+    """Return raw image bytes and whether the input had to be base64-decoded.
+
+    ``memoryview``s over a whole ``bytes`` object are unwrapped without copying.
+    """
+    if isinstance(data, bytes):
+        return data, False
+    if isinstance(data, memoryview):
+        if isinstance(data.obj, bytes) and data.nbytes == len(data.obj):
+            return data.obj, False
+        return data.tobytes(), False
+    if isinstance(data, bytearray):
+        return bytes(data), False
+    return base64.b64decode(data), True
+
+
+def _fit_image(data: bytes, mime_type: str, limits: ImageLimits) -> Tuple[bytes, str, bool]:
+    """Downscale/re-encode an image so it fits ``limits``.
+
+    Returns the original buffer untouched when it already fits or cannot be
+    decoded. CPU-bound; call through ``asyncio.to_thread``.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as probe:
+            width, height = probe.size
+    except Exception:
+        return data, mime_type, False
+
+    if len(data) <= limits.max_bytes and max(width, height) <= limits.max_edge:
+        return data, mime_type, False
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((limits.max_edge, limits.max_edge), Image.Resampling.LANCZOS)
+
+        encoded = data
+        for quality in REENCODE_QUALITY_STEPS:
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=quality, optimize=True)
+            encoded = buffer.getvalue()
+            if len(encoded) <= limits.max_bytes:
+                break
+
+    if len(encoded) >= len(data) and max(width, height) <= limits.max_edge:
+        return data, mime_type, False
+    return encoded, "image/jpeg", True
+
 
 class GeminiService:
     """Service for interacting with Google's Gemini API"""
@@ -47,6 +120,59 @@ class GeminiService:
         """Check if client is available"""
         if not self.client:
             raise Exception("Gemini client not initialized. Please check your GOOGLE_API_KEY.")
+
+    async def _generate_content(self, operation: str, **kwargs):
+        """Call ``generate_content`` and record its latency per operation and model"""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self.client.aio.models.generate_content(**kwargs)
+            outcome = "ok"
+            return response
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            GEMINI_REQUEST_DURATION.labels(operation, kwargs.get("model", ""), outcome).observe(
+                time.perf_counter() - started
+            )
+
+    async def _prepare_image_parts(
+        self, images: List[Dict[str, Any]], model: str
+    ) -> Tuple[List[types.Part], Dict[str, Any]]:
+        """Build image parts capped to the model's limits plus payload accounting.
+
+        ``img['data']`` may be raw bytes/memoryview (upload endpoints) or a base64
+        string (JSON endpoints).
+        """
+        limits = MODEL_IMAGE_LIMITS.get(model, DEFAULT_IMAGE_LIMITS)
+        parts: List[types.Part] = []
+        received_bytes = 0
+        sent_bytes = 0
+        reencoded = 0
+        base64_decoded = 0
+
+        for img in images:
+            raw, was_base64 = _as_bytes(img['data'])
+            mime_type = img.get('mime_type', 'image/jpeg')
+            received_bytes += len(raw)
+            base64_decoded += int(was_base64)
+
+            fitted, fitted_mime, changed = await asyncio.to_thread(_fit_image, raw, mime_type, limits)
+            reencoded += int(changed)
+            sent_bytes += len(fitted)
+            parts.append(types.Part.from_bytes(data=fitted, mime_type=fitted_mime))
+
+        payload = {
+            "image_count": len(images),
+            "received_bytes": received_bytes,
+            "sent_bytes": sent_bytes,
+            "reencoded_images": reencoded,
+            "base64_decoded_images": base64_decoded,
+            "max_edge": limits.max_edge,
+            "max_bytes": limits.max_bytes,
+        }
+        return parts, payload
     
     async def generate_text(self, request: GeminiTextRequest) -> GeminiResponse:
         """Generate text using Gemini API"""
@@ -71,7 +197,8 @@ class GeminiService:
             ]
             
             # Generate content
-            response = self.client.models.generate_content(
+            response = await self._generate_content(
+                "generate_text",
                 model=request.model.value,
                 contents=contents,
                 config=types.GenerateContentConfig(**config) if config else None
@@ -140,7 +267,7 @@ class GeminiService:
             
             chunk_id = 0
             # Stream content
-            for chunk in self.client.models.generate_content_stream(
+            async for chunk in await self.client.aio.models.generate_content_stream(
                 model=request.model.value,
                 contents=contents,
                 config=types.GenerateContentConfig(**config) if config else None
@@ -171,8 +298,11 @@ class GeminiService:
         self._check_client()
         
         try:
-            # Decode base64 image
-            image_bytes = base64.b64decode(request.image_data)
+            # Decode base64 image and cap it to the model's limits
+            image_parts, payload = await self._prepare_image_parts(
+                [{'data': request.image_data, 'mime_type': request.mime_type}],
+                request.model.value,
+            )
             
             # Configure generation parameters
             config = {}
@@ -187,13 +317,14 @@ class GeminiService:
                     role="user",
                     parts=[
                         types.Part.from_text(text=request.prompt),
-                        types.Part.from_bytes(data=image_bytes, mime_type=request.mime_type),
+                        *image_parts,
                     ],
                 ),
             ]
             
             # Generate content
-            response = self.client.models.generate_content(
+            response = await self._generate_content(
+                "analyze_image",
                 model=request.model.value,
                 contents=contents,
                 config=types.GenerateContentConfig(**config) if config else None
@@ -209,6 +340,7 @@ class GeminiService:
                 success=True,
                 metadata={
                     "image_mime_type": request.mime_type,
+                    "payload": payload,
                     "usage": self._extract_usage_stats(response) if hasattr(response, 'usage_metadata') else None
                 }
             )
@@ -232,15 +364,9 @@ class GeminiService:
             # Build content parts using official API format
             parts = [types.Part.from_text(text=request.text_prompt)]
             
-            # Add images
-            for img in request.images:
-                image_bytes = base64.b64decode(img['data'])
-                parts.append(
-                    types.Part.from_bytes(
-                        data=image_bytes, 
-                        mime_type=img.get('mime_type', 'image/jpeg')
-                    )
-                )
+            # Add images (re-encoded down to the model's limits when oversized)
+            image_parts, payload = await self._prepare_image_parts(request.images, request.model.value)
+            parts.extend(image_parts)
             
             # Create properly structured content
             contents = [
@@ -251,7 +377,8 @@ class GeminiService:
             ]
             
             # Generate content
-            response = self.client.models.generate_content(
+            response = await self._generate_content(
+                "generate_multimodal",
                 model=request.model.value,
                 contents=contents,
                 config=types.GenerateContentConfig(**config) if config else None
@@ -267,6 +394,7 @@ class GeminiService:
                 success=True,
                 metadata={
                     "image_count": len(request.images),
+                    "payload": payload,
                     "usage": self._extract_usage_stats(response) if hasattr(response, 'usage_metadata') else None
                 }
             )
@@ -287,18 +415,14 @@ class GeminiService:
             contents = [enhanced_prompt]
             
             # Add images if provided
+            payload = None
             if request.images:
-                for img in request.images:
-                    image_bytes = base64.b64decode(img['data'])
-                    contents.append(
-                        types.Part.from_bytes(
-                            data=image_bytes, 
-                            mime_type=img.get('mime_type', 'image/jpeg')
-                        )
-                    )
+                image_parts, payload = await self._prepare_image_parts(request.images, settings.GEMINI_MODEL)
+                contents.extend(image_parts)
             
             # Generate content with environmental focus
-            response = self.client.models.generate_content(
+            response = await self._generate_content(
+                "analyze_environmental_data",
                 model=settings.GEMINI_MODEL,
                 contents=contents,
                 config=types.GenerateContentConfig(
@@ -324,6 +448,7 @@ class GeminiService:
                 metadata={
                     "data_type": request.data_type,
                     "analysis_focus": request.analysis_focus,
+                    "payload": payload,
                     "usage": self._extract_usage_stats(response) if hasattr(response, 'usage_metadata') else None
                 }
             )
@@ -433,7 +558,7 @@ Format your response clearly with distinct sections for insights and recommendat
         
         try:
             model_name = model or settings.GEMINI_MODEL
-            response = self.client.models.count_tokens(
+            response = await self.client.aio.models.count_tokens(
                 model=model_name,
                 contents=text
             )
@@ -0,0 +1,579 @@
+"""Index advisor driven by ``pg_stat_statements`` and the slow-query log.
+
+1. Workload: the most expensive statements from ``pg_stat_statements`` (when
+   the extension is installed) plus slow-query shapes captured by
+   ``app.db.slow_query_log``.
+2. Candidates: predicates and ORDER BY clauses on tables mapped by the app
+   (``emission``, ``urban_greening``, ``app_auth``, ``app_audit``) become index
+   proposals. ``ILIKE``/``LIKE`` filters (the app always wraps terms in
+   ``%...%``) become ``gin_trgm_ops`` indexes, equality filters become btree
+   indexes, and ORDER BY keys become composite btree indexes (prefixed by an
+   equality column when there is one). When the statement also filters on
+   ``is_archived``, they become partial indexes ``WHERE is_archived = false``.
+   Proposals already covered by an existing index are dropped.
+3. Benefit: each statement is planned generically (``PREPARE`` +
+   ``plan_cache_mode = force_generic_plan``) with and without the candidate.
+   With HypoPG the candidate is a hypothetical index. Otherwise the table is
+   sampled into a temporary scratch copy that keeps the table's existing
+   indexes, and the plans compare the copy with and without a real index. Everything runs in a rolled-back transaction.
+4. Output: chosen candidates can be rendered as an Alembic migration stub.
+
+Costs are planner estimates, not measurements; treat the ranking as a
+shortlist to verify with EXPLAIN ANALYZE.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.db.database import Base
+from app.db.slow_query_log import slow_query_log
+# Register every mapped table with Base.metadata
+from app.models import audit_models, auth_models, emission_models, job_models, tree_inventory_models, urban_greening_models  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+APP_SCHEMAS = ("emission", "urban_greening", "app_auth", "app_audit")
+ARCHIVED_COLUMN = "is_archived"
+ADVISOR_STATEMENT = "index_advisor_stmt"
+
+_QUALIFIED_COLUMN = r"(?P<schema>\w+)\.(?P<table>\w+)\.(?P<column>\w+)"
+_PARAM = r"(?:\$\d+|\?|%\(\w+\)s|%s|'[^']*'|true|false|[\d.]+)"
+_LIKE = re.compile(rf"(?:lower\()?{_QUALIFIED_COLUMN}\)?\s+(?:NOT\s+)?I?LIKE\s", re.IGNORECASE)
+_EQUALS = re.compile(rf"{_QUALIFIED_COLUMN}\s*(?:=|IN\s*\(|IS\s+(?:true|false))\s*", re.IGNORECASE)
+_ORDER_BY = re.compile(r"ORDER BY (?P<keys>.+?)(?:\s+LIMIT|\s+OFFSET|\s+FOR\s|\)|$)", re.IGNORECASE)
+_ORDER_KEY = re.compile(rf"^{_QUALIFIED_COLUMN}(?:\s+(?P<direction>ASC|DESC))?", re.IGNORECASE)
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_INDEX_DEF = re.compile(r"USING (?P<method>\w+) \((?P<columns>.*?)\)(?: WHERE (?P<where>.*))?$")
+
+
+@dataclass
+class WorkloadStatement:
+    statement: str
+    source: str
+    calls: int
+    total_ms: float
+
+    @property
+    def weight(self) -> float:
+        return self.total_ms or float(self.calls)
+
+
+@dataclass
+class IndexCandidate:
+    schema: str
+    table: str
+    columns: Tuple[str, ...]
+    method: str = "btree"
+    descending: Tuple[bool, ...] = ()
+    where: Optional[str] = None
+    reason: str = ""
+    statements: List[WorkloadStatement] = field(default_factory=list)
+    cost_before: float = 0.0
+    cost_after: float = 0.0
+    estimated_by: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def qualified_table(self) -> str:
+        return f"{self.schema}.{self.table}"
+
+    @property
+    def name(self) -> str:
+        suffix = "trgm" if self.method == "gin" else "partial" if self.where else ""
+        parts = ["idx", self.table, *self.columns] + ([suffix] if suffix else [])
+        name = "_".join(parts)
+        if len(name) > 63:
+            name = f"{name[:54]}_{self.id[:8]}"
+        return name
+
+    @property
+    def id(self) -> str:
+        return hashlib.sha1(self.ddl("").encode()).hexdigest()[:12]
+
+    def _column_list(self) -> str:
+        if self.method == "gin":
+            return ", ".join(f"{column} gin_trgm_ops" for column in self.columns)
+        return ", ".join(
+            f"{column} DESC" if index < len(self.descending) and self.descending[index] else column
+            for index, column in enumerate(self.columns)
+        )
+
+    def ddl(self, name: Optional[str] = None) -> str:
+        name = self.name if name is None else name
+        statement = f"CREATE INDEX {name} ON {self.qualified_table} USING {self.method} ({self._column_list()})"
+        if self.where:
+            statement += f" WHERE {self.where}"
+        return statement
+
+    @property
+    def improvement_pct(self) -> float:
+        if not self.cost_before:
+            return 0.0
+        return round((self.cost_before - self.cost_after) / self.cost_before * 100, 1)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "table": self.qualified_table,
+            "ddl": self.ddl(),
+            "reason": self.reason,
+            "estimated_by": self.estimated_by,
+            "cost_before": round(self.cost_before, 2),
+            "cost_after": round(self.cost_after, 2),
+            "improvement_pct": self.improvement_pct,
+            "workload_weight": round(sum(statement.weight for statement in self.statements), 2),
+            "statements": [
+                {"statement": statement.statement[:500], "source": statement.source, "calls": statement.calls}
+                for statement in self.statements[:5]
+            ],
+            "errors": self.errors[:5],
+        }
+
+
+# ---- workload ---------------------------------------------------------------
+
+
+def app_tables() -> Dict[str, set]:
+    """``schema.table`` -> column names for every mapped table in the app schemas."""
+    tables: Dict[str, set] = {}
+    for table in Base.metadata.tables.values():
+        if table.schema in APP_SCHEMAS:
+            tables[f"{table.schema}.{table.name}"] = {column.name for column in table.columns}
+    return tables
+
+
+def pg_stat_statements_available(conn: Connection) -> bool:
+    return bool(conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")).scalar())
+
+
+def hypopg_available(conn: Connection) -> bool:
+    return bool(conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'hypopg'")).scalar())
+
+
+def load_workload(conn: Connection, *, limit: int = 100, min_calls: int = 5) -> List[WorkloadStatement]:
+    workload: List[WorkloadStatement] = []
+    if pg_stat_statements_available(conn):
+        rows = conn.execute(
+            text(
+                "SELECT query, calls, total_exec_time FROM pg_stat_statements "
+                "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+                "AND calls >= :min_calls AND query ~* '^\\s*(SELECT|WITH)' "
+                "AND query ~ :schemas "
+                "ORDER BY total_exec_time DESC LIMIT :limit"
+            ),
+            {"min_calls": min_calls, "limit": limit, "schemas": "(" + "|".join(APP_SCHEMAS) + ")\\."},
+        )
+        workload.extend(WorkloadStatement(query, "pg_stat_statements", calls, total) for query, calls, total in rows)
+    slow: Dict[str, WorkloadStatement] = {
+        offender["statement"]: WorkloadStatement(
+            offender["statement"], "slow_query_log", offender["count"], offender["total_ms"]
+        )
+        for offender in slow_query_log.top_offenders(limit)
+    }
+    if settings.SLOW_QUERY_LOG_PERSIST:
+        # Persisted entries cover every worker, not just this one
+        rows = conn.execute(
+            text(
+                "SELECT statement, count(*), sum(duration_ms) FROM app_audit.slow_queries "
+                "WHERE occurred_at >= now() - interval '7 days' "
+                "GROUP BY statement ORDER BY sum(duration_ms) DESC LIMIT :limit"
+            ),
+            {"limit": limit},
+        )
+        for statement, count, total in rows:
+            slow[statement] = WorkloadStatement(statement, "slow_queries", count, float(total))
+    workload.extend(
+        item for item in slow.values() if item.statement.lstrip().upper().startswith(("SELECT", "WITH"))
+    )
+    return workload
+
+
+# ---- candidates -------------------------------------------------------------
+
+
+def _known(tables: Dict[str, set], schema: str, table: str, column: str) -> bool:
+    return column in tables.get(f"{schema}.{table}", ())
+
+
+def _order_keys(statement: str, tables: Dict[str, set]) -> List[Tuple[str, str, str, bool]]:
+    match = _ORDER_BY.search(statement)
+    if not match:
+        return []
+    keys = []
+    for raw in match.group("keys").split(","):
+        key = _ORDER_KEY.match(raw.strip())
+        if not key or not _known(tables, key["schema"], key["table"], key["column"]):
+            return keys
+        keys.append((key["schema"], key["table"], key["column"], (key["direction"] or "").upper() == "DESC"))
+    return keys
+
+
+def candidates_for_statement(statement: str, tables: Dict[str, set]) -> List[IndexCandidate]:
+    """Index proposals suggested by one statement's predicates and ORDER BY."""
+    statement = _COMMENT.sub(" ", statement)
+    proposals: List[IndexCandidate] = []
+    equalities: Dict[str, List[str]] = {}
+    archived_tables = set()
+
+    for match in _LIKE.finditer(statement):
+        schema, table, column = match["schema"], match["table"], match["column"]
+        if _known(tables, schema, table, column):
+            proposals.append(IndexCandidate(
+                schema, table, (column,), method="gin", reason=f"ILIKE '%...%' filter on {column}",
+            ))
+
+    for match in _EQUALS.finditer(statement):
+        schema, table, column = match["schema"], match["table"], match["column"]
+        if not _known(tables, schema, table, column):
+            continue
+        if column == ARCHIVED_COLUMN:
+            archived_tables.add((schema, table))
+            continue
+        equalities.setdefault(f"{schema}.{table}", [])
+        if column not in equalities[f"{schema}.{table}"]:
+            equalities[f"{schema}.{table}"].append(column)
+
+    def archived_where(schema: str, table: str) -> Optional[str]:
+        return f"{ARCHIVED_COLUMN} = false" if (schema, table) in archived_tables else None
+
+    for qualified, columns in equalities.items():
+        schema, table = qualified.split(".")
+        for column in columns:
+            proposals.append(IndexCandidate(
+                schema, table, (column,), where=archived_where(schema, table), reason=f"equality filter on {column}",
+            ))
+
+    keys = _order_keys(statement, tables)
+    if keys and len({(schema, table) for schema, table, _, _ in keys}) == 1:
+        schema, table = keys[0][0], keys[0][1]
+        columns = tuple(column for _, _, column, _ in keys)
+        descending = tuple(desc for _, _, _, desc in keys)
+        prefix = [column for column in equalities.get(f"{schema}.{table}", []) if column not in columns][:1]
+        proposals.append(IndexCandidate(
+            schema, table, tuple(prefix) + columns,
+            descending=(False,) * len(prefix) + descending,
+            where=archived_where(schema, table),
+            reason="ORDER BY " + ", ".join(columns) + (f" after filtering on {prefix[0]}" if prefix else ""),
+        ))
+
+    # Archived filters without anything better to index still benefit from a partial index
+    for schema, table in archived_tables:
+        if not any(proposal.qualified_table == f"{schema}.{table}" for proposal in proposals):
+            if _known(tables, schema, table, "created_at"):
+                proposals.append(IndexCandidate(
+                    schema, table, ("created_at",), descending=(True,), where=f"{ARCHIVED_COLUMN} = false",
+                    reason="filter on is_archived = false",
+                ))
+    return proposals
+
+
+def propose_candidates(workload: Iterable[WorkloadStatement], tables: Dict[str, set]) -> List[IndexCandidate]:
+    merged: Dict[str, IndexCandidate] = {}
+    for item in workload:
+        for candidate in candidates_for_statement(item.statement, tables):
+            existing = merged.setdefault(candidate.id, candidate)
+            if item not in existing.statements:
+                existing.statements.append(item)
+    return list(merged.values())
+
+
+def parse_index_definition(indexdef: str) -> Optional[Tuple[str, List[str], Optional[str]]]:
+    """``(method, [leading tokens per column], where)`` from ``pg_indexes.indexdef``."""
+    match = _INDEX_DEF.search(indexdef)
+    if not match:
+        return None
+    columns = [part.strip() for part in match["columns"].split(",")]
+    return match["method"], columns, match["where"]
+
+
+def is_covered(candidate: IndexCandidate, indexdefs: Sequence[str]) -> bool:
+    for indexdef in indexdefs:
+        parsed = parse_index_definition(indexdef)
+        if not parsed:
+            continue
+        method, columns, _ = parsed
+        names = [column.split()[0].strip('"') for column in columns]
+        if candidate.method == "gin":
+            if method == "gin" and any(
+                column.split()[0].strip('"') == candidate.columns[0] and "gin_trgm_ops" in column for column in columns
+            ):
+                return True
+        elif method == "btree" and names[: len(candidate.columns)] == list(candidate.columns):
+            return True
+    return False
+
+
+def existing_indexes(conn: Connection, qualified_tables: Iterable[str]) -> Dict[str, List[str]]:
+    names = sorted(set(qualified_tables))
+    if not names:
+        return {}
+    rows = conn.execute(
+        text("SELECT schemaname || '.' || tablename, indexdef FROM pg_indexes WHERE schemaname || '.' || tablename = ANY(:names)"),
+        {"names": names},
+    )
+    indexes: Dict[str, List[str]] = {}
+    for table, indexdef in rows:
+        indexes.setdefault(table, []).append(indexdef)
+    return indexes
+
+
+# ---- cost estimation --------------------------------------------------------
+
+
+def to_numbered_params(statement: str) -> str:
+    """Turn ``?`` / ``?, ...`` placeholders from statement shapes into ``$n``."""
+    counter = iter(range(1, 10_000))
+    statement = statement.replace("?, ...", "?")
+    return re.sub(r"\?", lambda _: f"${next(counter)}", statement)
+
+
+def generic_plan_cost(conn: Connection, statement: str) -> float:
+    """Planner total cost of ``statement`` with parameters left unbound."""
+    conn.exec_driver_sql("SAVEPOINT index_advisor")
+    conn.exec_driver_sql("SET LOCAL plan_cache_mode = force_generic_plan")
+    try:
+        conn.exec_driver_sql(f"PREPARE {ADVISOR_STATEMENT} AS {to_numbered_params(_COMMENT.sub(' ', statement))}")
+        try:
+            param_count = conn.exec_driver_sql(
+                "SELECT cardinality(parameter_types) FROM pg_prepared_statements WHERE name = %(name)s",
+                {"name": ADVISOR_STATEMENT},
+            ).scalar() or 0
+            args = f"({', '.join(['NULL'] * param_count)})" if param_count else ""
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) EXECUTE {ADVISOR_STATEMENT}{args}").scalar()
+        finally:
+            # Prepared statements outlive rollbacks; always drop ours
+            conn.exec_driver_sql("ROLLBACK TO SAVEPOINT index_advisor")
+            conn.exec_driver_sql(f"DEALLOCATE {ADVISOR_STATEMENT}")
+    except Exception:
+        conn.exec_driver_sql("ROLLBACK TO SAVEPOINT index_advisor")
+        raise
+    finally:
+        conn.exec_driver_sql("RELEASE SAVEPOINT index_advisor")
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return float(plan[0]["Plan"]["Total Cost"])
+
+
+def _statement_costs(conn: Connection, candidate: IndexCandidate, rewrite=None) -> List[Optional[float]]:
+    costs: List[Optional[float]] = []
+    for item in candidate.statements:
+        statement = rewrite(item.statement) if rewrite else item.statement
+        try:
+            costs.append(generic_plan_cost(conn, statement))
+        except Exception as exc:
+            candidate.errors.append(str(exc).splitlines()[0][:200])
+            costs.append(None)
+    return costs
+
+
+def _weighted(candidate: IndexCandidate, before: List[Optional[float]], after: List[Optional[float]]) -> None:
+    total_before = total_after = 0.0
+    for item, cost_before, cost_after in zip(candidate.statements, before, after):
+        if cost_before is None or cost_after is None:
+            continue
+        total_before += cost_before * max(item.calls, 1)
+        total_after += cost_after * max(item.calls, 1)
+    candidate.cost_before, candidate.cost_after = total_before, total_after
+
+
+def estimate_with_hypopg(conn: Connection, candidate: IndexCandidate) -> None:
+    before = _statement_costs(conn, candidate)
+    conn.execute(text("SELECT * FROM hypopg_create_index(:ddl)"), {"ddl": candidate.ddl("")})
+    try:
+        after = _statement_costs(conn, candidate)
+    finally:
+        conn.execute(text("SELECT hypopg_reset()"))
+    _weighted(candidate, before, after)
+    candidate.estimated_by = "hypopg"
+
+
+def estimate_with_scratch_copy(conn: Connection, candidate: IndexCandidate, *, sample_rows: int = 50_000) -> None:
+    """Compare plans against a sampled temporary copy of the table, without and with a real index.
+
+    The copy carries the table's existing indexes so the "before" plans are the
+    ones the table really gets. Not ``INCLUDING ALL``: generated columns would
+    reject the ``INSERT ... SELECT *``.
+    """
+    scratch = f"index_advisor_{candidate.table}"
+    reltuples = conn.execute(
+        text("SELECT greatest(reltuples, 1) FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": candidate.qualified_table},
+    ).scalar() or 1
+    percent = min(100.0, sample_rows / float(reltuples) * 100)
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS pg_temp.{scratch}")
+    conn.exec_driver_sql(f"CREATE TEMP TABLE {scratch} (LIKE {candidate.qualified_table} INCLUDING DEFAULTS INCLUDING INDEXES)")
+    conn.exec_driver_sql(
+        f"INSERT INTO pg_temp.{scratch} SELECT * FROM {candidate.qualified_table} "
+        f"TABLESAMPLE SYSTEM ({percent:.4f}) LIMIT {int(sample_rows)}"
+    )
+    conn.exec_driver_sql(f"ANALYZE pg_temp.{scratch}")
+    pattern = re.compile(rf"\b{re.escape(candidate.qualified_table)}\b")
+
+    def rewrite(statement: str) -> str:
+        return pattern.sub(f"pg_temp.{scratch}", statement)
+
+    before = _statement_costs(conn, candidate, rewrite)
+    conn.exec_driver_sql(
+        candidate.ddl("").replace(f"ON {candidate.qualified_table} ", f"ON pg_temp.{scratch} ")
+    )
+    conn.exec_driver_sql(f"ANALYZE pg_temp.{scratch}")
+    after = _statement_costs(conn, candidate, rewrite)
+    conn.exec_driver_sql(f"DROP TABLE pg_temp.{scratch}")
+    _weighted(candidate, before, after)
+    candidate.estimated_by = f"scratch_copy({percent:.2f}% sample)"
+
+
+# ---- migration stub ---------------------------------------------------------
+
+
+def render_migration(
+    candidates: Sequence[IndexCandidate],
+    *,
+    down_revision: Optional[str] = None,
+    message: str = "add advised indexes",
+) -> str:
+    created = datetime.now(timezone.utc)
+    revision = f"add_advised_indexes_{created:%Y%m%d%H%M}"
+    upgrade: List[str] = []
+    downgrade: List[str] = []
+    if any(candidate.method == "gin" for candidate in candidates):
+        upgrade.append('    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")\n')
+    for candidate in candidates:
+        columns = [
+            f'sa.text("{column} DESC")' if index < len(candidate.descending) and candidate.descending[index] else f'"{column}"'
+            for index, column in enumerate(candidate.columns)
+        ]
+        options = [f'schema="{candidate.schema}"']
+        if candidate.method == "gin":
+            options.append('postgresql_using="gin"')
+            ops = ", ".join(f'"{column}": "gin_trgm_ops"' for column in candidate.columns)
+            options.append(f"postgresql_ops={{{ops}}}")
+        if candidate.where:
+            options.append(f'postgresql_where=sa.text("{candidate.where}")')
+        upgrade.append(
+            "    # " + f"{candidate.reason}; estimated {candidate.improvement_pct}% lower cost"
+            f" ({candidate.estimated_by or 'not estimated'})\n"
+            "    op.create_index(\n"
+            f'        "{candidate.name}",\n'
+            f'        "{candidate.table}",\n'
+            f"        [{', '.join(columns)}],\n"
+            + "".join(f"        {option},\n" for option in options)
+            + "    )\n"
+        )
+        downgrade.insert(
+            0, f'    op.drop_index("{candidate.name}", table_name="{candidate.table}", schema="{candidate.schema}")\n'
+        )
+    return (
+        f'"""{message}\n\n'
+        f"Revision ID: {revision}\n"
+        f"Revises: {down_revision or 'SET_ME'}\n"
+        f"Create Date: {created:%Y-%m-%d %H:%M:%S}\n\n"
+        "Generated by the index advisor. On large tables consider creating the\n"
+        "indexes CONCURRENTLY (outside a transaction) instead.\n"
+        '"""\n'
+        "from typing import Sequence, Union\n\n"
+        "from alembic import op\n"
+        "import sqlalchemy as sa\n\n\n"
+        "# revision identifiers, used by Alembic.\n"
+        f'revision: str = "{revision}"\n'
+        f'down_revision: Union[str, None] = "{down_revision or "SET_ME"}"\n'
+        "branch_labels: Union[str, Sequence[str], None] = None\n"
+        "depends_on: Union[str, Sequence[str], None] = None\n\n\n"
+        "def upgrade() -> None:\n"
+        + ("\n".join(upgrade) or "    pass\n")
+        + "\n\ndef downgrade() -> None:\n"
+        + ("".join(downgrade) or "    pass\n")
+    )
+
+
+# ---- orchestration ----------------------------------------------------------
+
+
+class IndexAdvisor:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last: Dict[str, IndexCandidate] = {}
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    def analyze(
+        self,
+        engine: Engine,
+        *,
+        limit: int = 100,
+        min_calls: int = 5,
+        max_candidates: int = 25,
+        estimate: bool = True,
+        sample_rows: int = 50_000,
+        statement_timeout_ms: int = 15_000,
+    ) -> Dict[str, Any]:
+        tables = app_tables()
+        with engine.connect() as conn:
+            try:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}")
+                has_pgss = pg_stat_statements_available(conn)
+                has_hypopg = hypopg_available(conn)
+                workload = load_workload(conn, limit=limit, min_calls=min_calls)
+                candidates = propose_candidates(workload, tables)
+                indexes = existing_indexes(conn, (candidate.qualified_table for candidate in candidates))
+                candidates = [
+                    candidate for candidate in candidates
+                    if not is_covered(candidate, indexes.get(candidate.qualified_table, []))
+                ]
+                candidates.sort(key=lambda candidate: sum(item.weight for item in candidate.statements), reverse=True)
+                candidates = candidates[:max_candidates]
+                if estimate:
+                    for candidate in candidates:
+                        try:
+                            if has_hypopg:
+                                estimate_with_hypopg(conn, candidate)
+                            else:
+                                estimate_with_scratch_copy(conn, candidate, sample_rows=sample_rows)
+                        except Exception as exc:
+                            logger.warning("Index advisor could not estimate %s: %s", candidate.ddl(), exc)
+                            candidate.errors.append(str(exc).splitlines()[0][:200])
+                            conn.rollback()
+                            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}")
+                    candidates.sort(key=lambda candidate: candidate.cost_before - candidate.cost_after, reverse=True)
+            finally:
+                # Nothing the advisor did should ever be kept
+                conn.rollback()
+
+        result = {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "pg_stat_statements": has_pgss,
+            "hypopg": has_hypopg,
+            "workload_statements": len(workload),
+            "candidates": [candidate.summary() for candidate in candidates],
+        }
+        with self._lock:
+            self._last = {candidate.id: candidate for candidate in candidates}
+            self._last_run = result
+        return result
+
+    def last_run(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._last_run
+
+    def migration(self, candidate_ids: Sequence[str], *, down_revision: Optional[str] = None, message: Optional[str] = None) -> str:
+        with self._lock:
+            missing = [candidate_id for candidate_id in candidate_ids if candidate_id not in self._last]
+            if missing:
+                raise KeyError(f"Unknown candidate ids (run the advisor first): {', '.join(missing)}")
+            chosen = [self._last[candidate_id] for candidate_id in candidate_ids]
+        return render_migration(chosen, down_revision=down_revision, message=message or "add advised indexes")
+
+
+index_advisor = IndexAdvisor()
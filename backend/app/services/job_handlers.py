@@ -0,0 +1,87 @@
+"""Job handlers for work that used to run inline in request handlers.
+
+Imported by the routers that enqueue these kinds and by ``app.worker``, so the
+registry is filled wherever jobs are created or run.
+"""
+
+from typing import Any, Dict, List
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.orm import joinedload
+
+from app.crud import crud_tree_inventory
+from app.crud.crud_emission import office_compliance
+from app.db.database import SessionLocal
+from app.models.auth_models import User
+from app.schemas.emission_schemas import OfficeComplianceResponse
+from app.schemas.tree_inventory_schemas import TreeInventoryCreate
+from app.services import report_service
+from app.services.analytics_service import REFRESH_JOB, analytics_snapshot
+from app.services.job_service import JobContext, PermanentJobError, job_handler, job_pool
+
+_tree_batch = TypeAdapter(List[TreeInventoryCreate])
+
+
+@job_handler("tree_inventory.carbon_statistics", executor="thread")
+def carbon_statistics(ctx: JobContext, payload: Dict[str, Any]) -> Any:
+    with SessionLocal() as db:
+        statistics, freshness = analytics_snapshot.compute(
+            db,
+            crud_tree_inventory.CARBON_STATISTICS_TABLES,
+            lambda run: crud_tree_inventory.get_tree_carbon_statistics(run=run),
+        )
+    return statistics.model_copy(update={"freshness": freshness})
+
+
+@job_handler("emission.office_compliance", executor="thread")
+def office_compliance_report(ctx: JobContext, payload: Dict[str, Any]) -> Any:
+    filters = {key: payload[key] for key in ("search_term", "year", "quarter") if payload.get(key)}
+    with SessionLocal() as db:
+        data = office_compliance.get_office_compliance_data(
+            db, skip=payload.get("skip", 0), limit=payload.get("limit", 100), filters=filters
+        )
+    return OfficeComplianceResponse.model_validate(data)
+
+
+@job_handler("tree_inventory.import_trees", executor="thread", max_attempts=1, cancel_running=False)
+def import_trees(ctx: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Bulk tree import; a single attempt, since a partial retry could duplicate trees.
+
+    Not cancellable once running: the thread would still commit the trees.
+    """
+    try:
+        trees = _tree_batch.validate_python(payload.get("trees", []))
+    except ValidationError as exc:
+        raise PermanentJobError(str(exc)) from exc
+    ctx.progress(0.1, f"Validated {len(trees)} trees")
+    with SessionLocal() as db:
+        user = None
+        if ctx.created_by:
+            user = (
+                db.query(User).options(joinedload(User.profile)).filter(User.email == ctx.created_by).first()
+            )
+        try:
+            created = crud_tree_inventory.create_trees(db, trees, user)
+        except crud_tree_inventory.DuplicateTreeCodeError as exc:
+            raise PermanentJobError("Tree code already exists") from exc
+    return {"created": len(created), "tree_ids": [tree.id for tree in created]}
+
+
+@job_handler(report_service.RENDER_JOB, executor="thread", max_attempts=2)
+def render_report(ctx: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Collect in this thread, render XLSX/PDF in the job process pool."""
+    if report_service.get_report(payload.get("report", "")) is None:
+        raise PermanentJobError(f"Unknown report '{payload.get('report')}'")
+    try:
+        return report_service.build(payload, ctx.progress, job_pool.process_executor().submit)
+    except ImportError as exc:
+        raise PermanentJobError(f"Report renderer not installed ({exc.name})") from exc
+
+
+@job_handler(REFRESH_JOB, executor="thread", max_attempts=1)
+def refresh_analytics(ctx: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy changed fact tables to the Parquet snapshot; the next scheduled run retries failures."""
+    try:
+        return analytics_snapshot.refresh(force=bool(payload.get("force")))
+    except ImportError as exc:
+        raise PermanentJobError(f"Analytics engine not installed ({exc.name})") from exc
@@ -0,0 +1,440 @@
+"""Background jobs backed by the ``app_audit.jobs`` table.
+
+Handlers are registered by kind::
+
+    @job_handler("tree_inventory.carbon_statistics", executor="thread")
+    def carbon_statistics(ctx: JobContext, payload: dict) -> dict: ...
+
+``executor`` says where the handler runs:
+
+- ``"async"``: a coroutine on the worker's event loop;
+- ``"thread"``: a sync function (e.g. one using ``SessionLocal``) in a thread;
+- ``"process"``: a picklable top-level function of ``payload`` alone in a
+  spawned process pool, for CPU-bound work. It cannot report progress.
+
+Endpoints enqueue a job and return 202 with its id; clients poll
+``/jobs/{id}``. Workers claim the most urgent runnable job with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of workers (in the API
+processes via the lifespan, or ``python -m app.worker``) share one queue
+without double-claiming. Progress is flushed with the heartbeat; jobs whose
+worker stopped heartbeating are requeued. A failed attempt is retried with
+exponential backoff until ``max_attempts``, unless the handler raises
+``PermanentJobError``. A job interrupted by a worker shutdown is requeued only
+while it has attempts left, since the thread running it cannot be stopped.
+
+Queued jobs can always be cancelled. Running ones only when the handler was
+registered with ``cancel_running=True`` (the default): the handler still runs
+to the end and only its result is discarded, so handlers whose side effects
+must not land after a cancel (imports) opt out and the endpoint answers 409.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import engine
+from app.models.job_models import Job
+
+logger = logging.getLogger(__name__)
+
+jobs = Job.__table__
+EXECUTORS = ("async", "thread", "process")
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (bad payload, conflict)."""
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    kind: str
+    func: Callable[..., Any]
+    executor: str
+    max_attempts: int
+    cancel_running: bool = True
+
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(
+    kind: str, *, executor: str = "async", max_attempts: Optional[int] = None, cancel_running: bool = True
+) -> Callable:
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown job executor '{executor}'")
+
+    def decorator(func: Callable) -> Callable:
+        if executor == "async" and not inspect.iscoroutinefunction(func):
+            raise TypeError(f"Job handler '{kind}' must be a coroutine function")
+        _handlers[kind] = JobHandler(kind, func, executor, max_attempts or settings.JOB_MAX_ATTEMPTS, cancel_running)
+        return func
+
+    return decorator
+
+
+def get_handler(kind: str) -> Optional[JobHandler]:
+    return _handlers.get(kind)
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds before retrying after failed attempt number ``attempt`` (1-based)."""
+    return min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempt - 1), settings.JOB_RETRY_MAX_SECONDS)
+
+
+class JobContext:
+    """Passed to async and thread handlers; ``progress`` is safe to call from either."""
+
+    def __init__(self, job_id: uuid.UUID, attempt: int, created_by: Optional[str]) -> None:
+        self.job_id = job_id
+        self.attempt = attempt
+        self.created_by = created_by
+        self.fraction = 0.0
+        self.message: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        with self._lock:
+            self.fraction = max(0.0, min(1.0, float(fraction)))
+            if message is not None:
+                self.message = message[:300]
+
+    def snapshot(self) -> tuple:
+        with self._lock:
+            return self.fraction, self.message
+
+
+# enqueueing
+
+
+def _new_job(kind: str, payload: Any, priority: int, created_by: Optional[str], run_after: Optional[datetime]) -> Job:
+    handler = get_handler(kind)
+    if handler is None:
+        raise ValueError(f"No job handler registered for '{kind}'")
+    job = Job(
+        id=uuid.uuid4(),
+        kind=kind,
+        payload=jsonable_encoder(payload or {}),
+        status="queued",
+        priority=priority,
+        attempts=0,
+        max_attempts=handler.max_attempts,
+        progress=0.0,
+        created_by=created_by,
+    )
+    if run_after is not None:
+        job.run_after = run_after
+    return job
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Any = None,
+    *,
+    priority: int = 0,
+    created_by: Optional[str] = None,
+    run_after: Optional[datetime] = None,
+) -> Job:
+    job = _new_job(kind, payload, priority, created_by, run_after)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    job_pool.wake()
+    return job
+
+
+def enqueue_sync(
+    db: Session,
+    kind: str,
+    payload: Any = None,
+    *,
+    priority: int = 0,
+    created_by: Optional[str] = None,
+    run_after: Optional[datetime] = None,
+) -> Job:
+    job = _new_job(kind, payload, priority, created_by, run_after)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    job_pool.wake()
+    return job
+
+
+# workers
+
+
+def claim_statement(worker_id: str) -> Any:
+    """Mark the most urgent runnable job as ours and return it (None when the queue is empty)."""
+    next_job = (
+        select(jobs.c.id)
+        .where(jobs.c.status == "queued", jobs.c.run_after <= func.now(), jobs.c.attempts < jobs.c.max_attempts)
+        .order_by(jobs.c.priority.desc(), jobs.c.run_after, jobs.c.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return (
+        update(jobs)
+        .where(jobs.c.id == next_job)
+        .values(
+            status="running",
+            attempts=jobs.c.attempts + 1,
+            locked_by=worker_id,
+            started_at=func.now(),
+            heartbeat_at=func.now(),
+        )
+        .returning(jobs.c.id, jobs.c.kind, jobs.c.payload, jobs.c.attempts, jobs.c.max_attempts, jobs.c.created_by)
+    )
+
+
+def finish_statement(job_id: uuid.UUID, worker_id: str, **values: Any) -> Any:
+    """Record an attempt's outcome, unless the job was cancelled or handed to another worker meanwhile."""
+    return (
+        update(jobs)
+        .where(jobs.c.id == job_id, jobs.c.status == "running", jobs.c.locked_by == worker_id)
+        .values(**values)
+    )
+
+
+def stale_statement(stale_after_seconds: float) -> Any:
+    """Requeue running jobs with no recent heartbeat; those out of attempts fail instead."""
+    exhausted = jobs.c.attempts >= jobs.c.max_attempts
+    return (
+        update(jobs)
+        .where(
+            jobs.c.status == "running",
+            jobs.c.heartbeat_at < func.now() - timedelta(seconds=stale_after_seconds),
+        )
+        .values(
+            status=case((exhausted, "failed"), else_="queued"),
+            finished_at=case((exhausted, func.now()), else_=jobs.c.finished_at),
+            locked_by=None,
+            error="Worker stopped heartbeating",
+        )
+    )
+
+
+class JobWorkerPool:
+    def __init__(self, *, concurrency: int = 2, process_workers: int = 2) -> None:
+        self.concurrency = concurrency
+        self.process_workers = process_workers
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_lock = threading.Lock()
+        self._running: Dict[uuid.UUID, JobContext] = {}
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(index), name=f"job-worker-{index}") for index in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._maintain(), name="job-maintenance"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        with self._process_pool_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+
+    def wake(self) -> None:
+        """Let an idle worker in this process pick up a just-enqueued job without waiting for the poll."""
+        if self._loop is None or self._wake is None or self._loop.is_closed():
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _work(self, index: int) -> None:
+        while True:
+            try:
+                claimed = await self._claim()
+            except Exception as exc:
+                logger.warning("Job claim failed (%s)", exc)
+                claimed = None
+            if claimed is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), settings.JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.execute(claimed)
+
+    async def _claim(self) -> Optional[Any]:
+        async with engine.begin() as conn:
+            return (await conn.execute(claim_statement(self.worker_id))).first()
+
+    async def execute(self, claimed: Any) -> None:
+        ctx = JobContext(claimed.id, claimed.attempts, claimed.created_by)
+        handler = get_handler(claimed.kind)
+        self._running[claimed.id] = ctx
+        heartbeat = asyncio.create_task(self._heartbeat(ctx))
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No job handler registered for '{claimed.kind}'")
+            result = await self._call(handler, ctx, claimed.payload or {})
+        except asyncio.CancelledError:
+            # A thread handler keeps running after this, so only requeue when another attempt is allowed
+            if claimed.attempts < claimed.max_attempts:
+                await self._finish(claimed.id, status="queued", error="Worker stopped", run_after=_now())
+            else:
+                self.failed += 1
+                await self._finish(
+                    claimed.id, status="failed", error="Interrupted: worker stopped on the last attempt", finished=True
+                )
+            raise
+        except Exception as exc:
+            retry = not isinstance(exc, PermanentJobError) and claimed.attempts < claimed.max_attempts
+            error = "".join(traceback.format_exception_only(type(exc), exc)).strip()[:4000]
+            if retry:
+                logger.warning("Job %s (%s) attempt %s failed: %s", claimed.id, claimed.kind, claimed.attempts, error)
+                await self._finish(
+                    claimed.id,
+                    status="queued",
+                    error=error,
+                    run_after=_now() + timedelta(seconds=retry_delay(claimed.attempts)),
+                )
+            else:
+                logger.error("Job %s (%s) failed: %s", claimed.id, claimed.kind, error)
+                self.failed += 1
+                await self._finish(claimed.id, status="failed", error=error, finished=True)
+        else:
+            self.completed += 1
+            await self._finish(
+                claimed.id, status="succeeded", result=jsonable_encoder(result), progress=1.0, finished=True
+            )
+        finally:
+            heartbeat.cancel()
+            self._running.pop(claimed.id, None)
+
+    async def _call(self, handler: JobHandler, ctx: JobContext, payload: Dict[str, Any]) -> Any:
+        if handler.executor == "async":
+            return await handler.func(ctx, payload)
+        if handler.executor == "thread":
+            return await asyncio.to_thread(handler.func, ctx, payload)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.process_executor(), functools.partial(handler.func, payload)
+        )
+
+    def process_executor(self) -> ProcessPoolExecutor:
+        """The shared process pool, also for thread handlers that offload CPU-bound steps."""
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                # Spawned, not forked: children must not inherit the loop or pooled connections
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+
+    async def _heartbeat(self, ctx: JobContext) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            fraction, message = ctx.snapshot()
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(
+                        update(jobs)
+                        .where(jobs.c.id == ctx.job_id, jobs.c.locked_by == self.worker_id)
+                        .values(heartbeat_at=func.now(), progress=fraction, progress_message=message)
+                    )
+            except Exception as exc:
+                logger.warning("Job heartbeat failed for %s (%s)", ctx.job_id, exc)
+
+    async def _finish(
+        self,
+        job_id: uuid.UUID,
+        *,
+        status: str,
+        error: Optional[str] = None,
+        result: Any = None,
+        progress: Optional[float] = None,
+        run_after: Optional[datetime] = None,
+        finished: bool = False,
+    ) -> None:
+        values: Dict[str, Any] = {"status": status, "error": error, "result": result, "locked_by": None}
+        if progress is not None:
+            values["progress"] = progress
+        if run_after is not None:
+            values["run_after"] = run_after
+        if finished:
+            values["finished_at"] = func.now()
+        ctx = self._running.get(job_id)
+        if ctx is not None and ctx.message is not None:
+            values["progress_message"] = ctx.message
+        async with engine.begin() as conn:
+            await conn.execute(finish_statement(job_id, self.worker_id, **values))
+
+    async def _maintain(self) -> None:
+        """Requeue jobs whose worker stopped heartbeating (crashed process, lost pod)."""
+        while True:
+            await asyncio.sleep(settings.JOB_STALE_AFTER_SECONDS / 2)
+            try:
+                async with engine.begin() as conn:
+                    result = await conn.execute(stale_statement(settings.JOB_STALE_AFTER_SECONDS))
+                if result.rowcount:
+                    logger.warning("Requeued %s stale jobs", result.rowcount)
+            except Exception as exc:
+                logger.warning("Stale job sweep failed (%s)", exc)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "active_jobs": [
+                {"id": str(job_id), "progress": ctx.snapshot()[0]} for job_id, ctx in self._running.items()
+            ],
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+job_pool = JobWorkerPool(concurrency=settings.JOB_WORKERS, process_workers=settings.JOB_PROCESS_WORKERS)
@@ -0,0 +1,204 @@
+"""Event-loop lag watchdog that pinpoints blocking calls.
+
+A heartbeat coroutine ticks on the event loop every ``interval_ms``. A helper
+thread checks how long ago the last tick was; once the loop has been stuck for
+longer than ``threshold_ms`` it grabs the loop thread's current stack via
+``sys._current_frames()`` — i.e. the code that is hogging the loop right now.
+When the loop recovers, the stall's duration is attributed to the innermost
+application frame on that stack and aggregated per call site.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_STACK_DEPTH = 40
+
+
+@dataclass
+class BlockingSite:
+    site: str
+    blocking_in: str
+    count: int = 0
+    total_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    last_seen: Optional[str] = None
+    sample_stack: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "site": self.site,
+            "blocking_in": self.blocking_in,
+            "count": self.count,
+            "total_lag_ms": round(self.total_lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "last_seen": self.last_seen,
+            "sample_stack": self.sample_stack,
+        }
+
+
+def _format_frame(entry: traceback.FrameSummary) -> str:
+    filename = entry.filename
+    if filename.startswith(APP_ROOT):
+        filename = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+    return f"{filename}:{entry.lineno} in {entry.name}"
+
+
+def describe_stack(frame) -> tuple[str, str, List[str]]:
+    """Return (app call site, innermost frame, formatted stack) for a frame."""
+    stack = traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)
+    if not stack:
+        return "unknown", "unknown", []
+
+    innermost = _format_frame(stack[-1])
+    site = innermost
+    for entry in reversed(stack):
+        if entry.filename.startswith(APP_ROOT) and not entry.filename.endswith("loop_watchdog_service.py"):
+            site = _format_frame(entry)
+            break
+    return site, innermost, [_format_frame(entry) for entry in stack]
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        *,
+        interval_ms: float = 50,
+        threshold_ms: float = 100,
+        max_sites: int = 200,
+    ) -> None:
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.max_sites = max_sites
+        self._lock = threading.Lock()
+        self._sites: Dict[str, BlockingSite] = {}
+        self._stalls = 0
+        self._last_lag_ms = 0.0
+        self._max_lag_ms = 0.0
+        self._beat_at = time.monotonic()
+        self._pending: Optional[tuple[str, str, List[str]]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat_at = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-watchdog-heartbeat")
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        interval = self.interval_ms / 1000
+        while True:
+            self._beat_at = time.monotonic()
+            expected = self._beat_at + interval
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (time.monotonic() - expected) * 1000)
+            self._last_lag_ms = lag_ms
+            self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+            if lag_ms > self.threshold_ms:
+                self._record_stall(lag_ms)
+
+    def _monitor(self) -> None:
+        check_every = min(self.interval_ms, self.threshold_ms) / 2000
+        while not self._stop.wait(check_every):
+            stalled_ms = (time.monotonic() - self._beat_at) * 1000 - self.interval_ms
+            if stalled_ms <= self.threshold_ms:
+                continue
+            with self._lock:
+                if self._pending is not None:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            captured = describe_stack(frame)
+            del frame
+            with self._lock:
+                if self._pending is None:
+                    self._pending = captured
+
+    def _record_stall(self, lag_ms: float) -> None:
+        with self._lock:
+            captured, self._pending = self._pending, None
+            self._stalls += 1
+            site, blocking_in, stack = captured or ("unknown", "unknown", [])
+            entry = self._sites.get(site)
+            if entry is None:
+                if len(self._sites) >= self.max_sites:
+                    # Drop the least significant site to keep memory bounded
+                    weakest = min(self._sites.values(), key=lambda item: item.total_lag_ms)
+                    del self._sites[weakest.site]
+                entry = self._sites[site] = BlockingSite(site=site, blocking_in=blocking_in)
+            entry.count += 1
+            entry.total_lag_ms += lag_ms
+            entry.max_lag_ms = max(entry.max_lag_ms, lag_ms)
+            entry.blocking_in = blocking_in
+            entry.last_seen = datetime.now(timezone.utc).isoformat()
+            entry.sample_stack = stack
+
+        logger.warning("Event loop blocked for %.0f ms at %s (inside %s)", lag_ms, site, blocking_in)
+
+    def top_offenders(self, limit: int = 20) -> List[Dict[str, object]]:
+        with self._lock:
+            sites = sorted(self._sites.values(), key=lambda item: item.total_lag_ms, reverse=True)
+            return [site.as_dict() for site in sites[:limit]]
+
+    def stats(self, limit: int = 20) -> Dict[str, object]:
+        return {
+            "enabled": settings.LOOP_WATCHDOG_ENABLED,
+            "running": self.running,
+            "threshold_ms": self.threshold_ms,
+            "interval_ms": self.interval_ms,
+            "stalls": self._stalls,
+            "last_lag_ms": round(self._last_lag_ms, 1),
+            "max_lag_ms": round(self._max_lag_ms, 1),
+            "top_offenders": self.top_offenders(limit),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sites.clear()
+            self._stalls = 0
+            self._max_lag_ms = 0.0
+
+
+loop_watchdog = LoopWatchdog(
+    interval_ms=settings.LOOP_WATCHDOG_INTERVAL_MS,
+    threshold_ms=settings.LOOP_WATCHDOG_THRESHOLD_MS,
+)
@@ -0,0 +1,181 @@
+"""Memory diagnostics for investigating worker growth without restarts.
+
+Wraps ``tracemalloc`` (start/stop, named snapshots, snapshot diffs grouped by
+file:line) and reports GC generation counts plus live ORM instances per mapped
+class and the identity-map sizes of live sessions. Everything is per worker
+process; snapshots are kept in memory and capped at ``max_snapshots``.
+"""
+
+from __future__ import annotations
+
+import gc
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+from sqlalchemy.orm import Session
+
+from app.db.database import Base
+
+# Allocations made by the diagnostics machinery itself
+IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryDiagnostics:
+    def __init__(self, *, max_snapshots: int = 5) -> None:
+        self.max_snapshots = max_snapshots
+        # name -> (description, snapshot); described once, when taken
+        self._snapshots: "OrderedDict[str, Tuple[Dict[str, Any], tracemalloc.Snapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # tracemalloc control
+
+    def start(self, frames: int = 1) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return self.tracing_status()
+
+    def stop(self) -> Dict[str, Any]:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return self.tracing_status()
+
+    def tracing_status(self) -> Dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_current_kb": round(current / 1024, 1),
+            "traced_peak_kb": round(peak / 1024, 1),
+            "snapshots": self.list_snapshots(),
+        }
+
+    # snapshots
+
+    def take_snapshot(self, name: Optional[str] = None) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            raise ValueError("tracemalloc is not running; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces(IGNORED_TRACES)
+        taken_at = datetime.now(timezone.utc).isoformat()
+        name = name or taken_at
+        description = self._describe(name, taken_at, snapshot)
+        with self._lock:
+            self._snapshots.pop(name, None)
+            self._snapshots[name] = (description, snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return dict(description)
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(description) for description, _ in self._snapshots.values()]
+
+    def delete_snapshot(self, name: str) -> bool:
+        with self._lock:
+            return self._snapshots.pop(name, None) is not None
+
+    def _get(self, name: str) -> tracemalloc.Snapshot:
+        with self._lock:
+            entry = self._snapshots.get(name)
+        if entry is None:
+            raise KeyError(f"Unknown snapshot '{name}'")
+        return entry[1]
+
+    @staticmethod
+    def _describe(name: str, taken_at: str, snapshot: tracemalloc.Snapshot) -> Dict[str, Any]:
+        stats = snapshot.statistics("filename")
+        return {
+            "name": name,
+            "taken_at": taken_at,
+            "total_kb": round(sum(stat.size for stat in stats) / 1024, 1),
+            "blocks": sum(stat.count for stat in stats),
+        }
+
+    def diff(
+        self,
+        base: str,
+        target: Optional[str] = None,
+        *,
+        group_by: str = "lineno",
+        limit: int = 25,
+    ) -> Dict[str, Any]:
+        """Top allocation growth from ``base`` to ``target`` (or a fresh snapshot)."""
+        base_snapshot = self._get(base)
+        if target is None:
+            if not tracemalloc.is_tracing():
+                raise ValueError("tracemalloc is not running; pass a target snapshot")
+            target_snapshot = tracemalloc.take_snapshot().filter_traces(IGNORED_TRACES)
+        else:
+            target_snapshot = self._get(target)
+
+        stats = target_snapshot.compare_to(base_snapshot, group_by)
+        return {
+            "base": base,
+            "target": target or "now",
+            "group_by": group_by,
+            "total_growth_kb": round(sum(stat.size_diff for stat in stats) / 1024, 1),
+            "top_growth": [
+                {
+                    "location": str(stat.traceback[0]) if group_by != "traceback" else None,
+                    "traceback": stat.traceback.format() if group_by == "traceback" else None,
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    # gc / ORM
+
+    @staticmethod
+    def gc_stats() -> Dict[str, Any]:
+        return {
+            "counts": gc.get_count(),
+            "thresholds": gc.get_threshold(),
+            "generations": gc.get_stats(),
+            "garbage": len(gc.garbage),
+        }
+
+    @staticmethod
+    def orm_instances(limit: int = 50) -> Dict[str, Any]:
+        """Live mapped instances per class and identity-map sizes of live sessions.
+
+        Walks every GC-tracked object, so this is O(heap); admin use only.
+        """
+        mapped = {mapper.class_ for mapper in Base.registry.mappers}
+        instances: Counter = Counter()
+        sessions: List[int] = []
+        for obj in gc.get_objects():
+            cls = type(obj)
+            if cls in mapped:
+                instances[cls.__name__] += 1
+            elif isinstance(obj, Session):
+                sessions.append(len(obj.identity_map))
+        return {
+            "total": sum(instances.values()),
+            "by_class": dict(instances.most_common(limit)),
+            "live_sessions": len(sessions),
+            "identity_map_sizes": sorted(sessions, reverse=True)[:limit],
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "rss_mb": round(psutil.Process().memory_info().rss / (1024 * 1024), 1),
+            "tracemalloc": self.tracing_status(),
+            "gc": self.gc_stats(),
+            "orm": self.orm_instances(),
+        }
+
+
+memory_diagnostics = MemoryDiagnostics()
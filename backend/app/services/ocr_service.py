@@ -0,0 +1,390 @@
+"""License plate OCR providers with hedged, first-result-wins racing.
+
+A single slow provider used to hold the plate recognition request for the full
+HTTP timeout. ``HedgedOCR`` sends the image to the primary provider and, if no
+answer arrives within a delay derived from the primary's recent p90 latency,
+launches the secondary as well. The first valid plate wins and the other
+request is cancelled.
+
+Providers:
+- ``gemini``: Gemini vision model with a plate-extraction prompt
+- ``ocr_space``: OCR.Space REST API (engine 2)
+- ``stub``: local provider returning ``OCR_STUB_TEXT`` after ``OCR_STUB_DELAY_MS``,
+  for offline development and tests
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import bisect
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+
+from app.core.config import settings
+from app.schemas.gemini_schemas import GeminiImageRequest
+from app.services.gemini_service import gemini_service
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = "NOT_FOUND"
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+LATENCY_BUCKETS_MS: Sequence[float] = (
+    50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 8000, 13000, 21000, 30000,
+)
+
+PLATE_RECOGNITION_PROMPT = """
+Extract license plate number from this image.
+
+TASK: Find visible license plate and return ONLY the alphanumeric characters.
+
+INSTRUCTIONS:
+- Look for rectangular plates on vehicles
+- Extract letters and numbers only
+- If no plate visible, return "NOT_FOUND"
+- Return ONLY the plate characters, no explanation
+
+EXAMPLES: ABC123, 123ABC, AB123CD
+"""
+
+
+def is_valid_plate(text: Optional[str]) -> bool:
+    if not text:
+        return False
+    cleaned = text.strip().upper()
+    if cleaned == NOT_FOUND:
+        return False
+    return bool(re.sub(r"[^A-Z0-9]", "", cleaned))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate quantiles."""
+
+    def __init__(self, buckets_ms: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self._bounds = list(buckets_ms)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def observe(self, latency_ms: float) -> None:
+        index = bisect.bisect_left(self._bounds, latency_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum_ms += latency_ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket containing the ``q`` quantile, or None when empty."""
+        with self._lock:
+            total = self._count
+            counts = list(self._counts)
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                if index < len(self._bounds):
+                    return float(self._bounds[index])
+                return float(self._bounds[-1])
+        return float(self._bounds[-1])
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            count = self._count
+            sum_ms = self._sum_ms
+        return {
+            "count": count,
+            "avg_ms": round(sum_ms / count, 1) if count else None,
+            "p50_ms": self.quantile(0.5),
+            "p90_ms": self.quantile(0.9),
+            "p99_ms": self.quantile(0.99),
+        }
+
+
+class OCRProvider(abc.ABC):
+    """Base class for plate OCR providers. ``recognize`` returns raw provider text."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def recognize(self, image_data: str, mime_type: str) -> str:
+        raise NotImplementedError
+
+
+class GeminiOCRProvider(OCRProvider):
+    name = "gemini"
+
+    async def recognize(self, image_data: str, mime_type: str) -> str:
+        request = GeminiImageRequest(
+            prompt=PLATE_RECOGNITION_PROMPT,
+            image_data=image_data,
+            mime_type=mime_type,
+            model="gemini-2.0-flash-lite",
+            temperature=0.0,  # Zero temperature for fastest processing
+            max_tokens=20,  # Reduced tokens for faster response
+        )
+        result = await gemini_service.analyze_image(request)
+        return result.content
+
+
+class OCRSpaceProvider(OCRProvider):
+    name = "ocr_space"
+
+    async def recognize(self, image_data: str, mime_type: str) -> str:
+        if not settings.OCR_SPACE_API_KEY:
+            raise Exception("OCR_SPACE_API_KEY is not set")
+
+        async with httpx.AsyncClient() as client:
+            # OCR.Space expects data URI scheme
+            base64_image = f"data:{mime_type};base64,{image_data}"
+
+            response = await client.post(
+                "https://api.ocr.space/parse/image",
+                data={
+                    "apikey": settings.OCR_SPACE_API_KEY,
+                    "base64Image": base64_image,
+                    "language": "eng",
+                    "isOverlayRequired": "false",
+                    "detectOrientation": "true",
+                    "scale": "true",
+                    "OCREngine": "2",  # Engine 2 is better for number plates/digits
+                },
+                timeout=settings.OCR_TIMEOUT_SECONDS,
+            )
+
+            if response.status_code != 200:
+                raise Exception(f"OCR.Space API error: {response.status_code} {response.text}")
+
+            result = response.json()
+
+            if result.get("IsErroredOnProcessing"):
+                raise Exception(f"OCR.Space processing error: {result.get('ErrorMessage')}")
+
+            if not result.get("ParsedResults"):
+                return NOT_FOUND
+
+            parsed_text = result["ParsedResults"][0]["ParsedText"]
+            return parsed_text if parsed_text else NOT_FOUND
+
+
+class StubOCRProvider(OCRProvider):
+    """Offline provider with a fixed answer, delay and optional failure."""
+
+    def __init__(
+        self,
+        name: str = "stub",
+        *,
+        text: str = NOT_FOUND,
+        delay_ms: float = 0,
+        error: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.text = text
+        self.delay_ms = delay_ms
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def recognize(self, image_data: str, mime_type: str) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay_ms / 1000)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise Exception(self.error)
+        return self.text
+
+
+@dataclass
+class OCRResult:
+    text: str
+    provider: str
+    latency_ms: int
+    hedged: bool = False
+
+
+class HedgedOCR:
+    """Races a primary and an optional secondary provider.
+
+    The hedge delay is the primary's observed p90 latency clamped to
+    ``[min_delay_ms, max_delay_ms]``; until ``min_samples`` latencies have been
+    recorded ``default_delay_ms`` is used instead.
+    """
+
+    def __init__(
+        self,
+        primary: OCRProvider,
+        secondary: Optional[OCRProvider] = None,
+        *,
+        default_delay_ms: float = 1500,
+        min_delay_ms: float = 200,
+        max_delay_ms: float = 10000,
+        min_samples: int = 20,
+        timeout_seconds: float = 30.0,
+    ) -> None:
+        self.primary = primary
+        self.secondary = secondary
+        self.default_delay_ms = default_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.min_samples = min_samples
+        self.timeout_seconds = timeout_seconds
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, provider: OCRProvider) -> LatencyHistogram:
+        histogram = self.histograms.get(provider.name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(provider.name, LatencyHistogram())
+        return histogram
+
+    def hedge_delay_ms(self) -> float:
+        histogram = self.histogram(self.primary)
+        p90 = histogram.quantile(0.9) if histogram.count >= self.min_samples else None
+        if p90 is None:
+            return self.default_delay_ms
+        return min(max(p90, self.min_delay_ms), self.max_delay_ms)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "primary": self.primary.name,
+            "secondary": self.secondary.name if self.secondary else None,
+            "hedge_delay_ms": self.hedge_delay_ms(),
+            "providers": {name: histogram.snapshot() for name, histogram in self.histograms.items()},
+        }
+
+    async def _timed(self, provider: OCRProvider, image_data: str, mime_type: str) -> str:
+        # Failed and cancelled calls count too: a cancelled primary ran at least
+        # this long, and leaving it out would drag the p90 (and the hedge) down.
+        started = time.perf_counter()
+        try:
+            return await provider.recognize(image_data, mime_type)
+        finally:
+            self.histogram(provider).observe((time.perf_counter() - started) * 1000)
+
+    async def recognize(self, image_data: str, mime_type: str) -> OCRResult:
+        started = time.perf_counter()
+        tasks: Dict[asyncio.Task, OCRProvider] = {}
+        fallback: Optional[OCRResult] = None
+        errors: List[str] = []
+
+        def elapsed_ms() -> int:
+            return int((time.perf_counter() - started) * 1000)
+
+        def launch(provider: OCRProvider) -> None:
+            task = asyncio.create_task(self._timed(provider, image_data, mime_type))
+            tasks[task] = provider
+
+        launch(self.primary)
+        hedged = False
+        deadline = started + self.timeout_seconds
+
+        try:
+            while tasks:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+
+                wait_for = remaining
+                if self.secondary is not None and not hedged:
+                    wait_for = min(wait_for, self.hedge_delay_ms() / 1000 - (time.perf_counter() - started))
+                    wait_for = max(wait_for, 0)
+
+                done, _ = await asyncio.wait(tasks.keys(), timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if self.secondary is not None and not hedged:
+                        logger.info(
+                            "OCR provider %s slower than %.0f ms, hedging with %s",
+                            self.primary.name,
+                            self.hedge_delay_ms(),
+                            self.secondary.name,
+                        )
+                        hedged = True
+                        launch(self.secondary)
+                    continue
+
+                for task in done:
+                    provider = tasks.pop(task)
+                    try:
+                        text = task.result()
+                    except Exception as exc:
+                        logger.warning("OCR provider %s failed: %s", provider.name, exc)
+                        errors.append(f"{provider.name}: {exc}")
+                        continue
+
+                    if is_valid_plate(text):
+                        return OCRResult(text=text, provider=provider.name, latency_ms=elapsed_ms(), hedged=hedged)
+                    if fallback is None:
+                        fallback = OCRResult(text=text, provider=provider.name, latency_ms=elapsed_ms(), hedged=hedged)
+
+                # Primary finished without a usable plate: try the secondary right away.
+                if self.secondary is not None and not hedged:
+                    hedged = True
+                    launch(self.secondary)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if fallback is not None:
+            return fallback
+        if errors:
+            raise Exception("All OCR providers failed: " + "; ".join(errors))
+        raise Exception(f"OCR timed out after {self.timeout_seconds:.0f}s")
+
+
+def build_provider(name: Optional[str]) -> Optional[OCRProvider]:
+    if not name or name == "none":
+        return None
+    if name == "gemini":
+        return GeminiOCRProvider()
+    if name == "ocr_space":
+        return OCRSpaceProvider()
+    if name == "stub":
+        return StubOCRProvider(text=settings.OCR_STUB_TEXT, delay_ms=settings.OCR_STUB_DELAY_MS)
+    raise ValueError(f"Unknown OCR provider: {name}")
+
+
+def _default_secondary(primary: str) -> Optional[str]:
+    """Use the other real provider when it is configured."""
+    if primary == "gemini" and settings.OCR_SPACE_API_KEY:
+        return "ocr_space"
+    if primary == "ocr_space" and settings.GOOGLE_API_KEY:
+        return "gemini"
+    return None
+
+
+def build_hedged_ocr() -> HedgedOCR:
+    primary_name = settings.OCR_PROVIDER
+    secondary_name = settings.OCR_SECONDARY_PROVIDER
+    if secondary_name is None:
+        secondary_name = _default_secondary(primary_name)
+    if not settings.OCR_HEDGE_ENABLED or secondary_name == primary_name:
+        secondary_name = None
+
+    return HedgedOCR(
+        primary=build_provider(primary_name),
+        secondary=build_provider(secondary_name),
+        default_delay_ms=settings.OCR_HEDGE_DEFAULT_DELAY_MS,
+        min_delay_ms=settings.OCR_HEDGE_MIN_DELAY_MS,
+        max_delay_ms=settings.OCR_HEDGE_MAX_DELAY_MS,
+        timeout_seconds=settings.OCR_TIMEOUT_SECONDS,
+    )
+
+
+ocr_service = build_hedged_ocr()
@@ -0,0 +1,359 @@
+"""In-memory fuzzy lookup over normalized vehicle identifiers.
+
+OCR output routinely confuses visually similar characters (0/O, 1/I, 8/B, 5/S),
+so an exact match on ``plate_number_search`` misses vehicles that are on file.
+This index keeps every normalized plate, chassis and registration identifier in
+a deletion-neighbourhood hash (SymSpell style) so that candidates within a small
+edit distance can be found without touching the database.
+
+Implementation notes:
+- Keys are folded onto a canonical confusable class before indexing, so OCR
+  confusions are free in the neighbourhood and only "real" edits consume budget
+- Only the first ``PREFIX_LENGTH`` characters contribute deletion variants,
+  which bounds memory for long chassis numbers
+- Candidates are ranked by a weighted Damerau-Levenshtein distance in which a
+  confusable substitution costs less than an arbitrary one
+- Building scans every vehicle, so the app builds it at startup and refreshes
+  it from a background task (``start``); requests only read it
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.emission_models import Vehicle
+
+logger = logging.getLogger(__name__)
+
+MAX_DISTANCE = 2.0
+PREFIX_LENGTH = 7
+CONFUSABLE_COST = 0.4
+EDIT_COST = 1.0
+
+IDENTIFIER_FIELDS = ("plate_number", "chassis_number", "registration_number")
+
+# Each group collapses onto its first character when folding keys.
+CONFUSABLE_GROUPS = ("0odq", "1il", "8b", "5s", "2z", "6g", "7t", "4a", "uv")
+
+_FOLD_MAP: Dict[str, str] = {
+    char: group[0] for group in CONFUSABLE_GROUPS for char in group
+}
+
+
+def normalize_identifier(value: Optional[str]) -> Optional[str]:
+    """Mirror the ``*_search`` computed columns (lowercase alphanumerics only)."""
+    if not value:
+        return None
+    normalized = re.sub(r"[^a-z0-9]", "", value.lower())
+    return normalized or None
+
+
+def fold_confusables(value: str) -> str:
+    return "".join(_FOLD_MAP.get(char, char) for char in value)
+
+
+def weighted_distance(source: str, target: str, max_distance: float = MAX_DISTANCE) -> float:
+    """Optimal-string-alignment distance with cheaper confusable substitutions.
+
+    Returns ``max_distance + 1`` as soon as the distance is known to exceed
+    ``max_distance`` so callers can discard the candidate early.
+    """
+    if source == target:
+        return 0.0
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    source_folded = fold_confusables(source)
+    target_folded = fold_confusables(target)
+    width = len(target)
+
+    previous_previous: List[float] = []
+    previous = [float(j) for j in range(width + 1)]
+    for i in range(1, len(source) + 1):
+        source_char = source[i - 1]
+        source_class = source_folded[i - 1]
+        current = [float(i)] + [0.0] * width
+        row_min = current[0]
+        for j in range(1, width + 1):
+            target_char = target[j - 1]
+            if source_char == target_char:
+                value = previous[j - 1]
+            elif source_class == target_folded[j - 1]:
+                value = previous[j - 1] + CONFUSABLE_COST
+            else:
+                value = previous[j - 1] + EDIT_COST
+            deletion = previous[j] + EDIT_COST
+            if deletion < value:
+                value = deletion
+            insertion = current[j - 1] + EDIT_COST
+            if insertion < value:
+                value = insertion
+            if i > 1 and j > 1 and source_char == target[j - 2] and source[i - 2] == target_char:
+                transposition = previous_previous[j - 2] + EDIT_COST
+                if transposition < value:
+                    value = transposition
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def _deletion_variants(value: str, max_deletes: int, prefix_length: int) -> Set[str]:
+    prefix = value[:prefix_length]
+    variants = {prefix}
+    for deletes in range(1, min(max_deletes, len(prefix)) + 1):
+        for positions in combinations(range(len(prefix)), deletes):
+            variants.add("".join(char for idx, char in enumerate(prefix) if idx not in positions))
+    return variants
+
+
+@dataclass(frozen=True)
+class PlateCandidate:
+    vehicle_id: UUID
+    plate_number: Optional[str]
+    matched_field: str
+    matched_value: str
+    distance: float
+
+    @property
+    def score(self) -> float:
+        return round(max(0.0, 1.0 - self.distance / (MAX_DISTANCE + 1)), 3)
+
+
+class PlateIndex:
+    """Thread-safe deletion-neighbourhood index over vehicle identifiers."""
+
+    def __init__(
+        self,
+        *,
+        max_distance: float = MAX_DISTANCE,
+        prefix_length: int = PREFIX_LENGTH,
+        max_age_seconds: Optional[int] = None,
+    ) -> None:
+        self._max_distance = max_distance
+        self._max_deletes = int(max_distance)
+        self._prefix_length = prefix_length
+        self._max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        # deletion variant -> identifier values sharing it
+        self._variants: Dict[str, Set[str]] = {}
+        # identifier value -> {(vehicle_id, field)}
+        self._owners: Dict[str, Set[Tuple[UUID, str]]] = {}
+        # vehicle_id -> {field: identifier value}
+        self._vehicles: Dict[UUID, Dict[str, str]] = {}
+        self._built_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    def __len__(self) -> int:
+        return len(self._vehicles)
+
+    def is_stale(self) -> bool:
+        if self._built_at is None:
+            return True
+        if not self._max_age_seconds:
+            return False
+        return (time.monotonic() - self._built_at) > self._max_age_seconds
+
+    def rebuild(self, rows: Iterable[Tuple[UUID, Optional[str], Optional[str], Optional[str]]]) -> None:
+        """Replace the index contents from ``(id, plate, chassis, registration)`` rows."""
+        fresh = PlateIndex(max_distance=self._max_distance, prefix_length=self._prefix_length)
+        for vehicle_id, plate, chassis, registration in rows:
+            fresh._add(vehicle_id, {"plate_number": plate, "chassis_number": chassis, "registration_number": registration})
+
+        with self._lock:
+            self._variants = fresh._variants
+            self._owners = fresh._owners
+            self._vehicles = fresh._vehicles
+            self._built_at = time.monotonic()
+
+    def rebuild_from_db(self, db: Session) -> None:
+        started = time.perf_counter()
+        rows = db.execute(
+            select(
+                Vehicle.id,
+                Vehicle.plate_number_search,
+                Vehicle.chassis_number_search,
+                Vehicle.registration_number_search,
+            )
+        ).all()
+        self.rebuild(rows)
+        logger.info(
+            "Plate index rebuilt with %s vehicles in %.1f ms",
+            len(rows),
+            (time.perf_counter() - started) * 1000,
+        )
+
+    def ensure_built(self, db: Session) -> None:
+        """Build on first use; afterwards one caller refreshes while others keep reading.
+
+        Left to the background refresher once it is running and has built the index.
+        """
+        if not self.is_stale() or (self.refreshing and self.is_built):
+            return
+        # Only block when there is nothing to serve yet.
+        if not self._build_lock.acquire(blocking=not self.is_built):
+            return
+        try:
+            if self.is_stale():
+                self.rebuild_from_db(db)
+        finally:
+            self._build_lock.release()
+
+    @property
+    def refreshing(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Build now and rebuild every ``max_age_seconds``, off the event loop."""
+        if self.refreshing:
+            return
+        self._task = asyncio.create_task(self._run(), name="plate-index-refresh")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Could not rebuild plate index: %s", exc)
+            if not self._max_age_seconds:
+                return
+            await asyncio.sleep(self._max_age_seconds)
+
+    def _refresh(self) -> None:
+        with self._build_lock, SessionLocal() as db:
+            self.rebuild_from_db(db)
+
+    def upsert(self, vehicle: Vehicle) -> None:
+        """Refresh a single vehicle after a write. No-op until the index is built."""
+        if not self.is_built:
+            return
+        identifiers = {field: getattr(vehicle, field, None) for field in IDENTIFIER_FIELDS}
+        with self._lock:
+            self._remove(vehicle.id)
+            self._add(vehicle.id, identifiers)
+
+    def remove(self, vehicle_id: UUID) -> None:
+        if not self.is_built:
+            return
+        with self._lock:
+            self._remove(vehicle_id)
+
+    def lookup(self, term: str, *, limit: int = 5) -> List[PlateCandidate]:
+        """Return up to ``limit`` candidates within the configured distance, best first."""
+        normalized = normalize_identifier(term)
+        if not normalized:
+            return []
+
+        folded = fold_confusables(normalized)
+        best: Dict[Tuple[UUID, str], PlateCandidate] = {}
+
+        with self._lock:
+            seen: Set[str] = set()
+            for variant in _deletion_variants(folded, self._max_deletes, self._prefix_length):
+                for value in self._variants.get(variant, ()):
+                    if value in seen:
+                        continue
+                    seen.add(value)
+                    distance = weighted_distance(normalized, value, self._max_distance)
+                    if distance > self._max_distance:
+                        continue
+                    for vehicle_id, field in self._owners.get(value, ()):
+                        plate = self._vehicles.get(vehicle_id, {}).get("plate_number")
+                        candidate = PlateCandidate(
+                            vehicle_id=vehicle_id,
+                            plate_number=plate.upper() if plate else None,
+                            matched_field=field,
+                            matched_value=value.upper(),
+                            distance=round(distance, 2),
+                        )
+                        key = (vehicle_id, field)
+                        if key not in best or best[key].distance > candidate.distance:
+                            best[key] = candidate
+
+        # Keep the closest identifier per vehicle, then rank (plates win ties).
+        per_vehicle: Dict[UUID, PlateCandidate] = {}
+        field_rank = {field: rank for rank, field in enumerate(IDENTIFIER_FIELDS)}
+        for candidate in best.values():
+            current = per_vehicle.get(candidate.vehicle_id)
+            if current is None or (candidate.distance, field_rank[candidate.matched_field]) < (
+                current.distance,
+                field_rank[current.matched_field],
+            ):
+                per_vehicle[candidate.vehicle_id] = candidate
+
+        ranked = sorted(
+            per_vehicle.values(),
+            key=lambda c: (c.distance, field_rank[c.matched_field], c.matched_value),
+        )
+        return ranked[:limit]
+
+    def _add(self, vehicle_id: UUID, identifiers: Dict[str, Optional[str]]) -> None:
+        stored: Dict[str, str] = {}
+        for field, raw in identifiers.items():
+            value = normalize_identifier(raw)
+            if not value:
+                continue
+            stored[field] = value
+            owners = self._owners.setdefault(value, set())
+            if not owners:
+                for variant in _deletion_variants(fold_confusables(value), self._max_deletes, self._prefix_length):
+                    self._variants.setdefault(variant, set()).add(value)
+            owners.add((vehicle_id, field))
+        if stored:
+            self._vehicles[vehicle_id] = stored
+
+    def _remove(self, vehicle_id: UUID) -> None:
+        stored = self._vehicles.pop(vehicle_id, None)
+        if not stored:
+            return
+        for field, value in stored.items():
+            owners = self._owners.get(value)
+            if owners is None:
+                continue
+            owners.discard((vehicle_id, field))
+            if owners:
+                continue
+            del self._owners[value]
+            for variant in _deletion_variants(fold_confusables(value), self._max_deletes, self._prefix_length):
+                values = self._variants.get(variant)
+                if values is None:
+                    continue
+                values.discard(value)
+                if not values:
+                    del self._variants[variant]
+
+
+plate_index = PlateIndex(max_age_seconds=settings.PLATE_INDEX_MAX_AGE_SECONDS)
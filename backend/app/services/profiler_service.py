@@ -0,0 +1,239 @@
+"""On-demand sampling profiler for individual requests.
+
+A request sent with ``X-Profile: 1`` is marked by ``ProfilingMiddleware``.
+Sampling only starts once the authenticated user resolves to a super admin
+(see ``start_request_profile`` in ``app.apis.deps``), so the header costs
+nothing for anyone else. While active, a helper thread snapshots every busy
+thread's stack through ``sys._current_frames()`` and aggregates them as
+collapsed stacks (``frame;frame;frame count``), which can also be exported as
+speedscope JSON.
+
+Async endpoints share the event-loop thread with concurrent requests, so their
+samples may include other requests' work; sync endpoints show up on their
+threadpool worker. Artifacts are kept in memory on the worker that served the
+request.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_STACK_DEPTH = 64
+
+# Innermost frames that mean the thread is parked rather than doing work
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(APP_ROOT):
+        filename = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame, thread_name: str) -> Optional[str]:
+    """Collapsed ``root;...;leaf`` stack for a frame, or None when the thread is idle."""
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+        return None
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(f"thread:{thread_name}")
+    return ";".join(reversed(labels))
+
+
+@dataclass
+class ProfileArtifact:
+    id: str
+    method: str
+    path: str
+    user_email: Optional[str] = None
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    duration_ms: float = 0.0
+    interval_ms: float = 0.0
+    sample_count: int = 0
+    truncated: bool = False
+    stacks: Counter = field(default_factory=Counter)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "user_email": self.user_email,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 1),
+            "interval_ms": self.interval_ms,
+            "sample_count": self.sample_count,
+            "truncated": self.truncated,
+        }
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self) -> Dict[str, Any]:
+        frames: List[Dict[str, str]] = []
+        frame_index: Dict[str, int] = {}
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, count in self.stacks.items():
+            indices = []
+            for label in stack.split(";"):
+                if label not in frame_index:
+                    frame_index[label] = len(frames)
+                    frames.append({"name": label})
+                indices.append(frame_index[label])
+            samples.append(indices)
+            weights.append(count * self.interval_ms)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "envirotrace-profiler",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": f"{self.method} {self.path}",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+class StackSampler:
+    """Samples all busy threads every ``interval_ms`` until stopped or ``max_seconds`` elapse."""
+
+    def __init__(self, artifact: ProfileArtifact, *, interval_ms: float, max_seconds: float) -> None:
+        self.artifact = artifact
+        self.interval = interval_ms / 1000
+        self.max_seconds = max_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._started = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self.artifact.interval_ms = self.interval * 1000
+        self._thread.start()
+
+    def stop(self) -> ProfileArtifact:
+        self._stop.set()
+        self._thread.join(timeout=1)
+        self.artifact.duration_ms = (time.perf_counter() - self._started) * 1000
+        return self.artifact
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        deadline = self._started + self.max_seconds
+        while not self._stop.wait(self.interval):
+            if time.perf_counter() > deadline:
+                self.artifact.truncated = True
+                return
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                stack = collapse_stack(frame, names.get(thread_id, str(thread_id)))
+                if stack is not None:
+                    self.artifact.stacks[stack] += 1
+            # Drop frame references promptly so sampled threads' locals can be freed
+            frames = frame = None
+            self.artifact.sample_count += 1
+
+
+class PendingProfile:
+    """Request marked for profiling; becomes active once a super admin is authenticated."""
+
+    def __init__(self, method: str, path: str) -> None:
+        self.artifact = ProfileArtifact(id=str(uuid.uuid4()), method=method, path=path)
+        self.sampler: Optional[StackSampler] = None
+
+
+_pending_profile: ContextVar[Optional[PendingProfile]] = ContextVar("pending_profile", default=None)
+
+
+class RequestProfiler:
+    def __init__(self, *, max_artifacts: int = 20, max_concurrent: int = 1) -> None:
+        self._artifacts: Deque[ProfileArtifact] = deque(maxlen=max_artifacts)
+        self._lock = threading.Lock()
+        self._active = 0
+        self.max_concurrent = max_concurrent
+
+    def mark(self, method: str, path: str) -> PendingProfile:
+        pending = PendingProfile(method, path)
+        _pending_profile.set(pending)
+        return pending
+
+    def activate(self, user_email: Optional[str]) -> Optional[str]:
+        """Start sampling the current marked request. Returns the profile id when started."""
+        pending = _pending_profile.get()
+        if pending is None or pending.sampler is not None:
+            return None
+        with self._lock:
+            if self._active >= self.max_concurrent:
+                return None
+            self._active += 1
+        pending.artifact.user_email = user_email
+        pending.sampler = StackSampler(
+            pending.artifact,
+            interval_ms=settings.PROFILE_SAMPLE_INTERVAL_MS,
+            max_seconds=settings.PROFILE_MAX_SECONDS,
+        )
+        pending.sampler.start()
+        return pending.artifact.id
+
+    def finish(self, pending: PendingProfile) -> Optional[ProfileArtifact]:
+        if pending.sampler is None:
+            return None
+        artifact = pending.sampler.stop()
+        pending.sampler = None
+        with self._lock:
+            self._active -= 1
+            self._artifacts.append(artifact)
+        return artifact
+
+    def artifacts(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [artifact.summary() for artifact in reversed(self._artifacts)]
+
+    def get(self, profile_id: str) -> Optional[ProfileArtifact]:
+        with self._lock:
+            for artifact in self._artifacts:
+                if artifact.id == profile_id:
+                    return artifact
+        return None
+
+
+request_profiler = RequestProfiler(max_artifacts=settings.PROFILE_MAX_ARTIFACTS)
+
+
+def start_request_profile(user) -> None:
+    """Begin sampling if this request asked for a profile and ``user`` is a super admin."""
+    if _pending_profile.get() is not None and getattr(user, "is_super_admin", False):
+        request_profiler.activate(getattr(user, "email", None))
@@ -0,0 +1,202 @@
+"""Report templates and the XLSX / PDF renderers that run in the job process pool.
+
+A ``ReportTemplate`` lists the sections of a report and the columns of each
+section; ``report_service`` fills a ``ReportData`` with plain row tuples. Both
+are picklable and this module imports nothing from the app, so ``render`` can
+run in a spawned worker process without a database.
+
+XLSX goes through XlsxWriter in ``constant_memory`` mode (rows are flushed to
+disk as they are written) and PDF through ReportLab; both are optional and
+imported only here.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+RENDERER_MODULES = {"xlsx": "xlsxwriter", "pdf": "reportlab"}
+
+
+@dataclass(frozen=True)
+class ReportColumn:
+    key: str
+    label: str
+    kind: str = "text"  # text, int, number, percent, date
+    width: float = 14
+    total: bool = False
+
+
+@dataclass(frozen=True)
+class ReportSection:
+    key: str
+    title: str
+    columns: Tuple[ReportColumn, ...]
+
+
+@dataclass(frozen=True)
+class ReportTemplate:
+    title: str
+    sections: Tuple[ReportSection, ...]
+    landscape: bool = False
+
+
+@dataclass
+class ReportData:
+    subtitle: str
+    generated_at: datetime
+    sections: Dict[str, List[Tuple[Any, ...]]] = field(default_factory=dict)
+    notes: List[str] = field(default_factory=list)
+
+
+def renderer_available(report_format: str) -> bool:
+    try:
+        __import__(RENDERER_MODULES[report_format])
+    except (KeyError, ImportError):
+        return False
+    return True
+
+
+def totals(section: ReportSection, rows: Sequence[Sequence[Any]]) -> Optional[List[Any]]:
+    if not any(column.total for column in section.columns) or not rows:
+        return None
+    line: List[Any] = []
+    for index, column in enumerate(section.columns):
+        if column.total:
+            line.append(sum(row[index] or 0 for row in rows))
+        else:
+            line.append("Total" if index == 0 else None)
+    return line
+
+
+def display(value: Any, kind: str) -> str:
+    if value is None:
+        return ""
+    if kind == "int":
+        return f"{int(value):,}"
+    if kind == "number":
+        return f"{float(value):,.2f}"
+    if kind == "percent":
+        return f"{float(value):.2f}%"
+    if kind == "date" and isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def render_xlsx(template: ReportTemplate, data: ReportData, path: str) -> None:
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "remove_timezone": True})
+    try:
+        formats = {
+            "title": workbook.add_format({"bold": True, "font_size": 14}),
+            "header": workbook.add_format({"bold": True, "bg_color": "#E2EFDA", "border": 1}),
+            "total": workbook.add_format({"bold": True, "top": 1}),
+            "int": workbook.add_format({"num_format": "#,##0"}),
+            "number": workbook.add_format({"num_format": "#,##0.00"}),
+            "percent": workbook.add_format({"num_format": "0.00\"%\""}),
+            "date": workbook.add_format({"num_format": "yyyy-mm-dd"}),
+            "text": None,
+        }
+        for section in template.sections:
+            sheet = workbook.add_worksheet(section.title[:31])
+            # constant_memory writes row by row, so every row is written in order
+            sheet.write(0, 0, f"{template.title} - {data.subtitle}", formats["title"])
+            sheet.write(1, 0, f"Generated {data.generated_at:%Y-%m-%d %H:%M}")
+            for index, column in enumerate(section.columns):
+                sheet.set_column(index, index, column.width)
+                sheet.write(3, index, column.label, formats["header"])
+            row_number = 4
+            rows = data.sections.get(section.key, [])
+            for row in rows:
+                for index, column in enumerate(section.columns):
+                    value = row[index]
+                    if isinstance(value, datetime):
+                        sheet.write_datetime(row_number, index, value, formats["date"])
+                    elif isinstance(value, date):
+                        sheet.write_datetime(row_number, index, datetime(value.year, value.month, value.day), formats["date"])
+                    elif value is None:
+                        sheet.write_blank(row_number, index, None)
+                    else:
+                        sheet.write(row_number, index, value, formats[column.kind])
+                row_number += 1
+            total_line = totals(section, rows)
+            if total_line:
+                for index, value in enumerate(total_line):
+                    sheet.write(row_number, index, value, formats["total"])
+                row_number += 1
+            for note in data.notes:
+                row_number += 1
+                sheet.write(row_number, 0, note)
+    finally:
+        workbook.close()
+
+
+def render_pdf(template: ReportTemplate, data: ReportData, path: str) -> None:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, TableStyle
+
+    page_size = landscape(A4) if template.landscape else A4
+    styles = getSampleStyleSheet()
+    story: List[Any] = [
+        Paragraph(template.title, styles["Title"]),
+        Paragraph(data.subtitle, styles["Heading3"]),
+        Paragraph(f"Generated {data.generated_at:%Y-%m-%d %H:%M}", styles["Normal"]),
+        Spacer(1, 6 * mm),
+    ]
+    usable_width = page_size[0] - 30 * mm
+    for section in template.sections:
+        rows = data.sections.get(section.key, [])
+        story.append(Paragraph(section.title, styles["Heading2"]))
+        table_rows = [[column.label for column in section.columns]]
+        table_rows.extend([display(value, column.kind) for value, column in zip(row, section.columns)] for row in rows)
+        total_line = totals(section, rows)
+        if total_line:
+            table_rows.append([display(value, column.kind) for value, column in zip(total_line, section.columns)])
+        scale = usable_width / sum(column.width for column in section.columns)
+        table = LongTable(table_rows, colWidths=[column.width * scale for column in section.columns], repeatRows=1)
+        style = [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#E2EFDA")),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ]
+        for index, column in enumerate(section.columns):
+            if column.kind != "text":
+                style.append(("ALIGN", (index, 1), (index, -1), "RIGHT"))
+        if total_line:
+            style.append(("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"))
+        table.setStyle(TableStyle(style))
+        story.extend([table, Spacer(1, 6 * mm)])
+    for note in data.notes:
+        story.append(Paragraph(note, styles["Italic"]))
+
+    document = SimpleDocTemplate(
+        path, pagesize=page_size, leftMargin=15 * mm, rightMargin=15 * mm, title=template.title
+    )
+    document.build(story)
+
+
+RENDERERS = {"xlsx": render_xlsx, "pdf": render_pdf}
+
+
+def render(report_format: str, template: ReportTemplate, data: ReportData, path: str) -> int:
+    """Render to ``path`` atomically (temp file + rename); returns the size in bytes."""
+    partial = f"{path}.{os.getpid()}.partial"
+    try:
+        RENDERERS[report_format](template, data, partial)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return os.path.getsize(path)
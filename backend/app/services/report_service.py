@@ -0,0 +1,368 @@
+"""Background report engine: quarterly emission compliance, tree inventory and fee collection.
+
+``POST /reports/{name}`` validates the report's parameters and computes the
+data version of its source tables (row count and latest ``updated_at`` of
+each). The artifact is cached on disk under a key of (report, parameters,
+format, data version):
+
+- when that file already exists, the download link is returned at once;
+- otherwise a ``reports.render`` job is queued (or the one already queued for
+  the same key is returned). The job collects the rows with grouped queries in
+  a worker thread and renders them in the job process pool, so neither the
+  query nor the rendering touches the request loop.
+
+Any write to a source table changes the version and therefore the key; stale
+artifacts are pruned after ``REPORT_ARTIFACT_TTL_HOURS``. ``REPORTS_DIR`` must
+be shared by the API and worker processes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field
+from sqlalchemy import Table, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import crud_tree_inventory
+from app.crud.crud_emission import office_compliance
+from app.crud.crud_fee import urban_greening_fee_record
+from app.db.database import SessionLocal
+from app.models.emission_models import Office, Test, Vehicle
+from app.models.job_models import Job
+from app.models.tree_inventory_models import TreeInventory
+from app.models.urban_greening_models import FeeRecord
+from app.services.job_service import enqueue_sync
+from app.services.report_rendering import (
+    CONTENT_TYPES,
+    ReportColumn,
+    ReportData,
+    ReportSection,
+    ReportTemplate,
+    render,
+)
+
+logger = logging.getLogger(__name__)
+
+RENDER_JOB = "reports.render"
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    name: str
+    template: ReportTemplate
+    params: Type[BaseModel]
+    sources: Tuple[Table, ...]
+    permission: str
+    collect: Callable[[Session, Any], ReportData]
+
+
+REPORTS: Dict[str, ReportDefinition] = {}
+
+
+def report(
+    name: str, *, template: ReportTemplate, params: Type[BaseModel], sources: Tuple[Any, ...], permission: str
+) -> Callable:
+    """Register ``collect(db, params) -> ReportData`` as the data step of report ``name``."""
+
+    def decorator(collect: Callable[[Session, Any], ReportData]) -> Callable:
+        tables = tuple(model.__table__ for model in sources)
+        REPORTS[name] = ReportDefinition(name, template, params, tables, permission, collect)
+        return collect
+
+    return decorator
+
+
+def get_report(name: str) -> Optional[ReportDefinition]:
+    return REPORTS.get(name)
+
+
+# cache keys
+
+
+def data_version(db: Session, tables: Tuple[Table, ...]) -> str:
+    """Row count and latest ``updated_at`` of every source table, in one round trip."""
+    parts = [
+        select(
+            literal(position).label("position"),
+            func.count().label("rows"),
+            func.max(table.c.updated_at).label("updated_at"),
+        ).select_from(table)
+        for position, table in enumerate(tables)
+    ]
+    rows = sorted(db.execute(union_all(*parts) if len(parts) > 1 else parts[0]).all(), key=lambda row: row.position)
+    fingerprint = ";".join(f"{table.fullname}:{row.rows}:{row.updated_at}" for table, row in zip(tables, rows))
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+
+
+def artifact_key(name: str, params: BaseModel, report_format: str, version: str) -> str:
+    identity = json.dumps(
+        {"report": name, "params": params.model_dump(mode="json"), "format": report_format, "version": version},
+        sort_keys=True,
+    )
+    return hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
+def artifact_path(name: str, key: str, report_format: str) -> Path:
+    return Path(settings.REPORTS_DIR) / name / f"{key}.{report_format}"
+
+
+def download_url(name: str, key: str, report_format: str) -> str:
+    return f"/api/v1/reports/{name}/artifacts/{key}.{report_format}"
+
+
+def find_artifact(name: str, key: str, report_format: str) -> Optional[Path]:
+    path = artifact_path(name, key, report_format)
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    return path if age < settings.REPORT_ARTIFACT_TTL_HOURS * 3600 else None
+
+
+def prune_artifacts() -> int:
+    removed = 0
+    cutoff = time.time() - settings.REPORT_ARTIFACT_TTL_HOURS * 3600
+    root = Path(settings.REPORTS_DIR)
+    if not root.is_dir():
+        return 0
+    for path in root.glob("*/*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def pending_job(db: Session, key: str) -> Optional[Job]:
+    """A queued or running render of the same artifact, so concurrent requests share it."""
+    return (
+        db.query(Job)
+        .filter(
+            Job.kind == RENDER_JOB,
+            Job.status.in_(("queued", "running")),
+            Job.payload["artifact_key"].astext == key,
+        )
+        .order_by(Job.created_at)
+        .first()
+    )
+
+
+def render_payload(name: str, params: BaseModel, report_format: str, key: str) -> Dict[str, Any]:
+    return {"report": name, "format": report_format, "params": params.model_dump(mode="json"), "artifact_key": key}
+
+
+def request_report(
+    db: Session, definition: ReportDefinition, params: BaseModel, report_format: str, created_by: Optional[str]
+) -> Dict[str, Any]:
+    """The cached artifact if the data has not changed, else the (possibly shared) render job."""
+    key = artifact_key(definition.name, params, report_format, data_version(db, definition.sources))
+    response: Dict[str, Any] = {"report": definition.name, "format": report_format, "artifact_key": key}
+    if find_artifact(definition.name, key, report_format):
+        return {**response, "status": "ready", "download_url": download_url(definition.name, key, report_format)}
+    job = pending_job(db, key) or enqueue_sync(
+        db, RENDER_JOB, render_payload(definition.name, params, report_format, key), created_by=created_by
+    )
+    return {**response, "status": job.status, "job_id": job.id}
+
+
+def build(payload: Dict[str, Any], progress: Callable[[float, str], None], submit: Callable[..., Any]) -> Dict[str, Any]:
+    """Job body: collect with ``SessionLocal`` in this thread, render through ``submit`` (the process pool)."""
+    definition = REPORTS[payload["report"]]
+    report_format = payload["format"]
+    key = payload["artifact_key"]
+    result = {
+        "report": definition.name,
+        "format": report_format,
+        "artifact_key": key,
+        "content_type": CONTENT_TYPES[report_format],
+        "download_url": download_url(definition.name, key, report_format),
+    }
+    path = artifact_path(definition.name, key, report_format)
+    if find_artifact(definition.name, key, report_format):
+        return {**result, "size": path.stat().st_size}
+
+    params = definition.params.model_validate(payload["params"])
+    with SessionLocal() as db:
+        data = definition.collect(db, params)
+    rows = sum(len(section_rows) for section_rows in data.sections.values())
+    progress(0.4, f"Collected {rows} rows; rendering {report_format.upper()}")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    size = submit(render, report_format, definition.template, data, str(path)).result()
+    pruned = prune_artifacts()
+    if pruned:
+        logger.info("Pruned %s expired report artifacts", pruned)
+    return {**result, "size": size}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# reports
+
+
+class ComplianceReportParams(BaseModel):
+    year: int = Field(..., ge=2000, le=2100)
+    quarter: Optional[int] = Field(None, ge=1, le=4, description="Omit for the whole year")
+    search_term: Optional[str] = Field(None, description="Only offices whose name contains this")
+
+
+@report(
+    "emission-compliance",
+    template=ReportTemplate(
+        title="Emission Compliance by Office",
+        sections=(
+            ReportSection(
+                "offices",
+                "Offices",
+                (
+                    ReportColumn("office_name", "Office", width=40),
+                    ReportColumn("total_vehicles", "Vehicles", "int", total=True),
+                    ReportColumn("tested_vehicles", "Tested", "int", total=True),
+                    ReportColumn("compliant_vehicles", "Passed", "int", total=True),
+                    ReportColumn("non_compliant_vehicles", "Failed", "int", total=True),
+                    ReportColumn("untested_vehicles", "Not tested", "int", total=True),
+                    ReportColumn("compliance_rate", "Pass rate", "percent"),
+                    ReportColumn("last_test_date", "Last test", "date"),
+                ),
+            ),
+        ),
+        landscape=True,
+    ),
+    params=ComplianceReportParams,
+    sources=(Office, Vehicle, Test),
+    permission="office.view",
+)
+def collect_compliance(db: Session, params: ComplianceReportParams) -> ReportData:
+    rows = []
+    for row in office_compliance.compliance_by_office(
+        db, year=params.year, quarter=params.quarter, search_term=params.search_term
+    ):
+        failed = row.tested_vehicles - row.compliant_vehicles
+        rate = round(row.compliant_vehicles / row.tested_vehicles * 100, 2) if row.tested_vehicles else 0.0
+        rows.append(
+            (
+                row.office_name,
+                row.total_vehicles,
+                row.tested_vehicles,
+                row.compliant_vehicles,
+                failed,
+                row.total_vehicles - row.tested_vehicles,
+                rate,
+                row.last_test_date,
+            )
+        )
+    period = f"Q{params.quarter} {params.year}" if params.quarter else str(params.year)
+    notes = ["Each vehicle counts once, by its latest test in the period."]
+    return ReportData(subtitle=period, generated_at=_now(), sections={"offices": rows}, notes=notes)
+
+
+class TreeInventoryReportParams(BaseModel):
+    barangay: Optional[str] = Field(None, description="Only barangays whose name contains this")
+    include_archived: bool = False
+
+
+@report(
+    "tree-inventory",
+    template=ReportTemplate(
+        title="Tree Inventory Summary",
+        sections=(
+            ReportSection(
+                "barangays",
+                "By barangay",
+                (
+                    ReportColumn("barangay", "Barangay", width=30),
+                    ReportColumn("total", "Trees", "int", total=True),
+                    ReportColumn("alive", "Alive", "int", total=True),
+                    ReportColumn("cut", "Cut", "int", total=True),
+                    ReportColumn("dead", "Dead", "int", total=True),
+                    ReportColumn("healthy", "Healthy", "int", total=True),
+                    ReportColumn("needs_attention", "Needs attention", "int", total=True),
+                    ReportColumn("diseased", "Diseased", "int", total=True),
+                    ReportColumn("species", "Species", "int"),
+                ),
+            ),
+            ReportSection(
+                "species",
+                "Top species",
+                (
+                    ReportColumn("species", "Species", width=34),
+                    ReportColumn("common_name", "Common name", width=26),
+                    ReportColumn("total", "Trees", "int", total=True),
+                    ReportColumn("alive", "Alive", "int", total=True),
+                ),
+            ),
+        ),
+        landscape=True,
+    ),
+    params=TreeInventoryReportParams,
+    sources=(TreeInventory,),
+    permission="tree.view",
+)
+def collect_tree_inventory(db: Session, params: TreeInventoryReportParams) -> ReportData:
+    barangays = [
+        (row.barangay or "Unknown", *row[1:])
+        for row in crud_tree_inventory.get_barangay_summary(db, params.barangay, params.include_archived)
+    ]
+    species = [tuple(row) for row in crud_tree_inventory.get_species_summary(db, params.barangay, params.include_archived)]
+    subtitle = f"Barangay: {params.barangay}" if params.barangay else "All barangays"
+    if params.include_archived:
+        subtitle += " (including archived trees)"
+    return ReportData(subtitle=subtitle, generated_at=_now(), sections={"barangays": barangays, "species": species})
+
+
+class FeeCollectionReportParams(BaseModel):
+    year: int = Field(..., ge=2000, le=2100)
+
+
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December")
+
+
+def _fee_columns(label: str) -> Tuple[ReportColumn, ...]:
+    return (
+        ReportColumn("label", label, width=24),
+        ReportColumn("records", "Records", "int", total=True),
+        ReportColumn("billed", "Billed", "number", width=18, total=True),
+        ReportColumn("collected", "Collected", "number", width=18, total=True),
+        ReportColumn("pending", "Pending records", "int", total=True),
+    )
+
+
+@report(
+    "fee-collection",
+    template=ReportTemplate(
+        title="Urban Greening Fee Collection",
+        sections=(
+            ReportSection("months", "By month", _fee_columns("Month")),
+            ReportSection("types", "By fee type", _fee_columns("Fee type")),
+        ),
+    ),
+    params=FeeCollectionReportParams,
+    sources=(FeeRecord,),
+    permission="fee.view",
+)
+def collect_fee_collection(db: Session, params: FeeCollectionReportParams) -> ReportData:
+    def plain(row: Any, label: str) -> Tuple[Any, ...]:
+        return (label, row.records, float(row.billed or 0), float(row.collected or 0), row.pending)
+
+    months = [
+        plain(row, MONTHS[int(row.month) - 1])
+        for row in urban_greening_fee_record.collection_summary(db, year=params.year, group_by="month")
+    ]
+    types = [
+        plain(row, row.type.replace("_", " ").title())
+        for row in urban_greening_fee_record.collection_summary(db, year=params.year, group_by="type")
+    ]
+    return ReportData(subtitle=str(params.year), generated_at=_now(), sections={"months": months, "types": types})
@@ -1,67 +1,194 @@
+import asyncio
+import logging
 import psutil
 import platform
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
+from app.core.config import settings
+from app.db.database import engine, sync_engine
+from app.middleware.request_tracking_middleware import request_stats
 from app.models.auth_models import User, ActivityLog, UserSession, FailedLogin
 from app.models.audit_models import AuditLog
 
+logger = logging.getLogger(__name__)
+
+# How often the sampler wakes up to measure event-loop lag within an interval
+LAG_PROBE_SECONDS = 0.25
+
+
+def _get_status(value: float) -> str:
+    if value < 60:
+        return "good"
+    elif value < 80:
+        return "warning"
+    else:
+        return "critical"
+
+
+def _pool_stats(pool) -> Dict[str, Any]:
+    try:
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checked_in": pool.checkedin(),
+        }
+    except Exception:
+        return {"size": None, "checked_out": None, "overflow": None, "checked_in": None}
+
+
+class SystemMetricsSampler:
+    """Background task that samples process/host metrics into a ring buffer.
+
+    ``psutil.cpu_percent(interval=1)`` used to run inside the request handler
+    and block the event loop for a second. The sampler instead collects CPU,
+    memory, disk, network deltas, event-loop lag, DB pool usage and in-flight
+    requests every ``interval_seconds``; readers only copy the latest samples.
+    """
+
+    def __init__(self, interval_seconds: float = 5.0, history_size: int = 120) -> None:
+        self.interval_seconds = interval_seconds
+        self._history: deque = deque(maxlen=history_size)
+        self._task: Optional[asyncio.Task] = None
+        self._last_net: Optional[tuple] = None
+        self._max_lag_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        # Prime cpu_percent so the first non-blocking reading is meaningful
+        psutil.cpu_percent(interval=None)
+        self._task = asyncio.create_task(self._run(), name="system-metrics-sampler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._wait_interval()
+                host = await asyncio.to_thread(self._collect_host)
+                self._history.append(self._build_sample(host))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("System metrics sampling failed: %s", exc)
+
+    async def _wait_interval(self) -> None:
+        """Sleep for one interval in short probes, recording the worst loop lag seen."""
+        self._max_lag_ms = 0.0
+        deadline = time.monotonic() + self.interval_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            step = min(LAG_PROBE_SECONDS, remaining)
+            expected = time.monotonic() + step
+            await asyncio.sleep(step)
+            lag_ms = max(0.0, (time.monotonic() - expected) * 1000)
+            self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+
+    def _collect_host(self) -> Dict[str, Any]:
+        cpu_percent = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        network = psutil.net_io_counters()
+
+        now = time.monotonic()
+        sent_per_sec = recv_per_sec = 0.0
+        if self._last_net is not None:
+            last_at, last_sent, last_recv = self._last_net
+            elapsed = max(now - last_at, 1e-6)
+            sent_per_sec = max(0, network.bytes_sent - last_sent) / elapsed
+            recv_per_sec = max(0, network.bytes_recv - last_recv) / elapsed
+        self._last_net = (now, network.bytes_sent, network.bytes_recv)
+
+        return {
+            "cpu_percent": round(cpu_percent, 1),
+            "memory_percent": round(memory.percent, 1),
+            "disk_percent": round((disk.used / disk.total) * 100, 1),
+            "net_sent_bytes_per_sec": round(sent_per_sec, 1),
+            "net_recv_bytes_per_sec": round(recv_per_sec, 1),
+        }
+
+    def _build_sample(self, host: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            **host,
+            "event_loop_lag_ms": round(self._max_lag_ms, 1),
+            "db_pool": {
+                "async": _pool_stats(engine.sync_engine.pool),
+                "sync": _pool_stats(sync_engine.pool),
+            },
+            "in_flight_requests": request_stats.in_flight,
+        }
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return self._history[-1] if self._history else None
+
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        samples = list(self._history)
+        if limit is not None:
+            samples = samples[-limit:] if limit > 0 else []
+        return samples
+
+    def snapshot_now(self) -> Dict[str, Any]:
+        """Non-blocking one-off sample for when the background task has not run yet."""
+        return self._build_sample(self._collect_host())
+
+
+system_metrics_sampler = SystemMetricsSampler(
+    interval_seconds=settings.SYSTEM_METRICS_INTERVAL_SECONDS,
+    history_size=settings.SYSTEM_METRICS_HISTORY_SIZE,
+)
+
 
 class SystemHealthService:
     """Service for collecting real system health metrics and statistics"""
     
     @staticmethod
     def get_system_metrics() -> List[Dict[str, Any]]:
-        """Get real-time system health metrics using psutil"""
+        """Get the latest sampled system health metrics (never blocks on psutil)"""
         try:
-            # CPU usage percentage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            
-            # Memory usage
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            
-            # Disk usage for the main drive
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
-            
-            # Network I/O (simplified metric)
-            network = psutil.net_io_counters()
-            # Convert to a percentage based on typical usage patterns (this is a simplified approach)
-            # In production, you might want to track this over time for more meaningful metrics
-            network_activity = min(((network.bytes_sent + network.bytes_recv) / (1024 * 1024 * 1024)) * 10, 100)
-            
-            # Determine status based on usage
-            def get_status(value: float) -> str:
-                if value < 60:
-                    return "good"
-                elif value < 80:
-                    return "warning"
-                else:
-                    return "critical"
-            
+            sample = system_metrics_sampler.latest() or system_metrics_sampler.snapshot_now()
+            network_kbps = (sample["net_sent_bytes_per_sec"] + sample["net_recv_bytes_per_sec"]) / 1024
+
             return [
                 {
                     "metric": "CPU Usage",
-                    "value": round(cpu_percent, 1),
-                    "status": get_status(cpu_percent)
+                    "value": sample["cpu_percent"],
+                    "status": _get_status(sample["cpu_percent"])
                 },
                 {
                     "metric": "Memory Usage", 
-                    "value": round(memory_percent, 1),
-                    "status": get_status(memory_percent)
+                    "value": sample["memory_percent"],
+                    "status": _get_status(sample["memory_percent"])
                 },
                 {
                     "metric": "Disk Space",
-                    "value": round(disk_percent, 1),
-                    "status": get_status(disk_percent)
+                    "value": sample["disk_percent"],
+                    "status": _get_status(sample["disk_percent"])
                 },
                 {
                     "metric": "Network I/O",
-                    "value": round(network_activity, 1),
-                    "status": get_status(network_activity)
+                    "value": round(network_kbps, 1),
+                    "unit": "KB/s",
+                    "status": "good"
                 }
             ]
         except Exception as e:
@@ -72,6 +199,17 @@ class SystemHealthService:
                 {"metric": "Disk Space", "value": 0, "status": "warning"},
                 {"metric": "Network I/O", "value": 0, "status": "warning"}
             ]
+
+    @staticmethod
+    def get_system_health(history_limit: int = 60) -> Dict[str, Any]:
+        """Latest metrics plus a short history series from the background sampler"""
+        return {
+            "metrics": SystemHealthService.get_system_metrics(),
+            "latest": system_metrics_sampler.latest(),
+            "history": system_metrics_sampler.history(limit=history_limit),
+            "interval_seconds": system_metrics_sampler.interval_seconds,
+            "sampler_running": system_metrics_sampler.running,
+        }
     
     @staticmethod
     def get_system_uptime() -> str:
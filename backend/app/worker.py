@@ -0,0 +1,38 @@
+"""Standalone background job worker.
+
+    python -m app.worker
+
+Runs the same ``JobWorkerPool`` as the API lifespan (set ``JOB_RUN_IN_APP=false``
+on the API processes to keep heavy jobs off them) until SIGINT/SIGTERM.
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.db.database import engine
+from app.services import job_handlers  # noqa: F401  (fills the handler registry)
+from app.services.job_service import job_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    job_pool.start()
+    logger.info("Job worker %s started with %s workers", job_pool.worker_id, job_pool.concurrency)
+    await stop.wait()
+
+    logger.info("Job worker %s stopping", job_pool.worker_id)
+    # Jobs interrupted here go back to the queue
+    await job_pool.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,12 @@
+"""Endpoint benchmark suite.
+
+Boots the API with uvicorn against a seeded local Postgres (see
+``scripts/generate_benchmark_data.py``), authenticates with a locally generated
+ES256 key, drives the hot endpoints concurrently and records p50/p95/p99
+latency and throughput per scenario. Results are compared against a JSON
+baseline and the run fails when a scenario regresses beyond the threshold.
+
+    python -m benchmarks --update-baseline          # record benchmarks/baseline.json
+    python -m benchmarks                            # compare against it (exit 1 on regression)
+    python -m benchmarks --only trees_map,trees_stats --requests 50
+"""
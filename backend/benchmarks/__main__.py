@@ -0,0 +1,150 @@
+"""CLI entry point: ``python -m benchmarks``."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy.engine import make_url
+
+from benchmarks.auth import SigningKey, ensure_benchmark_user
+from benchmarks.runner import run_scenario
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.server import BACKEND_ROOT, BenchmarkServer
+from benchmarks.stats import compare
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "db", "postgres"}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _database_url(explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    if os.environ.get("DATABASE_URL"):
+        return os.environ["DATABASE_URL"]
+    from app.core.config import settings
+    return settings.DATABASE_URL
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark hot API endpoints against a seeded local database")
+    parser.add_argument("--only", help="Comma-separated scenario names")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed regression as a fraction (0.2 = 20%%)")
+    parser.add_argument("--output", type=Path, help="Also write this run's results to a JSON file")
+    parser.add_argument("--database-url", help="Defaults to DATABASE_URL")
+    parser.add_argument("--allow-remote", action="store_true", help="Permit non-local database hosts")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace, base_url: str, token: str) -> Dict[str, Dict[str, float]]:
+    selected = set(args.only.split(",")) if args.only else None
+    scenarios = [scenario for scenario in SCENARIOS if selected is None or scenario.name in selected]
+    if selected and len(scenarios) != len(selected):
+        unknown = selected - {scenario.name for scenario in scenarios}
+        raise SystemExit(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=120,
+        limits=limits,
+    ) as client:
+        print(f"{'scenario':<30} {'req':>6} {'err':>4} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for scenario in scenarios:
+            result = await run_scenario(
+                client, scenario, requests=args.requests, concurrency=args.concurrency, warmup=args.warmup
+            )
+            results[scenario.name] = result.as_dict()
+            print(
+                f"{scenario.name:<30} {result.requests:>6} {result.errors:>4} {result.rps:>8.1f} "
+                f"{result.p50_ms:>8.1f}ms {result.p95_ms:>8.1f}ms {result.p99_ms:>8.1f}ms"
+            )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.list:
+        for scenario in SCENARIOS:
+            print(f"{scenario.name:<30} {scenario.path}")
+        return 0
+
+    database_url = _database_url(args.database_url)
+    url = make_url(database_url)
+    if url.host not in LOCAL_HOSTS and not args.allow_remote:
+        print(f"Refusing to benchmark against non-local database host '{url.host}' (use --allow-remote)")
+        return 2
+
+    key = SigningKey.generate()
+    ensure_benchmark_user(url.set(drivername="postgresql").render_as_string(hide_password=False))
+
+    env = {
+        "DATABASE_URL": database_url,
+        "SUPABASE_JWT_PUBLIC_KEY": key.public_pem,
+    }
+    with BenchmarkServer(env, workers=args.workers) as server:
+        results = asyncio.run(_run(args, server.base_url, key.mint_token()))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    for setting in ("requests", "concurrency", "workers"):
+        if baseline.get("meta", {}).get(setting) != report["meta"][setting]:
+            print(f"warning: baseline {setting}={baseline['meta'].get(setting)} differs from this run ({report['meta'][setting]})")
+
+    regressions = compare(baseline.get("scenarios", {}), results, threshold=args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} (baseline {baseline.get('meta', {}).get('git_commit')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
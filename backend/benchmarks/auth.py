@@ -0,0 +1,76 @@
+"""Local ES256 signing key and benchmark super admin for authenticated requests.
+
+The API verifies Supabase JWTs with ``SUPABASE_JWT_PUBLIC_KEY``; the benchmark
+server is started with the public half of a key generated here, so tokens can
+be minted locally without touching Supabase.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from dataclasses import dataclass
+
+import jwt
+import psycopg
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+BENCHMARK_EMAIL = "benchmark@envirotrace.local"
+# Fixed so repeated runs reuse the same app_auth.users row
+BENCHMARK_SUPABASE_USER_ID = uuid.UUID("00000000-0000-4000-8000-0000000b3e7c")
+
+
+@dataclass
+class SigningKey:
+    private_pem: bytes
+    public_pem: str
+
+    @classmethod
+    def generate(cls) -> "SigningKey":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        return cls(private_pem=private_pem, public_pem=public_pem)
+
+    def mint_token(
+        self,
+        subject: uuid.UUID = BENCHMARK_SUPABASE_USER_ID,
+        email: str = BENCHMARK_EMAIL,
+        ttl_seconds: int = 3600,
+    ) -> str:
+        now = int(time.time())
+        payload = {
+            "sub": str(subject),
+            "email": email,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "iat": now,
+            "exp": now + ttl_seconds,
+        }
+        return jwt.encode(payload, self.private_pem, algorithm="ES256")
+
+
+def ensure_benchmark_user(conninfo: str) -> None:
+    """Create (or re-enable) the super admin the benchmark token maps to."""
+    with psycopg.connect(conninfo) as conn:
+        conn.execute(
+            """
+            INSERT INTO app_auth.users (email, supabase_user_id, is_approved, is_super_admin, is_suspended)
+            VALUES (%s, %s, true, true, false)
+            ON CONFLICT (email) DO UPDATE
+               SET supabase_user_id = EXCLUDED.supabase_user_id,
+                   is_approved = true,
+                   is_super_admin = true,
+                   is_suspended = false,
+                   deleted_at = NULL
+            """,
+            (BENCHMARK_EMAIL, BENCHMARK_SUPABASE_USER_ID),
+        )
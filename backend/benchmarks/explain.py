@@ -0,0 +1,104 @@
+"""Plan snapshot check: ``python -m benchmarks.explain``.
+
+Captures ``EXPLAIN (FORMAT JSON)`` for the queries in
+``benchmarks.plan_queries`` against the seeded local database and compares the
+normalised shapes with ``benchmarks/plan_snapshots.json``. Exits 1 when a large
+table that used to be read through an index is now sequentially scanned (or on
+any shape change with ``--strict``).
+
+    python -m benchmarks.explain --update      # record the snapshot
+    python -m benchmarks.explain               # compare against it
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.database import _to_sync_psycopg
+from benchmarks.__main__ import LOCAL_HOSTS, _database_url, _git_commit
+from benchmarks.plan_queries import PLAN_QUERIES, capture_plans, relation_rows, snapshot_relations
+from benchmarks.plan_shapes import compare_plans
+
+DEFAULT_SNAPSHOT = Path(__file__).resolve().parent / "plan_snapshots.json"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Snapshot and check query plans of critical queries")
+    parser.add_argument("--snapshot", type=Path, default=DEFAULT_SNAPSHOT)
+    parser.add_argument("--update", action="store_true", help="Write the captured plans as the new snapshot")
+    parser.add_argument("--only", help="Comma-separated query names")
+    parser.add_argument("--min-rows", type=float, default=10_000, help="Tables smaller than this may seq scan")
+    parser.add_argument("--strict", action="store_true", help="Fail on any plan shape change")
+    parser.add_argument("--database-url", help="Defaults to DATABASE_URL")
+    parser.add_argument("--allow-remote", action="store_true", help="Permit non-local database hosts")
+    parser.add_argument("--list", action="store_true", help="List queries and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.list:
+        for query in PLAN_QUERIES:
+            print(f"{query.name:<30} {query.description}")
+        return 0
+
+    database_url = _database_url(args.database_url)
+    if make_url(database_url).host not in LOCAL_HOSTS and not args.allow_remote:
+        print(f"Refusing to explain against non-local database host '{make_url(database_url).host}' (use --allow-remote)")
+        return 2
+
+    queries = PLAN_QUERIES
+    if args.only:
+        wanted = set(args.only.split(","))
+        queries = [query for query in PLAN_QUERIES if query.name in wanted]
+
+    sync_engine = create_engine(_to_sync_psycopg(database_url))
+    async_engine = create_async_engine(database_url)
+    try:
+        plans = capture_plans(sync_engine, async_engine, queries)
+        rows = relation_rows(sync_engine, snapshot_relations(plans))
+    finally:
+        sync_engine.dispose()
+        asyncio.run(async_engine.dispose())
+
+    if args.update:
+        snapshot = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "git_commit": _git_commit(),
+            },
+            "relation_rows": rows,
+            "queries": plans,
+        }
+        args.snapshot.write_text(json.dumps(snapshot, indent=2, sort_keys=True) + "\n")
+        print(f"Plan snapshot for {len(plans)} queries written to {args.snapshot}")
+        return 0
+
+    if not args.snapshot.exists():
+        print(f"No snapshot at {args.snapshot}; run with --update first")
+        return 0
+
+    snapshot = json.loads(args.snapshot.read_text())
+    changes = compare_plans(snapshot.get("queries", {}), plans, rows, min_rows=args.min_rows)
+    for change in changes:
+        print(f"  {change}")
+    failing = [change for change in changes if change.regression or args.strict]
+    if failing:
+        print(f"\n{len(failing)} plan regression(s) (snapshot {snapshot.get('meta', {}).get('git_commit')})")
+        return 1
+    print(f"\nNo plan regressions across {len(plans)} queries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
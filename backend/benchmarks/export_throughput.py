@@ -0,0 +1,116 @@
+"""Export throughput check: ``python -m benchmarks.export_throughput``.
+
+Streams each export (``app.services.export_service``) from the seeded local
+database and reports rows/s and MB/s per entity and format. With
+``--trace-memory`` it also reports the peak traced allocation, which should stay
+near one batch regardless of row count (tracing slows the run, so rows/s is not
+gated then). Exits 1 when any export falls below ``--min-rows-per-sec``.
+
+    python -m benchmarks.export_throughput
+    python -m benchmarks.export_throughput --only trees,vehicles --formats csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.db.database import _to_sync_psycopg
+from app.schemas.audit_schemas import AuditLogFilter
+from app.services import export_service
+from benchmarks.__main__ import LOCAL_HOSTS, _database_url
+
+EXPORTS: Dict[str, Callable[[], Select]] = {
+    "vehicles": lambda: export_service.vehicles_select(),
+    "tests": lambda: export_service.tests_select(),
+    "trees": lambda: export_service.trees_select(is_archived=None),
+    "fees": lambda: export_service.fees_select(),
+    "audit-logs": lambda: export_service.audit_logs_select(AuditLogFilter()),
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure streaming export throughput")
+    parser.add_argument("--only", help="Comma-separated entities (default: all)")
+    parser.add_argument("--formats", default="csv,ndjson,parquet")
+    parser.add_argument("--batch-size", type=int, default=settings.EXPORT_BATCH_SIZE)
+    parser.add_argument("--min-rows-per-sec", type=float, default=100_000)
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak allocation instead of gating speed")
+    parser.add_argument("--database-url", help="Defaults to DATABASE_URL")
+    parser.add_argument("--allow-remote", action="store_true", help="Permit non-local database hosts")
+    return parser.parse_args(argv)
+
+
+def measure(engine: Any, stmt: Select, export_format: str, batch_size: int, trace: bool = False) -> Dict[str, float]:
+    rows = 0
+
+    def counted() -> Iterator[List[Any]]:
+        nonlocal rows
+        for partition in export_service.stream_partitions(engine.connect, stmt, batch_size):
+            rows += len(partition)
+            yield partition
+
+    writer = export_service.WRITERS[export_format]
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in writer(export_service.export_columns(stmt), counted()))
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "mb_per_sec": size / elapsed / 1e6 if elapsed else 0.0,
+        "peak_mb": peak / 1e6,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    database_url = _database_url(args.database_url)
+    if make_url(database_url).host not in LOCAL_HOSTS and not args.allow_remote:
+        print(f"Refusing to export from non-local database host '{make_url(database_url).host}' (use --allow-remote)")
+        return 2
+
+    entities = args.only.split(",") if args.only else list(EXPORTS)
+    formats = args.formats.split(",")
+    if "parquet" in formats and not export_service.parquet_available():
+        print("pyarrow not installed; skipping parquet")
+        formats.remove("parquet")
+
+    engine = create_engine(_to_sync_psycopg(database_url))
+    failures = 0
+    try:
+        print(f"{'export':<24}{'rows':>10}{'rows/s':>12}{'MB/s':>8}{'peak MB':>9}")
+        for entity in entities:
+            for export_format in formats:
+                result = measure(engine, EXPORTS[entity](), export_format, args.batch_size, args.trace_memory)
+                slow = not args.trace_memory and result["rows"] and result["rows_per_sec"] < args.min_rows_per_sec
+                failures += bool(slow)
+                print(
+                    f"{entity + '.' + export_format:<24}{result['rows']:>10}{result['rows_per_sec']:>12,.0f}"
+                    f"{result['mb_per_sec']:>8.1f}{result['peak_mb']:>9.1f}{'  SLOW' if slow else ''}"
+                )
+    finally:
+        engine.dispose()
+
+    if failures:
+        print(f"{failures} export(s) below {args.min_rows_per_sec:,.0f} rows/s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Named critical queries whose plans are snapshotted.
+
+Each entry runs the real CRUD code path, so a refactor that changes the SQL is
+picked up automatically. While it runs, every statement is EXPLAINed on the
+same cursor with the same bound parameters just before it executes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud import crud_tree_inventory
+from app.crud.crud_audit_log import audit_log_crud
+from app.crud.crud_emission import vehicle
+from app.db.query_stats import statement_shape
+from app.schemas.audit_schemas import AuditLogFilter
+from benchmarks.plan_shapes import plan_shape
+
+# Fixed keyset position inside the generated data range (2019-2025)
+CURSOR_POINT = datetime(2023, 6, 1, tzinfo=timezone.utc)
+CURSOR_ID = UUID(int=2 ** 128 - 1)
+
+
+@dataclass
+class PlanQuery:
+    name: str
+    description: str
+    run: Callable[[Any], Any]
+    is_async: bool = False
+
+
+def _vehicle_cursor() -> str:
+    return vehicle.paginator.encode_cursor([CURSOR_POINT, CURSOR_ID])
+
+
+def _tree_cursor() -> str:
+    return crud_tree_inventory.tree_pages.encode_cursor([CURSOR_POINT, CURSOR_ID])
+
+
+PLAN_QUERIES: List[PlanQuery] = [
+    PlanQuery(
+        "vehicle_keyset_first_page", "First vehicle page, newest first",
+        lambda db: vehicle.get_multi_optimized(db, limit=50, include_total=False),
+    ),
+    PlanQuery(
+        "vehicle_keyset_after", "Vehicle page after a cursor",
+        lambda db: vehicle.get_multi_optimized(db, limit=50, after=_vehicle_cursor(), include_total=False),
+    ),
+    PlanQuery(
+        "vehicle_keyset_before", "Vehicle page before a cursor",
+        lambda db: vehicle.get_multi_optimized(db, limit=50, before=_vehicle_cursor(), include_total=False),
+    ),
+    PlanQuery(
+        "vehicle_keyset_office", "Vehicle page filtered by office",
+        lambda db: vehicle.get_multi_optimized(
+            db, limit=50, filters={"office_id": UUID(int=1)}, include_total=False
+        ),
+    ),
+    PlanQuery(
+        "vehicle_trigram_search", "Vehicle search across plate/chassis/registration/driver",
+        lambda db: vehicle.search(db, search_term="ABC", limit=50, include_total=False),
+    ),
+    PlanQuery(
+        "vehicle_latest_test_window", "Vehicle page with the latest test per vehicle",
+        lambda db: vehicle.get_multi_with_test_info(db, limit=50, include_total=False),
+    ),
+    PlanQuery(
+        "tree_keyset_first_page", "First tree page, newest first",
+        lambda db: crud_tree_inventory.get_trees_page(db, limit=100),
+    ),
+    PlanQuery(
+        "tree_keyset_after", "Tree page after a cursor",
+        lambda db: crud_tree_inventory.get_trees_page(db, limit=100, after=_tree_cursor()),
+    ),
+    PlanQuery(
+        "tree_keyset_status", "Tree page filtered by status",
+        lambda db: crud_tree_inventory.get_trees_page(db, limit=100, status="cut"),
+    ),
+    PlanQuery(
+        "audit_logs_recent", "Latest audit log page with total",
+        lambda db: audit_log_crud.get_logs(db, filters=AuditLogFilter()),
+        is_async=True,
+    ),
+    PlanQuery(
+        "audit_logs_by_module", "Audit logs for one module",
+        lambda db: audit_log_crud.get_logs(db, filters=AuditLogFilter(module_name="emission")),
+        is_async=True,
+    ),
+    PlanQuery(
+        "audit_logs_by_user_and_range", "Audit logs for one user in a date range",
+        lambda db: audit_log_crud.get_logs(
+            db,
+            filters=AuditLogFilter(
+                user_email="benchmark@envirotrace.local",
+                date_from=datetime(2025, 1, 1, tzinfo=timezone.utc),
+                date_to=datetime(2025, 3, 31, tzinfo=timezone.utc),
+            ),
+        ),
+        is_async=True,
+    ),
+]
+
+
+@contextmanager
+def explain_statements(engine: Engine) -> Iterator[List[Dict[str, Any]]]:
+    """Collect ``{"statement", "plan"}`` for every SELECT executed on ``engine``."""
+    captured: List[Dict[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = cursor.fetchone()[0]
+        captured.append({"statement": statement_shape(statement), "plan": plan})
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _shapes(captured: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"statement": item["statement"], **plan_shape(item["plan"])} for item in captured]
+
+
+def capture_plans(
+    sync_engine: Engine,
+    async_engine: AsyncEngine,
+    queries: Optional[List[PlanQuery]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Plan shapes per query name; every query runs in a rolled-back transaction."""
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for query in queries or PLAN_QUERIES:
+        if query.is_async:
+            with explain_statements(async_engine.sync_engine) as captured:
+                asyncio.run(_run_async(async_engine, query))
+        else:
+            with explain_statements(sync_engine) as captured, Session(sync_engine) as db:
+                try:
+                    query.run(db)
+                finally:
+                    db.rollback()
+        results[query.name] = _shapes(captured)
+    return results
+
+
+async def _run_async(async_engine: AsyncEngine, query: PlanQuery) -> None:
+    try:
+        async with AsyncSession(async_engine) as db:
+            try:
+                await query.run(db)
+            finally:
+                await db.rollback()
+    finally:
+        # Connections are bound to this asyncio.run() loop
+        await async_engine.dispose()
+
+
+def relation_rows(sync_engine: Engine, relations: List[str]) -> Dict[str, float]:
+    """Planner row estimates (``pg_class.reltuples``) keyed by the names in ``relations``.
+
+    Plans EXPLAINed without VERBOSE name relations without their schema, so a
+    bare name matches that table in any schema (the largest one wins).
+    """
+    if not relations:
+        return {}
+    with sync_engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT n.nspname, c.relname, c.reltuples "
+                "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relname = ANY(:names) AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
+            ),
+            {"names": sorted({relation.rpartition(".")[2] for relation in relations})},
+        ).all()
+    estimates: Dict[str, float] = {}
+    for relation in relations:
+        schema, _, name = relation.rpartition(".")
+        matches = [
+            max(float(reltuples), 0.0)
+            for nspname, relname, reltuples in rows
+            if relname == name and (not schema or nspname == schema)
+        ]
+        if matches:
+            estimates[relation] = max(matches)
+    return estimates
+
+
+def snapshot_relations(plans: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    return sorted({relation for statements in plans.values() for item in statements for relation in item["access"]})
@@ -0,0 +1,122 @@
+"""Normalised EXPLAIN plan shapes and snapshot comparison.
+
+A plan shape keeps only what should stay stable between runs on the same
+schema: node types, the relations they read and the indexes they use. Costs,
+row estimates and timings are dropped. Each relation also gets an access kind
+(``index`` or ``seq``) so a comparison can tell an index that stopped being
+used apart from harmless plan reshuffles.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Tuple
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan", "Bitmap Heap Scan"}
+
+
+def _root(explain_output: Any) -> Dict[str, Any]:
+    """Top plan node from ``EXPLAIN (FORMAT JSON)`` output (parsed or raw text)."""
+    if isinstance(explain_output, str):
+        explain_output = json.loads(explain_output)
+    if isinstance(explain_output, list):
+        explain_output = explain_output[0]
+    return explain_output["Plan"]
+
+
+def _walk(node: Dict[str, Any], depth: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    yield depth, node
+    for child in node.get("Plans", ()):
+        yield from _walk(child, depth + 1)
+
+
+def _relation(node: Dict[str, Any]) -> str:
+    name = node.get("Relation Name")
+    if not name:
+        return ""
+    # only EXPLAIN (VERBOSE) reports the schema
+    schema = node.get("Schema")
+    return f"{schema}.{name}" if schema else name
+
+
+def node_label(node: Dict[str, Any]) -> str:
+    label = node["Node Type"]
+    if node.get("Strategy"):
+        label = f"{label} ({node['Strategy']})"
+    relation = _relation(node)
+    if relation:
+        label += f" on {relation}"
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    return label
+
+
+def plan_shape(explain_output: Any) -> Dict[str, Any]:
+    """``{"nodes": [indented labels], "access": {relation: "index" | "seq"}}``."""
+    nodes: List[str] = []
+    access: Dict[str, str] = {}
+    # Bitmap Index Scans carry the index but not the relation; the heap scan above them does
+    for depth, node in _walk(_root(explain_output)):
+        nodes.append("  " * depth + node_label(node))
+        relation = _relation(node)
+        if not relation:
+            continue
+        kind = "index" if node["Node Type"] in INDEX_NODES else "seq" if node["Node Type"] == "Seq Scan" else None
+        # A relation scanned several ways counts as sequential if any scan is
+        if kind and access.get(relation) != "seq":
+            access[relation] = kind
+    return {"nodes": nodes, "access": access}
+
+
+@dataclass
+class PlanChange:
+    query: str
+    statement: int
+    detail: str
+    regression: bool
+
+    def __str__(self) -> str:
+        marker = "REGRESSION" if self.regression else "changed"
+        return f"{self.query}[{self.statement}] {marker}: {self.detail}"
+
+
+def compare_plans(
+    baseline: Dict[str, List[Dict[str, Any]]],
+    current: Dict[str, List[Dict[str, Any]]],
+    relation_rows: Dict[str, float],
+    *,
+    min_rows: float = 10_000,
+) -> List[PlanChange]:
+    """Differences between snapshot ``baseline`` and ``current`` plan shapes.
+
+    A relation that was read through an index and is now sequentially scanned
+    is a regression when it holds at least ``min_rows`` rows (tiny tables are
+    legitimately seq-scanned). Any other shape difference is reported as a
+    change. Queries missing from the baseline are skipped.
+    """
+    changes: List[PlanChange] = []
+    for name, statements in current.items():
+        base_statements = baseline.get(name)
+        if base_statements is None:
+            continue
+        if len(base_statements) != len(statements):
+            changes.append(PlanChange(
+                name, 0, f"{len(base_statements)} statements -> {len(statements)}", regression=False
+            ))
+        for index, (before, after) in enumerate(zip(base_statements, statements)):
+            for relation, kind in before.get("access", {}).items():
+                now = after.get("access", {}).get(relation)
+                if kind == "index" and now == "seq" and relation_rows.get(relation, 0) >= min_rows:
+                    changes.append(PlanChange(
+                        name, index,
+                        f"{relation} ({relation_rows[relation]:,.0f} rows) index scan -> Seq Scan",
+                        regression=True,
+                    ))
+            if before.get("nodes") != after.get("nodes"):
+                changes.append(PlanChange(
+                    name, index,
+                    " / ".join(line.strip() for line in after.get("nodes", [])),
+                    regression=False,
+                ))
+    return changes
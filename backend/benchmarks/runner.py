@@ -0,0 +1,53 @@
+"""Concurrent load driver."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.scenarios import Scenario
+from benchmarks.stats import ScenarioResult
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> ScenarioResult:
+    paths = await scenario.paths(client)
+    cycle = itertools.cycle(paths)
+
+    for _ in range(warmup):
+        await client.get(next(cycle))
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            path = next(cycle)
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if failed:
+                errors += 1
+            else:
+                latencies.append(elapsed_ms)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return ScenarioResult.from_latencies(latencies, errors, time.perf_counter() - started)
@@ -0,0 +1,64 @@
+"""Hot endpoints exercised by the benchmark.
+
+A scenario either requests a fixed path or, when ``prepare`` is set, cycles
+through paths discovered before the timed run (e.g. keyset cursors collected by
+walking the first pages).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+import httpx
+
+API = "/api/v1"
+
+
+@dataclass
+class Scenario:
+    name: str
+    path: str
+    prepare: Optional[Callable[[httpx.AsyncClient, str], Awaitable[List[str]]]] = None
+
+    async def paths(self, client: httpx.AsyncClient) -> List[str]:
+        if self.prepare is None:
+            return [self.path]
+        return await self.prepare(client, self.path) or [self.path]
+
+
+async def collect_vehicle_cursors(client: httpx.AsyncClient, path: str, pages: int = 20) -> List[str]:
+    """Walk the first ``pages`` keyset pages and return a path per page."""
+    paths = [path]
+    cursor_path = path
+    for _ in range(pages - 1):
+        response = await client.get(cursor_path)
+        response.raise_for_status()
+        next_cursor = response.json().get("next_cursor")
+        if not next_cursor:
+            break
+        cursor_path = httpx.URL(path).copy_merge_params({"after": next_cursor}).raw_path.decode()
+        paths.append(cursor_path)
+    return paths
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("vehicles_offset", f"{API}/emission/vehicles?skip=1000&limit=50"),
+    Scenario("vehicles_offset_no_total", f"{API}/emission/vehicles?skip=1000&limit=50&include_total=false"),
+    Scenario(
+        "vehicles_keyset",
+        f"{API}/emission/vehicles?limit=50&include_total=false",
+        prepare=collect_vehicle_cursors,
+    ),
+    Scenario("vehicles_search", f"{API}/emission/vehicles?search=abc&limit=50"),
+    Scenario("vehicles_with_tests", f"{API}/emission/vehicles?limit=50&include_test_data=true"),
+    Scenario("emission_dashboard_summary", f"{API}/emission/dashboard/summary?year=2025"),
+    Scenario("office_compliance", f"{API}/emission/offices/compliance?year=2025&quarter=2"),
+    Scenario("trees", f"{API}/tree-inventory/trees?limit=100"),
+    Scenario("trees_map", f"{API}/tree-inventory/trees/map"),
+    Scenario("trees_stats", f"{API}/tree-inventory/trees/stats"),
+    Scenario("trees_carbon_statistics", f"{API}/tree-inventory/trees/carbon-statistics"),
+    Scenario("urban_greening_dashboard", f"{API}/dashboard/urban-greening?year=2025"),
+    Scenario("audit_logs", f"{API}/admin/audit/logs?limit=50"),
+    Scenario("audit_logs_filtered", f"{API}/admin/audit/logs?module_name=Emission&status_code=200&limit=50"),
+]
@@ -0,0 +1,184 @@
+"""List serialization throughput: ``python -m benchmarks.serialization_throughput``.
+
+Serializes ``--rows`` synthetic rows per list endpoint two ways and reports
+rows/s for each:
+
+* ``orm`` -- what the endpoints did before: mapped instances, validated into
+  the response schema and dumped the way FastAPI does for ``response_model``,
+  then rendered with the stdlib encoder;
+* ``projection`` -- the current path: plain row tuples from
+  ``Projection.columns()``, turned into dicts by ``to_dicts`` and rendered by
+  ``app.apis.responses.render_json``.
+
+No database is needed; only the Python side of the response is timed. Both
+outputs are decoded and compared, so a projection that drifts from its schema
+fails the run. Exits 1 on a mismatch or when the projection path is slower
+than ``--min-speedup`` times the ORM path.
+
+    python -m benchmarks.serialization_throughput
+    python -m benchmarks.serialization_throughput --only trees --rows 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.apis.responses import orjson, render_json
+from app.crud.crud_emission import TEST_RESPONSE, VEHICLE_LIST
+from app.crud.crud_fee import FEE_LIST
+from app.crud.crud_planting import PLANTING_LIST
+from app.crud.crud_tree_inventory import PROJECT_RESPONSE, TREE_RESPONSE
+from app.crud.projection import Projection
+from app.models.emission_models import Office, Vehicle
+from app.schemas.emission_schemas import Test as TestSchema, Vehicle as VehicleSchema
+from app.schemas.fee_schemas import UrbanGreeningFeeRecord
+from app.schemas.planting_schemas import UrbanGreeningPlantingInDB
+from app.schemas.tree_inventory_schemas import PlantingProjectResponse, TreeInventoryResponse
+
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+PHOTOS = json.dumps([
+    "/uploads/trees/a.jpg",
+    {"url": "/uploads/trees/b.jpg", "filename": "b.jpg", "size": 20480, "uploaded_at": "2025-01-01T00:00:00Z"},
+])
+PLANTS = json.dumps([{"planting_type": "trees", "species_name": "Narra", "quantity": 12}])
+
+
+@dataclass(frozen=True)
+class Case:
+    schema: Any
+    projection: Projection
+    overrides: Dict[str, Any]
+    # mapped instance -> what the endpoint handed to FastAPI
+    prepare: Callable[[Any], Any] = lambda obj: obj
+
+
+CASES: Dict[str, Case] = {
+    "trees": Case(TreeInventoryResponse, TREE_RESPONSE, {"photos": PHOTOS}, TreeInventoryResponse.from_db_model),
+    "vehicles": Case(VehicleSchema, VEHICLE_LIST, {}),
+    "tests": Case(TestSchema, TEST_RESPONSE, {}),
+    "plantings": Case(UrbanGreeningPlantingInDB, PLANTING_LIST, {"plants": PLANTS}),
+    "projects": Case(
+        PlantingProjectResponse, PROJECT_RESPONSE, {"photos": json.dumps(["/uploads/projects/a.jpg"])},
+        PlantingProjectResponse.from_db_model,
+    ),
+    "fees": Case(UrbanGreeningFeeRecord, FEE_LIST, {}),
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure list response serialization throughput")
+    parser.add_argument("--only", help="Comma-separated lists (default: all)")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--min-speedup", type=float, default=1.0)
+    return parser.parse_args(argv)
+
+
+def _value(column: Any, i: int) -> Any:
+    kind = column.type
+    if isinstance(kind, UUID):
+        return uuid.UUID(int=i + 1, version=4)
+    if isinstance(kind, Boolean):
+        return i % 2 == 0
+    if isinstance(kind, DateTime):
+        return EPOCH + timedelta(minutes=i)
+    if isinstance(kind, Date):
+        return (EPOCH + timedelta(days=i % 365)).date()
+    if isinstance(kind, Numeric) and not isinstance(kind, Float):
+        return Decimal(f"{i % 5000}.50")
+    if isinstance(kind, Float):
+        return (i % 900) / 10
+    if isinstance(kind, Integer):
+        return i % 90 + 1
+    return f"{column.key}-{i}"
+
+
+def _values(projection: Projection, i: int, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    table = projection.model.__table__
+    return {name: overrides.get(name, _value(table.columns[name], i)) for name in projection.fields}
+
+
+def synthetic(case: Case, rows: int) -> tuple[List[Any], List[tuple]]:
+    """``rows`` mapped instances and the matching ``case.projection.columns()`` tuples."""
+    objects, tuples = [], []
+    offices = case.projection.related.get("office")
+    for i in range(rows):
+        office = _values(offices, i % 50, {}) if offices is not None else None
+        overrides = dict(case.overrides, office_id=office["id"]) if office else case.overrides
+        values = _values(case.projection, i, overrides)
+        row = [values[name] for name in case.projection.fields]
+        obj = case.projection.model(**values)
+        if office is not None:
+            row.extend(office[name] for name in offices.fields)
+            obj.office = Office(**office)
+        if case.projection.model is Vehicle:
+            obj.latest_test_result = None
+            obj.latest_test_date = None
+        objects.append(obj)
+        tuples.append(tuple(row))
+    return objects, tuples
+
+
+def orm_path(case: Case, adapter: TypeAdapter) -> Callable[[List[Any]], bytes]:
+    def render(objects: List[Any]) -> bytes:
+        validated = adapter.validate_python([case.prepare(obj) for obj in objects], from_attributes=True)
+        content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return render
+
+
+def projection_path(case: Case) -> Callable[[List[tuple]], bytes]:
+    return lambda rows: render_json(case.projection.to_dicts(rows))
+
+
+def best(function: Callable[[Any], bytes], payload: Any, repeat: int) -> tuple[float, bytes]:
+    elapsed, body = float("inf"), b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = function(payload)
+        elapsed = min(elapsed, time.perf_counter() - started)
+    return elapsed, body
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    names = args.only.split(",") if args.only else list(CASES)
+    print(f"renderer: {'orjson' if orjson is not None else 'json (orjson not installed)'}, {args.rows} rows")
+    print(f"{'list':<12}{'orm rows/s':>14}{'projection rows/s':>20}{'speedup':>9}{'MB':>7}")
+
+    failures = 0
+    for name in names:
+        case = CASES[name]
+        objects, tuples = synthetic(case, args.rows)
+        orm_seconds, orm_body = best(orm_path(case, TypeAdapter(List[case.schema])), objects, args.repeat)
+        fast_seconds, fast_body = best(projection_path(case), tuples, args.repeat)
+
+        speedup = orm_seconds / fast_seconds if fast_seconds else float("inf")
+        mismatch = json.loads(orm_body) != json.loads(fast_body)
+        slow = speedup < args.min_speedup
+        failures += mismatch or slow
+        print(
+            f"{name:<12}{args.rows / orm_seconds:>14,.0f}{args.rows / fast_seconds:>20,.0f}"
+            f"{speedup:>8.1f}x{len(fast_body) / 1e6:>7.1f}"
+            f"{'  MISMATCH' if mismatch else ''}{'  SLOW' if slow else ''}"
+        )
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Sparse fieldset payload sizes: ``python -m benchmarks.sparse_payloads``.
+
+For each resource that accepts ``?fields=``, renders ``--rows`` synthetic
+rows (see ``benchmarks.serialization_throughput``) in full and narrowed to a
+typical mobile fieldset, and reports the selected column count, bytes per row
+(raw and gzipped) and rows/s before and after. Every sparse item is checked
+against the full item restricted to the same fields. Exits 1 on a mismatch or
+when a sparse payload is not at most ``--max-ratio`` of the full one.
+
+    python -m benchmarks.sparse_payloads
+    python -m benchmarks.sparse_payloads --only trees --fields id,tree_code,latitude,longitude
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from app.apis.responses import render_json
+from app.crud.projection import Projection
+from benchmarks.serialization_throughput import CASES, best, synthetic
+
+# what the mobile list screens ask for
+MOBILE_FIELDS: Dict[str, Sequence[str]] = {
+    "trees": ("id", "tree_code", "common_name", "latitude", "longitude"),
+    "vehicles": ("id", "plate_number", "driver_name", "vehicle_type", "latest_test_result"),
+    "tests": ("id", "vehicle_id", "test_date", "result"),
+    "plantings": ("id", "species_name", "quantity_planted", "planting_date", "status"),
+    "projects": ("id", "project_name", "status", "trees_planted"),
+    "fees": ("id", "reference_number", "amount", "status"),
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare full and sparse (?fields=) list payloads")
+    parser.add_argument("--only", help="Comma-separated resources (default: all)")
+    parser.add_argument("--fields", help="Comma-separated fields instead of the mobile set (needs --only)")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--max-ratio", type=float, default=0.5, help="Largest acceptable sparse/full size")
+    return parser.parse_args(argv)
+
+
+def narrow_rows(full: Projection, sparse: Projection, rows: List[tuple]) -> List[tuple]:
+    """``full.columns()`` rows cut down to ``sparse.columns()``, as the narrowed SELECT returns them."""
+    positions = {name: index for index, name in enumerate(full.fields)}
+    offset = len(full.fields)
+    for prefix, related in full.related.items():
+        for name in related.fields:
+            positions[f"{prefix}__{name}"] = offset
+            offset += 1
+    picks = [positions[name] for name in sparse.fields]
+    for prefix, related in sparse.related.items():
+        picks.extend(positions[f"{prefix}__{name}"] for name in related.fields)
+    return [tuple(row[index] for index in picks) for row in rows]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    names = args.only.split(",") if args.only else list(MOBILE_FIELDS)
+    if args.fields and len(names) != 1:
+        print("--fields needs exactly one resource in --only")
+        return 2
+
+    print(f"{args.rows} rows per resource")
+    print(f"{'resource':<11}{'columns':>10}{'B/row':>14}{'gzip B/row':>14}{'rows/s':>22}{'size':>8}")
+    failures = 0
+    for name in names:
+        case = CASES[name]
+        fields = args.fields.split(",") if args.fields else MOBILE_FIELDS[name]
+        full, sparse = case.projection, case.projection.only(fields)
+        _, full_rows = synthetic(case, args.rows)
+        sparse_rows = narrow_rows(full, sparse, full_rows)
+
+        full_seconds, full_body = best(lambda rows: render_json(full.to_dicts(rows)), full_rows, args.repeat)
+        sparse_seconds, sparse_body = best(lambda rows: render_json(sparse.to_dicts(rows)), sparse_rows, args.repeat)
+
+        expected = [{key: item[key] for key in sparse.names} for item in json.loads(full_body)]
+        mismatch = json.loads(sparse_body) != expected
+        ratio = len(sparse_body) / len(full_body)
+        failures += mismatch or ratio > args.max_ratio
+        print(
+            f"{name:<11}{len(full.columns()):>4} ->{len(sparse.columns()):>3}"
+            f"{len(full_body) / args.rows:>7.0f} ->{len(sparse_body) / args.rows:>4.0f}"
+            f"{len(gzip.compress(full_body)) / args.rows:>7.0f} ->{len(gzip.compress(sparse_body)) / args.rows:>4.0f}"
+            f"{args.rows / full_seconds:>11,.0f} ->{args.rows / sparse_seconds:>8,.0f}"
+            f"{ratio:>8.0%}{'  MISMATCH' if mismatch else ''}"
+        )
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Latency summaries and baseline comparison."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    duration_s: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+    @classmethod
+    def from_latencies(cls, latencies_ms: List[float], errors: int, duration_s: float) -> "ScenarioResult":
+        ordered = sorted(latencies_ms)
+        count = len(ordered)
+        return cls(
+            requests=count,
+            errors=errors,
+            duration_s=round(duration_s, 3),
+            rps=round(count / duration_s, 2) if duration_s > 0 else 0.0,
+            mean_ms=round(sum(ordered) / count, 2) if count else 0.0,
+            p50_ms=round(percentile(ordered, 50), 2),
+            p95_ms=round(percentile(ordered, 95), 2),
+            p99_ms=round(percentile(ordered, 99), 2),
+            max_ms=round(ordered[-1], 2) if count else 0.0,
+        )
+
+    def as_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+@dataclass
+class Regression:
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change_pct(self) -> float:
+        if not self.baseline:
+            return math.inf
+        return (self.current - self.baseline) / self.baseline * 100
+
+    def __str__(self) -> str:
+        return f"{self.scenario}: {self.metric} {self.baseline:g} -> {self.current:g} ({self.change_pct:+.1f}%)"
+
+
+# Higher is worse for latencies, lower is worse for throughput
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def compare(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    *,
+    threshold: float = 0.2,
+    min_delta_ms: float = 2.0,
+) -> List[Regression]:
+    """Regressions of ``current`` against ``baseline`` beyond ``threshold`` (a fraction).
+
+    Latency increases smaller than ``min_delta_ms`` are ignored so that very
+    fast endpoints do not fail on scheduler noise. Scenarios missing from the
+    baseline are skipped.
+    """
+    regressions: List[Regression] = []
+    for name, result in current.items():
+        base: Optional[Dict[str, float]] = baseline.get(name)
+        if not base:
+            continue
+        for metric in LATENCY_METRICS:
+            before, after = base.get(metric, 0.0), result.get(metric, 0.0)
+            if after > before * (1 + threshold) and after - before >= min_delta_ms:
+                regressions.append(Regression(name, metric, before, after))
+        before_rps, after_rps = base.get("rps", 0.0), result.get("rps", 0.0)
+        if before_rps and after_rps < before_rps * (1 - threshold):
+            regressions.append(Regression(name, "rps", before_rps, after_rps))
+        if result.get("errors", 0) > base.get("errors", 0):
+            regressions.append(Regression(name, "errors", base.get("errors", 0), result["errors"]))
+    return regressions
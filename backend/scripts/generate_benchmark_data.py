@@ -0,0 +1,564 @@
+"""
+Generate a large, reproducible benchmark dataset with COPY.
+
+Rows are produced by per-table seeded RNGs and streamed into PostgreSQL with
+psycopg's COPY support, so the same --seed and counts always give the same
+data. Primary keys are derived from the row index, which lets child tables
+reference parents without keeping them in memory.
+
+Distributions are skewed on purpose (a few hot offices and barangays, common
+species, recent years, a handful of very active users) so query plans and cache
+behaviour resemble production.
+
+Usage:
+    python scripts/generate_benchmark_data.py --scale 0.01 --truncate
+    python scripts/generate_benchmark_data.py --only vehicles,tests --count tests=500000
+    python scripts/generate_benchmark_data.py --seed 7 --truncate          # full size (~12M rows)
+
+Only local databases are accepted unless --allow-remote is passed.
+"""
+import argparse
+import bisect
+import itertools
+import math
+import random
+import sys
+import time
+import uuid
+import zlib
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Add the parent directory to sys.path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+# Row counts at --scale 1.0
+DEFAULT_COUNTS: Dict[str, int] = {
+    "offices": 60,
+    "vehicles": 200_000,
+    "tests": 2_000_000,
+    "species": 500,
+    "trees": 1_000_000,
+    "monitoring_logs": 2_000_000,
+    "fee_records": 50_000,
+    "tree_requests": 10_000,
+    "audit_logs": 5_000_000,
+}
+
+# Counts that should not shrink below a floor when scaling down
+MIN_COUNTS = {"offices": 5, "species": 20}
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "db", "postgres", None, ""}
+
+EPOCH = datetime(2019, 1, 1, tzinfo=timezone.utc)
+YEARS = list(range(2019, 2026))
+# Later years carry more activity
+YEAR_WEIGHTS = [1, 1.3, 1.6, 2.0, 2.6, 3.3, 4.0]
+
+FIRST_NAMES = [
+    "Juan", "Maria", "Jose", "Ana", "Pedro", "Rosa", "Carlos", "Liza", "Mark", "Grace",
+    "Paolo", "Joy", "Ramon", "Carmen", "Angelo", "Kristine", "Miguel", "Bea", "Rafael", "Ella",
+]
+LAST_NAMES = [
+    "Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Villanueva",
+    "Ramos", "Aquino", "Castillo", "Rivera", "Navarro", "Domingo", "Salazar", "Dela Cruz", "Lim",
+]
+BARANGAYS = [
+    "Poblacion", "San Isidro", "San Roque", "Santo Niño", "Bagong Silang", "Malanday", "Santa Cruz",
+    "San Jose", "Concepcion", "Marikina Heights", "Tumana", "Nangka", "Parang", "Fortune",
+    "Jesus de la Peña", "Kalumpang", "Industrial Valley", "Barangka", "Tañong", "San Antonio",
+] + [f"Barangay {number}" for number in range(1, 41)]
+VEHICLE_TYPES = [("Sedan", 4), ("SUV", 4), ("Pickup", 4), ("Van", 4), ("Truck", 6), ("Bus", 6), ("Motorcycle", 2), ("Jeepney", 4)]
+TEST_CENTERS = ["City Hall Testing Center", "North Depot", "South Depot", "Mobile Unit A", "Mobile Unit B"]
+SPECIES_FAMILIES = ["Fabaceae", "Moraceae", "Meliaceae", "Dipterocarpaceae", "Myrtaceae", "Arecaceae", "Lamiaceae", "Anacardiaceae"]
+FEE_TYPES = [("inspection", 6), ("cutting_permit", 3), ("pruning_permit", 4), ("violation_fine", 1)]
+AUDIT_ROUTES = [
+    ("GET", "/api/v1/emission/vehicles", "Emission", 30),
+    ("GET", "/api/v1/emission/vehicles/{id}", "Emission", 12),
+    ("POST", "/api/v1/emission/tests", "Emission", 6),
+    ("GET", "/api/v1/tree-inventory/trees/map", "Tree Inventory", 10),
+    ("GET", "/api/v1/tree-inventory/trees", "Tree Inventory", 14),
+    ("GET", "/api/v1/dashboard/emission", "Dashboard", 8),
+    ("GET", "/api/v1/tree-management/requests", "Tree Management", 6),
+    ("PUT", "/api/v1/tree-management/requests/{id}", "Tree Management", 2),
+    ("GET", "/api/v1/fees", "Fee Management", 4),
+    ("POST", "/api/v1/auth/login", "Authentication", 3),
+    ("POST", "/api/v1/gemini/plate-recognition", "Gemini AI", 2),
+]
+
+
+def table_rng(seed: int, table: str) -> random.Random:
+    """Independent, reproducible RNG per table so changing one count does not reshuffle others."""
+    return random.Random(seed * 1_000_003 + zlib.crc32(table.encode()))
+
+
+def row_uuid(table: str, index: int) -> uuid.UUID:
+    """Deterministic UUID for the index-th row of a table."""
+    return uuid.UUID(int=(zlib.crc32(table.encode()) << 96) | index, version=4)
+
+
+class Skewed:
+    """Zipf-like picker: item ``k`` is chosen with weight ``1 / (k + 1) ** exponent``."""
+
+    def __init__(self, size: int, exponent: float = 1.0) -> None:
+        self._cumulative = list(itertools.accumulate(1.0 / (k + 1) ** exponent for k in range(size)))
+        self._total = self._cumulative[-1]
+
+    def pick(self, rng: random.Random) -> int:
+        return bisect.bisect_left(self._cumulative, rng.random() * self._total)
+
+
+class Weighted:
+    def __init__(self, choices: Sequence[Tuple[object, float]]) -> None:
+        self._values = [value for value, _ in choices]
+        self._cumulative = list(itertools.accumulate(weight for _, weight in choices))
+
+    def pick(self, rng: random.Random):
+        return self._values[bisect.bisect_left(self._cumulative, rng.random() * self._cumulative[-1])]
+
+
+def random_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def random_timestamp(rng: random.Random, year: int) -> datetime:
+    start = datetime(year, 1, 1, tzinfo=timezone.utc)
+    return start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+
+def random_date(rng: random.Random, year: int) -> date:
+    return date(year, 1, 1) + timedelta(days=rng.randrange(365))
+
+
+class Context:
+    """Shared state between generators (parent sizes and per-row attributes children need)."""
+
+    def __init__(self, counts: Dict[str, int]) -> None:
+        self.counts = counts
+        self.vehicle_is_diesel = bytearray()
+        self.vehicle_year = array("H")
+        self.species_names: List[Tuple[str, str]] = []
+        self.tree_years = array("H")
+        self.barangay_centroids: List[Tuple[float, float]] = []
+        self.year_picker = Weighted(list(zip(YEARS, YEAR_WEIGHTS)))
+
+
+# --------------------------------------------------------------------------- generators
+
+
+def gen_offices(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    for index in range(count):
+        created = EPOCH + timedelta(days=rng.randrange(30))
+        yield (
+            row_uuid("offices", index),
+            f"Office {index + 1:03d} - {rng.choice(BARANGAYS)}",
+            f"{rng.randint(1, 999)} {rng.choice(LAST_NAMES)} St.",
+            f"09{rng.randrange(10**9):09d}",
+            f"office{index + 1:03d}@example.gov.ph",
+            created,
+            created,
+        )
+
+
+def gen_vehicles(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    office_picker = Skewed(ctx.counts["offices"], exponent=1.2)
+    type_picker = Weighted([(vehicle_type, weight) for vehicle_type, weight in zip(VEHICLE_TYPES, (8, 6, 5, 4, 3, 1, 6, 2))])
+    letters = "ABCDEFGHJKLMNPRSTUVWXYZ"
+    for index in range(count):
+        vehicle_type, wheels = type_picker.pick(rng)
+        diesel = vehicle_type in ("Truck", "Bus", "Jeepney") or (vehicle_type in ("Pickup", "Van", "SUV") and rng.random() < 0.6)
+        year_acquired = ctx.year_picker.pick(rng) - rng.randrange(0, 12)
+        ctx.vehicle_is_diesel.append(1 if diesel else 0)
+        ctx.vehicle_year.append(year_acquired)
+        created = random_timestamp(rng, ctx.year_picker.pick(rng))
+        plate = "".join(rng.choice(letters) for _ in range(3)) + f" {rng.randrange(10000):04d}"
+        yield (
+            row_uuid("vehicles", index),
+            random_name(rng),
+            f"09{rng.randrange(10**9):09d}" if rng.random() < 0.7 else None,
+            "Diesel" if diesel else "Gasoline",
+            row_uuid("offices", office_picker.pick(rng)),
+            plate if rng.random() < 0.97 else None,
+            f"CH{index:09d}{rng.randrange(1000):03d}",
+            f"REG-{index:08d}" if rng.random() < 0.9 else None,
+            vehicle_type,
+            wheels,
+            year_acquired,
+            created,
+            created,
+        )
+
+
+def gen_tests(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    vehicle_count = len(ctx.vehicle_is_diesel)
+    vehicle_picker = Skewed(vehicle_count, exponent=0.4)
+    for index in range(count):
+        vehicle = vehicle_picker.pick(rng)
+        year = max(ctx.year_picker.pick(rng), ctx.vehicle_year[vehicle])
+        quarter = rng.randint(1, 4)
+        test_date = datetime(year, 3 * quarter - 2, 1, 8, tzinfo=timezone.utc) + timedelta(
+            days=rng.randrange(90), minutes=rng.randrange(600)
+        )
+        passed = rng.random() < 0.85
+        if ctx.vehicle_is_diesel[vehicle]:
+            co_level = hc_level = None
+            opacity = round(rng.uniform(0.3, 2.2) if passed else rng.uniform(2.3, 4.5), 2)
+        else:
+            co_level = round(rng.uniform(0.1, 3.5) if passed else rng.uniform(3.6, 8.0), 2)
+            hc_level = round(rng.uniform(50, 600) if passed else rng.uniform(601, 1500), 2)
+            opacity = None
+        yield (
+            row_uuid("tests", index),
+            row_uuid("vehicles", vehicle),
+            test_date,
+            quarter,
+            year,
+            passed,
+            None if passed or rng.random() < 0.5 else "Retest required",
+            co_level,
+            hc_level,
+            opacity,
+            random_name(rng),
+            rng.choice(TEST_CENTERS),
+            test_date,
+            test_date,
+        )
+
+
+def gen_species(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    for index in range(count):
+        common = f"Species {index + 1:04d}"
+        scientific = f"Genus{index % 97} species{index + 1}"
+        ctx.species_names.append((scientific, common))
+        height = rng.uniform(5, 40)
+        yield (
+            row_uuid("species", index),
+            scientific,
+            common,
+            f"Lokal {index + 1}" if rng.random() < 0.5 else None,
+            rng.choice(SPECIES_FAMILIES),
+            "Tree" if rng.random() < 0.85 else rng.choice(["Ornamental", "Seed", "Other"]),
+            rng.random() < 0.6,
+            rng.random() < 0.05,
+            True,
+            round(height * 0.7, 1),
+            round(height * 1.3, 1),
+            round(height, 1),
+            round(rng.uniform(5, 60), 1),
+            EPOCH,
+        )
+
+
+def gen_trees(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    species_picker = Skewed(len(ctx.species_names), exponent=1.1)
+    barangay_picker = Skewed(len(BARANGAYS), exponent=0.9)
+    ctx.barangay_centroids = [
+        (14.60 + rng.uniform(0, 0.12), 121.05 + rng.uniform(0, 0.12)) for _ in BARANGAYS
+    ]
+    status_picker = Weighted([("alive", 88), ("cut", 6), ("dead", 4), ("replaced", 2)])
+    health_picker = Weighted([("healthy", 75), ("needs_attention", 15), ("diseased", 7), ("dead", 3)])
+    for index in range(count):
+        year = ctx.year_picker.pick(rng)
+        ctx.tree_years.append(year)
+        scientific, common = ctx.species_names[species_picker.pick(rng)]
+        barangay = barangay_picker.pick(rng)
+        lat, lon = ctx.barangay_centroids[barangay]
+        status = status_picker.pick(rng)
+        health = "dead" if status == "dead" else health_picker.pick(rng)
+        planted = random_date(rng, year - rng.randrange(0, 15))
+        created = random_timestamp(rng, year)
+        yield (
+            row_uuid("trees", index),
+            f"{year}-{index + 1:07d}",
+            scientific,
+            common,
+            round(lat + rng.gauss(0, 0.004), 6),
+            round(lon + rng.gauss(0, 0.004), 6),
+            BARANGAYS[barangay],
+            status,
+            health,
+            status in ("cut", "dead") and rng.random() < 0.5,
+            round(rng.uniform(1, 30), 1),
+            round(rng.uniform(5, 120), 1),
+            planted,
+            random_date(rng, year) if status == "cut" else None,
+            rng.choice(["DENR", "Barangay", "Private", "City"]),
+            created,
+            created,
+        )
+
+
+def gen_monitoring_logs(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    tree_count = len(ctx.tree_years)
+    tree_picker = Skewed(tree_count, exponent=0.3)
+    health_picker = Weighted([("healthy", 70), ("needs_attention", 18), ("diseased", 9), ("dead", 3)])
+    inspectors = [random_name(rng) for _ in range(40)]
+    for index in range(count):
+        tree = tree_picker.pick(rng)
+        year = max(ctx.tree_years[tree], ctx.year_picker.pick(rng))
+        inspected = random_date(rng, year)
+        yield (
+            row_uuid("monitoring_logs", index),
+            row_uuid("trees", tree),
+            inspected,
+            health_picker.pick(rng),
+            round(rng.uniform(1, 30), 1),
+            round(rng.uniform(5, 120), 1),
+            "Routine inspection" if rng.random() < 0.3 else None,
+            rng.choice(inspectors),
+            datetime(inspected.year, inspected.month, inspected.day, tzinfo=timezone.utc),
+        )
+
+
+def gen_fee_records(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    type_picker = Weighted(FEE_TYPES)
+    status_picker = Weighted([("paid", 75), ("pending", 20), ("cancelled", 5)])
+    for index in range(count):
+        year = ctx.year_picker.pick(rng)
+        issued = random_date(rng, year)
+        status = status_picker.pick(rng)
+        paid = status == "paid"
+        created = datetime(issued.year, issued.month, issued.day, tzinfo=timezone.utc)
+        yield (
+            row_uuid("fee_records", index),
+            f"FEE-{year}-{index + 1:06d}",
+            type_picker.pick(rng),
+            round(rng.choice([150, 300, 500, 1000, 2500, 5000]) * rng.uniform(0.9, 1.5), 2),
+            random_name(rng),
+            issued,
+            status,
+            f"OR-{index + 1:07d}" if paid else None,
+            issued + timedelta(days=rng.randrange(0, 14)) if paid else None,
+            created,
+            created,
+        )
+
+
+def gen_tree_requests(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    type_picker = Weighted([("cutting", 5), ("pruning", 8), ("ball_out", 1)])
+    status_picker = Weighted([
+        ("receiving", 10), ("inspection", 15), ("requirements", 15), ("clearance", 10), ("completed", 45), ("cancelled", 5),
+    ])
+    phases = ["receiving", "inspection", "requirements", "clearance", "completed"]
+    for index in range(count):
+        year = ctx.year_picker.pick(rng)
+        received = random_date(rng, year)
+        status = status_picker.pick(rng)
+        reached = phases.index(status) if status in phases else rng.randrange(0, 3)
+        inspected = received + timedelta(days=rng.randrange(2, 20)) if reached >= 1 else None
+        completed = inspected + timedelta(days=rng.randrange(5, 40)) if reached >= 3 and inspected else None
+        created = datetime(received.year, received.month, received.day, tzinfo=timezone.utc)
+        yield (
+            row_uuid("tree_requests", index),
+            f"TR-{year}-{index + 1:05d}",
+            type_picker.pick(rng),
+            status,
+            status == "cancelled" and rng.random() < 0.5,
+            received,
+            received.strftime("%B"),
+            rng.choice(["Walk-in", "Email", "Letter", "Phone"]),
+            random_name(rng),
+            BARANGAYS[rng.randrange(len(BARANGAYS))],
+            inspected,
+            inspected.strftime("%B") if inspected else None,
+            completed,
+            created,
+            created,
+        )
+
+
+def gen_audit_logs(rng: random.Random, count: int, ctx: Context) -> Iterator[tuple]:
+    route_picker = Weighted([(route[:3], route[3]) for route in AUDIT_ROUTES])
+    user_picker = Skewed(200, exponent=1.3)
+    status_picker = Weighted([(200, 90), (201, 3), (400, 2), (401, 2), (404, 2), (500, 1)])
+    span_seconds = int((datetime(2026, 1, 1, tzinfo=timezone.utc) - EPOCH).total_seconds())
+    for index in range(count):
+        method, route, module = route_picker.pick(rng)
+        # Square root skews timestamps towards the end of the range (traffic grows)
+        occurred = EPOCH + timedelta(seconds=int(span_seconds * math.sqrt(rng.random())))
+        user = user_picker.pick(rng)
+        status_code = status_picker.pick(rng)
+        event = f"{method}_{route}"
+        yield (
+            row_uuid("audit_logs", index),
+            event[:150],
+            f"{module} {method} {route.rsplit('/', 1)[-1]}",
+            module,
+            method,
+            route,
+            status_code,
+            occurred,
+            occurred.isoformat(),
+            occurred.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            row_uuid("users", user),
+            f"user{user:03d}@example.gov.ph",
+            f"10.{user % 256}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+            int(rng.lognormvariate(3.8, 0.8)),
+            '{"detail": "error"}' if status_code >= 500 else None,
+            occurred,
+        )
+
+
+# --------------------------------------------------------------------------- tables
+
+TableSpec = Tuple[str, str, Sequence[str], Callable[[random.Random, int, Context], Iterator[tuple]]]
+
+TABLES: List[TableSpec] = [
+    ("offices", "emission.offices",
+     ("id", "name", "address", "contact_number", "email", "created_at", "updated_at"), gen_offices),
+    ("vehicles", "emission.vehicles",
+     ("id", "driver_name", "contact_number", "engine_type", "office_id", "plate_number", "chassis_number",
+      "registration_number", "vehicle_type", "wheels", "year_acquired", "created_at", "updated_at"), gen_vehicles),
+    ("tests", "emission.tests",
+     ("id", "vehicle_id", "test_date", "quarter", "year", "result", "remarks", "co_level", "hc_level",
+      "opacimeter_result", "technician_name", "testing_center", "created_at", "updated_at"), gen_tests),
+    ("species", "urban_greening.tree_species",
+     ("id", "scientific_name", "common_name", "local_name", "family", "species_type", "is_native", "is_endangered",
+      "is_active", "avg_mature_height_min_m", "avg_mature_height_max_m", "avg_mature_height_avg_m",
+      "co2_absorbed_kg_per_year", "created_at"), gen_species),
+    ("trees", "urban_greening.tree_inventory",
+     ("id", "tree_code", "species", "common_name", "latitude", "longitude", "barangay", "status", "health",
+      "is_archived", "height_meters", "diameter_cm", "planted_date", "cutting_date", "managed_by",
+      "created_at", "updated_at"), gen_trees),
+    ("monitoring_logs", "urban_greening.tree_monitoring_logs",
+     ("id", "tree_id", "inspection_date", "health_status", "height_meters", "diameter_cm", "notes",
+      "inspector_name", "created_at"), gen_monitoring_logs),
+    ("fee_records", "urban_greening.fee_records",
+     ("id", "reference_number", "type", "amount", "payer_name", "date", "status", "or_number", "payment_date",
+      "created_at", "updated_at"), gen_fee_records),
+    ("tree_requests", "urban_greening.tree_requests",
+     ("id", "request_number", "request_type", "overall_status", "is_archived", "receiving_date_received",
+      "receiving_month", "receiving_received_through", "receiving_name", "receiving_address",
+      "inspection_date_of_inspection", "inspection_month", "clearance_date_issued", "created_at",
+      "updated_at"), gen_tree_requests),
+    ("audit_logs", "app_audit.audit_logs",
+     ("id", "event_id", "event_name", "module_name", "http_method", "route_path", "status_code", "occurred_at",
+      "occurred_at_iso", "occurred_at_gmt", "user_id", "user_email", "ip_address", "user_agent", "latency_ms",
+      "error", "created_at"), gen_audit_logs),
+]
+
+# Child tables need their parents generated in the same run (for in-memory attributes)
+DEPENDENCIES = {
+    "vehicles": ["offices"],
+    "tests": ["vehicles"],
+    "trees": ["species"],
+    "monitoring_logs": ["trees"],
+}
+
+
+def resolve_counts(scale: float, overrides: Dict[str, int]) -> Dict[str, int]:
+    counts = {}
+    for name, default in DEFAULT_COUNTS.items():
+        counts[name] = max(int(default * scale), MIN_COUNTS.get(name, 1))
+    counts.update(overrides)
+    return counts
+
+
+def resolve_tables(only: Optional[List[str]]) -> List[str]:
+    if not only:
+        return [name for name, *_ in TABLES]
+    selected = set()
+    pending = list(only)
+    while pending:
+        name = pending.pop()
+        if name not in DEFAULT_COUNTS:
+            raise SystemExit(f"Unknown table '{name}'. Choose from: {', '.join(DEFAULT_COUNTS)}")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(DEPENDENCIES.get(name, []))
+    return [name for name, *_ in TABLES if name in selected]
+
+
+def conninfo_from(url: str) -> Tuple[str, Optional[str]]:
+    parsed = make_url(url).set(drivername="postgresql")
+    return parsed.render_as_string(hide_password=False), parsed.host
+
+
+def copy_table(conn: psycopg.Connection, qualified: str, columns: Sequence[str], rows: Iterator[tuple]) -> int:
+    written = 0
+    with conn.cursor() as cur:
+        with cur.copy(f"COPY {qualified} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+                written += 1
+    return written
+
+
+def generate(conninfo: str, *, seed: int, counts: Dict[str, int], tables: List[str], truncate: bool) -> None:
+    ctx = Context(counts)
+    specs = [spec for spec in TABLES if spec[0] in tables]
+
+    with psycopg.connect(conninfo) as conn:
+        conn.execute("SET synchronous_commit = off")
+        if truncate:
+            qualified = ", ".join(spec[1] for spec in specs)
+            print(f"Truncating {qualified} ...")
+            conn.execute(f"TRUNCATE {qualified} CASCADE")
+            conn.commit()
+
+        overall = time.perf_counter()
+        for name, qualified, columns, generator in specs:
+            started = time.perf_counter()
+            rows = generator(table_rng(seed, name), counts[name], ctx)
+            written = copy_table(conn, qualified, columns, rows)
+            conn.commit()
+            elapsed = time.perf_counter() - started
+            print(f"  {qualified:<40} {written:>10,} rows  {elapsed:7.1f}s  ({written / max(elapsed, 1e-9):,.0f} rows/s)")
+
+        print("Analyzing ...")
+        for _, qualified, _, _ in specs:
+            conn.execute(f"ANALYZE {qualified}")
+        conn.commit()
+        print(f"Done in {time.perf_counter() - overall:.1f}s")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed (same seed + counts = same data)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier applied to the default row counts")
+    parser.add_argument("--count", action="append", default=[], metavar="TABLE=N", help="Override one table's row count")
+    parser.add_argument("--only", help="Comma-separated tables to generate (parents are added automatically)")
+    parser.add_argument("--truncate", action="store_true", help="TRUNCATE ... CASCADE the target tables first")
+    parser.add_argument("--database-url", help="Defaults to DATABASE_URL from settings")
+    parser.add_argument("--allow-remote", action="store_true", help="Permit non-local database hosts")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    overrides = {}
+    for item in args.count:
+        name, _, value = item.partition("=")
+        if name not in DEFAULT_COUNTS or not value.isdigit():
+            raise SystemExit(f"Invalid --count '{item}'; expected TABLE=N with TABLE in {', '.join(DEFAULT_COUNTS)}")
+        overrides[name] = int(value)
+
+    database_url = args.database_url
+    if not database_url:
+        from app.core.config import settings
+        database_url = settings.DATABASE_URL
+
+    conninfo, host = conninfo_from(database_url)
+    if host not in LOCAL_HOSTS and not args.allow_remote:
+        raise SystemExit(f"Refusing to load benchmark data into non-local host '{host}' (use --allow-remote)")
+
+    counts = resolve_counts(args.scale, overrides)
+    tables = resolve_tables(args.only.split(",") if args.only else None)
+
+    print("=" * 70)
+    print(f"GENERATING BENCHMARK DATA (seed={args.seed}, host={host})")
+    print("=" * 70)
+    generate(conninfo, seed=args.seed, counts=counts, tables=tables, truncate=args.truncate)
+
+
+if __name__ == "__main__":
+    main()
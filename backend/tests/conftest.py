@@ -0,0 +1,105 @@
+"""Shared fixtures for tests that exercise the API against a real database.
+
+Database-backed tests are opt-in: set ``DB_TESTS=1`` and point ``DATABASE_URL``
+at a local, migrated database (ideally seeded with
+``scripts/generate_benchmark_data.py``). Everything else in this directory is
+pure logic and runs without Postgres.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from app.db.query_stats import RequestQueryStats
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "db", "postgres"}
+
+# Authentication and session bookkeeping run on every request; budgets cover
+# the endpoint's own statements only.
+UNBUDGETED_SCHEMAS = ("app_auth.",)
+
+
+@pytest.fixture(scope="session")
+def database_conninfo() -> str:
+    if os.environ.get("DB_TESTS") != "1":
+        pytest.skip("database tests are opt-in (set DB_TESTS=1)")
+    from app.core.config import settings
+
+    url = make_url(settings.DATABASE_URL)
+    if url.host not in LOCAL_HOSTS:
+        pytest.skip(f"refusing to run database tests against non-local host '{url.host}'")
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+@pytest.fixture(scope="session")
+def api_client(database_conninfo: str) -> Iterator["TestClient"]:
+    """TestClient authenticated as the benchmark super admin via a locally signed JWT."""
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+    from app.main import app
+    from benchmarks.auth import SigningKey, ensure_benchmark_user
+
+    key = SigningKey.generate()
+    ensure_benchmark_user(database_conninfo)
+    original_public_key = settings.SUPABASE_JWT_PUBLIC_KEY
+    settings.SUPABASE_JWT_PUBLIC_KEY = key.public_pem
+    try:
+        with TestClient(app) as client:
+            client.headers["Authorization"] = f"Bearer {key.mint_token()}"
+            yield client
+    finally:
+        settings.SUPABASE_JWT_PUBLIC_KEY = original_public_key
+
+
+class QueryBudget:
+    """Statements executed by requests made while the fixture is active."""
+
+    def __init__(self) -> None:
+        self.requests: List[RequestQueryStats] = []
+
+    def reset(self) -> None:
+        self.requests.clear()
+
+    @property
+    def last(self) -> RequestQueryStats:
+        assert self.requests, "no request was recorded"
+        return self.requests[-1]
+
+    @staticmethod
+    def budgeted_shapes(stats: RequestQueryStats) -> dict:
+        return {
+            shape: count
+            for shape, count in stats.shapes.items()
+            if not any(schema in shape for schema in UNBUDGETED_SCHEMAS)
+        }
+
+    def assert_within(self, budget: int, label: str = "request") -> None:
+        shapes = self.budgeted_shapes(self.last)
+        executed = sum(shapes.values())
+        if executed > budget:
+            listing = "\n".join(f"  {count}x {shape[:200]}" for shape, count in shapes.items())
+            pytest.fail(f"{label} executed {executed} statements (budget {budget}):\n{listing}")
+
+
+@pytest.fixture
+def query_budget(monkeypatch: pytest.MonkeyPatch) -> QueryBudget:
+    """Capture the per-request stats ``DBTimingMiddleware`` collects."""
+    from app.core.config import settings
+    from app.db import query_stats
+    from app.middleware import db_timing_middleware
+
+    budget = QueryBudget()
+
+    def recording_begin(scope=None) -> RequestQueryStats:
+        stats = query_stats.begin_request_stats(scope)
+        budget.requests.append(stats)
+        return stats
+
+    monkeypatch.setattr(settings, "DB_INSTRUMENTATION_ENABLED", True)
+    monkeypatch.setattr(db_timing_middleware, "begin_request_stats", recording_begin)
+    return budget
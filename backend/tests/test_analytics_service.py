@@ -0,0 +1,154 @@
+from datetime import datetime
+from decimal import Decimal
+
+import asyncio
+
+import pytest
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, MetaData, String, Table, create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services import analytics_service
+from app.services.analytics_service import AnalyticsSnapshot, FactTable, RefreshScheduler, duckdb_available
+
+pytestmark = pytest.mark.skipif(not duckdb_available(), reason="duckdb not installed")
+
+metadata = MetaData()
+readings = Table(
+    "readings",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("station", String(20)),
+    Column("value", Float),
+    Column("valid", Boolean),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def _snapshot(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(readings),
+            [
+                {"id": 1, "station": "north", "value": 1.5, "valid": True, "updated_at": datetime(2025, 1, 1)},
+                {"id": 2, "station": "north", "value": 2.5, "valid": False, "updated_at": datetime(2025, 1, 2)},
+                {"id": 3, "station": 'south "b"', "value": None, "valid": True, "updated_at": datetime(2025, 1, 3)},
+            ],
+        )
+    snapshot = AnalyticsSnapshot(str(tmp_path / "analytics"), facts=[FactTable("readings", readings, lambda: select(readings))])
+    return engine, snapshot
+
+
+def _per_station(run):
+    stmt = (
+        select(readings.c.station, func.count().filter(readings.c.valid.is_(True)), func.sum(readings.c.value))
+        .group_by(readings.c.station)
+        .order_by(readings.c.station)
+    )
+    return [tuple(row) for row in run(stmt)]
+
+
+def test_refresh_copies_only_changed_tables(tmp_path) -> None:
+    engine, snapshot = _snapshot(tmp_path)
+    assert snapshot.refresh(engine.connect)["tables"] == {"readings": 3}
+    assert snapshot.refresh(engine.connect)["tables"] == {"readings": "unchanged"}
+
+    with engine.begin() as conn:
+        conn.execute(insert(readings).values(id=4, station="south", value=4.0, valid=True, updated_at=datetime(2025, 2, 1)))
+    assert snapshot.refresh(engine.connect)["tables"] == {"readings": 4}
+    assert snapshot.stats()["tables"]["readings"]["rows"] == 4
+
+
+def test_compute_reads_the_snapshot_until_it_is_stale(tmp_path, monkeypatch) -> None:
+    engine, snapshot = _snapshot(tmp_path)
+    snapshot.refresh(engine.connect)
+    with Session(engine) as db:
+        snapshot_rows, freshness = snapshot.compute(db, ["readings"], _per_station)
+        assert freshness.source == "snapshot"
+        assert snapshot_rows == [("north", 1, 4.0), ('south "b"', 1, None)]
+
+        monkeypatch.setattr(settings, "ANALYTICS_MAX_STALENESS_SECONDS", -1)
+        rows, freshness = snapshot.compute(db, ["readings"], _per_station)
+        assert freshness.source == "live"
+        assert rows == snapshot_rows
+
+        # tables that were never copied are read live as well
+        monkeypatch.setattr(settings, "ANALYTICS_MAX_STALENESS_SECONDS", 900)
+        assert snapshot.compute(db, ["readings", "missing"], _per_station)[1].source == "live"
+
+
+def test_refreshes_are_not_scheduled_without_duckdb(monkeypatch) -> None:
+    monkeypatch.setattr(analytics_service, "duckdb_available", lambda: False)
+    scheduler = RefreshScheduler(interval_seconds=60)
+
+    async def scenario() -> bool:
+        scheduler.start()
+        running = scheduler.running
+        await scheduler.stop()
+        return running
+
+    assert not asyncio.run(scenario())
+
+
+def _canonical(value):
+    """Builder output with engine-specific number types and float summation noise removed."""
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(exclude={"generated_at", "freshness"})
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (float, Decimal)):
+        return round(float(value), 6)
+    return value
+
+
+@pytest.fixture(scope="module")
+def live_snapshot(database_conninfo, tmp_path_factory):
+    """Every fact table copied from the configured database."""
+    snapshot = AnalyticsSnapshot(str(tmp_path_factory.mktemp("analytics")))
+    snapshot.refresh(force=True)
+    return snapshot
+
+
+def _assert_parity(snapshot, names, build) -> None:
+    import duckdb
+
+    from app.db.database import SessionLocal
+
+    duck = duckdb.connect()
+    try:
+        # the runner itself, not compute(): a DuckDB error must fail here, not fall back
+        from_snapshot = build(snapshot.runner(duck, names))
+    finally:
+        duck.close()
+    with SessionLocal() as db:
+        live = build(lambda stmt: db.execute(stmt).all())
+    assert _canonical(from_snapshot) == _canonical(live)
+
+
+@pytest.mark.parametrize("quarter", [None, "Q1", "Q4"])
+def test_urban_greening_overview_matches_postgres(live_snapshot, quarter) -> None:
+    from app.crud.crud_dashboard import URBAN_GREENING_TABLES, urban_greening_overview
+
+    year = datetime.now().year
+    _assert_parity(
+        live_snapshot,
+        URBAN_GREENING_TABLES,
+        lambda run: urban_greening_overview(run, year=year, quarter=quarter, current_month=12),
+    )
+
+
+@pytest.mark.parametrize("period", [{}, {"year": datetime.now().year}, {"year": datetime.now().year, "quarter": 1}])
+def test_emission_dashboard_summary_matches_postgres(live_snapshot, period) -> None:
+    from app.crud.crud_emission import EMISSION_DASHBOARD_TABLES, office_compliance
+
+    _assert_parity(live_snapshot, EMISSION_DASHBOARD_TABLES, lambda run: office_compliance.dashboard_summary(run, **period))
+
+
+def test_tree_carbon_statistics_match_postgres(live_snapshot) -> None:
+    from app.crud.crud_tree_inventory import CARBON_STATISTICS_TABLES, get_tree_carbon_statistics
+
+    _assert_parity(live_snapshot, CARBON_STATISTICS_TABLES, lambda run: get_tree_carbon_statistics(run=run))
@@ -0,0 +1,50 @@
+import jwt
+
+from benchmarks.auth import BENCHMARK_SUPABASE_USER_ID, SigningKey
+from benchmarks.stats import ScenarioResult, compare, percentile
+
+
+def test_percentiles_use_nearest_rank() -> None:
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_result_summary() -> None:
+    result = ScenarioResult.from_latencies([10.0, 20.0, 30.0, 40.0], errors=1, duration_s=2.0)
+
+    assert result.requests == 4
+    assert result.rps == 2.0
+    assert result.p50_ms == 20.0
+    assert result.max_ms == 40.0
+
+
+def test_compare_flags_latency_and_throughput_regressions() -> None:
+    baseline = {
+        "trees_map": {"p50_ms": 100.0, "p95_ms": 200.0, "p99_ms": 300.0, "rps": 50.0, "errors": 0},
+        "trees_stats": {"p50_ms": 1.0, "p95_ms": 1.5, "p99_ms": 2.0, "rps": 900.0, "errors": 0},
+    }
+    current = {
+        "trees_map": {"p50_ms": 105.0, "p95_ms": 260.0, "p99_ms": 310.0, "rps": 35.0, "errors": 0},
+        # +100% but under the absolute noise floor
+        "trees_stats": {"p50_ms": 2.0, "p95_ms": 3.0, "p99_ms": 3.5, "rps": 880.0, "errors": 0},
+        "new_scenario": {"p50_ms": 5.0, "p95_ms": 5.0, "p99_ms": 5.0, "rps": 1.0, "errors": 0},
+    }
+
+    regressions = compare(baseline, current, threshold=0.2)
+
+    assert {(regression.scenario, regression.metric) for regression in regressions} == {
+        ("trees_map", "p95_ms"),
+        ("trees_map", "rps"),
+    }
+
+
+def test_minted_token_verifies_with_public_key() -> None:
+    key = SigningKey.generate()
+
+    payload = jwt.decode(key.mint_token(), key.public_pem, algorithms=["ES256"], audience="authenticated")
+
+    assert payload["sub"] == str(BENCHMARK_SUPABASE_USER_ID)
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.cache_bus_service import CacheInvalidationBus, decode_payload, encode_payloads, listen_dsn
+from app.services.cache_service import Cache, MemoryCacheBackend
+
+
+def test_payloads_round_trip_and_stay_under_the_notify_limit() -> None:
+    tags = {f"tests:{year}Q{quarter}" for year in range(1000, 2000) for quarter in range(1, 5)}
+
+    payloads = encode_payloads(tags)
+
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) <= 7000 for payload in payloads)
+    assert set().union(*(decode_payload(payload) for payload in payloads)) == tags
+    assert listen_dsn("postgresql+asyncpg://u:p@db:5432/app") == "postgresql://u:p@db:5432/app"
+
+
+def test_notifications_evict_and_disconnects_fall_back_to_short_ttl(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "CACHE_BUS_FALLBACK_TTL_SECONDS", 5)
+    cache = Cache(MemoryCacheBackend(), default_ttl=300)
+    bus = CacheInvalidationBus(cache)
+    cache.set("species:{}", [1], tags=["tree_species"])
+    cache.set("roles:{}", [2], tags=["roles"])
+
+    bus._on_notification(None, 123, "app_cache", "tree_species,vehicles")
+
+    assert cache.backend.get("species:{}") == (False, None)
+    assert cache.backend.get("roles:{}") == (True, [2])
+
+    bus._set_connected(False)
+    assert cache.backend.get("roles:{}") == (False, None)
+    cache.set("roles:{}", [2], tags=["roles"])
+    expires_at = cache.backend._entries["roles:{}"][0]
+    assert expires_at <= time.monotonic() + 5
+    assert cache.ttl_cap == 5
+
+    bus._set_connected(True)
+    assert cache.ttl_cap is None and cache.backend.stats()["entries"] == 0
+
+
+def test_probe_needs_its_own_notify_to_come_back(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "CACHE_BUS_PROBE_TIMEOUT_SECONDS", 0.05)
+    bus = CacheInvalidationBus(Cache(MemoryCacheBackend()))
+
+    class Connection:
+        """Delivers NOTIFY back to the listener like a direct connection, or drops it like a transaction pooler."""
+
+        def __init__(self, delivers: bool) -> None:
+            self.delivers = delivers
+
+        async def execute(self, statement: str, channel: str, payload: str) -> None:
+            if self.delivers:
+                asyncio.get_running_loop().call_soon(bus._on_notification, self, 1, channel, payload)
+
+    async def probe(delivers: bool) -> None:
+        bus._connection = Connection(delivers)
+        await bus._probe()
+
+    asyncio.run(probe(True))
+    with pytest.raises(RuntimeError, match="session-mode"):
+        asyncio.run(probe(False))
+    assert bus.received == 0 and bus._probes == {}
+
+
+def test_bus_connects_to_a_direct_database(monkeypatch, database_conninfo) -> None:
+    monkeypatch.setattr(settings, "CACHE_BUS_DATABASE_URL", database_conninfo)
+    bus = CacheInvalidationBus(Cache(MemoryCacheBackend()), channel="app_cache_test")
+
+    async def scenario() -> bool:
+        bus.start()
+        for _ in range(100):
+            if bus.connected:
+                break
+            await asyncio.sleep(0.05)
+        await bus._probe()
+        connected = bus.connected
+        await bus.stop()
+        return connected
+
+    assert asyncio.run(scenario())
@@ -0,0 +1,141 @@
+import asyncio
+import importlib
+import time
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import Column, Integer, String, create_engine, select, update
+from sqlalchemy.orm import Session, declarative_base, make_transient_to_detached
+
+from app.services.cache_service import Cache, MemoryCacheBackend, bulk_tag, cache as app_cache
+
+Base = declarative_base()
+
+
+class Species(Base):
+    __tablename__ = "species"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    kind = Column(String, nullable=False, default="tree")
+
+
+class SpeciesOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+
+
+class CacheSession(Session):
+    pass
+
+
+def _setup():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    cache = Cache(MemoryCacheBackend())
+    cache.install(CacheSession)
+    calls = []
+
+    @cache.cached("species", tags=("species", lambda kind: [f"species:{kind}"]), model=List[SpeciesOut])
+    def list_species(kind: Optional[str] = None, db: Session = None):
+        calls.append(kind)
+        stmt = select(Species).order_by(Species.id)
+        return db.scalars(stmt.where(Species.kind == kind) if kind else stmt).all()
+
+    return engine, cache, calls, list_species
+
+
+def test_commits_evict_tagged_entries_and_rollbacks_do_not() -> None:
+    engine, cache, calls, list_species = _setup()
+    with CacheSession(engine) as db:
+        db.add(Species(id=1, name="Narra"))
+        db.commit()
+
+        assert list_species(db=db) == [{"id": 1, "name": "Narra"}]
+        assert list_species(db=db) == [{"id": 1, "name": "Narra"}]
+        assert list_species("tree", db=db) == [{"id": 1, "name": "Narra"}]
+        assert calls == [None, "tree"]
+
+        db.add(Species(id=2, name="Molave"))
+        db.rollback()
+        list_species(db=db)
+        assert calls == [None, "tree"]
+
+        db.execute(update(Species).where(Species.id == 1).values(name="Narra (Pterocarpus)"))
+        db.commit()
+        assert list_species(db=db) == [{"id": 1, "name": "Narra (Pterocarpus)"}]
+        assert calls == [None, "tree", None]
+
+    cache.tag_writes(Species, lambda species: [f"species:{species.kind}"])
+    assert cache.tags_for(Species(kind="shrub")) == {"species", "species:shrub"}
+
+
+def test_bulk_writes_evict_entries_tagged_narrower_than_the_table() -> None:
+    engine, cache, calls, list_species = _setup()
+    cache.tag_writes(Species, lambda species: [f"species:{species.kind}"])
+
+    @cache.cached("species.kind", tags=(lambda kind: [f"species:{kind}", bulk_tag("species")],))
+    def count_kind(kind: str, db: Session = None):
+        calls.append(kind)
+        return db.query(Species).filter(Species.kind == kind).count()
+
+    with CacheSession(engine) as db:
+        db.add(Species(id=1, name="Narra"))
+        db.commit()
+        assert count_kind("tree", db=db) == 1
+
+        db.add(Species(id=2, name="Sampaguita", kind="shrub"))
+        db.commit()
+        assert count_kind("tree", db=db) == 1
+        assert calls == ["tree"]
+
+        db.execute(update(Species).values(kind="shrub"))
+        db.commit()
+        assert count_kind("tree", db=db) == 0
+        assert calls == ["tree", "tree"]
+
+
+def test_test_writes_tag_the_quarter_they_moved_from() -> None:
+    # imported for its side effect: crud_emission registers the period tags
+    importlib.import_module("app.crud.crud_emission")
+    from app.models.emission_models import Test
+
+    test = Test(id=1, year=2026, quarter=1)
+    assert app_cache.tags_for(test) == {"tests", "tests:2026Q1"}
+
+    make_transient_to_detached(test)
+    test.quarter = 2
+    assert app_cache.tags_for(test) == {"tests", "tests:2026Q1", "tests:2026Q2"}
+
+
+def test_memory_backend_lru_and_ttl() -> None:
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", 1, 60, ["x"])
+    backend.set("b", 2, 60, ["y"])
+    backend.get("a")
+    backend.set("c", 3, 60, ["x"])
+
+    assert backend.get("b") == (False, None)
+    assert backend.invalidate_tags(["x"]) == 2
+    backend.set("d", 4, 0.01, [])
+    time.sleep(0.02)
+    assert backend.get("d") == (False, None)
+    assert backend.stats()["entries"] == 0
+
+
+def test_async_endpoints_are_cached() -> None:
+    cache = Cache(MemoryCacheBackend())
+    calls = []
+
+    @cache.cached("totals", tags=("totals",))
+    async def totals(year: int, db: object = None):
+        calls.append(year)
+        return {"year": year}
+
+    async def run():
+        return [await totals(2026, db=object()), await totals(2026, db=object()), await totals(2025)]
+
+    assert asyncio.run(run()) == [{"year": 2026}, {"year": 2026}, {"year": 2025}]
+    assert calls == [2026, 2025]
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import JSON, Column, DateTime, Integer, Numeric, String, create_engine, insert
+from sqlalchemy.orm import declarative_base
+
+from app.services import export_service
+
+Base = declarative_base()
+
+
+class Reading(Base):
+    __tablename__ = "readings"
+
+    id = Column(Integer, primary_key=True)
+    station = Column(String, nullable=False)
+    level = Column(Numeric(5, 2), nullable=True)
+    taken_at = Column(DateTime(timezone=True), nullable=False)
+    extra = Column(JSON, nullable=True)
+
+
+def _engine(rows: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Reading),
+            [
+                {
+                    "id": i,
+                    "station": f"st-{i % 3}",
+                    "level": None if i % 4 == 0 else i / 4,
+                    "taken_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+                    "extra": {"i": i} if i % 2 else None,
+                }
+                for i in range(1, rows + 1)
+            ],
+        )
+    return engine
+
+
+def _export(engine, export_format: str, batch_size: int = 4) -> bytes:
+    stmt = export_service.base_select(Reading).order_by(Reading.id)
+    return b"".join(export_service.export_chunks(engine.connect, stmt, export_format, batch_size))
+
+
+def test_csv_and_ndjson_carry_every_row_in_order() -> None:
+    engine = _engine(10)
+
+    rows = list(csv.DictReader(io.StringIO(_export(engine, "csv").decode())))
+    assert [row["id"] for row in rows] == [str(i) for i in range(1, 11)]
+    assert rows[0]["extra"] == '{"i": 1}' and rows[1]["extra"] == ""
+    assert rows[3]["level"] == ""
+
+    lines = [json.loads(line) for line in _export(engine, "ndjson").decode().splitlines()]
+    assert [line["id"] for line in lines] == list(range(1, 11))
+    assert lines[0]["extra"] == {"i": 1}
+    assert lines[1]["level"] == 0.5
+    assert lines[0]["taken_at"].startswith("2025-01-01")
+
+
+def test_chunks_follow_cursor_partitions() -> None:
+    engine = _engine(10)
+    stmt = export_service.base_select(Reading).order_by(Reading.id)
+    chunks = list(export_service.export_chunks(engine.connect, stmt, "ndjson", batch_size=4))
+    assert [chunk.count(b"\n") for chunk in chunks] == [4, 4, 2]
+
+
+def test_parquet_writes_one_row_group_per_partition() -> None:
+    if not export_service.parquet_available():
+        pytest.skip("pyarrow not installed")
+    import pyarrow.parquet as pq
+
+    table = pq.ParquetFile(io.BytesIO(_export(_engine(10), "parquet")))
+    assert table.metadata.num_rows == 10
+    assert table.metadata.num_row_groups == 3
@@ -0,0 +1,63 @@
+import base64
+import io
+import random
+
+from PIL import Image
+
+from app.services.gemini_service import ImageLimits, _as_bytes, _fit_image
+
+
+def _encode(image: Image.Image, format: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **options)
+    return buffer.getvalue()
+
+
+def _noise(width: int, height: int) -> Image.Image:
+    rng = random.Random(0)
+    return Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+
+
+def test_oversize_image_is_downscaled_and_reencoded() -> None:
+    data = _encode(_noise(1200, 600), "JPEG", quality=95)
+    limits = ImageLimits(max_edge=400, max_bytes=60_000)
+
+    fitted, mime_type, changed = _fit_image(data, "image/jpeg", limits)
+
+    assert changed and mime_type == "image/jpeg"
+    assert len(fitted) <= limits.max_bytes < len(data)
+    with Image.open(io.BytesIO(fitted)) as image:
+        assert image.size == (400, 200)
+
+
+def test_image_within_limits_is_returned_untouched() -> None:
+    data = _encode(_noise(300, 200), "JPEG")
+
+    fitted, mime_type, changed = _fit_image(data, "image/jpeg", ImageLimits(max_edge=400, max_bytes=len(data)))
+
+    assert fitted is data
+    assert (mime_type, changed) == ("image/jpeg", False)
+
+
+def test_non_jpeg_input_is_converted_to_jpeg() -> None:
+    rgba = _noise(800, 800).convert("RGBA")
+    data = _encode(rgba, "PNG")
+
+    fitted, mime_type, changed = _fit_image(data, "image/png", ImageLimits(max_edge=256, max_bytes=1_000_000))
+
+    assert changed and mime_type == "image/jpeg"
+    with Image.open(io.BytesIO(fitted)) as image:
+        assert (image.format, image.mode, image.size) == ("JPEG", "RGB", (256, 256))
+
+    # undecodable input is passed through as-is
+    assert _fit_image(b"not an image", "image/png", ImageLimits(1, 1)) == (b"not an image", "image/png", False)
+
+
+def test_as_bytes_decodes_base64_and_unwraps_buffers() -> None:
+    raw = b"\xff\xd8\xff\xe0jpeg"
+
+    assert _as_bytes(base64.b64encode(raw).decode()) == (raw, True)
+    assert _as_bytes(raw)[0] is raw
+    assert _as_bytes(memoryview(raw))[0] is raw
+    assert _as_bytes(memoryview(raw)[1:]) == (raw[1:], False)
+    assert _as_bytes(bytearray(raw)) == (raw, False)
@@ -0,0 +1,71 @@
+from app.services.index_advisor_service import (
+    WorkloadStatement,
+    app_tables,
+    is_covered,
+    propose_candidates,
+    render_migration,
+    to_numbered_params,
+)
+
+TREE_SEARCH = (
+    "SELECT urban_greening.tree_inventory.id, urban_greening.tree_inventory.tree_code "
+    "FROM urban_greening.tree_inventory "
+    "WHERE urban_greening.tree_inventory.is_archived = ? "
+    "AND urban_greening.tree_inventory.barangay ILIKE ? "
+    "ORDER BY urban_greening.tree_inventory.created_at DESC LIMIT ? OFFSET ?"
+)
+FEES_BY_PAYER = (
+    "SELECT urban_greening.fee_records.id FROM urban_greening.fee_records "
+    "WHERE urban_greening.fee_records.payer_name ILIKE $1 "
+    "ORDER BY urban_greening.fee_records.date DESC"
+)
+
+
+def test_candidates_follow_filters_and_ordering() -> None:
+    workload = [
+        WorkloadStatement(TREE_SEARCH, "slow_query_log", 12, 9000.0),
+        WorkloadStatement(FEES_BY_PAYER, "pg_stat_statements", 40, 1200.0),
+        WorkloadStatement("SELECT unknown.table.column FROM unknown.table", "pg_stat_statements", 99, 1.0),
+    ]
+
+    ddl = sorted(candidate.ddl() for candidate in propose_candidates(workload, app_tables()))
+
+    assert ddl == [
+        "CREATE INDEX idx_fee_records_date ON urban_greening.fee_records USING btree (date DESC)",
+        "CREATE INDEX idx_fee_records_payer_name_trgm ON urban_greening.fee_records "
+        "USING gin (payer_name gin_trgm_ops)",
+        "CREATE INDEX idx_tree_inventory_barangay_trgm ON urban_greening.tree_inventory "
+        "USING gin (barangay gin_trgm_ops)",
+        "CREATE INDEX idx_tree_inventory_created_at_partial ON urban_greening.tree_inventory "
+        "USING btree (created_at DESC) WHERE is_archived = false",
+    ]
+
+
+def test_existing_indexes_cover_candidates() -> None:
+    [trgm] = [
+        candidate
+        for candidate in propose_candidates([WorkloadStatement(FEES_BY_PAYER, "test", 1, 1.0)], app_tables())
+        if candidate.method == "gin"
+    ]
+
+    assert is_covered(trgm, [
+        "CREATE INDEX idx_payer ON urban_greening.fee_records USING gin (payer_name gin_trgm_ops)",
+    ])
+    assert not is_covered(trgm, [
+        "CREATE INDEX idx_payer ON urban_greening.fee_records USING btree (payer_name)",
+    ])
+
+
+def test_migration_stub_and_placeholders() -> None:
+    candidates = propose_candidates([WorkloadStatement(TREE_SEARCH, "test", 1, 1.0)], app_tables())
+
+    migration = render_migration(candidates, down_revision="add_slow_query_log_20261019")
+
+    assert 'down_revision: Union[str, None] = "add_slow_query_log_20261019"' in migration
+    assert 'op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")' in migration
+    assert 'postgresql_ops={"barangay": "gin_trgm_ops"}' in migration
+    assert 'postgresql_where=sa.text("is_archived = false")' in migration
+    assert 'op.drop_index("idx_tree_inventory_barangay_trgm"' in migration
+    compile(migration, "migration.py", "exec")
+
+    assert to_numbered_params("a = ? AND b IN (?, ...) AND c = ?") == "a = $1 AND b IN ($2) AND c = $3"
@@ -0,0 +1,106 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services.job_service import (
+    JobContext,
+    JobWorkerPool,
+    claim_statement,
+    finish_statement,
+    get_handler,
+    job_handler,
+    retry_delay,
+    stale_statement,
+)
+
+
+@job_handler("tests.async_double")
+async def async_double(ctx: JobContext, payload: dict) -> dict:
+    ctx.progress(0.5, "halfway")
+    return {"value": payload["value"] * 2}
+
+
+@job_handler("tests.thread_double", executor="thread")
+def thread_double(ctx: JobContext, payload: dict) -> dict:
+    ctx.progress(2, "done")
+    return {"value": payload["value"] * 2}
+
+
+job_handler("tests.process_len", executor="process")(len)
+
+
+@job_handler("tests.forever")
+async def forever(ctx: JobContext, payload: dict) -> None:
+    await asyncio.Event().wait()
+
+
+def test_claims_skip_locked_rows_in_priority_order() -> None:
+    sql = str(claim_statement("host:1").compile(dialect=postgresql.dialect()))
+
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "ORDER BY app_audit.jobs.priority DESC, app_audit.jobs.run_after, app_audit.jobs.created_at" in sql
+    assert "RETURNING" in sql
+    assert "app_audit.jobs.attempts < app_audit.jobs.max_attempts" in sql
+
+    finish = str(finish_statement(uuid.uuid4(), "host:1", status="failed").compile(dialect=postgresql.dialect()))
+    assert "app_audit.jobs.status = %(status_1)s AND app_audit.jobs.locked_by = %(locked_by_1)s" in finish
+
+    stale = str(stale_statement(60).compile(dialect=postgresql.dialect()))
+    assert "finished_at=CASE WHEN (app_audit.jobs.attempts >= app_audit.jobs.max_attempts) THEN now()" in stale
+
+
+def test_interrupted_jobs_are_requeued_only_with_attempts_left(monkeypatch) -> None:
+    pool = JobWorkerPool()
+    finished = []
+
+    async def record_finish(job_id, **values):
+        finished.append(values["status"])
+
+    monkeypatch.setattr(pool, "_finish", record_finish)
+
+    async def interrupt(attempts: int) -> None:
+        claimed = SimpleNamespace(
+            id=uuid.uuid4(), kind="tests.forever", payload={}, attempts=attempts, max_attempts=2, created_by=None
+        )
+        task = asyncio.create_task(pool.execute(claimed))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(interrupt(1))
+    asyncio.run(interrupt(2))
+    assert finished == ["queued", "failed"]
+
+
+def test_retry_backoff_doubles_up_to_the_cap(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 10)
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 60)
+
+    assert [retry_delay(attempt) for attempt in range(1, 5)] == [10, 20, 40, 60]
+
+
+def test_handlers_run_on_their_executor() -> None:
+    pool = JobWorkerPool(process_workers=1)
+
+    async def run():
+        results = []
+        for kind, payload in (("tests.async_double", {"value": 2}), ("tests.thread_double", {"value": 3})):
+            ctx = JobContext(uuid.uuid4(), 1, None)
+            results.append((await pool._call(get_handler(kind), ctx, payload), ctx.snapshot()))
+        results.append(await pool._call(get_handler("tests.process_len"), None, {"a": 1, "b": 2}))
+        await pool.stop()
+        return results
+
+    assert asyncio.run(run()) == [
+        ({"value": 4}, (0.5, "halfway")),
+        ({"value": 6}, (1.0, "done")),
+        2,
+    ]
+
+    with pytest.raises(TypeError):
+        job_handler("tests.not_async")(len)
@@ -0,0 +1,148 @@
+from datetime import date
+
+from sqlalchemy import Column, Date, Integer, String, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+
+from app.core.config import settings
+from app.crud import pagination
+from app.crud.pagination import Key, KeysetPaginator
+from app.db.page_jump_index import PageJumpIndex
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    id = Column(Integer, primary_key=True)
+    group = Column(String, nullable=False)
+    due = Column(Date, nullable=True)
+
+
+def _walk(db: Session, paginator: KeysetPaginator, limit: int):
+    pages, cursor = [], None
+    while True:
+        page = paginator.paginate_sync(db, select(Row), limit=limit, after=cursor)
+        pages.append([row.id for row in page.items])
+        if not page.next_cursor:
+            return pages
+        cursor = page.next_cursor
+
+
+def _walk_back(db: Session, paginator: KeysetPaginator, limit: int, cursor: str):
+    pages = []
+    while cursor:
+        page = paginator.paginate_sync(db, select(Row), limit=limit, before=cursor)
+        pages.insert(0, [row.id for row in page.items])
+        cursor = page.prev_cursor
+    return pages
+
+
+def test_after_and_before_walk_the_same_order() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(
+            Row(id=i, group="ab"[i % 2], due=None if i % 3 == 0 else date(2025, 1, i % 5 + 1))
+            for i in range(1, 12)
+        )
+        db.commit()
+
+        paginator = KeysetPaginator(
+            "rows", Row.group.asc(), Key(Row.due, descending=True, nulls=date.min), Row.id.desc()
+        )
+        expected = [
+            row.id
+            for row in sorted(
+                db.scalars(select(Row)),
+                key=lambda row: (row.group, -(row.due or date.min).toordinal(), -row.id),
+            )
+        ]
+
+        pages = _walk(db, paginator, limit=4)
+        assert [row_id for page in pages for row_id in page] == expected
+        assert [len(page) for page in pages] == [4, 4, 3]
+
+        last = paginator.paginate_sync(db, select(Row), limit=4, skip=8)
+        previous = paginator.paginate_sync(db, select(Row), limit=4, before=last.prev_cursor)
+        assert [row.id for row in previous.items] == pages[1]
+        assert previous.next_cursor and previous.prev_cursor
+
+
+def test_nullable_keys_without_stand_in_keep_null_rows() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(Row(id=i, group="a", due=None if i % 3 == 0 else date(2025, 1, i % 4 + 1)) for i in range(1, 14))
+        db.commit()
+        rows = list(db.scalars(select(Row)))
+
+        for descending in (True, False):
+            paginator = KeysetPaginator("rows", Key(Row.due, descending), Key(Row.id, descending))
+            # NULLs last ascending, first descending
+            expected = [
+                row.id
+                for row in sorted(rows, key=lambda row: (row.due is None, row.due or date.min, row.id), reverse=descending)
+            ]
+            pages = _walk(db, paginator, limit=3)
+            assert [row_id for page in pages for row_id in page] == expected
+
+            last = paginator.paginate_sync(db, select(Row), limit=3, skip=12)
+            back = _walk_back(db, paginator, limit=3, cursor=last.prev_cursor)
+            assert [row_id for page in back for row_id in page] + [row.id for row in last.items] == expected
+
+
+def test_deep_skip_jumps_from_cached_boundaries(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PAGE_JUMP_STRIDE", 5)
+    monkeypatch.setattr(settings, "PAGE_JUMP_MAX_WRITES", 3)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    index = PageJumpIndex()
+    index.install(engine)
+    monkeypatch.setattr(pagination, "page_jump_index", index)
+    with Session(engine) as db:
+        db.add_all(Row(id=i, group="ab"[i % 3 == 0], due=date(2025, 1, i % 7 + 1)) for i in range(1, 41))
+        db.commit()
+        paginator = KeysetPaginator("rows", Row.due.desc(), Row.id.desc())
+        ordered = [row.id for row in db.scalars(select(Row).order_by(Row.due.desc(), Row.id.desc()))]
+        stmt = select(Row).where(Row.group == "a")
+        filtered = [row.id for row in db.scalars(stmt.order_by(Row.due.desc(), Row.id.desc()))]
+
+        for skip in (5, 12, 23, 39, 45):
+            page = paginator.paginate_sync(db, select(Row), limit=4, skip=skip)
+            assert [row.id for row in page.items] == ordered[skip:skip + 4]
+        assert paginator.paginate_sync(db, stmt, limit=4, skip=11).items == [
+            db.get(Row, row_id) for row_id in filtered[11:15]
+        ]
+        assert index.stats() == {"entries": 2, "hits": 4, "builds": 2}
+
+        db.add_all(Row(id=i, group="a", due=date(2026, 1, 1)) for i in range(41, 44))
+        db.commit()
+        page = paginator.paginate_sync(db, select(Row), limit=4, skip=12)
+        assert [row.id for row in page.items] == ordered[9:13]
+        assert index.stats()["builds"] == 3
+
+
+def test_projections_of_one_query_share_boundaries(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PAGE_JUMP_STRIDE", 5)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    index = PageJumpIndex()
+    index.install(engine)
+    monkeypatch.setattr(pagination, "page_jump_index", index)
+    with Session(engine) as db:
+        db.add_all(Row(id=i, group="ab"[i % 3 == 0], due=date(2025, 1, i % 7 + 1)) for i in range(1, 41))
+        db.commit()
+        paginator = KeysetPaginator("rows", Row.due.desc(), Row.id.desc())
+        query = db.query(Row).filter(Row.group == "a")
+        filtered = [row.id for row in query.order_by(Row.due.desc(), Row.id.desc())]
+
+        narrow = query.with_entities(Row.id, Row.due)
+        wide = query.with_entities(Row.id, Row.group, Row.due)
+        assert paginator.jump_signature(narrow) == paginator.jump_signature(wide)
+        assert paginator.jump_signature(narrow) != paginator.jump_signature(narrow.filter(Row.id > 3))
+
+        for projected in (narrow, wide):
+            page = paginator.paginate_sync(db, projected, limit=4, skip=11)
+            assert [row.id for row in page.items] == filtered[11:15]
+        assert index.stats() == {"entries": 1, "hits": 1, "builds": 1}
@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from app.services.loop_watchdog_service import LoopWatchdog
+
+
+def _blocking_handler() -> None:
+    time.sleep(0.3)
+
+
+async def _run_with_stall(watchdog: LoopWatchdog) -> None:
+    watchdog.start()
+    await asyncio.sleep(0.1)
+    _blocking_handler()
+    await asyncio.sleep(0.1)
+    await watchdog.stop()
+
+
+def test_stall_is_attributed_to_blocking_call_site() -> None:
+    watchdog = LoopWatchdog(interval_ms=20, threshold_ms=100)
+
+    asyncio.run(_run_with_stall(watchdog))
+
+    stats = watchdog.stats()
+    assert stats["stalls"] == 1
+    assert stats["max_lag_ms"] >= 200
+    offender = stats["top_offenders"][0]
+    assert "_blocking_handler" in offender["site"]
+    assert offender["sample_stack"]
+
+
+def test_idle_loop_records_no_stalls() -> None:
+    watchdog = LoopWatchdog(interval_ms=20, threshold_ms=100)
+
+    async def idle() -> None:
+        watchdog.start()
+        await asyncio.sleep(0.2)
+        await watchdog.stop()
+
+    asyncio.run(idle())
+
+    assert watchdog.stats()["stalls"] == 0
+    assert watchdog.top_offenders() == []
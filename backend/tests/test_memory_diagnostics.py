@@ -0,0 +1,52 @@
+import pytest
+
+from app.services.memory_diagnostics_service import MemoryDiagnostics
+
+
+def test_diff_reports_growth_site() -> None:
+    diagnostics = MemoryDiagnostics(max_snapshots=2)
+    diagnostics.start()
+    try:
+        diagnostics.take_snapshot("before")
+        retained = [bytearray(1024) for _ in range(2000)]
+        diagnostics.take_snapshot("after")
+
+        result = diagnostics.diff("before", "after", limit=5)
+    finally:
+        diagnostics.stop()
+
+    assert result["total_growth_kb"] > 1000
+    assert "test_memory_diagnostics.py" in result["top_growth"][0]["location"]
+    assert len(retained) == 2000
+
+
+def test_snapshot_requires_tracing_and_caps_history(monkeypatch) -> None:
+    diagnostics = MemoryDiagnostics(max_snapshots=2)
+
+    with pytest.raises(ValueError):
+        diagnostics.take_snapshot("too-early")
+
+    diagnostics.start()
+    try:
+        for name in ("one", "two", "three"):
+            diagnostics.take_snapshot(name)
+    finally:
+        diagnostics.stop()
+
+    # listing reuses the totals recorded when each snapshot was taken
+    monkeypatch.setattr(MemoryDiagnostics, "_describe", None)
+    listed = diagnostics.list_snapshots()
+    assert [snapshot["name"] for snapshot in listed] == ["two", "three"]
+    assert all(snapshot["blocks"] > 0 for snapshot in listed)
+    with pytest.raises(KeyError):
+        diagnostics.diff("one", "three")
+
+
+def test_orm_instance_counts() -> None:
+    from app.models.emission_models import Vehicle
+
+    vehicles = [Vehicle(plate_number=f"ABC{i}") for i in range(3)]
+
+    counts = MemoryDiagnostics.orm_instances()
+
+    assert counts["by_class"]["Vehicle"] >= len(vehicles)
@@ -0,0 +1,45 @@
+from app.services.metrics_service import MetricsRegistry
+
+
+def test_counter_and_gauge_render_with_labels() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route", "status"))
+    depth = registry.gauge("queue_depth", "Queue depth")
+
+    requests.labels("/items/{item_id}", "200").inc()
+    requests.labels(route="/items/{item_id}", status="200").inc()
+    depth.inc(3)
+    depth.dec()
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/items/{item_id}",status="200"} 2' in text
+    assert "queue_depth 2" in text
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 5.0):
+        latency.labels("/a").observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 5.55' in lines
+
+
+def test_failing_callback_does_not_break_scrape() -> None:
+    registry = MetricsRegistry()
+    registry.gauge_callback("broken", "Broken", (), lambda: 1 / 0)
+    registry.counter("ok_total", "Ok").inc()
+
+    text = registry.render()
+
+    assert "ok_total 1" in text
+    assert "# broken unavailable" in text
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.services.ocr_service import HedgedOCR, LatencyHistogram, StubOCRProvider
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_fast_primary_wins_without_hedging() -> None:
+    primary = StubOCRProvider("primary", text="ABC123", delay_ms=5)
+    secondary = StubOCRProvider("secondary", text="XYZ999", delay_ms=5)
+    ocr = HedgedOCR(primary, secondary, default_delay_ms=200)
+
+    result = _run(ocr.recognize("", "image/jpeg"))
+
+    assert result.provider == "primary"
+    assert result.text == "ABC123"
+    assert result.hedged is False
+    assert secondary.calls == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled() -> None:
+    primary = StubOCRProvider("primary", text="ABC123", delay_ms=2000)
+    secondary = StubOCRProvider("secondary", text="XYZ999", delay_ms=10)
+    ocr = HedgedOCR(primary, secondary, default_delay_ms=20)
+
+    result = _run(ocr.recognize("", "image/jpeg"))
+
+    assert result.provider == "secondary"
+    assert result.hedged is True
+    assert primary.cancelled == 1
+    # the cancelled primary still counts, at least as slow as the hedge delay
+    assert ocr.histogram(primary).count == 1
+    assert ocr.histogram(primary).snapshot()["avg_ms"] >= 20
+
+
+def test_failed_primary_falls_through_to_secondary_immediately() -> None:
+    primary = StubOCRProvider("primary", error="boom")
+    secondary = StubOCRProvider("secondary", text="XYZ999")
+    ocr = HedgedOCR(primary, secondary, default_delay_ms=5000)
+
+    result = _run(ocr.recognize("", "image/jpeg"))
+
+    assert result.provider == "secondary"
+    assert result.latency_ms < 1000
+
+
+def test_not_found_from_both_providers_is_returned() -> None:
+    ocr = HedgedOCR(StubOCRProvider("primary"), StubOCRProvider("secondary"), default_delay_ms=5)
+
+    result = _run(ocr.recognize("", "image/jpeg"))
+
+    assert result.text == "NOT_FOUND"
+
+
+def test_all_providers_failing_raises() -> None:
+    ocr = HedgedOCR(StubOCRProvider("primary", error="down"), None)
+
+    with pytest.raises(Exception, match="All OCR providers failed"):
+        _run(ocr.recognize("", "image/jpeg"))
+
+
+def test_hedge_delay_follows_primary_p90() -> None:
+    primary = StubOCRProvider("primary")
+    ocr = HedgedOCR(primary, None, default_delay_ms=1500, min_delay_ms=100, min_samples=10)
+
+    assert ocr.hedge_delay_ms() == 1500
+
+    histogram = ocr.histogram(primary)
+    for _ in range(9):
+        histogram.observe(250)
+    histogram.observe(4000)
+
+    assert ocr.hedge_delay_ms() == 300
+
+
+def test_histogram_quantiles() -> None:
+    histogram = LatencyHistogram(buckets_ms=(10, 100, 1000))
+    assert histogram.quantile(0.9) is None
+
+    for value in (5, 50, 50, 500):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 100
+    assert histogram.quantile(0.99) == 1000
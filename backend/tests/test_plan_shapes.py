@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.plan_shapes import compare_plans, plan_shape
+
+INDEX_PLAN = [{
+    "Plan": {
+        "Node Type": "Limit", "Total Cost": 4.2, "Plan Rows": 51,
+        "Plans": [{
+            "Node Type": "Index Scan", "Relation Name": "vehicles",
+            "Index Name": "idx_vehicles_created_at_id", "Total Cost": 3.1, "Plan Rows": 51,
+        }],
+    }
+}]
+
+SEQ_PLAN = [{
+    "Plan": {
+        "Node Type": "Limit", "Total Cost": 900.0,
+        "Plans": [{
+            "Node Type": "Sort",
+            "Plans": [{"Node Type": "Seq Scan", "Relation Name": "vehicles"}],
+        }],
+    }
+}]
+
+
+def test_plan_shape_drops_costs_and_records_access() -> None:
+    shape = plan_shape(json.dumps(INDEX_PLAN))
+
+    assert shape["nodes"] == ["Limit", "  Index Scan on vehicles using idx_vehicles_created_at_id"]
+    assert shape["access"] == {"vehicles": "index"}
+
+
+def test_index_to_seq_scan_on_large_table_is_a_regression() -> None:
+    baseline = {"vehicle_keyset_first_page": [plan_shape(INDEX_PLAN)]}
+    current = {"vehicle_keyset_first_page": [plan_shape(SEQ_PLAN)]}
+
+    changes = compare_plans(baseline, current, {"vehicles": 250_000})
+
+    assert [change.regression for change in changes] == [True, False]
+    assert "index scan -> Seq Scan" in str(changes[0])
+
+
+@pytest.mark.parametrize("rows", [500, None])
+def test_seq_scan_on_small_or_unknown_table_is_only_a_change(rows) -> None:
+    baseline = {"q": [plan_shape(INDEX_PLAN)]}
+    current = {"q": [plan_shape(SEQ_PLAN)], "new_query": [plan_shape(SEQ_PLAN)]}
+    relation_rows = {"vehicles": rows} if rows else {}
+
+    changes = compare_plans(baseline, current, relation_rows)
+
+    assert len(changes) == 1 and not changes[0].regression
+
+
+def test_snapshot_has_no_plan_regressions(database_conninfo) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.config import settings
+    from app.db.database import _to_sync_psycopg
+    from benchmarks.explain import DEFAULT_SNAPSHOT
+    from benchmarks.plan_queries import capture_plans, relation_rows, snapshot_relations
+
+    if not DEFAULT_SNAPSHOT.exists():
+        pytest.skip("no plan snapshot recorded (python -m benchmarks.explain --update)")
+    snapshot = json.loads(DEFAULT_SNAPSHOT.read_text())
+
+    sync_engine = create_engine(_to_sync_psycopg(settings.DATABASE_URL))
+    async_engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        plans = capture_plans(sync_engine, async_engine)
+        rows = relation_rows(sync_engine, snapshot_relations(plans))
+    finally:
+        sync_engine.dispose()
+        asyncio.run(async_engine.dispose())
+
+    regressions = [change for change in compare_plans(snapshot["queries"], plans, rows) if change.regression]
+    assert not regressions, "\n".join(str(change) for change in regressions)
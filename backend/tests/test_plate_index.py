@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import uuid
+
+import pytest
+
+from app.services.plate_index_service import PlateIndex, weighted_distance
+
+
+@pytest.fixture()
+def index() -> PlateIndex:
+    plate_index = PlateIndex()
+    plate_index.rebuild(
+        [
+            (uuid.UUID(int=1), "abc1234", "jtdbr32e720012345", "reg0001"),
+            (uuid.UUID(int=2), "xyz5678", None, None),
+            (uuid.UUID(int=3), "abd1234", None, None),
+        ]
+    )
+    return plate_index
+
+
+def test_confusable_substitution_is_cheaper_than_edit() -> None:
+    assert weighted_distance("abc1234", "abc1234") == 0.0
+    assert weighted_distance("abc1234", "abci234") < weighted_distance("abc1234", "abc9234")
+
+
+def test_lookup_finds_ocr_misread(index: PlateIndex) -> None:
+    candidates = index.lookup("A8C-I234")
+
+    assert candidates[0].vehicle_id == uuid.UUID(int=1)
+    assert candidates[0].matched_field == "plate_number"
+    assert candidates[0].distance < 1.0
+
+
+def test_lookup_matches_chassis_and_respects_limit(index: PlateIndex) -> None:
+    candidates = index.lookup("JTDBR32E72OO12345", limit=1)
+
+    assert len(candidates) == 1
+    assert candidates[0].matched_field == "chassis_number"
+
+
+def test_lookup_excludes_candidates_beyond_distance(index: PlateIndex) -> None:
+    assert index.lookup("qqq0000") == []
+
+
+def test_upsert_and_remove_refresh_index(index: PlateIndex) -> None:
+    vehicle = type("VehicleStub", (), {})()
+    vehicle.id = uuid.UUID(int=2)
+    vehicle.plate_number = "NEW-9090"
+    vehicle.chassis_number = None
+    vehicle.registration_number = None
+
+    index.upsert(vehicle)
+    assert index.lookup("new9090")[0].vehicle_id == vehicle.id
+    assert index.lookup("xyz5678") == []
+
+    index.remove(vehicle.id)
+    assert index.lookup("new9090") == []
+
+
+def test_background_refresh_builds_off_the_event_loop(monkeypatch) -> None:
+    index = PlateIndex(max_age_seconds=3600)
+    threads = []
+
+    def refresh() -> None:
+        threads.append(threading.current_thread())
+        index.rebuild([(uuid.UUID(int=1), "abc1234", None, None)])
+
+    monkeypatch.setattr(index, "_refresh", refresh)
+
+    async def scenario() -> None:
+        index.start()
+        for _ in range(100):
+            if index.is_built:
+                break
+            await asyncio.sleep(0.01)
+        assert index.refreshing
+        # requests leave a built index to the refresher, even when stale
+        index._built_at -= 7200
+        index.ensure_built(db=None)
+        await index.stop()
+
+    asyncio.run(scenario())
+    assert threads and threads[0] is not threading.main_thread()
+    assert index.lookup("abc1234")[0].vehicle_id == uuid.UUID(int=1)
@@ -0,0 +1,113 @@
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.apis import responses
+from app.crud.crud_emission import TEST_RESPONSE, VEHICLE_LIST, test as crud_test
+from app.crud.crud_fee import FEE_LIST
+from app.crud.crud_tree_inventory import TREE_RESPONSE
+from app.crud.projection import fetch_one
+from app.models.emission_models import Office, Vehicle
+from app.models.tree_inventory_models import TreeInventory
+from app.models.urban_greening_models import FeeRecord
+from app.schemas.emission_schemas import Vehicle as VehicleSchema
+from app.schemas.fee_schemas import UrbanGreeningFeeRecord
+from app.schemas.tree_inventory_schemas import TreeInventoryResponse
+
+NOW = datetime(2025, 3, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def _row(projection, values):
+    return tuple(values.get(name) for name in projection.fields)
+
+
+@pytest.fixture(params=["orjson", "json"])
+def render(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson not installed")
+    return lambda content: json.loads(responses.render_json(content))
+
+
+def test_tree_dicts_match_the_response_schema(render) -> None:
+    values = {
+        "id": uuid.uuid4(), "tree_code": "2025-0001", "species": "Pterocarpus indicus", "common_name": "Narra",
+        "latitude": 14.6, "status": "alive", "health": "healthy", "planted_date": date(2020, 6, 1),
+        "photos": json.dumps(["/a.jpg", {"url": "/b.jpg", "size": 10}]),
+        "created_at": NOW, "is_archived": False,
+    }
+    expected = TreeInventoryResponse.from_db_model(TreeInventory(**values)).model_dump(mode="json")
+    assert render(TREE_RESPONSE.to_dicts([_row(TREE_RESPONSE, values)])) == [expected]
+
+    # unparseable photos fall back to an empty list, as from_db_model does
+    values["photos"] = "not json"
+    assert render(TREE_RESPONSE.to_dicts([_row(TREE_RESPONSE, values)]))[0]["photos"] == []
+
+
+def test_related_and_decimal_columns_match_the_response_schema(render) -> None:
+    office = {"id": uuid.uuid4(), "name": "CENRO", "created_at": NOW, "updated_at": NOW}
+    vehicle = {
+        "id": uuid.uuid4(), "driver_name": "Juan", "engine_type": "diesel", "office_id": office["id"],
+        "vehicle_type": "truck", "wheels": 6, "created_at": NOW, "updated_at": NOW,
+    }
+    orm = Vehicle(**vehicle, office=Office(**office))
+    orm.latest_test_result = orm.latest_test_date = None
+    row = _row(VEHICLE_LIST, vehicle) + _row(VEHICLE_LIST.related["office"], office)
+    assert render(VEHICLE_LIST.to_dicts([row])) == [VehicleSchema.model_validate(orm).model_dump(mode="json")]
+
+    # a vehicle without an office gets office: null, not a dict of nulls
+    no_office = (None,) * len(VEHICLE_LIST.related["office"].fields)
+    assert VEHICLE_LIST.to_dicts([_row(VEHICLE_LIST, vehicle) + no_office])[0]["office"] is None
+
+    fee = {
+        "id": uuid.uuid4(), "reference_number": "FEE-1", "type": "cutting_permit", "amount": Decimal("1500.50"),
+        "payer_name": "Ana", "date": date(2025, 2, 1), "status": "paid", "created_at": NOW, "updated_at": NOW,
+    }
+    expected = UrbanGreeningFeeRecord.model_validate(FeeRecord(**fee)).model_dump(mode="json")
+    assert render(FEE_LIST.to_dicts([_row(FEE_LIST, fee)])) == [expected]
+
+
+def test_sparse_fieldsets_select_and_emit_only_the_requested_fields() -> None:
+    sparse = TEST_RESPONSE.only(["result", "co_level", "created_by"])
+    assert sparse.fields == ("result", "co_level")
+    assert sparse.names == ("result", "co_level", "created_by")
+
+    # pagination keys are selected for the cursors but not emitted
+    paged = sparse.keeping([key.name for key in crud_test.paginator.keys])
+    assert paged.fields == ("result", "co_level", "test_date", "id")
+    assert paged.to_dicts([(True, Decimal("1.50"), NOW, uuid.uuid4())]) == [
+        {"result": True, "co_level": 1.5, "created_by": None}
+    ]
+
+    with pytest.raises(ValueError):
+        TEST_RESPONSE.only(["result", "password"])
+
+
+class _RecordingQuery:
+    """Stands in for a legacy ``Query``: records the selected columns and returns one row."""
+
+    def __init__(self, row):
+        self.row = row
+        self.columns = None
+
+    def with_entities(self, *columns):
+        self.columns = columns
+        return self
+
+    def first(self):
+        return self.row
+
+
+def test_constant_only_fieldsets_still_select_the_key() -> None:
+    tree_id = uuid.uuid4()
+    query = _RecordingQuery((tree_id,))
+    assert fetch_one(query, TREE_RESPONSE.only(["monitoring_logs_count"])) == {"monitoring_logs_count": 0}
+    assert [column.key for column in query.columns] == ["id"]
+
+    query = _RecordingQuery((tree_id, "2025-0001"))
+    assert fetch_one(query, TREE_RESPONSE.only(["id", "tree_code"])) == {"id": tree_id, "tree_code": "2025-0001"}
+    assert [column.key for column in query.columns] == ["id", "tree_code"]
@@ -0,0 +1,51 @@
+"""Per-endpoint SQL statement budgets (opt-in, needs a local database; see conftest).
+
+A budget counts the statements an endpoint executes for one request, excluding
+authentication lookups. Exceeding it usually means an N+1 pattern slipped in
+(per-row lookups, per-item commits), so raise a budget only together with a
+note on why the extra statement is needed.
+"""
+
+import uuid
+
+import psycopg
+import pytest
+
+READ_BUDGETS = [
+    # count, keyset page (office joined), latest test per vehicle
+    ("/api/v1/emission/vehicles?include_test_data=true", 3),
+    ("/api/v1/emission/vehicles", 2),
+    # aggregate counters, top species UNION ALL top barangays
+    ("/api/v1/tree-inventory/trees/stats", 2),
+    # page, processing standards for the page's request types
+    ("/api/v1/tree-management/v2/requests?limit=50", 2),
+]
+
+BATCH_SIZE = 5
+# tree codes, batched tree insert, batched monitoring-log insert, reload
+BATCH_CREATE_BUDGET = 4
+
+
+@pytest.mark.parametrize("path,budget", READ_BUDGETS)
+def test_read_endpoint_budget(api_client, query_budget, path, budget) -> None:
+    response = api_client.get(path)
+
+    assert response.status_code == 200, response.text
+    query_budget.assert_within(budget, f"GET {path}")
+
+
+def test_batch_tree_creation_budget(api_client, query_budget, database_conninfo) -> None:
+    marker = f"query-budget-{uuid.uuid4().hex[:8]}"
+    payload = [
+        {"common_name": "Narra", "species": "Pterocarpus indicus", "notes": marker}
+        for _ in range(BATCH_SIZE)
+    ]
+
+    response = api_client.post("/api/v1/tree-inventory/trees/batch", json=payload)
+    try:
+        assert response.status_code == 201, response.text
+        assert len(response.json()) == BATCH_SIZE
+        query_budget.assert_within(BATCH_CREATE_BUDGET, f"POST batch of {BATCH_SIZE} trees")
+    finally:
+        with psycopg.connect(database_conninfo) as conn:
+            conn.execute("DELETE FROM urban_greening.tree_inventory WHERE notes = %s", (marker,))
@@ -0,0 +1,46 @@
+import contextvars
+
+from sqlalchemy import create_engine, text
+
+from app.db.query_stats import begin_request_stats, install_query_hooks, statement_shape
+
+
+def test_statement_shape_collapses_binds_and_whitespace() -> None:
+    assert statement_shape("SELECT *\n  FROM t WHERE id = %(id_1)s") == "SELECT * FROM t WHERE id = ?"
+    assert statement_shape("SELECT * FROM t WHERE id IN ($1, $2, $3)") == "SELECT * FROM t WHERE id IN (?, ...)"
+
+
+def test_hooks_attribute_queries_to_current_request() -> None:
+    engine = create_engine("sqlite://")
+    install_query_hooks(engine)
+
+    def handle_request():
+        stats = begin_request_stats()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            for value in range(6):
+                conn.execute(text("SELECT :value"), {"value": value})
+        return stats
+
+    stats = contextvars.copy_context().run(handle_request)
+
+    assert stats.count == 7
+    assert stats.total_ms >= stats.slowest_ms > 0
+    assert stats.repeated_shapes(threshold=5) == [{"statement": "SELECT ?", "count": 6}]
+    assert stats.server_timing().startswith('db;dur=')
+    assert '"7 queries"' in stats.server_timing()
+    assert stats.summary()["query_count"] == 7
+
+
+def test_queries_after_request_closes_are_ignored() -> None:
+    engine = create_engine("sqlite://")
+    install_query_hooks(engine)
+
+    def finished_request():
+        stats = begin_request_stats()
+        stats.close()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return stats
+
+    assert contextvars.copy_context().run(finished_request).count == 0
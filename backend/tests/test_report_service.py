@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, create_engine, insert, update
+from sqlalchemy.orm import Session
+
+from app.services import report_service
+from app.services.report_rendering import ReportData, display, render, renderer_available, totals
+
+metadata = MetaData()
+readings = Table(
+    "readings",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("updated_at", DateTime, nullable=False),
+)
+stations = Table("stations", metadata, Column("id", Integer, primary_key=True), Column("updated_at", DateTime))
+
+
+def test_data_version_moves_with_inserts_and_updates() -> None:
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with Session(engine) as db:
+        tables = (readings, stations)
+        empty = report_service.data_version(db, tables)
+        db.execute(insert(readings).values(id=1, updated_at=datetime(2025, 1, 1)))
+        inserted = report_service.data_version(db, tables)
+        db.execute(update(readings).values(updated_at=datetime(2025, 1, 2)))
+        updated = report_service.data_version(db, tables)
+        assert len({empty, inserted, updated}) == 3
+        assert report_service.data_version(db, tables) == updated
+
+
+def test_artifact_key_covers_params_format_and_version() -> None:
+    params = report_service.ComplianceReportParams
+    key = report_service.artifact_key("emission-compliance", params(year=2025, quarter=2), "xlsx", "v1")
+    assert key == report_service.artifact_key("emission-compliance", params(quarter=2, year=2025), "xlsx", "v1")
+    assert key != report_service.artifact_key("emission-compliance", params(year=2025, quarter=3), "xlsx", "v1")
+    assert key != report_service.artifact_key("emission-compliance", params(year=2025, quarter=2), "pdf", "v1")
+    assert key != report_service.artifact_key("emission-compliance", params(year=2025, quarter=2), "xlsx", "v2")
+
+
+def test_totals_and_display_follow_the_template() -> None:
+    section = report_service.REPORTS["fee-collection"].template.sections[0]
+    rows = [("January", 2, 150.5, 100.0, 1), ("February", 1, 20.0, 0.0, 1)]
+    assert totals(section, rows) == ["Total", 3, 170.5, 100.0, 2]
+    assert totals(section, []) is None
+    assert display(1234.5, "number") == "1,234.50"
+    assert display(75, "percent") == "75.00%"
+    assert display(None, "int") == ""
+
+
+@pytest.mark.parametrize("report_format", ["xlsx", "pdf"])
+def test_render_writes_the_artifact_atomically(tmp_path, report_format) -> None:
+    if not renderer_available(report_format):
+        pytest.skip(f"{report_format} renderer not installed")
+    template = report_service.REPORTS["emission-compliance"].template
+    data = ReportData(
+        "Q2 2025",
+        datetime(2025, 7, 1, tzinfo=timezone.utc),
+        {"offices": [("City Hall", 10, 8, 6, 2, 2, 75.0, datetime(2025, 5, 1, tzinfo=timezone.utc))]},
+    )
+    path = tmp_path / f"report.{report_format}"
+    size = render(report_format, template, data, str(path))
+    assert size == path.stat().st_size > 0
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
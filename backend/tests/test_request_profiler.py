@@ -0,0 +1,46 @@
+import contextvars
+import time
+import types
+
+from app.services.profiler_service import RequestProfiler, request_profiler, start_request_profile
+
+
+def _busy_loop(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def _profiled_request(user) -> object:
+    pending = request_profiler.mark("GET", "/api/v1/admin/reports")
+    start_request_profile(user)
+    _busy_loop(0.15)
+    return request_profiler.finish(pending)
+
+
+def test_super_admin_request_is_sampled() -> None:
+    admin = types.SimpleNamespace(is_super_admin=True, email="admin@example.com")
+
+    artifact = contextvars.copy_context().run(_profiled_request, admin)
+
+    assert artifact is not None
+    assert artifact.sample_count > 0
+    assert any("_busy_loop" in stack for stack in artifact.stacks)
+    assert request_profiler.get(artifact.id) is artifact
+    assert "_busy_loop" in artifact.collapsed()
+
+    speedscope = artifact.speedscope()
+    profile = speedscope["profiles"][0]
+    assert len(profile["samples"]) == len(profile["weights"]) == len(artifact.stacks)
+
+
+def test_non_admin_header_does_not_start_sampling() -> None:
+    user = types.SimpleNamespace(is_super_admin=False, email="user@example.com")
+
+    assert contextvars.copy_context().run(_profiled_request, user) is None
+
+
+def test_unmarked_request_is_ignored() -> None:
+    profiler = RequestProfiler()
+
+    assert contextvars.copy_context().run(profiler.activate, "admin@example.com") is None
@@ -0,0 +1,58 @@
+import contextvars
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db.query_stats import begin_request_stats, install_query_hooks, set_request_user
+from app.db.slow_query_log import SlowQueryLog, redact_parameters, to_pyformat
+
+
+def test_parameters_are_redacted_to_types() -> None:
+    redacted = redact_parameters({"plate": "ABC 1234", "year": 2025, "ids": [1, 2], "at": datetime(2025, 1, 1), "x": None})
+
+    assert redacted == {"plate": "<str:8>", "year": "<int>", "ids": "<list:2>", "at": "<datetime>", "x": None}
+    assert redact_parameters([("a",), ("b",)], executemany=True) == {"executemany": 2, "first": ["<str:1>"]}
+
+
+def test_asyncpg_statements_are_rewritten_for_the_side_connection() -> None:
+    statement, params = to_pyformat("SELECT * FROM t WHERE a = $1 AND b LIKE '%x' AND c = $2 OR a = $1", ("v1", 2))
+
+    assert statement == "SELECT * FROM t WHERE a = %(p1)s AND b LIKE '%%x' AND c = %(p2)s OR a = %(p1)s"
+    assert params == {"p1": "v1", "p2": 2}
+
+
+def test_slow_statements_are_attributed_and_ranked(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG_ENABLED", True)
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", False)
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG_PERSIST", False)
+
+    engine = create_engine("sqlite://")
+    install_query_hooks(engine)
+    log = SlowQueryLog(max_entries=10)
+    log.install(engine, engine)
+
+    def handle_request():
+        begin_request_stats({"type": "http", "method": "GET", "path": "/api/v1/emission/vehicles"})
+        set_request_user("inspector@example.com")
+        with engine.connect() as conn:
+            for value in range(3):
+                conn.execute(text("SELECT :value"), {"value": f"secret-{value}"})
+            conn.execute(text("SELECT 1"))
+
+    contextvars.copy_context().run(handle_request)
+
+    recent = log.recent()
+    assert len(recent) == 4
+    assert recent[-1]["route"] == "/api/v1/emission/vehicles"
+    assert recent[-1]["user_email"] == "inspector@example.com"
+    assert recent[-1]["parameters"] == ["<str:8>"]
+    assert "secret" not in str(recent)
+    assert [entry["id"] for entry in log.recent(2)] == [entry["id"] for entry in recent[:2]]
+    assert log.recent(0) == []
+
+    top = log.top_offenders()
+    assert {item["statement"] for item in top} == {"SELECT ?", "SELECT 1"}
+    assert next(item for item in top if item["statement"] == "SELECT ?")["count"] == 3
+    assert log.get(recent[0]["id"])["shape"] == "SELECT 1"
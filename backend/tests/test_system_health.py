@@ -0,0 +1,46 @@
+import asyncio
+
+from app.services.system_health_service import SystemMetricsSampler
+
+
+def _host(n: int) -> dict:
+    return {
+        "cpu_percent": float(n), "memory_percent": 0.0, "disk_percent": 0.0,
+        "net_sent_bytes_per_sec": 0.0, "net_recv_bytes_per_sec": 0.0,
+    }
+
+
+def test_history_keeps_the_newest_samples_and_honours_limit() -> None:
+    sampler = SystemMetricsSampler(history_size=3)
+    assert sampler.latest() is None and sampler.history() == []
+
+    for n in range(5):
+        sampler._history.append(sampler._build_sample(_host(n)))
+
+    assert [sample["cpu_percent"] for sample in sampler.history()] == [2.0, 3.0, 4.0]
+    assert sampler.latest()["cpu_percent"] == 4.0
+    assert [sample["cpu_percent"] for sample in sampler.history(limit=2)] == [3.0, 4.0]
+    assert len(sampler.history(limit=10)) == 3
+    assert sampler.history(limit=0) == []
+
+
+def test_background_sampler_wraps_around() -> None:
+    sampler = SystemMetricsSampler(interval_seconds=0.01, history_size=2)
+
+    async def scenario() -> dict:
+        sampler.start()
+        while sampler.latest() is None:
+            await asyncio.sleep(0.01)
+        first = sampler.latest()
+        for _ in range(200):
+            if first not in sampler.history():
+                break
+            await asyncio.sleep(0.01)
+        await sampler.stop()
+        return first
+
+    first = asyncio.run(scenario())
+    history = sampler.history()
+    assert len(history) == 2 and first not in history
+    assert history[0]["timestamp"] <= history[1]["timestamp"]
+    assert not sampler.running
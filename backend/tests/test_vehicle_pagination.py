@@ -4,7 +4,8 @@ from typing import Optional
 
 import pytest
 
-from app.crud.crud_emission import CRUDVehicle
+from app.crud.crud_emission import CRUDVehicle, vehicle_driver_history
+from app.crud.pagination import InvalidCursorError
 from app.models.emission_models import Vehicle
 
 
@@ -19,8 +20,8 @@ def test_vehicle_cursor_roundtrip() -> None:
     crud = CRUDVehicle(Vehicle)
     vehicle = _build_vehicle()
 
-    cursor = crud._encode_vehicle_cursor(vehicle)
-    decoded_created_at, decoded_id = crud._decode_vehicle_cursor(cursor)
+    cursor = crud.paginator.cursor_for(vehicle)
+    decoded_created_at, decoded_id = crud.paginator.decode_cursor(cursor)
 
     assert decoded_id == vehicle.id
     assert decoded_created_at == vehicle.created_at
@@ -30,12 +31,23 @@ def test_decode_invalid_cursor_raises_value_error() -> None:
     crud = CRUDVehicle(Vehicle)
 
     with pytest.raises(ValueError):
-        crud._decode_vehicle_cursor("invalid cursor")
+        crud.paginator.decode_cursor("invalid cursor")
+
+
+def test_tampered_or_foreign_cursor_is_rejected() -> None:
+    crud = CRUDVehicle(Vehicle)
+    cursor = crud.paginator.cursor_for(_build_vehicle())
+    payload, signature = cursor.split(".")
+
+    with pytest.raises(InvalidCursorError):
+        crud.paginator.decode_cursor(f"{payload[:-2]}AA.{signature}")
+    with pytest.raises(InvalidCursorError):
+        vehicle_driver_history.paginator.decode_cursor(cursor)
 
 
 def test_sanitize_limit_bounds() -> None:
     crud = CRUDVehicle(Vehicle)
 
-    assert crud._sanitize_limit(None) == crud._DEFAULT_LIMIT
-    assert crud._sanitize_limit(0) == 1
-    assert crud._sanitize_limit(crud._MAX_LIMIT + 50) == crud._MAX_LIMIT
+    assert crud.paginator.sanitize_limit(None) == crud._DEFAULT_LIMIT
+    assert crud.paginator.sanitize_limit(0) == 1
+    assert crud.paginator.sanitize_limit(crud._MAX_LIMIT + 50) == crud._MAX_LIMIT